@@ -103,6 +103,9 @@ class ConfigManager:
             "cache.max_images", 100, ConfigType.INTEGER, "最大缓存图片数", env_var="PLOOKINGII_CACHE_MAX_IMAGES"
         )
         self._register_schema("cache.preview_max_mb", 128, ConfigType.INTEGER, "预览缓存最大内存(MB)")
+        self._register_schema("cache.encoded_max_mb", 256, ConfigType.INTEGER, "编码字节缓存最大内存(MB)")
+        self._register_schema("cache.encoded_window", 20, ConfigType.INTEGER, "编码字节预读窗口(张)")
+        self._register_schema("cache.mrc_sample_rate", 0.5, ConfigType.FLOAT, "缓存命中率曲线估计的采样率")
 
         # 性能配置
         self._register_schema(
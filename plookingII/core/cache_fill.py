@@ -0,0 +1,172 @@
+"""
+远程文件流式缓存填充
+
+NetworkCache 此前先 shutil.copy2 复制整个远程文件，再整体 f.read() 计算 MD5：
+60MB 的文件要完整读两遍并产生 60MB 的临时分配，解码方也必须等复制结束。
+CacheFill 把填充合并为一遍流水线：
+
+- 以固定大块（默认 1MiB，偏移天然对齐到块大小）读取远程文件，复用同一缓冲区
+- 每块增量更新 MD5 并写入临时文件 ``<local>.part``，完成后 os.replace 原子
+  改名为正式缓存文件，失败时删除临时文件
+- 已写入字节数对其他线程可见：wait_for(n) 等待前缀就绪，read_prefix(n) 直接
+  读取已完成的前缀，解码方无需等待整个文件复制完成
+
+用法:
+    fill = CacheFill(remote_path, local_path)
+    ok = fill.run()                     # 在填充线程执行
+
+    # 其他线程（例如解码器）
+    header = fill.read_prefix(64 * 1024)
+
+Author: PlookingII Team
+"""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import threading
+from collections.abc import Callable
+from typing import BinaryIO
+
+# 单次读取块大小：大块顺序读减少 SMB 往返次数
+FILL_CHUNK_BYTES = 1024 * 1024
+
+# 临时文件后缀：填充期间解码方可读取已完成的前缀
+PARTIAL_SUFFIX = ".part"
+
+
+def _open_source(path: str) -> BinaryIO:
+    # 由 CacheFill.run 负责关闭
+    return open(path, "rb", buffering=0)
+
+
+class CacheFill:
+    """一次远程文件 → 本地缓存的流式填充（读块 → 增量哈希 → 写临时文件 → 原子改名）"""
+
+    def __init__(
+        self,
+        remote_path: str,
+        local_path: str,
+        chunk_size: int = FILL_CHUNK_BYTES,
+        opener: Callable[[str], BinaryIO] | None = None,
+        progress_callback: Callable[[int, int | None], None] | None = None,
+    ):
+        """
+        Args:
+            remote_path: 远程文件路径
+            local_path: 最终缓存文件路径
+            chunk_size: 单次读取字节数
+            opener: 打开数据源的函数（需支持 readinto）；None 直接打开远程文件。
+                基准测试用于注入延迟，已读入内存的内容经 io.BytesIO 写入
+            progress_callback: 每写入一块回调 (已写入字节数, 总字节数或 None)
+        """
+        self.remote_path = remote_path
+        self.local_path = local_path
+        self.temp_path = local_path + PARTIAL_SUFFIX
+        self.chunk_size = max(4096, int(chunk_size))
+        self.checksum = ""
+        self.total_bytes: int | None = None
+        self.error: BaseException | None = None
+        self._opener = opener or _open_source
+        self._progress_callback = progress_callback
+        self._written = 0
+        self._done = False
+        self._cond = threading.Condition()
+
+    @property
+    def bytes_written(self) -> int:
+        return self._written
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def succeeded(self) -> bool:
+        return self._done and self.error is None
+
+    def progress(self) -> tuple[int, int | None]:
+        """(已写入字节数, 总字节数或 None)"""
+        return self._written, self.total_bytes
+
+    def run(self) -> bool:
+        """执行填充（阻塞直到完成）
+
+        Returns:
+            是否成功（失败原因见 error）
+        """
+        hasher = hashlib.md5(usedforsecurity=False)  # 仅用于完整性校验
+        buf = bytearray(self.chunk_size)
+        view = memoryview(buf)
+        try:
+            with self._opener(self.remote_path) as src, open(self.temp_path, "wb", buffering=0) as dst:
+                with contextlib.suppress(OSError, AttributeError, ValueError):
+                    self.total_bytes = os.fstat(src.fileno()).st_size
+                while True:
+                    n = src.readinto(buf)
+                    if not n:
+                        break
+                    chunk = view[:n]
+                    hasher.update(chunk)
+                    dst.write(chunk)
+                    with self._cond:
+                        self._written += n
+                        self._cond.notify_all()
+                    if self._progress_callback is not None:
+                        self._progress_callback(self._written, self.total_bytes)
+            # 与 copy2 一致保留时间戳等元数据（远程文件系统不支持时忽略）
+            with contextlib.suppress(OSError):
+                shutil.copystat(self.remote_path, self.temp_path)
+            os.replace(self.temp_path, self.local_path)
+            self.checksum = hasher.hexdigest()
+        except Exception as e:
+            self.error = e
+            with contextlib.suppress(OSError):
+                os.remove(self.temp_path)
+        finally:
+            view.release()
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+        return self.error is None
+
+    def wait_for(self, nbytes: int, timeout: float | None = None) -> bool:
+        """等待前 nbytes 字节写入完成（或填充结束）
+
+        Returns:
+            前缀是否可读（填充失败时为 False；文件短于 nbytes 时完成即可读）
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._written >= nbytes or self._done, timeout)
+            if self._written >= nbytes:
+                return True
+            return self.succeeded
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """等待填充结束，返回是否成功"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout)
+        return self.succeeded
+
+    def read_prefix(self, nbytes: int, timeout: float | None = None) -> bytes | None:
+        """读取已完成的前 nbytes 字节（必要时等待）
+
+        Returns:
+            前缀数据（文件更短时返回全部内容）；填充失败或超时返回 None
+        """
+        if not self.wait_for(nbytes, timeout):
+            return None
+        # 填充进行中读临时文件；若恰好已改名则读正式文件
+        for path in (self.temp_path, self.local_path):
+            try:
+                with open(path, "rb") as f:
+                    return f.read(min(nbytes, self._written))
+            except FileNotFoundError:
+                continue
+            except OSError:
+                return None
+        return None
+
+
+__all__ = ["FILL_CHUNK_BYTES", "PARTIAL_SUFFIX", "CacheFill"]
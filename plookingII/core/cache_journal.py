@@ -0,0 +1,314 @@
+"""
+网络缓存元数据日志（紧凑快照 + 追加式日志）
+
+NetworkCache 此前每缓存一个文件就以 indent=2 重写整个 cache_metadata.json：
+1 万条缓存时每次填充都是 O(n) 序列化。MetadataJournal 改为：
+
+- 变更（put / del / touch / clear / stats）以单行 JSON 追加到日志，写入为 O(1)；
+  访问更新（touch）先缓冲，随下一次结构性变更或批量阈值一起写出。记录变更
+  只在内存中缓冲，写出与 fsync 只发生在 commit()，调用方可在自己的锁外提交
+- fsync 按时间间隔批量进行（进程崩溃不丢已写出的记录，仅系统崩溃可能丢失
+  最后一批）
+- 日志记录数超过存活条目的若干倍时压缩：紧凑快照（无缩进）临时文件 +
+  os.replace 原子替换，再截断日志；替换与截断之间崩溃时重放日志结果不变
+  （所有记录幂等）
+- 启动时读取快照并重放日志；末尾被截断的半行丢弃并截掉，旧版
+  cache_metadata.json 自动迁移为快照
+
+Author: PlookingII Team
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ..config.constants import APP_NAME
+from ..imports import logging
+
+logger = logging.getLogger(APP_NAME)
+
+_SNAPSHOT_VERSION = 1
+
+SNAPSHOT_NAME = "cache_metadata.snapshot.json"
+JOURNAL_NAME = "cache_metadata.journal"
+LEGACY_METADATA_NAME = "cache_metadata.json"
+
+
+class MetadataJournal:
+    """NetworkCache 元数据持久化：快照 + 追加日志（线程安全）
+
+    条目以 dict（字段同 CacheEntry）传入传出，本类不依赖 CacheEntry。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        sync_interval: float = 2.0,
+        touch_batch: int = 64,
+        compact_min_records: int = 1000,
+        compact_ratio: float = 4.0,
+    ):
+        """
+        Args:
+            cache_dir: 缓存目录
+            sync_interval: fsync 最小间隔（秒）；0 表示每次写出都 fsync
+            touch_batch: 缓冲的访问更新达到该数量时写出
+            compact_min_records: 日志记录数低于该值时不压缩
+            compact_ratio: 日志记录数超过存活条目数的该倍数时压缩
+        """
+        self.snapshot_path = os.path.join(cache_dir, SNAPSHOT_NAME)
+        self.journal_path = os.path.join(cache_dir, JOURNAL_NAME)
+        self.legacy_path = os.path.join(cache_dir, LEGACY_METADATA_NAME)
+        self.sync_interval = sync_interval
+        self.touch_batch = touch_batch
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+
+        self._lock = threading.RLock()
+        self._pending: list[str] = []
+        self._touches: dict[str, tuple[float, int]] = {}
+        self._journal_records = 0
+        self._journal_file = None
+        self._last_sync = 0.0
+        self._stats = {"appended": 0, "syncs": 0, "compactions": 0, "recovered_bytes": 0}
+
+    # —— 加载 ——
+    def load(self) -> tuple[dict[str, dict], dict]:
+        """读取快照并重放日志
+
+        Returns:
+            (cache_key → 条目字段 dict, 统计信息 dict)
+        """
+        with self._lock:
+            entries, stats = self._read_snapshot()
+            if not entries and not os.path.exists(self.snapshot_path) and os.path.exists(self.legacy_path):
+                entries, stats = self._migrate_legacy()
+            self._journal_records = self._replay(entries, stats)
+            return entries, stats
+
+    def _read_snapshot(self) -> tuple[dict[str, dict], dict]:
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get("version") != _SNAPSHOT_VERSION:
+                return {}, {}
+            return dict(data.get("entries", {})), dict(data.get("stats", {}))
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError, TypeError):
+            logger.warning("网络缓存元数据快照损坏，忽略: %s", self.snapshot_path)
+            return {}, {}
+
+    def _migrate_legacy(self) -> tuple[dict[str, dict], dict]:
+        """旧版整份 JSON 元数据 → 快照（迁移成功后删除旧文件）"""
+        try:
+            with open(self.legacy_path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = dict(data.get("cache_index", {}))
+            stats = dict(data.get("stats", {}))
+        except (OSError, ValueError, TypeError, AttributeError):
+            logger.warning("旧版网络缓存元数据读取失败，忽略: %s", self.legacy_path)
+            return {}, {}
+        if self._write_snapshot(entries, stats):
+            with contextlib.suppress(OSError):
+                os.remove(self.legacy_path)
+        return entries, stats
+
+    def _replay(self, entries: dict[str, dict], stats: dict) -> int:
+        """按序重放日志到 entries/stats；末尾不完整的记录截掉。返回有效记录数"""
+        try:
+            with open(self.journal_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return 0
+        except OSError:
+            logger.warning("网络缓存元数据日志读取失败，忽略: %s", self.journal_path)
+            return 0
+
+        good_end = 0
+        records = 0
+        for line in raw.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                rec = json.loads(line)
+                self._apply(rec, entries, stats)
+            except (ValueError, TypeError, KeyError):
+                break
+            good_end += len(line)
+            records += 1
+
+        if good_end < len(raw):
+            # 崩溃留下的半行（或损坏记录）：丢弃其后的内容，保证后续追加从整行开始
+            self._stats["recovered_bytes"] += len(raw) - good_end
+            logger.info("网络缓存元数据日志恢复：丢弃末尾 %d 字节", len(raw) - good_end)
+            with contextlib.suppress(OSError), open(self.journal_path, "r+b") as f:
+                f.truncate(good_end)
+        return records
+
+    @staticmethod
+    def _apply(rec: dict, entries: dict[str, dict], stats: dict) -> None:
+        op = rec["op"]
+        if op == "put":
+            entries[rec["k"]] = rec["e"]
+        elif op == "del":
+            entries.pop(rec["k"], None)
+        elif op == "touch":
+            entry = entries.get(rec["k"])
+            if entry is not None:
+                entry["last_access_time"] = rec["t"]
+                entry["access_count"] = rec["n"]
+        elif op == "clear":
+            entries.clear()
+        elif op == "stats":
+            stats.clear()
+            stats.update(rec["s"])
+
+    # —— 记录变更 ——
+    def put(self, key: str, entry: dict) -> None:
+        self._append({"op": "put", "k": key, "e": entry})
+
+    def delete(self, key: str) -> None:
+        self._append({"op": "del", "k": key})
+
+    def touch(self, key: str, last_access_time: float, access_count: int) -> bool:
+        """访问更新：仅缓冲，同键只保留最新值
+
+        Returns:
+            缓冲的访问更新是否已达批量阈值（调用方应尽快 commit）
+        """
+        with self._lock:
+            self._touches[key] = (last_access_time, access_count)
+            return len(self._touches) >= self.touch_batch
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touches.clear()
+            self._append({"op": "clear"})
+
+    def _append(self, rec: dict) -> None:
+        with self._lock:
+            if rec["op"] == "put" or rec["op"] == "del":
+                self._touches.pop(rec["k"], None)
+            self._pending.append(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+
+    def _drain_touches(self) -> None:
+        for key, (t, n) in self._touches.items():
+            self._pending.append(json.dumps({"op": "touch", "k": key, "t": t, "n": n}, separators=(",", ":")))
+        self._touches.clear()
+
+    # —— 写出 / 压缩 ——
+    def commit(
+        self,
+        stats: dict | Callable[[], dict] | None = None,
+        snapshot_state: Callable[[], tuple[dict[str, dict], dict]] | None = None,
+        live_entries: int = 0,
+        sync: bool = False,
+    ) -> None:
+        """写出缓冲的记录（附带最新统计），按间隔 fsync，必要时压缩
+
+        Args:
+            stats: 当前统计信息（作为 stats 记录写入）；传入函数时在日志锁内取值，
+                并发提交时后写出的统计一定不旧于先写出的
+            snapshot_state: 返回 (全部条目, 统计) 的函数；需要压缩时才调用
+            live_entries: 当前存活条目数（决定是否压缩）
+            sync: 立即 fsync
+        """
+        with self._lock:
+            self._drain_touches()
+            if callable(stats):
+                stats = stats()
+            if stats is not None:
+                self._pending.append(json.dumps({"op": "stats", "s": stats}, separators=(",", ":")))
+            if not self._pending:
+                return
+            try:
+                f = self._open_journal()
+                f.write(("\n".join(self._pending) + "\n").encode("utf-8"))
+                f.flush()
+                self._journal_records += len(self._pending)
+                self._stats["appended"] += len(self._pending)
+                self._pending.clear()
+                now = time.monotonic()
+                if sync or now - self._last_sync >= self.sync_interval:
+                    os.fsync(f.fileno())
+                    self._last_sync = now
+                    self._stats["syncs"] += 1
+            except OSError as e:
+                logger.warning("网络缓存元数据日志写入失败: %s", e)
+                return
+
+            if snapshot_state is not None and self.should_compact(live_entries):
+                entries, snap_stats = snapshot_state()
+                self.compact(entries, snap_stats)
+
+    def should_compact(self, live_entries: int) -> bool:
+        """日志记录数是否已足够多、应压缩为快照"""
+        with self._lock:
+            if self._journal_records < self.compact_min_records:
+                return False
+            return self._journal_records > self.compact_ratio * max(1, live_entries)
+
+    def compact(self, entries: dict[str, dict], stats: dict) -> bool:
+        """写入紧凑快照并截断日志"""
+        with self._lock:
+            self._drain_touches()
+            self._pending.clear()
+            if not self._write_snapshot(entries, stats):
+                return False
+            try:
+                f = self._open_journal()
+                f.truncate(0)
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError as e:
+                logger.warning("网络缓存元数据日志截断失败: %s", e)
+                return False
+            self._journal_records = 0
+            self._stats["compactions"] += 1
+            return True
+
+    def _write_snapshot(self, entries: dict[str, dict], stats: dict) -> bool:
+        payload = {"version": _SNAPSHOT_VERSION, "entries": entries, "stats": stats}
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            return True
+        except OSError as e:
+            logger.warning("网络缓存元数据快照写入失败: %s", e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            return False
+
+    def _open_journal(self):
+        if self._journal_file is None or self._journal_file.closed:
+            self._journal_file = open(self.journal_path, "ab")  # noqa: SIM115  # 长期持有，close() 关闭
+        return self._journal_file
+
+    def close(self) -> None:
+        """写出缓冲并关闭日志文件"""
+        with self._lock:
+            with contextlib.suppress(Exception):
+                self.commit(sync=True)
+            if self._journal_file is not None:
+                with contextlib.suppress(OSError):
+                    self._journal_file.close()
+                self._journal_file = None
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["journal_records"] = self._journal_records
+            stats["pending"] = len(self._pending) + len(self._touches)
+            return stats
+
+
+__all__ = ["JOURNAL_NAME", "LEGACY_METADATA_NAME", "SNAPSHOT_NAME", "MetadataJournal"]
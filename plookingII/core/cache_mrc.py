@@ -0,0 +1,244 @@
+"""
+图片缓存的在线缺失率曲线（MRC）估计与容量自动调优
+
+缓存容量原先只按物理内存的静态规则给出（_compute_cache_params / 默认
+20 项 2000MB），无法回答"再加一倍内存能多命中多少"。本模块在线估计
+当前访问流在 0.5x / 1x / 2x / 4x 容量下的 LRU 命中率：
+
+- 空间采样（SHARDS）：按键哈希只跟踪固定比例的路径，被采样键之间的重用
+  距离按采样率放大即为全量重用距离的估计，开销与采样率成正比
+- 幽灵 LRU 栈：只记录被采样路径的访问顺序与记账大小（不持有图像），
+  一次读取的重用距离为栈中比它更新的键数与字节数；距离超出最大倍率
+  容量的键必然全部缺失，直接从栈底丢弃，栈长度因此有界
+- 同时按条目数与内存双重上限判定命中，与 SimpleImageCache 的双重约束一致
+
+CacheAutoTuner 依据曲线的边际收益给出扩容/缩容建议，扩容量不超过内存
+看门狗预防阈值的剩余空间；ImageManager 仅在看门狗空闲周期调用。
+
+用法:
+    mrc = MissRatioCurveEstimator(max_items=40, max_memory_mb=3000)
+    cache.set_mrc_estimator(mrc)
+    mrc.hit_ratios()   # {0.5: 0.41, 1.0: 0.63, 2.0: 0.70, 4.0: 0.72}
+"""
+
+import logging
+import math
+import threading
+import zlib
+from collections import OrderedDict
+
+from ..config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+# 报告的容量倍率
+MRC_SCALES = (0.5, 1.0, 2.0, 4.0)
+
+# 默认采样率：图片缓存访问频率低（每次翻页数次），半数采样已足够平滑
+DEFAULT_MRC_SAMPLE_RATE = 0.5
+
+# 哈希采样空间：crc32 低 24 位与阈值比较
+_HASH_MODULUS = 1 << 24
+
+# 幽灵栈的字节余量：栈底条目自身大小不计入重用距离，留少量余量避免过早丢弃
+_GHOST_MB_SLACK = 1.25
+
+
+class MissRatioCurveEstimator:
+    """空间采样重用距离 + 幽灵 LRU 栈的在线 MRC 估计（线程安全）"""
+
+    def __init__(
+        self,
+        max_items: int,
+        max_memory_mb: float,
+        sample_rate: float = DEFAULT_MRC_SAMPLE_RATE,
+        scales: tuple[float, ...] = MRC_SCALES,
+    ):
+        """
+        Args:
+            max_items: 缓存当前条目上限（1x 基准）
+            max_memory_mb: 缓存当前内存上限（1x 基准）
+            sample_rate: 采样率 (0, 1]
+            scales: 报告的容量倍率
+        """
+        self.sample_rate = min(1.0, max(1.0 / _HASH_MODULUS, float(sample_rate)))
+        self.scales = tuple(sorted(scales))
+        self._threshold = int(self.sample_rate * _HASH_MODULUS)
+        self._lock = threading.Lock()
+        self._ghost: OrderedDict[str, float] = OrderedDict()
+        self._ghost_mb = 0.0
+        self.set_capacity(max_items, max_memory_mb)
+
+    def set_capacity(self, max_items: int, max_memory_mb: float) -> None:
+        """更新 1x 基准容量并清零命中计数（幽灵栈保留，新基准下继续估计）"""
+        with self._lock:
+            self.max_items = max(1, int(max_items))
+            self.max_memory_mb = max(0.0, float(max_memory_mb))
+            top = self.scales[-1]
+            self._max_tracked = math.ceil(top * self.max_items * self.sample_rate) + 1
+            self._max_tracked_mb = top * self.max_memory_mb * self.sample_rate * _GHOST_MB_SLACK
+            self.samples = 0
+            self.cold_misses = 0
+            self._hits = [0] * len(self.scales)
+            self._prune_locked()
+
+    def _sampled(self, key: str) -> bool:
+        return (zlib.crc32(key.encode("utf-8", "surrogatepass")) % _HASH_MODULUS) < self._threshold
+
+    # ------------------------------------------------------------------
+    # 访问流
+    # ------------------------------------------------------------------
+    def record_get(self, key: str) -> None:
+        """记录一次读取（按路径，不区分档位）"""
+        if not self._sampled(key):
+            return
+        with self._lock:
+            self.samples += 1
+            size_mb = self._ghost.get(key)
+            if size_mb is None:
+                # 首次访问或已超出最大倍率容量：所有倍率下均缺失，随后的 put 入栈
+                self.cold_misses += 1
+                return
+            items = 0
+            newer_mb = 0.0
+            for other in reversed(self._ghost):
+                if other == key:
+                    break
+                items += 1
+                newer_mb += self._ghost[other]
+            distance_items = items / self.sample_rate
+            distance_mb = newer_mb / self.sample_rate + size_mb
+            for i, scale in enumerate(self.scales):
+                if distance_items < scale * self.max_items and distance_mb <= scale * self.max_memory_mb:
+                    self._hits[i] += 1
+            self._ghost.move_to_end(key)
+
+    def record_put(self, key: str, size_mb: float) -> None:
+        """记录一次写入（缺失回填或预取）：路径移到栈顶并更新记账大小"""
+        if not self._sampled(key):
+            return
+        with self._lock:
+            old = self._ghost.pop(key, None)
+            if old is not None:
+                self._ghost_mb -= old
+            size_mb = max(0.0, float(size_mb))
+            self._ghost[key] = size_mb
+            self._ghost_mb += size_mb
+            self._prune_locked()
+
+    def _prune_locked(self) -> None:
+        """丢弃栈底超出最大倍率容量的键（其后的读取在所有倍率下均缺失）"""
+        while len(self._ghost) > 1 and (len(self._ghost) > self._max_tracked or self._ghost_mb > self._max_tracked_mb):
+            _, size_mb = self._ghost.popitem(last=False)
+            self._ghost_mb -= size_mb
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ghost.clear()
+            self._ghost_mb = 0.0
+        self.set_capacity(self.max_items, self.max_memory_mb)
+
+    # ------------------------------------------------------------------
+    # 结果
+    # ------------------------------------------------------------------
+    def hit_ratios(self) -> dict[float, float]:
+        """各倍率下的估计命中率（尚无采样时为空字典）"""
+        with self._lock:
+            if not self.samples:
+                return {}
+            return {scale: hits / self.samples for scale, hits in zip(self.scales, self._hits, strict=True)}
+
+    def get_stats(self) -> dict:
+        ratios = self.hit_ratios()
+        with self._lock:
+            return {
+                "samples": self.samples,
+                "cold_misses": self.cold_misses,
+                "sample_rate": self.sample_rate,
+                "tracked": len(self._ghost),
+                "max_items": self.max_items,
+                "max_memory_mb": self.max_memory_mb,
+                "hit_rate_pct": {f"{scale:g}x": round(ratio * 100, 2) for scale, ratio in ratios.items()},
+            }
+
+    def report_rows(self) -> list[dict]:
+        """性能报告用的表格行（每个倍率一行）"""
+        ratios = self.hit_ratios()
+        with self._lock:
+            samples = self.samples
+            return [
+                {
+                    "倍率": f"{scale:g}x",
+                    "条目上限": round(scale * self.max_items),
+                    "内存上限(MB)": round(scale * self.max_memory_mb),
+                    "估计命中率": f"{ratios[scale]:.1%}" if scale in ratios else "-",
+                    "采样读取": samples,
+                }
+                for scale in self.scales
+            ]
+
+
+class CacheAutoTuner:
+    """按 MRC 的边际收益调整缓存容量（无状态建议器，由调用方执行 resize）
+
+    - 扩容：2x 相对 1x 的命中率增益 ≥ grow_gain，且新增内存不超过看门狗余量
+      （余量不足翻倍时按余量部分扩容，增幅不足 25% 则不动）
+    - 缩容：1x 相对 0.5x 的增益 < shrink_gain，说明一半容量已足够
+    - 始终限制在初始容量的 [min_factor, max_factor] 倍之间
+    """
+
+    def __init__(
+        self,
+        base_items: int,
+        base_memory_mb: float,
+        min_samples: int = 200,
+        grow_gain: float = 0.05,
+        shrink_gain: float = 0.01,
+        min_factor: float = 0.5,
+        max_factor: float = 4.0,
+    ):
+        self.base_items = max(1, int(base_items))
+        self.base_memory_mb = float(base_memory_mb)
+        self.min_samples = min_samples
+        self.grow_gain = grow_gain
+        self.shrink_gain = shrink_gain
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+
+    def suggest(self, estimator: MissRatioCurveEstimator, headroom_mb: float) -> tuple[int, float] | None:
+        """给出新的 (max_items, max_memory_mb)；无需调整返回 None
+
+        Args:
+            estimator: 当前容量为 1x 基准的 MRC 估计
+            headroom_mb: 看门狗预防阈值减去当前 RSS 的剩余内存（MB）
+        """
+        if estimator.samples < self.min_samples:
+            return None
+        ratios = estimator.hit_ratios()
+        if not {0.5, 1.0, 2.0} <= ratios.keys():
+            return None
+        items, memory = estimator.max_items, estimator.max_memory_mb
+        if memory <= 0:
+            return None
+
+        factor = 1.0
+        if ratios[2.0] - ratios[1.0] >= self.grow_gain:
+            limit = self.max_factor * self.base_memory_mb / memory
+            factor = min(2.0, limit, (memory + max(0.0, headroom_mb)) / memory)
+            if factor < 1.25:
+                return None
+        elif ratios[1.0] - ratios[0.5] < self.shrink_gain:
+            factor = max(0.5, self.min_factor * self.base_memory_mb / memory)
+            if factor > 0.8:
+                return None
+        else:
+            return None
+        return max(1, round(items * factor)), round(memory * factor, 1)
+
+
+__all__ = [
+    "DEFAULT_MRC_SAMPLE_RATE",
+    "MRC_SCALES",
+    "CacheAutoTuner",
+    "MissRatioCurveEstimator",
+]
@@ -0,0 +1,431 @@
+"""
+图片缓存的准入/淘汰策略（W-TinyLFU）与访问轨迹回放
+
+纯 LRU 下，预取扫过下一个文件夹或快速拖动浏览 200 张图，就会把用户
+反复回看的图片（HOT3、刚保留的图片）全部冲掉。W-TinyLFU 用频率决定
+"新来的是否值得挤掉老的"：
+
+- 频率草图：Count-Min（4 行、4 位饱和计数），累计增量达到采样上限后
+  全部减半老化，使频率反映近期热度；内存占用与缓存容量成正比
+- 窗口 LRU：新条目先进入小窗口，保留最近访问的图片（当前图与相邻图）
+- 分段主区：probation（试用）+ protected（保护）两段 LRU；试用段命中
+  晋升到保护段，保护段溢出降级回试用段
+- 准入：窗口溢出的候选进入主区前，按 size_mb 从试用段（不足时保护段）
+  LRU 端收集需要腾出的受害者；候选频率严格高于其中最高频率才准入，
+  否则丢弃候选。大图必须比它挤掉的每一张图都更热（按成本准入）
+
+轨迹回放：CacheTraceRecorder 以 JSON Lines 记录缓存 get/put 事件，
+replay_trace/compare_policies 用同一份轨迹分别驱动 LRU 与 W-TinyLFU 的
+SimpleImageCache，对比命中率。
+
+Author: PlookingII Team
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from ..config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+POLICY_LRU = "lru"
+POLICY_TINYLFU = "tinylfu"
+
+# 4 位计数上限
+_MAX_COUNT = 15
+# 各行哈希的乘法种子（奇数，打散低位）
+_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+# 老化：每个计数减半（bytearray.translate 一次完成）
+_HALVE_TABLE = bytes(v >> 1 for v in range(256))
+
+
+class FrequencySketch:
+    """Count-Min 频率草图（4 行、4 位饱和计数、周期性减半老化）"""
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: 缓存容量（条目数），决定草图宽度与老化采样周期
+        """
+        width = 16
+        while width < capacity * 8:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in _SEEDS]
+        self._sample_size = max(16, capacity * 10)
+        self._additions = 0
+
+    def _indexes(self, key) -> list[int]:
+        h = hash(key) & _MASK64
+        out = []
+        for seed in _SEEDS:
+            x = (h * seed) & _MASK64
+            out.append((x ^ (x >> 29)) & self._mask)
+        return out
+
+    def increment(self, key) -> None:
+        added = False
+        for row, i in zip(self._rows, self._indexes(key), strict=True):
+            if row[i] < _MAX_COUNT:
+                row[i] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._age()
+
+    def frequency(self, key) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key), strict=True))
+
+    def _age(self) -> None:
+        for row in self._rows:
+            row[:] = row.translate(_HALVE_TABLE)
+        self._additions //= 2
+
+
+class _Region:
+    """策略中的一段 LRU：键 → 记账大小，维护段内内存合计"""
+
+    __slots__ = ("entries", "memory_mb")
+
+    def __init__(self):
+        self.entries: OrderedDict[str, float] = OrderedDict()
+        self.memory_mb = 0.0
+
+    def add(self, key: str, size_mb: float) -> None:
+        self.entries[key] = size_mb
+        self.memory_mb += size_mb
+
+    def pop(self, key: str) -> float:
+        size = self.entries.pop(key)
+        self.memory_mb -= size
+        return size
+
+    def pop_oldest(self) -> tuple[str, float]:
+        key, size = self.entries.popitem(last=False)
+        self.memory_mb -= size
+        return key, size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.memory_mb = 0.0
+
+
+class WTinyLFUPolicy:
+    """W-TinyLFU 准入/淘汰策略（非线程安全，由缓存持锁调用）
+
+    只维护键与记账大小，不持有值；on_insert/pop_victims 返回需要从缓存中
+    移除的键，由缓存执行实际删除。
+    """
+
+    name = POLICY_TINYLFU
+
+    def __init__(self, max_items: int, max_memory_mb: float, window_pct: float = 0.2, protected_pct: float = 0.8):
+        """
+        Args:
+            max_items: 缓存条目上限
+            max_memory_mb: 缓存内存上限（MB）
+            window_pct: 窗口占总容量比例（图片浏览以相邻图回看为主，默认高于通用缓存的 1%）
+            protected_pct: 保护段占主区比例
+        """
+        self.max_items = max(1, max_items)
+        self.max_memory_mb = max_memory_mb
+        self.window_items = max(1, round(self.max_items * window_pct))
+        self.window_memory_mb = max_memory_mb * self.window_items / self.max_items
+        self.protected_pct = protected_pct
+        self.sketch = FrequencySketch(self.max_items)
+        self._window = _Region()
+        self._probation = _Region()
+        self._protected = _Region()
+        self._where: dict[str, _Region] = {}
+        self.admitted = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._where
+
+    def record_access(self, key: str, hit: bool) -> None:
+        """记录一次读取：累加频率；命中时调整所在段的位置"""
+        self.sketch.increment(key)
+        if not hit:
+            return
+        region = self._where.get(key)
+        if region is None:
+            return
+        if region is self._probation:
+            # 试用段命中：晋升保护段，保护段溢出的 LRU 端降级回试用段
+            size = self._probation.pop(key)
+            self._protected.add(key, size)
+            self._where[key] = self._protected
+            self._demote_protected_overflow()
+        else:
+            region.entries.move_to_end(key)
+
+    def resize(self, max_items: int, max_memory_mb: float) -> list[str]:
+        """调整容量上限（窗口按原比例重算，频率草图保留）
+
+        Returns:
+            缩容后需要从缓存移除的键
+        """
+        window_pct = self.window_items / self.max_items
+        self.max_items = max(1, max_items)
+        self.max_memory_mb = max_memory_mb
+        self.window_items = max(1, round(self.max_items * window_pct))
+        self.window_memory_mb = max_memory_mb * self.window_items / self.max_items
+        self._demote_protected_overflow()
+        return self._evict_overflow()
+
+    def on_insert(self, key: str, size_mb: float) -> list[str]:
+        """写入一个键（新键进入窗口，已有键更新大小并视作访问）
+
+        Returns:
+            需要从缓存移除的键（可能包含被拒绝准入的候选本身）
+        """
+        self.sketch.increment(key)
+        region = self._where.get(key)
+        if region is not None:
+            region.pop(key)
+            region.add(key, size_mb)
+            if region is self._protected:
+                self._demote_protected_overflow()
+        else:
+            self._window.add(key, size_mb)
+            self._where[key] = self._window
+        return self._evict_overflow()
+
+    def on_remove(self, key: str) -> None:
+        """缓存侧移除了键（显式删除、对账、淘汰）"""
+        region = self._where.pop(key, None)
+        if region is not None:
+            region.pop(key)
+
+    def pop_victims(self, count: int) -> list[str]:
+        """按价值从低到高选出 count 个键移除：试用段 → 窗口 → 保护段（均从 LRU 端）"""
+        victims = []
+        for region in (self._probation, self._window, self._protected):
+            while len(victims) < count and region.entries:
+                key, _ = region.pop_oldest()
+                del self._where[key]
+                victims.append(key)
+        return victims
+
+    def clear(self) -> None:
+        """清空键集合（保留频率草图：历史热度对下一批图片仍有参考价值）"""
+        for region in (self._window, self._probation, self._protected):
+            region.clear()
+        self._where.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "policy": self.name,
+            "window": len(self._window.entries),
+            "probation": len(self._probation.entries),
+            "protected": len(self._protected.entries),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    def _main_limits(self) -> tuple[int, float]:
+        """主区容量：总容量减去窗口预算（窗口实际占用不挤压主区）"""
+        return self.max_items - self.window_items, self.max_memory_mb - self.window_memory_mb
+
+    def _demote_protected_overflow(self) -> None:
+        max_items, max_memory = self._main_limits()
+        limit_items = max(1, int(max_items * self.protected_pct))
+        limit_memory = max_memory * self.protected_pct
+        while len(self._protected.entries) > 1 and (
+            len(self._protected.entries) > limit_items or self._protected.memory_mb > limit_memory
+        ):
+            key, size = self._protected.pop_oldest()
+            self._probation.add(key, size)
+            self._where[key] = self._probation
+
+    def _evict_overflow(self) -> list[str]:
+        victims: list[str] = []
+        # 窗口溢出：LRU 端候选逐个竞争进入主区（窗口至少保留最近一个条目）
+        while len(self._window.entries) > 1 and (
+            len(self._window.entries) > self.window_items or self._window.memory_mb > self.window_memory_mb
+        ):
+            key, size = self._window.pop_oldest()
+            del self._where[key]
+            victims.extend(self._admit(key, size))
+        # 总量兜底：窗口仅剩的最新条目超出窗口预算、或已有键更新了大小时，
+        # 总占用仍可能超限，从主区低价值端淘汰
+        while self._probation.entries or self._protected.entries:
+            items = len(self._where)
+            memory = self._window.memory_mb + self._probation.memory_mb + self._protected.memory_mb
+            if items <= self.max_items and memory <= self.max_memory_mb:
+                break
+            region = self._probation if self._probation.entries else self._protected
+            key, _ = region.pop_oldest()
+            del self._where[key]
+            victims.append(key)
+        return victims
+
+    def _admit(self, candidate: str, size_mb: float) -> list[str]:
+        """候选进入主区：按大小收集需腾出的受害者，候选更热才准入"""
+        max_items, max_memory = self._main_limits()
+        items = len(self._probation.entries) + len(self._protected.entries) + 1
+        memory = self._probation.memory_mb + self._protected.memory_mb + size_mb
+        pending: list[tuple[_Region, str, float]] = []
+        for region in (self._probation, self._protected):
+            for key, size in region.entries.items():
+                if items <= max_items and memory <= max_memory:
+                    break
+                pending.append((region, key, size))
+                items -= 1
+                memory -= size
+        if items > max_items or memory > max_memory:
+            # 即使清空主区也放不下
+            self.rejected += 1
+            return [candidate]
+        if pending:
+            candidate_freq = self.sketch.frequency(candidate)
+            if candidate_freq <= max(self.sketch.frequency(key) for _, key, _ in pending):
+                self.rejected += 1
+                return [candidate]
+        victims = []
+        for region, key, _ in pending:
+            region.pop(key)
+            del self._where[key]
+            victims.append(key)
+        self._probation.add(candidate, size_mb)
+        self._where[candidate] = self._probation
+        self.admitted += 1
+        return victims
+
+
+def create_policy(name: str, max_items: int, max_memory_mb: float) -> WTinyLFUPolicy | None:
+    """按名称创建策略；POLICY_LRU（或未知名称）返回 None，表示缓存自身的 LRU"""
+    if name == POLICY_TINYLFU:
+        return WTinyLFUPolicy(max_items, max_memory_mb)
+    if name != POLICY_LRU:
+        logger.warning("未知缓存策略 %s，使用 LRU", name)
+    return None
+
+
+class CacheTraceRecorder:
+    """以 JSON Lines 记录缓存访问轨迹：{"op": "get"|"put", "key": ..., "size_mb": ...}"""
+
+    def __init__(self, path: str, flush_every: int = 64):
+        self.path = path
+        self._flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115  # 长期持有，close() 关闭
+
+    def record(self, op: str, key: str, size_mb: float = 0.0) -> None:
+        line = json.dumps({"op": op, "key": key, "size_mb": round(size_mb, 3)}, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(line + "\n")
+                self._pending += 1
+                if self._pending >= self._flush_every:
+                    self._file.flush()
+                    self._pending = 0
+            except (OSError, ValueError):
+                logger.debug("缓存轨迹写入失败: %s", self.path, exc_info=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+
+def load_trace(path: str) -> list[tuple[str, str, float]]:
+    """读取轨迹文件，跳过损坏行
+
+    Returns:
+        [(op, key, size_mb), ...]
+    """
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                raw = json.loads(line)
+                op = raw["op"]
+                if op in ("get", "put"):
+                    events.append((op, str(raw["key"]), float(raw.get("size_mb", 0.0))))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return events
+
+
+def replay_trace(events: Iterable[tuple[str, str, float]], policy: str, max_items: int, max_memory_mb: float) -> dict:
+    """用指定策略的 SimpleImageCache 回放轨迹（OrderedDict 模式，单分片）
+
+    回放语义（与记录时的缓存内容无关）：
+    - get：按需读取，计入命中/未命中；未命中时立即以该键已知大小回填
+    - 紧跟同键 get 的 put：记录时的解码回填，回放已自行回填，跳过
+    - 其他 put：预取写入，仅在键不在缓存时写入（预取前会先检查缓存）
+    """
+    from .simple_cache import SimpleImageCache
+
+    events = list(events)
+    sizes: dict[str, float] = {}
+    for op, key, size_mb in events:
+        if op == "put":
+            sizes[key] = size_mb
+    cache = SimpleImageCache(
+        max_items=max_items,
+        max_memory_mb=max_memory_mb,
+        name=f"replay-{policy}",
+        shards=1,
+        use_nscache=False,
+        policy=policy,
+    )
+    last_get = None
+    for op, key, size_mb in events:
+        if op == "get":
+            last_get = key
+            if cache.get(key) is None:
+                cache.put(key, True, size_mb=sizes.get(key, 1.0))
+            continue
+        if key != last_get and key not in cache:
+            cache.put(key, True, size_mb=size_mb)
+        last_get = None
+    stats = cache.get_stats()
+    return {
+        "policy": policy,
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_rate_pct": stats["hit_rate_pct"],
+        "evictions": stats["evictions"],
+    }
+
+
+def compare_policies(
+    events: Iterable[tuple[str, str, float]],
+    max_items: int,
+    max_memory_mb: float,
+    policies: tuple[str, ...] = (POLICY_LRU, POLICY_TINYLFU),
+) -> dict[str, dict]:
+    """同一轨迹分别回放各策略，返回 策略名 → 回放结果"""
+    events = list(events)
+    return {name: replay_trace(events, name, max_items, max_memory_mb) for name in policies}
+
+
+__all__ = [
+    "POLICY_LRU",
+    "POLICY_TINYLFU",
+    "CacheTraceRecorder",
+    "FrequencySketch",
+    "WTinyLFUPolicy",
+    "compare_policies",
+    "create_policy",
+    "load_trace",
+    "replay_trace",
+]
@@ -5,12 +5,18 @@
 （全分辨率实测 ~242MB/张）全部隔离在子进程，子进程周期重启回收。
 
 设计：
-- 池大小：固定 N 个子进程，每个持有一条 Pipe
-- 任务分发：轮询空闲子进程（简单 FIFO），阻塞等待结果
+- 池大小：固定 N 个子进程，每个持有一条独占 Pipe 与一个读线程
+- 任务分发：请求带 ID 进入池级待发队列（排队中可取消），调度器发给在途数
+  最少的子进程；每个子进程最多 pipeline_depth 个在途请求，回复按 ID 完成
+  对应 Future（decode_async），decode() 为其同步封装
 - 周期重启：子进程累计解码 MAX_TASKS_PER_WORKER 次后重启，确保
   autorelease pool 随进程销毁彻底释放
 - 临时文件清理：主进程拿到结果文件后，使用完毕后删除
 - 降级：multiprocessing 不可用（如受限环境）时回退主进程直接解码
+- 共享内存传输（decode_frame）：子进程把 RGBA 像素写入主进程分配的
+  共享内存 slab，主进程直接拿到像素 + 宽/高/行跨度，省去 JPEG 临时文件的
+  二次编解码与磁盘往返；slab 按尺寸分档循环复用（不反复创建/删除
+  /dev/shm 段），容量无法预估或预算不足时回退文件传输
 
 用法:
     from ..core.decode_pool import DecodePool
@@ -19,20 +25,253 @@
     file_path = pool.decode(path, target_size=(1920, 1280))  # 返回临时文件路径
     # ... 使用 file_path 显示 ...
     pool.cleanup_file(file_path)
+
+    futures = [pool.decode_async(p, (1920, 1280)) for p in next_paths]  # 并行分布到各子进程
+    futures[-1].cancel()  # 尚未发送的请求可取消
+
+    with pool.decode_frame(path, target_size=(1920, 1280)) as frame:
+        if frame.pixels is not None:  # 共享内存 RGBA 像素
+            ...  # frame.width / frame.height / frame.stride
+        else:  # 回退：frame.file_path
+            ...
     pool.shutdown()
 """
 
+import atexit
+import contextlib
+import itertools
 import logging
 import multiprocessing as mp
 import os
 import tempfile
 import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future
+
+from .image_header import read_image_header
 
 logger = logging.getLogger("plookingII.decode_pool")
 
 # 每个子进程最多解码次数：达到后重启（保证解码内存彻底回收）
 _DEFAULT_MAX_TASKS_PER_WORKER = 50
 
+# 每个子进程的在途请求上限：2 = 当前解码 + 下一张已在管道中等待
+_DEFAULT_PIPELINE_DEPTH = 2
+
+# 共享内存 slab 总预算（MB）：0 关闭共享内存传输
+_DEFAULT_SHM_BUDGET_MB = 512
+
+# slab 最小分档（字节）
+_MIN_SLAB_BYTES = 1024 * 1024
+
+# 行跨度对齐（Quartz 位图上下文可能按 64 字节对齐行）
+_STRIDE_ALIGN = 64
+
+
+# 解释器退出中：multiprocessing 的 atexit 会终止守护子进程，此时读线程
+# 不应再把 EOF 当作异常退出去重启（守护线程可能在 spawn 中途被销毁）
+_interpreter_exiting = False
+_exit_hook_registered = False
+
+
+def _mark_interpreter_exiting() -> None:
+    global _interpreter_exiting  # noqa: PLW0603
+    _interpreter_exiting = True
+
+
+def _register_exit_hook() -> None:
+    """在子进程启动后注册（晚于 multiprocessing.util，按 LIFO 先于其终止子进程执行）"""
+    global _exit_hook_registered  # noqa: PLW0603
+    if not _exit_hook_registered:
+        _exit_hook_registered = True
+        atexit.register(_mark_interpreter_exiting)
+
+
+def _align(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def estimate_frame_bytes(path: str, target_size: tuple[int, int] | None) -> int | None:
+    """按头部尺寸估算 RGBA 帧所需字节数（上界）；尺寸未知返回 None
+
+    缩略图模式长边不超过 max(target_size)，取整误差各加 1 像素。
+    """
+    header = read_image_header(path)
+    if header is None:
+        return None
+    width, height = header.width, header.height
+    if target_size:
+        max_px = max(target_size)
+        long_edge = max(width, height)
+        if long_edge > max_px:
+            scale = max_px / long_edge
+            width = int(width * scale) + 1
+            height = int(height * scale) + 1
+    return _align(width * 4, _STRIDE_ALIGN) * height
+
+
+def estimate_tier_bytes(target_size: tuple[int, int] | None) -> int:
+    """按目标档位估算 RGBA 帧字节数上界（长边取满、按正方形计），不读文件
+
+    供主线程按档位做预算：预取调度只需量级，逐张读头部在网络盘上每次都是往返。
+    """
+    if not target_size:
+        return 0
+    max_px = max(target_size)
+    return _align(max_px * 4, _STRIDE_ALIGN) * max_px
+
+
+class _SharedSlabPool:
+    """共享内存 slab 池：按尺寸分档复用，总量受预算约束
+
+    分档：不小于需求的 2^k 的 1/4 步进（1, 1.25, 1.5, 1.75 × 2^k），
+    浪费 ≤25%；预算不足时先回收空闲 slab，仍不足则返回 None（调用方回退）。
+    """
+
+    def __init__(self, budget_bytes: int):
+        self._budget = max(0, budget_bytes)
+        self._lock = threading.Lock()
+        self._free: dict[int, list] = {}
+        self._in_use: dict[str, tuple] = {}  # name -> (shm, 分档)
+        # 释放失败（视图仍被导出等）的 slab：继续计入总量，后续重试回收
+        self._doomed: list = []
+        self._total = 0
+        self._created = 0
+        self._reused = 0
+
+    @staticmethod
+    def size_class(nbytes: int) -> int:
+        nbytes = max(nbytes, _MIN_SLAB_BYTES)
+        step = max((1 << (nbytes.bit_length() - 1)) // 4, 1)
+        return _align(nbytes, step)
+
+    def acquire(self, nbytes: int):
+        """获取容量 ≥ nbytes 的 slab；预算不足返回 None"""
+        from multiprocessing import shared_memory
+
+        cls = self.size_class(nbytes)
+        with self._lock:
+            self._reap_doomed()
+            free = self._free.get(cls)
+            if free:
+                shm = free.pop()
+                self._in_use[shm.name] = (shm, cls)
+                self._reused += 1
+                return shm
+            if cls > self._budget:
+                return None
+            # 预算不足：回收空闲 slab（大档优先）
+            for other in sorted(self._free, reverse=True):
+                while self._free[other] and self._total + cls > self._budget:
+                    self._destroy(self._free[other].pop())
+            if self._total + cls > self._budget:
+                return None
+            try:
+                shm = shared_memory.SharedMemory(create=True, size=cls)
+            except OSError:
+                logger.warning("创建共享内存 slab 失败 size=%s", cls, exc_info=True)
+                return None
+            self._total += shm.size
+            self._created += 1
+            self._in_use[shm.name] = (shm, cls)
+            return shm
+
+    def release(self, shm) -> None:
+        """归还 slab 供后续复用"""
+        with self._lock:
+            entry = self._in_use.pop(shm.name, None)
+            if entry is None:
+                return
+            self._free.setdefault(entry[1], []).append(shm)
+
+    def _destroy(self, shm) -> None:
+        """关闭并删除 slab（调用方持锁）；失败时留待重试，总量仍计入该 slab"""
+        if not self._try_destroy(shm):
+            self._doomed.append(shm)
+
+    def _reap_doomed(self) -> None:
+        if self._doomed:
+            self._doomed = [shm for shm in self._doomed if not self._try_destroy(shm)]
+
+    def _try_destroy(self, shm) -> bool:
+        try:
+            shm.close()
+            with contextlib.suppress(FileNotFoundError):
+                shm.unlink()
+        except (OSError, BufferError):
+            logger.debug("共享内存 slab 释放失败: %s", shm.name, exc_info=True)
+            return False
+        self._total -= shm.size
+        return True
+
+    def close(self) -> None:
+        """释放全部 slab（池关闭时调用）"""
+        with self._lock:
+            segments = [shm for free in self._free.values() for shm in free]
+            segments.extend(shm for shm, _cls in self._in_use.values())
+            self._free.clear()
+            self._in_use.clear()
+            self._reap_doomed()
+            for shm in segments:
+                self._destroy(shm)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_mb": round(self._budget / (1024 * 1024), 1),
+                "allocated_mb": round(self._total / (1024 * 1024), 1),
+                "in_use": len(self._in_use),
+                "free": sum(len(v) for v in self._free.values()),
+                "doomed": len(self._doomed),
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+
+class DecodedFrame:
+    """解码结果：共享内存 RGBA 像素，或回退的临时文件路径
+
+    使用完毕必须调用 release()（或 with 语句），以归还 slab / 删除临时文件。
+    pixels 为只在 release 前有效的 memoryview，长度 stride × height；
+    mode 沿用 PIL 命名："RGBA" 为非预乘 alpha，"RGBa" 为预乘 alpha（Quartz）。
+    """
+
+    __slots__ = ("_pool", "_slab", "file_path", "height", "mode", "pixels", "stride", "width")
+
+    def __init__(self, pool, width=0, height=0, stride=0, mode="RGBA", pixels=None, slab=None, file_path=None):
+        self._pool = pool
+        self._slab = slab
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.mode = mode
+        self.pixels = pixels
+        self.file_path = file_path
+
+    @property
+    def is_shared(self) -> bool:
+        return self.pixels is not None
+
+    def release(self) -> None:
+        """归还共享内存 slab 或删除临时文件（幂等）"""
+        if self.pixels is not None:
+            # 调用方仍持有导出的缓冲时 memoryview 无法释放：照常归还 slab
+            with contextlib.suppress(BufferError):
+                self.pixels.release()
+            self.pixels = None
+        if self._slab is not None:
+            self._pool._release_slab(self._slab)
+            self._slab = None
+        if self.file_path:
+            self._pool.cleanup_file(self.file_path)
+            self.file_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
 
 def _spawn_worker_entry(conn, work_dir: str) -> None:
     """模块级子进程入口（spawn 要求 target 可 pickle 的顶层函数）
@@ -44,39 +283,74 @@ def _spawn_worker_entry(conn, work_dir: str) -> None:
     worker_entry(conn, work_dir)
 
 
+class _DecodeRequest:
+    """单个解码请求：请求 ID + 任务元组 + 结果 Future"""
+
+    __slots__ = ("attempts", "future", "req_id", "started", "task")
+
+    def __init__(self, req_id: int, task: tuple):
+        self.req_id = req_id
+        self.task = task
+        self.future: Future = Future()
+        self.attempts = 0
+        self.started = False
+
+
 class _WorkerSlot:
-    """单个子进程槽位：持有进程 + Pipe + 任务计数"""
+    """单个子进程槽位：持有进程 + Pipe + 在途队列 + 任务计数
 
-    __slots__ = ("active", "conn", "process", "tasks_done")
+    槽位独占自己的 Pipe：发送在池锁内完成，接收只由该槽位的读线程执行，
+    多个调用方不会在同一条管道上交错收发。
+    """
+
+    __slots__ = ("conn", "inflight", "process", "reader", "retired", "tasks_done")
 
     def __init__(self, process, conn):
         self.process = process
         self.conn = conn
         self.tasks_done = 0
-        self.active = False
+        # 已发送、等待回复的请求（请求 ID → 请求），子进程按序处理
+        self.inflight: dict[int, _DecodeRequest] = {}
+        self.reader: threading.Thread | None = None
+        self.retired = False
 
 
 class DecodePool:
-    """解码子进程池（内存隔离 + 周期重启）"""
+    """解码子进程池（内存隔离 + 周期重启 + 流水线并发）
+
+    请求先进入池级待发队列（可取消），调度器把它发给在途数最少的子进程；
+    每个子进程最多同时持有 pipeline_depth 个在途请求，使其处理完当前图后
+    无需等待主进程往返即可开始下一张。回复携带请求 ID，由槽位读线程
+    完成对应 Future。
+    """
 
     def __init__(
         self,
         max_workers: int = 2,
         max_tasks_per_worker: int = _DEFAULT_MAX_TASKS_PER_WORKER,
         work_dir: str | None = None,
+        shm_budget_mb: int = _DEFAULT_SHM_BUDGET_MB,
+        pipeline_depth: int = _DEFAULT_PIPELINE_DEPTH,
     ):
         """
         Args:
             max_workers: 子进程数（并发解码）
             max_tasks_per_worker: 每个子进程重启前累计解码次数
             work_dir: 临时文件输出目录，None 使用系统临时目录
+            shm_budget_mb: 共享内存 slab 总预算（MB），0 关闭共享内存传输
+            pipeline_depth: 每个子进程的最大在途请求数
         """
         self._max_workers = max(1, max_workers)
         self._max_tasks = max(1, max_tasks_per_worker)
+        self._pipeline_depth = max(1, pipeline_depth)
         self._work_dir = work_dir or os.path.join(tempfile.gettempdir(), "plookingII-decode")
+        self._slabs = _SharedSlabPool(shm_budget_mb * 1024 * 1024) if shm_budget_mb > 0 else None
+        self._frame_stats = {"shared": 0, "file_fallback": 0, "overflow": 0}
         self._lock = threading.RLock()
         self._slots: list[_WorkerSlot] = []
-        self._round_robin = 0
+        self._queue: deque[_DecodeRequest] = deque()
+        self._req_ids = itertools.count(1)
+        self._cancelled = 0
         self._shutdown_flag = False
         self._spawn_ctx = None
 
@@ -84,6 +358,7 @@ class DecodePool:
             self._spawn_ctx = mp.get_context("spawn")
             # 预启动子进程（延迟到首次 decode 也行，但预启动降低首图延迟）
             self._ensure_workers()
+            _register_exit_hook()
         except Exception:
             logger.warning("解码子进程池初始化失败，将回退主进程直接解码", exc_info=True)
             self._spawn_ctx = None
@@ -101,7 +376,7 @@ class DecodePool:
                 self._start_worker()
 
     def _start_worker(self) -> None:
-        """启动一个子进程槽位"""
+        """启动一个子进程槽位及其读线程"""
         try:
             parent_conn, child_conn = mp.Pipe(duplex=True)
             process = self._spawn_ctx.Process(
@@ -112,7 +387,12 @@ class DecodePool:
             process.start()
             # 子进程端连接在父进程侧关闭，避免泄漏
             child_conn.close()
-            self._slots.append(_WorkerSlot(process, parent_conn))
+            slot = _WorkerSlot(process, parent_conn)
+            slot.reader = threading.Thread(
+                target=self._reader_loop, args=(slot,), name="decode-pool-reader", daemon=True
+            )
+            self._slots.append(slot)
+            slot.reader.start()
             logger.debug("解码子进程已启动 pid=%s", process.pid)
         except Exception:
             logger.exception("启动解码子进程失败")
@@ -120,17 +400,138 @@ class DecodePool:
     def _restart_worker(self, slot: _WorkerSlot) -> None:
         """重启一个子进程（终止旧进程，启动新进程）"""
         with self._lock:
+            if slot.retired:
+                return
+            slot.retired = True
+            if slot in self._slots:
+                self._slots.remove(slot)
+            if not self._shutdown_flag and not _interpreter_exiting:
+                self._start_worker()
+        try:
+            slot.conn.close()
+        except Exception:
+            pass
+        try:
+            slot.process.terminate()
+            slot.process.join(timeout=3.0)
+        except Exception:
+            pass
+
+    def _reader_loop(self, slot: _WorkerSlot) -> None:
+        """槽位读线程：接收 (请求 ID, 结果) 并完成对应 Future"""
+        while True:
             try:
-                slot.conn.close()
-            except Exception:
-                pass
-            try:
-                slot.process.terminate()
-                slot.process.join(timeout=3.0)
-            except Exception:
-                pass
-            self._slots.remove(slot)
-            self._start_worker()
+                req_id, result = slot.conn.recv()
+            except (EOFError, OSError, TypeError, ValueError):
+                break
+            with self._lock:
+                request = slot.inflight.pop(req_id, None)
+                slot.tasks_done += 1
+                # 达到上限且在途清空：重启（确保解码内存随进程销毁回收）
+                recycle = slot.tasks_done >= self._max_tasks and not slot.inflight
+            if request is not None:
+                request.future.set_result(result)
+            if recycle:
+                self._restart_worker(slot)
+                self._pump()
+                return
+            self._pump()
+        self._on_worker_lost(slot)
+
+    def _on_worker_lost(self, slot: _WorkerSlot) -> None:
+        """读线程发现管道断开：非预期退出时重启子进程，在途请求重试一次"""
+        with self._lock:
+            orphans = list(slot.inflight.values())
+            slot.inflight.clear()
+            expected = slot.retired or self._shutdown_flag or _interpreter_exiting
+            retry = [] if expected else [r for r in orphans if r.attempts < 1]
+            for request in reversed(retry):
+                request.attempts += 1
+                self._queue.appendleft(request)
+        failed = [r for r in orphans if r not in retry]
+        for request in failed:
+            request.future.set_result(None)
+        if not expected:
+            logger.warning("解码子进程异常退出，重启并重试 %d 个在途请求", len(retry))
+            self._restart_worker(slot)
+            self._pump()
+
+    # ------------------------------------------------------------------
+    # 调度
+    # ------------------------------------------------------------------
+    def _pick_slot(self) -> _WorkerSlot | None:
+        """选择在途数最少、未到重启阈值的子进程（调用方持锁）"""
+        candidates = [
+            s
+            for s in self._slots
+            # 在途请求也占用重启额度，避免超发后延迟回收
+            if not s.retired
+            and len(s.inflight) < self._pipeline_depth
+            and s.tasks_done + len(s.inflight) < self._max_tasks
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: len(s.inflight))
+
+    def _pump(self) -> None:
+        """把待发队列中的请求分发给有空位的子进程"""
+        with self._lock:
+            while self._queue:
+                slot = self._pick_slot()
+                if slot is None:
+                    return
+                request = self._queue.popleft()
+                if not request.started:
+                    if not request.future.set_running_or_notify_cancel():
+                        continue  # 排队期间已被取消
+                    request.started = True
+                slot.inflight[request.req_id] = request
+                try:
+                    slot.conn.send((request.req_id, request.task))
+                except (OSError, ValueError):
+                    # 管道已断：放回队首，由读线程触发重启后重发
+                    slot.inflight.pop(request.req_id, None)
+                    self._queue.appendleft(request)
+                    return
+
+    def _submit(self, task: tuple) -> Future:
+        request = _DecodeRequest(next(self._req_ids), task)
+        with self._lock:
+            if not self._slots:
+                self._ensure_workers()
+            if not self._slots:
+                request.future.set_result(None)
+                return request.future
+            self._queue.append(request)
+        self._pump()
+        return request.future
+
+    def _dispatch(self, task: tuple):
+        """同步执行：提交任务并等待结果"""
+        try:
+            return self._submit(task).result()
+        except CancelledError:
+            return None
+
+    def cancel_queued(self) -> int:
+        """取消所有尚未发送给子进程的请求（已在途的请求不可取消）
+
+        子进程异常退出后放回队列重试的请求已处于运行状态，不可取消：
+        留在队列中等待重发，否则其 Future 永远不会完成。
+
+        Returns:
+            取消的请求数
+        """
+        with self._lock:
+            pending = [r for r in self._queue if not r.started]
+            retried = [r for r in self._queue if r.started]
+            self._queue.clear()
+            self._queue.extend(retried)
+        # 已被调用方自行取消的请求只需出队，不重复计数
+        count = sum(1 for r in pending if not r.future.cancelled() and r.future.cancel())
+        with self._lock:
+            self._cancelled += count
+        return count
 
     # ------------------------------------------------------------------
     # 解码接口
@@ -145,45 +546,123 @@ class DecodePool:
         Returns:
             解码后临时文件路径（主进程显示用），失败返回 None
         """
-        if self._shutdown_flag:
+        try:
+            result = self.decode_async(path, target_size).result()
+        except CancelledError:
             return None
+        return result if isinstance(result, str) else None
+
+    def decode_async(self, path: str, target_size: tuple[int, int] | None = None) -> Future:
+        """异步解码：立即返回 Future，结果为临时文件路径或 None
+
+        排队中的请求可通过 future.cancel() 或 cancel_queued() 取消；
+        多个请求会并行分布到各子进程。
+
+        Args:
+            path: 源图片路径
+            target_size: 目标尺寸 (w, h)；None 表示全分辨率
+
+        Returns:
+            concurrent.futures.Future
+        """
+        if self._shutdown_flag:
+            future: Future = Future()
+            future.set_result(None)
+            return future
 
         # 回退路径：无子进程池时主进程直接解码
-        if self._spawn_ctx is None or not self._slots:
+        if self._spawn_ctx is None:
+            future = Future()
             try:
                 from .decode_worker import _decode_to_file
 
-                return _decode_to_file(path, target_size, self._work_dir)
+                future.set_result(_decode_to_file(path, target_size, self._work_dir))
             except Exception:
                 logger.exception("主进程回退解码失败 %s", path)
+                future.set_result(None)
+            return future
+
+        return self._submit((path, target_size))
+
+    @property
+    def uses_subprocess(self) -> bool:
+        """解码是否在子进程中执行（子进程池启动失败时为主进程回退路径）"""
+        return self._spawn_ctx is not None and not self._shutdown_flag
+
+    def decode_frame(
+        self, path: str, target_size: tuple[int, int] | None = None, fallback_to_file: bool = True
+    ) -> DecodedFrame | None:
+        """解码为 RGBA 像素帧（共享内存传输），必要时回退文件传输
+
+        容量按头部尺寸预估（读取文件头，调用方应在工作线程调用）并从 slab 池
+        获取；尺寸未知（非 JPEG/PNG）、预算不足或子进程报告溢出时回退到
+        decode() 的 JPEG 临时文件。
+
+        Args:
+            path: 源图片路径
+            target_size: 目标尺寸 (w, h)；None 表示全分辨率
+            fallback_to_file: 共享内存不可用时是否回退文件传输；False 时返回 None
+
+        Returns:
+            DecodedFrame（调用方负责 release），失败返回 None
+        """
+        if self._shutdown_flag:
+            return None
+
+        capacity = estimate_frame_bytes(path, target_size) if self._slabs is not None else None
+        slab = self._slabs.acquire(capacity) if capacity else None
+        if slab is not None:
+            meta = self._decode_into_slab(path, target_size, slab)
+            if isinstance(meta, dict) and "overflow" in meta:
+                # 预估偏小（如 DNL 尺寸、奇异采样）：换更大 slab 重试一次
+                self._count_frame("overflow")
+                self._slabs.release(slab)
+                slab = self._slabs.acquire(int(meta["overflow"]))
+                if slab is not None:
+                    meta = self._decode_into_slab(path, target_size, slab)
+            if isinstance(meta, dict) and "nbytes" in meta:
+                self._count_frame("shared")
+                return DecodedFrame(
+                    self,
+                    width=meta["width"],
+                    height=meta["height"],
+                    stride=meta["stride"],
+                    mode=meta["mode"],
+                    pixels=slab.buf[: meta["nbytes"]],
+                    slab=slab,
+                )
+            if slab is not None:
+                self._slabs.release(slab)
+            if meta is None:
+                # 解码本身失败：文件传输同样会失败，不再重试
                 return None
+        if not fallback_to_file:
+            return None
+
+        # 回退：文件传输
+        self._count_frame("file_fallback")
+        file_path = self.decode(path, target_size)
+        return DecodedFrame(self, file_path=file_path) if file_path else None
 
-        # 轮询选择空闲槽位（FIFO 轮转）
-        slot = None
+    def _count_frame(self, kind: str) -> None:
         with self._lock:
-            if not self._slots:
-                self._ensure_workers()
-            if not self._slots:
-                return None
-            self._round_robin = (self._round_robin + 1) % len(self._slots)
-            slot = self._slots[self._round_robin]
+            self._frame_stats[kind] += 1
 
-        if slot is None:
-            return None
+    def _decode_into_slab(self, path: str, target_size, slab):
+        """在子进程（或主进程回退路径）中把像素解码进 slab，返回元数据字典"""
+        if self._spawn_ctx is None:
+            try:
+                from .decode_worker import _decode_to_shared
 
-        try:
-            slot.conn.send((path, target_size))
-            result = slot.conn.recv()  # 阻塞等待解码结果
-            slot.tasks_done += 1
-            # 达到上限重启（确保解码内存随进程销毁回收）
-            if slot.tasks_done >= self._max_tasks:
-                self._restart_worker(slot)
-            return result if isinstance(result, str) else None
-        except (EOFError, OSError):
-            # 子进程异常退出：重启并重试一次
-            logger.warning("解码子进程异常，重启重试: %s", path)
-            self._restart_worker(slot)
-            return self.decode(path, target_size)
+                return _decode_to_shared(path, target_size, slab.buf, slab.size)
+            except Exception:
+                logger.exception("主进程回退共享内存解码失败 %s", path)
+                return None
+        return self._dispatch((path, target_size, slab.name, slab.size))
+
+    def _release_slab(self, slab) -> None:
+        if self._slabs is not None:
+            self._slabs.release(slab)
 
     @staticmethod
     def cleanup_file(file_path: str | None) -> None:
@@ -200,17 +679,28 @@ class DecodePool:
         """关闭子进程池（应用退出时调用）"""
         self._shutdown_flag = True
         with self._lock:
-            for slot in self._slots:
-                try:
-                    slot.conn.send(None)  # 终止信号
-                    slot.process.join(timeout=2.0)
-                except Exception:
-                    pass
-                try:
-                    slot.conn.close()
-                except Exception:
-                    pass
+            queued = list(self._queue)
+            self._queue.clear()
+            slots = self._slots
             self._slots = []
+            for slot in slots:
+                slot.retired = True
+        # 排队请求以 None 结束（与解码失败语义一致），等待方不会永久阻塞
+        for request in queued:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_result(None)
+        for slot in slots:
+            try:
+                slot.conn.send(None)  # 终止信号
+                slot.process.join(timeout=2.0)
+            except Exception:
+                pass
+            try:
+                slot.conn.close()
+            except Exception:
+                pass
+        if self._slabs is not None:
+            self._slabs.close()
 
     def get_stats(self) -> dict:
         """导出池状态（调试/监控）"""
@@ -218,8 +708,14 @@ class DecodePool:
             return {
                 "workers": len(self._slots),
                 "tasks_per_worker": [s.tasks_done for s in self._slots],
+                "inflight_per_worker": [len(s.inflight) for s in self._slots],
+                "queued": len(self._queue),
+                "cancelled": self._cancelled,
+                "pipeline_depth": self._pipeline_depth,
                 "max_tasks": self._max_tasks,
                 "work_dir": self._work_dir,
+                "frames": dict(self._frame_stats),
+                "shm": self._slabs.get_stats() if self._slabs is not None else None,
             }
 
 
@@ -254,4 +750,12 @@ def reset_decode_pool() -> None:
         _global_pool = None
 
 
-__all__ = ["DecodePool", "get_decode_pool", "reset_decode_pool", "shutdown_decode_pool"]
+__all__ = [
+    "DecodePool",
+    "DecodedFrame",
+    "estimate_frame_bytes",
+    "estimate_tier_bytes",
+    "get_decode_pool",
+    "reset_decode_pool",
+    "shutdown_decode_pool",
+]
@@ -11,15 +11,27 @@ PyObjC 桥接下，任何在主进程触发的 ObjC 图像解码，其解码缓
 - 子进程完成任务后退出 → 解码内存随进程销毁**彻底释放**
 - 周期性重启子进程 → 无限解码循环内存平台型（实测 30 次父进程净增 +0.1MB）
 
+两种结果传输：
+- 文件传输（默认/回退）：子进程写显示级 JPEG 临时文件，主进程再解码一次
+- 共享内存传输：子进程把 RGBA 像素直接写入主进程分配的共享内存 slab，
+  只回传 (宽, 高, 行跨度)，省去一次有损编解码与磁盘往返
+
+解码后端：优先 Quartz（ImageIO）；Quartz 不可用（Linux 基准环境）时回退 PIL。
+
 本模块 = 子进程入口（worker 函数），通过 multiprocessing spawn 启动。
 主进程侧管理见 decode_pool.py。
 """
 
 import logging
 import os
+from collections import OrderedDict
 
 logger = logging.getLogger("plookingII.decode_worker")
 
+# 子进程缓存的共享内存句柄上限（slab 循环复用，同名重复 attach 无需重新映射）
+_MAX_ATTACHED_SEGMENTS = 8
+_attached_segments: OrderedDict = OrderedDict()
+
 
 def _decode_to_file(path: str, target_size: tuple[int, int] | None, out_dir: str) -> str | None:
     """子进程内解码图片并写入显示级文件，返回文件路径
@@ -36,6 +48,10 @@ def _decode_to_file(path: str, target_size: tuple[int, int] | None, out_dir: str
     Returns:
         解码后文件的路径（失败返回 None）
     """
+    try:
+        import Quartz  # noqa: F401
+    except ImportError:
+        return _decode_to_file_pil(path, target_size, out_dir)
     try:
         from Foundation import NSURL
         from Quartz import (
@@ -103,8 +119,199 @@ def _decode_to_file(path: str, target_size: tuple[int, int] | None, out_dir: str
         return None
 
 
+def _decode_to_file_pil(path: str, target_size: tuple[int, int] | None, out_dir: str) -> str | None:
+    """PIL 回退：解码并写入显示级 JPEG 临时文件（非 macOS 基准环境）"""
+    try:
+        import uuid
+
+        from PIL import Image
+
+        with Image.open(path) as im:
+            if target_size:
+                max_px = max(target_size)
+                im.draft("RGB", (max_px, max_px))
+                im.thumbnail((max_px, max_px))
+            rgb = im.convert("RGB")
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"dec_{uuid.uuid4().hex[:12]}.jpg")
+        rgb.save(out_path, "JPEG", quality=90)
+        return out_path
+    except Exception:
+        logger.exception("子进程 PIL 解码异常: %s", path)
+        return None
+
+
+def _quartz_available() -> bool:
+    try:
+        import Quartz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _render_rgba_quartz(path: str, target_size: tuple[int, int] | None, buf, capacity: int) -> dict | None:
+    """Quartz 解码并直接绘制进共享内存缓冲（预乘 alpha，32 位大端）
+
+    位图上下文以 slab 本身为后备存储：像素只写一次，不经过
+    CGDataProviderCopyData / bytes 中转。先按图像尺寸检查容量，超出时不绘制。
+    """
+    from Foundation import NSURL
+    from Quartz import (
+        CGBitmapContextCreate,
+        CGColorSpaceCreateDeviceRGB,
+        CGContextDrawImage,
+        CGImageGetHeight,
+        CGImageGetWidth,
+        CGImageSourceCreateImageAtIndex,
+        CGImageSourceCreateThumbnailAtIndex,
+        CGImageSourceCreateWithURL,
+        CGRectMake,
+        kCGBitmapByteOrder32Big,
+        kCGImageAlphaPremultipliedLast,
+        kCGImageSourceCreateThumbnailFromImageAlways,
+        kCGImageSourceShouldCacheImmediately,
+        kCGImageSourceThumbnailMaxPixelSize,
+    )
+
+    source = CGImageSourceCreateWithURL(NSURL.fileURLWithPath_(path), None)
+    if source is None:
+        return None
+    if target_size:
+        cg = CGImageSourceCreateThumbnailAtIndex(
+            source,
+            0,
+            {
+                kCGImageSourceCreateThumbnailFromImageAlways: True,
+                kCGImageSourceThumbnailMaxPixelSize: max(target_size),
+                kCGImageSourceShouldCacheImmediately: False,
+            },
+        )
+    else:
+        cg = CGImageSourceCreateImageAtIndex(source, 0, {kCGImageSourceShouldCacheImmediately: False})
+    if cg is None:
+        return None
+    width = CGImageGetWidth(cg)
+    height = CGImageGetHeight(cg)
+    stride = width * 4
+    nbytes = stride * height
+    if nbytes > capacity:
+        return {"overflow": nbytes}
+    ctx = CGBitmapContextCreate(
+        buf,
+        width,
+        height,
+        8,
+        stride,
+        CGColorSpaceCreateDeviceRGB(),
+        kCGImageAlphaPremultipliedLast | kCGBitmapByteOrder32Big,
+    )
+    if ctx is None:
+        return None
+    CGContextDrawImage(ctx, CGRectMake(0, 0, width, height), cg)
+    # 上下文引用 slab 内存：返回前释放，slab 之后可被主进程复用
+    del ctx
+    return {"width": width, "height": height, "stride": stride, "mode": "RGBa", "nbytes": nbytes}
+
+
+def _decode_rgba_pil(path: str, target_size: tuple[int, int] | None):
+    """PIL 解码为 RGBA（非预乘），返回 (宽, 高, 行跨度, 像素缓冲)
+
+    JPEG 走 draft() 的 DCT 域降采样，与 Quartz SubsampleFactor 等价。
+    """
+    from PIL import Image
+
+    with Image.open(path) as im:
+        if target_size:
+            max_px = max(target_size)
+            im.draft("RGB", (max_px, max_px))
+            im.thumbnail((max_px, max_px))
+        rgba = im.convert("RGBA")
+    width, height = rgba.size
+    return width, height, width * 4, memoryview(rgba.tobytes())
+
+
+def _attach_segment(name: str):
+    """按名称 attach 主进程分配的共享内存 slab（LRU 复用句柄）"""
+    from multiprocessing import shared_memory
+
+    shm = _attached_segments.get(name)
+    if shm is not None:
+        _attached_segments.move_to_end(name)
+        return shm
+    shm = shared_memory.SharedMemory(name=name)
+    _attached_segments[name] = shm
+    while len(_attached_segments) > _MAX_ATTACHED_SEGMENTS:
+        _, old = _attached_segments.popitem(last=False)
+        try:
+            old.close()
+        except Exception:
+            pass
+    return shm
+
+
+def _decode_to_shared(path: str, target_size: tuple[int, int] | None, buf, capacity: int) -> dict | None:
+    """解码并把 RGBA 像素写入共享内存缓冲
+
+    Args:
+        path: 源图片路径
+        target_size: 目标尺寸，None 表示全分辨率
+        buf: 可写缓冲（共享内存 slab 的 memoryview）
+        capacity: 缓冲可用字节数
+
+    Returns:
+        {"width", "height", "stride", "mode", "nbytes"} 元数据（mode 为 "RGBa"
+        表示预乘 alpha）；像素超出容量时返回 {"overflow": 所需字节数}；失败返回 None
+    """
+    try:
+        if _quartz_available():
+            meta = _render_rgba_quartz(path, target_size, buf, capacity)
+            if meta is None:
+                logger.warning("子进程 RGBA 解码失败: %s", path)
+            return meta
+        frame = _decode_rgba_pil(path, target_size)
+        if frame is None:
+            logger.warning("子进程 RGBA 解码失败: %s", path)
+            return None
+        width, height, stride, pixels = frame
+        nbytes = stride * height
+        if nbytes > capacity:
+            return {"overflow": nbytes}
+        buf[:nbytes] = pixels[:nbytes]
+        return {"width": width, "height": height, "stride": stride, "mode": "RGBA", "nbytes": nbytes}
+    except Exception:
+        logger.exception("子进程共享内存解码异常: %s", path)
+        return None
+
+
+def _handle_task(task, work_dir: str):
+    """执行单个任务：2 元组走文件传输，4 元组走共享内存传输"""
+    if len(task) == 2:
+        path, target_size = task
+        return _decode_to_file(path, target_size, work_dir)
+    path, target_size, shm_name, capacity = task
+    try:
+        shm = _attach_segment(shm_name)
+    except (OSError, ValueError):
+        logger.warning("子进程 attach 共享内存失败: %s", shm_name)
+        return None
+    return _decode_to_shared(path, target_size, shm.buf, capacity)
+
+
+def _close_attached_segments() -> None:
+    while _attached_segments:
+        _, shm = _attached_segments.popitem()
+        try:
+            shm.close()
+        except Exception:
+            pass
+
+
 def worker_entry(pipe_conn, work_dir: str) -> None:
-    """子进程主入口：从管道接收 (path, target_size)，回传结果路径
+    """子进程主入口：从管道接收任务，回传结果
+
+    消息格式：(请求 ID, 任务) → 回传 (请求 ID, 结果)；None 为终止信号
+    - 任务 (path, target_size) → 结果为临时文件路径或 None
+    - 任务 (path, target_size, shm_name, capacity) → 结果为像素元数据字典或 None
 
     Args:
         pipe_conn: multiprocessing.Pipe 连接（子进程端）
@@ -115,17 +322,17 @@ def worker_entry(pipe_conn, work_dir: str) -> None:
             # 阻塞接收任务
             if not pipe_conn.poll(30.0):
                 continue
-            task = pipe_conn.recv()
-            if task is None:  # 终止信号
+            message = pipe_conn.recv()
+            if message is None:  # 终止信号
                 break
-            path, target_size = task
-            result = _decode_to_file(path, target_size, work_dir)
-            pipe_conn.send(result)
+            req_id, task = message
+            pipe_conn.send((req_id, _handle_task(task, work_dir)))
     except (EOFError, OSError):
         pass
     except Exception:
         logger.exception("子进程 worker 异常退出")
     finally:
+        _close_attached_segments()
         try:
             pipe_conn.close()
         except Exception:
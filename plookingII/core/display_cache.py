@@ -0,0 +1,311 @@
+"""
+显示级渲染图磁盘缓存（跨启动复用的降采样 JPEG）
+
+内存缓存（SimpleImageCache）只在会话内有效且容量很小，重启或目录重访后
+被淘汰的图片需要重新解码整张大 JPEG。本缓存把显示级降采样版本持久化到
+应用支持目录（`~/Library/Application Support/PlookingII/display_cache/`），
+重访时直接加载 ~300KB 的渲染图，而不是重新解码数十 MB 的原图。
+
+设计原则：
+- 键：(规范化路径, mtime_ns, 文件大小) 的 hash + 长边档位；源文件变化即换键，
+  旧条目不再命中，随 LRU 自然淘汰
+- 长边档位：固定几档（1024/2048/3072），按目标尺寸长边向上取档，
+  查找时允许命中更大的档位
+- LRU 字节预算：访问时刷新文件 mtime，跨启动保留 LRU 次序；超预算按 mtime 淘汰
+- 崩溃安全：先写同目录临时文件并 fsync，再 os.replace 原子改名；
+  启动扫描时清理残留临时文件
+- 所有失败静默降级为未命中，不影响主流程
+
+文件结构：
+    <app_support>/display_cache/<hash[:2]>/<hash>_<bucket>.jpg
+
+Author: PlookingII Team
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+# 长边档位（像素）：目标长边向上取档，超过最大档位不落盘
+DISPLAY_BUCKETS = (1024, 2048, 3072)
+
+# 默认字节预算：1GB 约可容纳 3000+ 张 2048 档渲染图
+_DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+_ENTRY_SUFFIX = ".jpg"
+_TMP_MARKER = ".tmp"
+
+
+class DisplayTierCache:
+    """显示级渲染图磁盘缓存（LRU 字节预算 + 原子写入）"""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        buckets: tuple[int, ...] = DISPLAY_BUCKETS,
+    ):
+        """
+        Args:
+            cache_dir: 缓存根目录；None 使用默认应用支持目录
+            max_bytes: 缓存总字节上限（LRU 淘汰）
+            buckets: 长边档位（升序）
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.path.expanduser("~"), "Library", "Application Support", APP_NAME, "display_cache"
+            )
+        self._cache_dir = Path(cache_dir)
+        self._max_bytes = max(1, int(max_bytes))
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.RLock()
+        # 相对路径 → 字节数；按访问先后排列（最旧在前），首次使用时扫描磁盘建立
+        self._index: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------
+    # 键与档位
+    # ------------------------------------------------------------------
+    def bucket_for(self, target_size: tuple[int, int] | None) -> int | None:
+        """目标尺寸 → 长边档位；全分辨率或超过最大档位返回 None"""
+        if not target_size:
+            return None
+        try:
+            long_edge = max(int(target_size[0]), int(target_size[1]))
+        except (TypeError, ValueError, IndexError):
+            return None
+        for bucket in self._buckets:
+            if long_edge <= bucket:
+                return bucket
+        return None
+
+    @staticmethod
+    def _source_key(file_path: str) -> str | None:
+        """(规范化路径, mtime_ns, 大小) → hash；源文件不可访问返回 None"""
+        try:
+            canonical = os.path.realpath(file_path)
+            st = os.stat(canonical)
+        except OSError:
+            return None
+        raw = f"{canonical}\0{st.st_mtime_ns}\0{st.st_size}"
+        return hashlib.sha1(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+    @staticmethod
+    def _relative_name(key: str, bucket: int) -> str:
+        return os.path.join(key[:2], f"{key}_{bucket}{_ENTRY_SUFFIX}")
+
+    # ------------------------------------------------------------------
+    # 索引（LRU）
+    # ------------------------------------------------------------------
+    def _ensure_index(self) -> OrderedDict[str, int]:
+        """首次使用时扫描磁盘：按 mtime 建立 LRU 次序，并清理残留临时文件"""
+        if self._index is not None:
+            return self._index
+        entries = []
+        try:
+            if self._cache_dir.exists():
+                for shard in self._cache_dir.iterdir():
+                    if not shard.is_dir():
+                        continue
+                    for f in shard.iterdir():
+                        try:
+                            if _TMP_MARKER in f.name:
+                                f.unlink(missing_ok=True)  # 崩溃残留的半成品
+                                continue
+                            if f.suffix != _ENTRY_SUFFIX:
+                                continue
+                            st = f.stat()
+                            entries.append((st.st_mtime, os.path.join(shard.name, f.name), st.st_size))
+                        except OSError:
+                            continue
+        except OSError:
+            logger.debug("显示缓存目录扫描失败，忽略: %s", self._cache_dir)
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _touch(self, rel: str) -> None:
+        """刷新 LRU 次序（内存 + 文件 mtime，跨启动保留）"""
+        self._index.move_to_end(rel)
+        try:
+            now = time.time()
+            os.utime(self._cache_dir / rel, (now, now))
+        except OSError:
+            pass
+
+    def _forget(self, rel: str) -> None:
+        size = self._index.pop(rel, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _prune_locked(self) -> None:
+        """超预算时按 LRU 淘汰最旧的条目"""
+        while self._total_bytes > self._max_bytes and self._index:
+            rel, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            try:
+                (self._cache_dir / rel).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # 读写接口
+    # ------------------------------------------------------------------
+    def lookup(self, file_path: str, target_size: tuple[int, int] | None) -> str | None:
+        """查找可用于目标尺寸的渲染图；命中返回缓存文件路径
+
+        优先目标档位，其次更大的档位（显示时降采样即可）。
+
+        Args:
+            file_path: 源图片路径
+            target_size: 显示目标尺寸 (w, h)
+
+        Returns:
+            渲染图文件路径；未命中/源文件已变化返回 None
+        """
+        bucket = self.bucket_for(target_size)
+        if bucket is None:
+            return None
+        key = self._source_key(file_path)
+        if key is None:
+            return None
+        with self._lock:
+            index = self._ensure_index()
+            for candidate in self._buckets:
+                if candidate < bucket:
+                    continue
+                rel = self._relative_name(key, candidate)
+                if rel not in index:
+                    continue
+                full = self._cache_dir / rel
+                if not full.exists():
+                    # 外部删除：同步索引
+                    self._forget(rel)
+                    continue
+                self._touch(rel)
+                self._stats["hits"] += 1
+                return str(full)
+            self._stats["misses"] += 1
+            return None
+
+    def contains(self, file_path: str, target_size: tuple[int, int] | None) -> bool:
+        """是否已有可用渲染图（不刷新 LRU、不计统计）"""
+        bucket = self.bucket_for(target_size)
+        key = self._source_key(file_path) if bucket is not None else None
+        if key is None:
+            return False
+        with self._lock:
+            index = self._ensure_index()
+            return any(self._relative_name(key, b) in index for b in self._buckets if b >= bucket)
+
+    def store_file(self, file_path: str, bucket: int, rendition_path: str) -> str | None:
+        """把已编码的渲染图文件写入缓存（原子改名，崩溃不留半成品）
+
+        Args:
+            file_path: 源图片路径（用于计算键）
+            bucket: 长边档位（bucket_for 的返回值）
+            rendition_path: 已编码 JPEG 渲染图路径（调用方负责删除）
+
+        Returns:
+            缓存文件路径；失败返回 None
+        """
+        if bucket not in self._buckets:
+            return None
+        key = self._source_key(file_path)
+        if key is None:
+            return None
+        rel = self._relative_name(key, bucket)
+        final = self._cache_dir / rel
+        tmp = final.with_name(f"{final.name}{_TMP_MARKER}{os.getpid()}_{threading.get_ident()}")
+        try:
+            os.makedirs(final.parent, exist_ok=True)
+            with open(rendition_path, "rb") as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp, final)
+            size = final.stat().st_size
+        except OSError:
+            logger.debug("显示缓存写入失败，忽略: %s", file_path)
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            index = self._ensure_index()
+            self._forget(rel)
+            index[rel] = size
+            self._total_bytes += size
+            self._stats["stores"] += 1
+            self._prune_locked()
+            if rel not in index:
+                return None  # 单个条目即超预算
+        return str(final)
+
+    def clear(self) -> None:
+        """清空全部渲染图"""
+        with self._lock:
+            try:
+                if self._cache_dir.exists():
+                    shutil.rmtree(self._cache_dir, ignore_errors=True)
+            except OSError:
+                pass
+            self._index = OrderedDict()
+            self._total_bytes = 0
+
+    def get_stats(self) -> dict:
+        """导出缓存统计"""
+        with self._lock:
+            index = self._ensure_index()
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "entries": len(index),
+                    "total_bytes": self._total_bytes,
+                    "max_bytes": self._max_bytes,
+                    "cache_dir": str(self._cache_dir),
+                }
+            )
+            return stats
+
+
+# 全局单例（与内存缓存互补：后者会话内热路径，本缓存跨启动/重访）
+_global_display_cache: DisplayTierCache | None = None
+_display_cache_lock = threading.Lock()
+
+
+def get_display_cache() -> DisplayTierCache:
+    """获取全局显示级磁盘缓存单例"""
+    global _global_display_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _display_cache_lock:
+        if _global_display_cache is None:
+            _global_display_cache = DisplayTierCache()
+        return _global_display_cache
+
+
+def reset_display_cache() -> None:
+    """重置全局单例（主要用于测试）"""
+    global _global_display_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _display_cache_lock:
+        _global_display_cache = None
+
+
+__all__ = [
+    "DISPLAY_BUCKETS",
+    "DisplayTierCache",
+    "get_display_cache",
+    "reset_display_cache",
+]
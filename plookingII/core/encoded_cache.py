@@ -0,0 +1,284 @@
+"""
+编码字节缓存层（原始文件字节，位于解码位图缓存之前）
+
+24MP 解码位图约 100MB/张，解码层的预取窗口因此只能放 1-4 张；而同一张图的
+压缩 JPEG 只有 5-10MB。本模块在内存中保留当前图片前后 K 张（默认 20）的
+原始文件字节：
+
+- 由单个后台线程按窗口顺序整文件顺序读取（F_NOCACHE，不与页缓存重复占用），
+  新窗口替换尚未读取的旧窗口，最近的邻居最先读取
+- 以字节预算约束（LRU；窗口外的条目优先淘汰），单文件超过预算 1/4 时不缓存
+- 解码端通过 get() 拿到 memoryview 直接创建图像源，不再读盘；条目记录
+  (size, mtime_ns)，距上次校验超过 _REVALIDATE_SEC 的命中才重新 stat，
+  文件变化后自动失效（网络盘上 stat 是一次往返，不在每次查找时执行）
+
+网络盘/USB 盘上即使解码跟不上导航速度，I/O 延迟也已移出关键路径；解码位图层
+保持较小即可。
+
+用法:
+    cache = get_encoded_cache()
+    cache.prefetch([next1, prev1, next2, ...])   # 按优先顺序
+    data = cache.get(path)                       # memoryview 或 None
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ..config.constants import APP_NAME
+from .loading.helpers import open_no_cache
+
+logger = logging.getLogger(APP_NAME)
+
+# 默认窗口（当前图片前后合计读取的文件数）与字节预算
+_DEFAULT_WINDOW = 20
+_DEFAULT_MAX_MB = 256.0
+
+# 单文件上限占预算的比例：超大文件直接走解码器自身的按需读取
+_MAX_FILE_FRACTION = 0.25
+
+# 命中时的新鲜度校验间隔（秒）：间隔内复用上次 stat 结果
+_REVALIDATE_SEC = 2.0
+
+
+class _EncodedEntry:
+    __slots__ = ("data", "mtime_ns", "size", "verified_at")
+
+    def __init__(self, data: bytearray, size: int, mtime_ns: int):
+        self.data = data
+        self.size = size
+        self.mtime_ns = mtime_ns
+        # 上次确认 (size, mtime_ns) 与磁盘一致的时刻（monotonic）
+        self.verified_at = time.monotonic()
+
+
+class EncodedBytesCache:
+    """按窗口预读、按字节预算 LRU 淘汰的原始文件字节缓存（线程安全）"""
+
+    def __init__(self, max_mb: float = _DEFAULT_MAX_MB, window: int = _DEFAULT_WINDOW):
+        self.max_bytes = int(max(0.0, float(max_mb)) * 1024 * 1024)
+        self.window = max(0, int(window))
+        self._lock = threading.Condition(threading.Lock())
+        self._entries: OrderedDict[str, _EncodedEntry] = OrderedDict()
+        self._bytes = 0
+        self._window_paths: frozenset[str] = frozenset()
+        self._pending: list[str] = []
+        self._thread: threading.Thread | None = None
+        self._shutdown = False
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "reads": 0, "read_bytes": 0, "skipped": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    def get(self, path: str) -> memoryview | None:
+        """获取文件的原始字节（零拷贝视图）；未缓存或文件已变化返回 None"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+        now = time.monotonic()
+        if now - entry.verified_at < _REVALIDATE_SEC:
+            fresh = True
+        else:
+            try:
+                st = os.stat(path)
+                fresh = st.st_size == entry.size and st.st_mtime_ns == entry.mtime_ns
+            except OSError:
+                fresh = False
+            if fresh:
+                entry.verified_at = now
+        with self._lock:
+            if not fresh:
+                if self._entries.get(path) is entry:
+                    self._unlink_locked(path)
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            self._stats["hits"] += 1
+        return memoryview(entry.data)
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return path in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # 预读
+    # ------------------------------------------------------------------
+    def prefetch(self, paths: list[str]) -> None:
+        """设置新的预读窗口（按优先顺序，超出 window 的部分截断）
+
+        尚未读取的旧窗口被整体替换；已缓存的文件不重复读取。
+        """
+        paths = [p for p in paths if p][: self.window]
+        with self._lock:
+            if self._shutdown or self.max_bytes <= 0:
+                return
+            self._window_paths = frozenset(paths)
+            self._pending = [p for p in paths if p not in self._entries]
+            if not self._pending:
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker_loop, name="encoded_prefetch", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._shutdown:
+                    self._lock.wait()
+                if self._shutdown:
+                    return
+                path = self._pending.pop(0)
+                if path in self._entries:
+                    continue
+            try:
+                self.read(path)
+            except Exception:
+                logger.debug("encoded prefetch failed: %s", path, exc_info=True)
+
+    def read(self, path: str) -> bool:
+        """整文件顺序读入缓存（同步）
+
+        Returns:
+            是否已缓存（超出单文件上限或读取失败返回 False）
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size <= 0 or st.st_size > self.max_bytes * _MAX_FILE_FRACTION:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return False
+
+        f = open_no_cache(path)
+        if f is None:
+            return False
+        data = bytearray(st.st_size)
+        with f:
+            view = memoryview(data)
+            filled = 0
+            while filled < st.st_size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            view.release()
+        if filled != st.st_size:
+            # 读取期间文件被截断/改写：放弃
+            return False
+
+        with self._lock:
+            self._stats["reads"] += 1
+            self._stats["read_bytes"] += filled
+            self._unlink_locked(path)
+            self._entries[path] = _EncodedEntry(data, st.st_size, st.st_mtime_ns)
+            self._bytes += st.st_size
+            self._evict_locked(keep=path)
+        return True
+
+    # ------------------------------------------------------------------
+    # 淘汰
+    # ------------------------------------------------------------------
+    def _unlink_locked(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict_locked(self, keep: str) -> None:
+        """超出字节预算时淘汰：先淘汰窗口外的条目，再按 LRU"""
+        if self._bytes <= self.max_bytes:
+            return
+        outside = [p for p in self._entries if p not in self._window_paths and p != keep]
+        inside = [p for p in self._entries if p in self._window_paths and p != keep]
+        for path in outside + inside:
+            if self._bytes <= self.max_bytes:
+                break
+            self._unlink_locked(path)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, path: str) -> None:
+        """移除单个文件（文件被修改/删除时调用）"""
+        with self._lock:
+            self._unlink_locked(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._bytes = 0
+
+    def shutdown(self) -> None:
+        """停止后台预读线程并释放缓存"""
+        with self._lock:
+            self._shutdown = True
+            self._lock.notify_all()
+        self.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "entries": len(self._entries),
+                    "memory_mb": round(self._bytes / (1024 * 1024), 2),
+                    "max_memory_mb": round(self.max_bytes / (1024 * 1024), 2),
+                    "window": self.window,
+                    "pending": len(self._pending),
+                }
+            )
+        return stats
+
+
+# 全局单例：解码端（core/loading/helpers）与预读端（ImageManager）共享
+_global_cache: EncodedBytesCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_encoded_cache() -> EncodedBytesCache:
+    """获取全局编码字节缓存单例（容量与窗口取自配置）"""
+    global _global_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _cache_lock:
+        if _global_cache is None:
+            from ..config.manager import get_config
+
+            _global_cache = EncodedBytesCache(
+                max_mb=get_config("cache.encoded_max_mb", _DEFAULT_MAX_MB),
+                window=get_config("cache.encoded_window", _DEFAULT_WINDOW),
+            )
+        return _global_cache
+
+
+def peek_encoded_bytes(path: str) -> memoryview | None:
+    """解码端查询：仅当全局缓存已创建时查找（不为此创建单例与预读线程）"""
+    cache = _global_cache
+    if cache is None:
+        return None
+    return cache.get(path)
+
+
+def reset_encoded_cache() -> None:
+    """重置全局单例（主要用于测试）"""
+    global _global_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _cache_lock:
+        if _global_cache is not None:
+            _global_cache.shutdown()
+        _global_cache = None
+
+
+__all__ = [
+    "EncodedBytesCache",
+    "get_encoded_cache",
+    "peek_encoded_bytes",
+    "reset_encoded_cache",
+]
@@ -15,20 +15,25 @@ Date: 2025-01-XX (实验性优化)
 """
 
 import os
+import queue
 import threading
 import time
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 
 from ..config.constants import APP_NAME
 from ..imports import logging
+from .path_table import PackedPaths, get_path_table
+from .sort_order import DEFAULT_SORT_ORDER, SORT_NAME, is_sort_order, sort_paths
+from .tree_snapshot import DirNode, TreeScanResult, resolve_dir_node
 
 logger = logging.getLogger(APP_NAME)
 
 
-@dataclass
+@dataclass(slots=True)
 class FileInfo:
-    """文件信息数据类"""
+    """文件信息数据类（__slots__：大目录扫描时每条记录省去实例字典）"""
 
     path: str
     size_bytes: int = 0
@@ -161,6 +166,12 @@ class DirectoryImageListCache:
     同时维护"目录是否含图"布尔缓存：目录树深度扫描阶段对每个目录
     只枚举一次，之后 _dir_contains_images 直接命中布尔结果，避免
     "先判断是否含图、再枚举图片列表"的两轮全量枚举。
+
+    另按 (目录, 排序方式) 缓存排序结果（见 core/sort_order）：切换排序方式
+    或重访目录时直接返回，不再重新提取排序键与排序；同样以目录 mtime 失效。
+
+    图片列表以 PackedPaths（见 core/path_table）保存：目录前缀全局驻留，
+    各排序方式的结果复用同一批文件名字符串，不再各存一份完整路径。
     """
 
     def __init__(self, max_size: int = 64):
@@ -170,11 +181,14 @@ class DirectoryImageListCache:
             max_size: 最大缓存目录数（LRU 淘汰）
         """
         self.max_size = max_size
-        # 内部以不可变元组保存图片列表，对外返回副本：
+        # 内部以不可变的 PackedPaths 保存图片列表，对外返回新列表：
         # 防止调用方（如 main_window.images）原地 pop/修改污染共享缓存
-        self._cache: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()  # dir -> (mtime, images)
+        self._paths = get_path_table()
+        self._cache: OrderedDict[str, tuple[float, PackedPaths]] = OrderedDict()  # dir -> (mtime, images)
         # 含图布尔缓存：dir -> (mtime, has_images)
         self._contains_cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        # 排序结果缓存：dir -> (mtime, {排序方式: images})
+        self._ordered_cache: OrderedDict[str, tuple[float, dict[str, PackedPaths]]] = OrderedDict()
         self._lock = threading.RLock()
 
     def get(self, dir_path: str) -> list[str] | None:
@@ -193,8 +207,8 @@ class DirectoryImageListCache:
                 return None
             # LRU：移动到末尾
             self._cache.move_to_end(dir_path)
-            # 返回副本：缓存内部元组保持不可变，调用方修改结果不影响缓存
-            return list(images)
+            # 返回新列表：缓存内部保持不可变，调用方修改结果不影响缓存
+            return images.unpack()
 
     def put(self, dir_path: str, mtime: float, images: list[str]) -> None:
         """写入缓存条目"""
@@ -203,8 +217,45 @@ class DirectoryImageListCache:
                 del self._cache[dir_path]
             while len(self._cache) >= self.max_size:
                 self._cache.popitem(last=False)
-            # 以不可变元组存储，杜绝外部引用突变
-            self._cache[dir_path] = (mtime, tuple(images))
+            # 以不可变的列存形式存储，杜绝外部引用突变
+            self._cache[dir_path] = (mtime, self._paths.pack(images))
+            # 新列表：旧的排序结果作废
+            self._ordered_cache.pop(dir_path, None)
+
+    def get_ordered(self, dir_path: str, order: str) -> list[str] | None:
+        """获取按指定排序方式缓存的图片列表；目录 mtime 变化或未缓存时返回 None"""
+        with self._lock:
+            entry = self._ordered_cache.get(dir_path)
+            if entry is None:
+                return None
+            mtime, orders = entry
+            try:
+                current_mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                current_mtime = -1.0
+            if abs(current_mtime - mtime) > 1e-9:
+                del self._ordered_cache[dir_path]
+                return None
+            images = orders.get(order)
+            if images is None:
+                return None
+            self._ordered_cache.move_to_end(dir_path)
+            return images.unpack()
+
+    def put_ordered(self, dir_path: str, mtime: float, order: str, images: list[str]) -> None:
+        """写入某排序方式的排序结果（同目录其他排序方式的结果在 mtime 不变时保留）"""
+        with self._lock:
+            entry = self._ordered_cache.pop(dir_path, None)
+            orders = entry[1] if entry is not None and abs(entry[0] - mtime) <= 1e-9 else {}
+            while len(self._ordered_cache) >= self.max_size:
+                self._ordered_cache.popitem(last=False)
+            # 与列表缓存为同一组路径时仅重排，复用文件名字符串
+            base = self._cache.get(dir_path)
+            packed = None
+            if base is not None and abs(base[0] - mtime) <= 1e-9 and len(base[1]) == len(images):
+                packed = base[1].reordered(images)
+            orders[order] = packed if packed is not None else self._paths.pack(images)
+            self._ordered_cache[dir_path] = (mtime, orders)
 
     def get_contains(self, dir_path: str) -> bool | None:
         """获取目录是否含图的布尔缓存；mtime 变化或不存在时返回 None"""
@@ -238,6 +289,7 @@ class DirectoryImageListCache:
         with self._lock:
             self._cache.clear()
             self._contains_cache.clear()
+            self._ordered_cache.clear()
 
 
 class FileInfoBatchLoader:
@@ -255,6 +307,7 @@ class FileInfoBatchLoader:
         self.cache = cache or FileInfoCache()
         self._dir_images_cache = DirectoryImageListCache()
         self._lock = threading.RLock()
+        self._sort_order = DEFAULT_SORT_ORDER
 
         logger.debug("FileInfoBatchLoader initialized")
 
@@ -459,37 +512,69 @@ class FileInfoBatchLoader:
 
         return file_infos
 
-    def get_directory_images(self, dir_path: str, filter_exts: tuple[str, ...] | None = None) -> list[str]:
-        """获取目录内按文件名排序的图片路径列表（目录级缓存）
+    def set_sort_order(self, order: str) -> bool:
+        """设置目录图片的默认排序方式（见 core/sort_order）
+
+        Returns:
+            是否为已注册的排序方式（未注册时保持原设置）
+        """
+        if not is_sort_order(order):
+            logger.warning("未知的排序方式: %s", order)
+            return False
+        self._sort_order = order
+        return True
+
+    def get_sort_order(self) -> str:
+        """当前默认排序方式"""
+        return self._sort_order
+
+    def get_directory_images(
+        self, dir_path: str, filter_exts: tuple[str, ...] | None = None, order: str | None = None
+    ) -> list[str]:
+        """获取目录内排序后的图片路径列表（目录级缓存）
 
         以目录 mtime 作为缓存失效依据：会话内重复访问同一文件夹时，
         直接返回缓存的排序结果，跳过目录枚举与排序。mtime 变化
-        （文件增删）时自动失效并重新扫描。
+        （文件增删）时自动失效并重新扫描。排序键在排序时对每个文件
+        只计算一次，结果按 (目录, 排序方式) 缓存，切换排序方式后再
+        切回无需重新排序。
 
         Args:
             dir_path: 目录路径
             filter_exts: 过滤的文件扩展名列表（小写，不含点号），None 表示不过滤
+            order: 排序方式；None 使用 set_sort_order 设置的默认值
 
         Returns:
-            图片文件路径列表（按文件名排序）
+            图片文件路径列表（按排序方式排序）
         """
         if not os.path.isdir(dir_path):
             return []
 
+        order = order or self._sort_order
         try:
             mtime = os.stat(dir_path).st_mtime
         except OSError:
             mtime = -1.0
 
-        cached = self._dir_images_cache.get(dir_path)
+        cached = self._dir_images_cache.get_ordered(dir_path, order)
         if cached is not None:
             return cached
 
-        file_infos = self.scan_directory(dir_path, filter_exts=filter_exts)
-        images = [info.path for info in file_infos if info.is_file]
-        images.sort()
-        self._dir_images_cache.put(dir_path, mtime, images)
-        return images
+        images = self._dir_images_cache.get(dir_path)
+        if images is None:
+            file_infos = self.scan_directory(dir_path, filter_exts=filter_exts)
+            images = [info.path for info in file_infos if info.is_file]
+            images.sort()
+            infos = {info.path: info for info in file_infos}
+            self._dir_images_cache.put(dir_path, mtime, images)
+        else:
+            # 列表命中而排序结果未命中：复用会话内的文件信息缓存，缺失项由排序键构建器 stat
+            infos = self.cache.get_batch(images)[0] if order != SORT_NAME else {}
+
+        if order != SORT_NAME:
+            images = sort_paths(dir_path, images, order, infos)
+        self._dir_images_cache.put_ordered(dir_path, mtime, order, images)
+        return list(images)
 
     def directory_contains_images(self, dir_path: str, filter_exts: tuple[str, ...] | None = None) -> bool:
         """判断目录是否包含图片（目录级布尔缓存）
@@ -656,6 +741,212 @@ class FileInfoBatchLoader:
         }
 
 
+class ParallelTreeWalker:
+    """工作窃取式并行目录树遍历器：目录发现与含图判断同时并行
+
+    旧流程先串行 os.walk 收集全部目录、再用线程池逐目录判断是否含图，
+    前半段完全没有并行度。本遍历器让每个工作线程在处理目录的同时产生
+    子目录任务：
+    - 每个工作线程持有自己的双端队列，从尾部取任务（深度优先，局部性好），
+      自己的队列为空时从其他线程队列头部窃取（最浅的目录，子树最大）
+    - 按挂载设备（st_dev）限制同时进行的 stat/scandir 数量，避免 NAS/SMB
+      上过多并发请求相互拖慢
+    - 与目录树快照配合：mtime 未变的目录直接复用快照节点，只 stat 不枚举
+    - 结果按完成顺序流式产出，调用方负责排序；提供进度与吞吐计数
+
+    walk() 的签名与 tree_snapshot.iter_walk 一致，可直接作为
+    TreeSnapshotStore.iter_scan 的 walk_fn。
+    """
+
+    def __init__(self, max_workers: int = 16, per_mount_inflight: int = 8):
+        """
+        Args:
+            max_workers: 工作线程数
+            per_mount_inflight: 每个挂载设备同时进行的目录 I/O 上限
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.per_mount_inflight = max(1, int(per_mount_inflight))
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._progress = self._empty_progress()
+
+    @staticmethod
+    def _empty_progress() -> dict:
+        return {
+            "dirs_rescanned": 0,
+            "dirs_reused": 0,
+            "image_dirs": 0,
+            "errors": 0,
+            "steals": 0,
+            "queued": 0,
+            "in_flight": 0,
+            "started_at": 0.0,
+            "finished_at": 0.0,
+        }
+
+    def cancel(self) -> None:
+        """取消进行中的遍历（工作线程处理完当前目录后退出）"""
+        self._cancelled.set()
+
+    def get_progress(self) -> dict:
+        """导出进度与吞吐计数（可在遍历过程中从任意线程调用）"""
+        with self._lock:
+            progress = dict(self._progress)
+        started = progress.pop("started_at")
+        finished = progress.pop("finished_at")
+        end = finished or (time.perf_counter() if started else 0.0)
+        elapsed = max(0.0, end - started) if started else 0.0
+        done = progress["dirs_rescanned"] + progress["dirs_reused"]
+        progress.update(
+            {
+                "dirs_done": done,
+                "elapsed_s": round(elapsed, 3),
+                "dirs_per_s": round(done / elapsed, 1) if elapsed > 0 else 0.0,
+                "finished": bool(finished),
+            }
+        )
+        return progress
+
+    def walk(
+        self,
+        root: str,
+        exts: tuple[str, ...],
+        previous: dict[str, DirNode] | None = None,
+        scanned_at_ns: int = 0,
+        dir_filter: Callable[[str, str], bool] | None = None,
+        result: TreeScanResult | None = None,
+    ) -> Iterator[tuple[str, DirNode]]:
+        """并行遍历目录树，按完成顺序产出 (绝对路径, 节点)
+
+        Args:
+            root: 根目录
+            exts: 图片扩展名（小写，含点号）
+            previous: 上次快照（绝对路径 → 节点）；None 表示全量遍历
+            scanned_at_ns: 上次快照时间（用于 mtime 粒度保护）
+            dir_filter: 子目录过滤 (父目录路径, 子目录名) → 是否进入
+            result: 可选的累积结果对象（在调用方线程更新）
+        """
+        previous = previous or {}
+        if result is None:
+            result = TreeScanResult(root=root)
+        try:
+            root_dev = os.stat(root).st_dev
+        except OSError:
+            return
+
+        self._cancelled.clear()
+        with self._lock:
+            self._progress = self._empty_progress()
+            self._progress["started_at"] = time.perf_counter()
+            self._progress["queued"] = 1
+
+        n = self.max_workers
+        deques: list[deque] = [deque() for _ in range(n)]
+        deques[0].append((root, root_dev))
+        cond = threading.Condition()
+        pending = [1]  # 已入队或处理中的目录数；归零即遍历结束
+        mount_sems: dict[int, threading.BoundedSemaphore] = {}
+        out: queue.SimpleQueue = queue.SimpleQueue()
+        done_marker = object()
+
+        def take(i: int):
+            """取任务：先取自己队列尾部，再窃取其他队列头部；无任务时等待"""
+            with cond:
+                while True:
+                    if self._cancelled.is_set() or pending[0] == 0:
+                        return None
+                    if deques[i]:
+                        return deques[i].pop()
+                    for k in range(1, n):
+                        victim = deques[(i + k) % n]
+                        if victim:
+                            with self._lock:
+                                self._progress["steals"] += 1
+                            return victim.popleft()
+                    cond.wait(0.1)
+
+        def mount_sem(dev: int) -> threading.BoundedSemaphore:
+            with cond:
+                sem = mount_sems.get(dev)
+                if sem is None:
+                    sem = mount_sems[dev] = threading.BoundedSemaphore(self.per_mount_inflight)
+                return sem
+
+        def worker(i: int) -> None:
+            try:
+                while True:
+                    task = take(i)
+                    if task is None:
+                        return
+                    # 任务携带父目录所在设备：查找（stat）经父目录的挂载完成；
+                    # 枚举按目录自身的 st_dev 限流，子目录可能是另一个挂载点
+                    dirpath, parent_dev = task
+                    with self._lock:
+                        self._progress["queued"] -= 1
+                        self._progress["in_flight"] += 1
+                    children: list = []
+                    try:
+                        with mount_sem(parent_dev):
+                            st = os.stat(dirpath)
+                        with mount_sem(st.st_dev):
+                            resolved = resolve_dir_node(dirpath, exts, previous.get(dirpath), scanned_at_ns, st)
+                        if resolved is not None:
+                            node, reused = resolved
+                            names = node.children
+                            if dir_filter is not None:
+                                names = tuple(c for c in names if dir_filter(dirpath, c))
+                            children = [(os.path.join(dirpath, c), st.st_dev) for c in names]
+                            out.put((dirpath, node, reused))
+                    except Exception:
+                        resolved = None
+                        logger.debug("并行遍历目录失败: %s", dirpath, exc_info=True)
+                    with self._lock:
+                        self._progress["in_flight"] -= 1
+                        self._progress["queued"] += len(children)
+                        if resolved is None:
+                            self._progress["errors"] += 1
+                    with cond:
+                        if children:
+                            deques[i].extend(children)
+                            pending[0] += len(children)
+                        pending[0] -= 1
+                        if children or pending[0] == 0:
+                            cond.notify_all()
+            finally:
+                out.put(done_marker)
+
+        threads = [threading.Thread(target=worker, args=(i,), name=f"TreeWalker-{i}", daemon=True) for i in range(n)]
+        for t in threads:
+            t.start()
+
+        finished = 0
+        try:
+            while finished < n:
+                item = out.get()
+                if item is done_marker:
+                    finished += 1
+                    continue
+                dirpath, node, reused = item
+                result.nodes[dirpath] = node
+                if reused:
+                    result.reused += 1
+                else:
+                    result.rescanned += 1
+                with self._lock:
+                    self._progress["dirs_reused" if reused else "dirs_rescanned"] += 1
+                    if node.image_count > 0:
+                        self._progress["image_dirs"] += 1
+                yield dirpath, node
+        finally:
+            if finished < n:
+                # 调用方提前关闭生成器：通知工作线程退出，不等待慢 I/O
+                self._cancelled.set()
+                with cond:
+                    cond.notify_all()
+            with self._lock:
+                self._progress["finished_at"] = time.perf_counter()
+
+
 # 全局实例（单例模式）
 _global_loader: FileInfoBatchLoader | None = None
 _loader_lock = threading.Lock()
@@ -693,6 +984,7 @@ __all__ = [
     "FileInfo",
     "FileInfoBatchLoader",
     "FileInfoCache",
+    "ParallelTreeWalker",
     "get_file_info_loader",
     "reset_file_info_loader",
 ]
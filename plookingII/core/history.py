@@ -125,6 +125,7 @@ class TaskHistoryManager:
             current_index INTEGER DEFAULT 0,
             keep_folder TEXT,
             current_folder TEXT,
+            current_image TEXT,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
@@ -215,7 +216,7 @@ class TaskHistoryManager:
             # 创建数据库表
             self._create_database_tables(cursor)
 
-            # 兼容旧库：补充 current_folder 列（新增于 v2.4.1+）
+            # 兼容旧库：补充 current_folder / current_image 列
             self._migrate_schema(cursor)
 
             # 初始化任务记录
@@ -236,8 +237,11 @@ class TaskHistoryManager:
             if "current_folder" not in columns:
                 cursor.execute("ALTER TABLE current_session ADD COLUMN current_folder TEXT")
                 logger.info("已为 current_session 表补充 current_folder 列")
+            if "current_image" not in columns:
+                cursor.execute("ALTER TABLE current_session ADD COLUMN current_image TEXT")
+                logger.info("已为 current_session 表补充 current_image 列")
         except Exception:
-            logger.debug("迁移 current_session.current_folder 列失败", exc_info=True)
+            logger.debug("迁移 current_session 表失败", exc_info=True)
 
     def save_task_progress(self, current_data):
         """保存任务进度到数据库（增量更新）。
@@ -251,6 +255,7 @@ class TaskHistoryManager:
                 - current_index: 当前图片索引
                 - keep_folder: 保留文件夹路径
                 - subfolders: 子文件夹列表
+                - current_image: 当前图片路径（排序方式变化后按路径恢复）
 
         Returns:
             bool: 保存成功返回True，失败返回False
@@ -287,6 +292,7 @@ class TaskHistoryManager:
                 current_index = ?,
                 keep_folder = ?,
                 current_folder = ?,
+                current_image = ?,
                 last_updated = CURRENT_TIMESTAMP
             WHERE id = 1
             """,
@@ -295,6 +301,7 @@ class TaskHistoryManager:
                     current_data.get("current_index", 0),
                     current_data.get("keep_folder", ""),
                     current_data.get("current_folder", ""),
+                    current_data.get("current_image", ""),
                 ),
             )
 
@@ -348,14 +355,15 @@ class TaskHistoryManager:
         """
         # 获取当前会话状态
         cursor.execute(
-            "SELECT current_subfolder_index, current_index, keep_folder, current_folder FROM current_session WHERE id = 1"
+            "SELECT current_subfolder_index, current_index, keep_folder, current_folder, current_image "
+            "FROM current_session WHERE id = 1"
         )
         session = cursor.fetchone()
 
         if not session:
             return None
 
-        current_subfolder_index, current_index, keep_folder, current_folder = session
+        current_subfolder_index, current_index, keep_folder, current_folder, current_image = session
 
         # 迁移旧 keep_folder 路径：.../保留 -> .../[父目录名] 精选
         try:
@@ -379,6 +387,7 @@ class TaskHistoryManager:
             "current_index": int(current_index or 0),
             "keep_folder": keep_folder or "",
             "current_folder": current_folder or "",
+            "current_image": current_image or "",
         }
 
     def _upsert_recent_folder(self, cursor, folder_path: str) -> None:
@@ -424,6 +433,7 @@ class TaskHistoryManager:
                 - current_subfolder_index: 当前子文件夹索引
                 - current_index: 当前图片索引
                 - keep_folder: 保留文件夹路径
+                - current_image: 当前图片路径（旧版本记录为空串）
 
         Note:
             - 验证数据库文件存在性和任务记录有效性
@@ -473,7 +483,7 @@ class TaskHistoryManager:
             cursor.execute("DELETE FROM subfolders")
             cursor.execute(
                 "UPDATE current_session SET current_subfolder_index = 0, "
-                "current_index = 0, keep_folder = NULL, current_folder = NULL WHERE id = 1"
+                "current_index = 0, keep_folder = NULL, current_folder = NULL, current_image = NULL WHERE id = 1"
             )
 
             conn.commit()
@@ -0,0 +1,378 @@
+"""
+纯 Python 图片头部解析（不依赖 Quartz）
+
+尺寸 / Alpha / MPF 探测此前每个文件都要创建一次 CGImageSource，SMB 共享上
+单文件耗时数十毫秒，且在非 macOS 环境完全不可用。本模块只读取文件头部的
+一个有界前缀（单次 ``os.pread``），在纯字节层面解析：
+
+- JPEG：SOF0/1/2（及其余非差分 SOF 标记）中的宽高；APP1 EXIF IFD0 方向与
+  拍摄时间（Exif 子 IFD 的 DateTimeOriginal，缺失时取 IFD0 DateTime）；APP2 MPF 索引中的子图像偏移与长度（Index 1 即"Large Thumbnail"预览）
+- PNG：IHDR 宽高与色彩类型；IDAT 之前的 tRNS 块判定透明
+
+解析失败（前缀不足、格式不认识、结构损坏）一律返回 None，由调用方回退到
+Quartz 元数据路径；本模块从不抛出异常，也不解码任何像素。
+
+探测是纯 I/O，可批量并行（见 read_image_headers），5000 张的目录尺寸预热
+不再逐个排队等待 ImageIO。
+
+说明：
+    - 宽高为文件存储的原始像素尺寸，不按 EXIF 方向交换（项目不做运行期方向
+      修正，与 Quartz PixelWidth/PixelHeight 语义一致）；方向仅作为元数据返回
+    - 前缀默认 64KB：相机 JPEG 的 APP1 常内嵌 10~60KB 的 EXIF 缩略图，SOF 位于
+      其后，过小的前缀会让大多数相机文件退回 Quartz；64KB 在 SMB2 上仍是单次往返
+
+Author: PlookingII Team
+"""
+
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# 单次 pread 的头部前缀上限（字节）
+HEADER_PROBE_BYTES = 64 * 1024
+
+# 批量探测默认并发（纯 I/O，网络盘上并发可掩盖往返延迟）
+DEFAULT_PROBE_WORKERS = 8
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 帧头标记：C0-CF 中除 DHT(C4)/JPG(C8)/DAC(CC) 外均为 SOFn
+_JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+# 无长度字段的独立标记：TEM、RST0-7、SOI
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8})
+
+_EXIF_TAG_ORIENTATION = 0x0112
+_EXIF_TAG_DATETIME = 0x0132
+_EXIF_TAG_EXIF_IFD = 0x8769
+_EXIF_TAG_DATETIME_ORIGINAL = 0x9003
+# EXIF 时间固定格式 "YYYY:MM:DD HH:MM:SS"（19 字符 + NUL）
+_EXIF_DATETIME_LEN = 19
+_MPF_TAG_NUMBER_OF_IMAGES = 0xB001
+_MPF_TAG_MP_ENTRY = 0xB002
+_MPF_ENTRY_SIZE = 16
+# 防御性上限：MP Entry 数量异常大时视为损坏
+_MPF_MAX_ENTRIES = 64
+
+
+@dataclass(frozen=True)
+class ImageHeaderInfo:
+    """图片头部元数据（不含像素）
+
+    Attributes:
+        format: "jpeg" 或 "png"
+        width: 存储宽度（像素）
+        height: 存储高度（像素）
+        orientation: EXIF 方向（1~8，缺失为 1）
+        has_alpha: 是否含透明通道；无法在前缀内判定时为 None
+        mpf_images: MPF 子图像 (文件绝对偏移, 长度) 列表，Index 0 为主图
+        capture_time: EXIF 拍摄时间 "YYYY:MM:DD HH:MM:SS"（字典序即时间序）；缺失为 None
+    """
+
+    format: str
+    width: int
+    height: int
+    orientation: int = 1
+    has_alpha: bool | None = None
+    mpf_images: tuple[tuple[int, int], ...] = ()
+    capture_time: str | None = None
+
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        return (self.width, self.height)
+
+    @property
+    def has_mpf(self) -> bool:
+        """是否含 MPF 附属图像（至少主图 + 1 张预览）"""
+        return len(self.mpf_images) >= 2
+
+    @property
+    def preview_range(self) -> tuple[int, int] | None:
+        """MPF Index 1（Large Thumbnail）的 (偏移, 长度)；无预览返回 None"""
+        if not self.has_mpf:
+            return None
+        return self.mpf_images[1]
+
+
+# ----------------------------------------------------------------------
+# 字节读取工具
+# ----------------------------------------------------------------------
+def _u16(data, pos: int, little: bool) -> int:
+    return int.from_bytes(data[pos : pos + 2], "little" if little else "big")
+
+
+def _u32(data, pos: int, little: bool) -> int:
+    return int.from_bytes(data[pos : pos + 4], "little" if little else "big")
+
+
+def _tiff_header(data, start: int, end: int) -> tuple[bool, int] | None:
+    """解析 TIFF 头（字节序 + 42 + IFD0 偏移），返回 (little_endian, ifd0_abs)"""
+    if start + 8 > end:
+        return None
+    order = bytes(data[start : start + 2])
+    if order == b"II":
+        little = True
+    elif order == b"MM":
+        little = False
+    else:
+        return None
+    if _u16(data, start + 2, little) != 42:
+        return None
+    ifd_abs = start + _u32(data, start + 4, little)
+    if ifd_abs + 2 > end:
+        return None
+    return little, ifd_abs
+
+
+def _iter_ifd(data, ifd_abs: int, end: int, little: bool):
+    """遍历 IFD 条目，产出 (tag, type, count, value_field_pos)"""
+    count = _u16(data, ifd_abs, little)
+    pos = ifd_abs + 2
+    for _ in range(count):
+        if pos + 12 > end:
+            return
+        yield _u16(data, pos, little), _u16(data, pos + 2, little), _u32(data, pos + 4, little), pos + 8
+        pos += 12
+
+
+# ----------------------------------------------------------------------
+# JPEG
+# ----------------------------------------------------------------------
+def _read_exif_datetime(data, tiff_start: int, end: int, count: int, value_pos: int, little: bool) -> str | None:
+    """读取 ASCII 类型的 EXIF 时间值（超过 4 字节时为相对 TIFF 头的偏移）"""
+    if count < _EXIF_DATETIME_LEN:
+        return None
+    pos = tiff_start + _u32(data, value_pos, little)
+    if pos + _EXIF_DATETIME_LEN > end:
+        return None
+    raw = bytes(data[pos : pos + _EXIF_DATETIME_LEN])
+    try:
+        text = raw.decode("ascii")
+    except UnicodeDecodeError:
+        return None
+    # 过滤相机未设置时间时写入的全零/空白值
+    if not text[:4].isdigit() or text.startswith("0000") or text[4] != ":" or text[10] != " ":
+        return None
+    return text
+
+
+def _parse_exif(data, start: int, end: int) -> tuple[int | None, str | None]:
+    """从 APP1 EXIF 读取 IFD0 方向与拍摄时间，返回 (orientation, capture_time)"""
+    header = _tiff_header(data, start, end)
+    if header is None:
+        return None, None
+    little, ifd_abs = header
+    orientation = None
+    datetime = None
+    exif_ifd = None
+    for tag, typ, count, value_pos in _iter_ifd(data, ifd_abs, end, little):
+        if tag == _EXIF_TAG_ORIENTATION and typ == 3:  # SHORT
+            value = _u16(data, value_pos, little)
+            orientation = value if 1 <= value <= 8 else None
+        elif tag == _EXIF_TAG_DATETIME and typ == 2:  # ASCII
+            datetime = _read_exif_datetime(data, start, end, count, value_pos, little)
+        elif tag == _EXIF_TAG_EXIF_IFD:
+            exif_ifd = start + _u32(data, value_pos, little)
+    if exif_ifd is not None and exif_ifd + 2 <= end:
+        for tag, typ, count, value_pos in _iter_ifd(data, exif_ifd, end, little):
+            if tag == _EXIF_TAG_DATETIME_ORIGINAL and typ == 2:
+                datetime = _read_exif_datetime(data, start, end, count, value_pos, little) or datetime
+                break
+    return orientation, datetime
+
+
+def _parse_mpf(data, start: int, end: int) -> tuple[tuple[int, int], ...]:
+    """解析 APP2 MPF 索引 IFD，返回子图像 (绝对偏移, 长度) 列表
+
+    MP Entry 中的偏移以 MPF 段内 TIFF 头（字节序字段）为基准；
+    Index 0（主图）偏移约定为 0，即文件开头。
+    """
+    header = _tiff_header(data, start, end)
+    if header is None:
+        return ()
+    little, ifd_abs = header
+    num_images = 0
+    entry_pos = -1
+    entry_len = 0
+    for tag, _typ, count, value_pos in _iter_ifd(data, ifd_abs, end, little):
+        if tag == _MPF_TAG_NUMBER_OF_IMAGES:
+            num_images = _u32(data, value_pos, little)
+        elif tag == _MPF_TAG_MP_ENTRY:
+            entry_len = count
+            entry_pos = start + _u32(data, value_pos, little)
+    if num_images < 1 or num_images > _MPF_MAX_ENTRIES or entry_pos < 0:
+        return ()
+    if entry_len < num_images * _MPF_ENTRY_SIZE or entry_pos + num_images * _MPF_ENTRY_SIZE > end:
+        return ()
+    images: list[tuple[int, int]] = []
+    for i in range(num_images):
+        pos = entry_pos + i * _MPF_ENTRY_SIZE
+        size = _u32(data, pos + 4, little)
+        offset = _u32(data, pos + 8, little)
+        images.append((0 if i == 0 else start + offset, size))
+    return tuple(images)
+
+
+def _parse_jpeg(data, file_size: int | None) -> ImageHeaderInfo | None:
+    n = len(data)
+    pos = 2
+    orientation = 1
+    capture_time = None
+    mpf_images: tuple[tuple[int, int], ...] = ()
+    while pos + 4 <= n:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # 填充字节
+            pos += 1
+            continue
+        pos += 2
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # EOI / SOS 先于 SOF 出现：结构异常
+            return None
+        seg_len = _u16(data, pos, False)
+        if seg_len < 2:
+            return None
+        seg_start = pos + 2
+        seg_end = pos + seg_len
+        if marker in _JPEG_SOF_MARKERS:
+            if seg_start + 5 > n:
+                return None
+            height = _u16(data, seg_start + 1, False)
+            width = _u16(data, seg_start + 3, False)
+            if width <= 0 or height <= 0:
+                # height=0 需 DNL 段补充，交给 Quartz
+                return None
+            if file_size is not None:
+                mpf_images = tuple((off, size) for off, size in mpf_images if off + size <= file_size)
+            return ImageHeaderInfo("jpeg", width, height, orientation, False, mpf_images, capture_time)
+        if seg_end <= n:
+            if marker == 0xE1 and bytes(data[seg_start : seg_start + 6]) == b"Exif\x00\x00":
+                exif_orientation, capture_time = _parse_exif(data, seg_start + 6, seg_end)
+                orientation = exif_orientation or orientation
+            elif marker == 0xE2 and bytes(data[seg_start : seg_start + 4]) == b"MPF\x00":
+                mpf_images = _parse_mpf(data, seg_start + 4, seg_end)
+        pos = seg_end
+    # 前缀内未遇到 SOF
+    return None
+
+
+# ----------------------------------------------------------------------
+# PNG
+# ----------------------------------------------------------------------
+def _parse_png(data) -> ImageHeaderInfo | None:
+    n = len(data)
+    if n < 33 or bytes(data[12:16]) != b"IHDR":
+        return None
+    width = _u32(data, 16, False)
+    height = _u32(data, 20, False)
+    color_type = data[25]
+    if width <= 0 or height <= 0:
+        return None
+    has_alpha: bool | None
+    if color_type in (4, 6):
+        has_alpha = True
+    else:
+        # 灰度/真彩/调色板：透明度由 IDAT 之前的 tRNS 块声明
+        has_alpha = None
+        pos = 8 + 8 + 13 + 4
+        while pos + 8 <= n:
+            length = _u32(data, pos, False)
+            ctype = bytes(data[pos + 4 : pos + 8])
+            if ctype == b"tRNS":
+                has_alpha = True
+                break
+            if ctype in (b"IDAT", b"IEND"):
+                has_alpha = False
+                break
+            pos += 12 + length
+    return ImageHeaderInfo("png", width, height, 1, has_alpha)
+
+
+# ----------------------------------------------------------------------
+# 公共接口
+# ----------------------------------------------------------------------
+def parse_image_header(data, file_size: int | None = None) -> ImageHeaderInfo | None:
+    """解析内存中的文件头部前缀
+
+    Args:
+        data: 文件开头的字节（bytes / bytearray / memoryview）
+        file_size: 文件总大小；提供时丢弃越界的 MPF 条目
+
+    Returns:
+        ImageHeaderInfo；不认识的格式或结构不完整返回 None
+    """
+    try:
+        if len(data) >= 3 and data[0] == 0xFF and data[1] == 0xD8:
+            return _parse_jpeg(data, file_size)
+        if bytes(data[:8]) == _PNG_SIGNATURE:
+            return _parse_png(data)
+    except (IndexError, ValueError, TypeError):
+        logger.debug("头部解析异常，回退", exc_info=True)
+    return None
+
+
+def read_image_header(file_path: str, max_bytes: int = HEADER_PROBE_BYTES) -> ImageHeaderInfo | None:
+    """读取并解析文件头部（单次有界 pread，不解码像素）
+
+    Args:
+        file_path: 文件路径
+        max_bytes: 读取前缀上限
+
+    Returns:
+        ImageHeaderInfo；文件不可读或无法解析返回 None
+    """
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        file_size = os.fstat(fd).st_size
+        data = os.pread(fd, min(max_bytes, file_size), 0)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return parse_image_header(data, file_size)
+
+
+def read_image_headers(
+    paths: Iterable[str],
+    max_workers: int = DEFAULT_PROBE_WORKERS,
+    max_bytes: int = HEADER_PROBE_BYTES,
+) -> dict[str, ImageHeaderInfo]:
+    """批量并行探测头部（纯 I/O，GIL 在 pread 期间释放）
+
+    Args:
+        paths: 文件路径序列
+        max_workers: 并发线程数；≤1 时串行
+        max_bytes: 单文件前缀上限
+
+    Returns:
+        路径 → ImageHeaderInfo，仅包含解析成功的条目
+    """
+    path_list = list(paths)
+    if not path_list:
+        return {}
+    if max_workers <= 1 or len(path_list) == 1:
+        results = [read_image_header(p, max_bytes) for p in path_list]
+    else:
+        workers = min(max_workers, len(path_list))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="header-probe") as pool:
+            results = list(pool.map(lambda p: read_image_header(p, max_bytes), path_list))
+    return {p: info for p, info in zip(path_list, results, strict=True) if info is not None}
+
+
+__all__ = [
+    "HEADER_PROBE_BYTES",
+    "ImageHeaderInfo",
+    "parse_image_header",
+    "read_image_header",
+    "read_image_headers",
+]
@@ -0,0 +1,239 @@
+"""
+图片序列（分块列表 + 块长度 Fenwick 树）
+
+window.images 此前是普通 list：精选（keep）时 ``images.pop(index)`` 搬移其后
+全部元素，随后 BidirectionalCachePool.set_sequence 与 ImageManager 的
+path→index 映射整体重建，2 万张的目录每次精选都是 O(n)。本模块提供与 list
+接口兼容的 ImageSequence：
+
+- 元素按块存放（每块至多 2×_LOAD 个），块长度由 Fenwick 树维护，
+  按下标定位 / 删除 / 插入为 O(log B + _LOAD)（B 为块数）
+- path → 所在块 的映射使 index() / in 无需线性扫描；块分裂或清空时才
+  O(B) 重建块位置表，均摊开销可忽略
+- window.images、双向缓存池与预取偏移查找共享同一对象，增删后无需重建
+  任何映射
+
+路径在同一目录列表中唯一；出现重复元素时 index() 回退为线性查找以保证
+语义与 list 一致。
+
+Author: PlookingII Team
+"""
+
+from collections.abc import Iterable, Iterator, MutableSequence
+from typing import Any
+
+# 块的目标长度；超过 2 倍时分裂
+_LOAD = 256
+
+
+class ImageSequence(MutableSequence):
+    """list 兼容的图片路径序列（O(log n) 下标定位、删除、插入与 index）"""
+
+    def __init__(self, iterable: Iterable = ()):
+        self._reset(list(iterable))
+
+    # —— 内部结构 ——
+    def _reset(self, items: list) -> None:
+        self._blocks: list[list] = [items[i : i + _LOAD] for i in range(0, len(items), _LOAD)]
+        self._len = len(items)
+        self._owner: dict[Any, list] = {}
+        self._dupes = 0
+        for block in self._blocks:
+            for item in block:
+                if item in self._owner:
+                    self._dupes += 1
+                self._owner[item] = block
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """重建块位置表与 Fenwick 树（块分裂/清空时调用，O(B)）"""
+        n = len(self._blocks)
+        tree = [0] * (n + 1)
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._block_pos = {id(block): i for i, block in enumerate(self._blocks)}
+
+    def _add(self, pos: int, delta: int) -> None:
+        tree = self._tree
+        i = pos + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, pos: int) -> int:
+        """前 pos 个块的元素总数"""
+        tree = self._tree
+        total = 0
+        while pos > 0:
+            total += tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """下标 → (块序号, 块内偏移)；index 须已规范化到 [0, len)"""
+        tree = self._tree
+        n = len(tree) - 1
+        pos = 0
+        step = 1 << (n.bit_length() - 1) if n else 0
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= index:
+                pos = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ImageSequence index out of range")
+        return index
+
+    # —— 序列接口 ——
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for block in self._blocks:
+            yield from block
+
+    def __contains__(self, value) -> bool:
+        if self._dupes:
+            return any(item == value for item in self)
+        try:
+            return value in self._owner
+        except TypeError:
+            return False
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        pos, off = self._locate(self._normalize(index))
+        return self._blocks[pos][off]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self._reset(items)
+            return
+        pos, off = self._locate(self._normalize(index))
+        block = self._blocks[pos]
+        old = block[off]
+        block[off] = value
+        if self._owner.get(old) is block:
+            del self._owner[old]
+        if value in self._owner:
+            self._dupes += 1
+        self._owner[value] = block
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            for i in sorted(range(*index.indices(self._len)), reverse=True):
+                self.pop(i)
+            return
+        self.pop(index)
+
+    def pop(self, index: int = -1):
+        if not self._len:
+            raise IndexError("pop from empty ImageSequence")
+        pos, off = self._locate(self._normalize(index))
+        block = self._blocks[pos]
+        value = block.pop(off)
+        self._len -= 1
+        if self._owner.get(value) is block:
+            del self._owner[value]
+        if block:
+            self._add(pos, -1)
+        else:
+            del self._blocks[pos]
+            self._rebuild_index()
+        return value
+
+    def insert(self, index: int, value) -> None:
+        # 与 list.insert 相同的越界语义：截断到 [0, len]
+        if index < 0:
+            index = max(0, index + self._len)
+        index = min(index, self._len)
+        if not self._blocks:
+            block = [value]
+            self._blocks.append(block)
+            pos = 0
+            rebuild = True
+        else:
+            if index == self._len:
+                pos = len(self._blocks) - 1
+                off = len(self._blocks[pos])
+            else:
+                pos, off = self._locate(index)
+            block = self._blocks[pos]
+            block.insert(off, value)
+            rebuild = False
+        self._len += 1
+        if value in self._owner:
+            self._dupes += 1
+        self._owner[value] = block
+
+        if len(block) > 2 * _LOAD:
+            tail = block[_LOAD:]
+            del block[_LOAD:]
+            self._blocks.insert(pos + 1, tail)
+            for item in tail:
+                if self._owner.get(item) is block:
+                    self._owner[item] = tail
+            rebuild = True
+        if rebuild:
+            self._rebuild_index()
+        else:
+            self._add(pos, 1)
+
+    def index_of(self, value) -> int | None:
+        """返回元素下标，不存在时返回 None（O(log n)）"""
+        if self._dupes:
+            # 重复元素下 path → 块 映射不可靠，回退线性查找
+            for i, item in enumerate(self):
+                if item == value:
+                    return i
+            return None
+        try:
+            block = self._owner.get(value)
+        except TypeError:
+            return None
+        if block is None:
+            return None
+        return self._prefix(self._block_pos[id(block)]) + block.index(value)
+
+    def index(self, value, start: int = 0, stop: int | None = None) -> int:
+        if start == 0 and stop is None:
+            i = self.index_of(value)
+            if i is None:
+                raise ValueError(f"{value!r} is not in ImageSequence")
+            return i
+        return list(self).index(value, start, self._len if stop is None else stop)
+
+    def clear(self) -> None:
+        self._reset([])
+
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        self._reset(sorted(self, key=key, reverse=reverse))
+
+    def copy(self) -> "ImageSequence":
+        return ImageSequence(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ImageSequence, list)):
+            return self._len == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ImageSequence({list(self)!r})"
+
+
+__all__ = ["ImageSequence"]
@@ -5,6 +5,7 @@
 - OptimizedStrategy: 智能加载（自动选择最优方法）
 - PreviewStrategy: 快速预览/缩略图
 - AutoStrategy: 自动策略选择器
+- DecodeSingleFlight: 合并同一 (path, target_size) 的并发解码
 
 使用示例:
     from plookingII.core.loading import get_loader
@@ -24,19 +25,35 @@ Date: 2025-10-06
 
 from .config import LoadingConfig
 from .helpers import clear_loader_cache, create_loader, get_loader, is_jpeg_file, is_png_file, png_has_alpha
+from .single_flight import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_FOREGROUND,
+    PRIORITY_NEXT,
+    DecodeFlight,
+    DecodeSingleFlight,
+    get_decode_flights,
+    reset_decode_flights,
+)
 from .stats import LoadingStats
 from .strategies import AutoStrategy, OptimizedStrategy, PreviewStrategy
 
 __all__ = [
+    "PRIORITY_BACKGROUND",
+    "PRIORITY_FOREGROUND",
+    "PRIORITY_NEXT",
     "AutoStrategy",
+    "DecodeFlight",
+    "DecodeSingleFlight",
     "LoadingConfig",
     "LoadingStats",
     "OptimizedStrategy",
     "PreviewStrategy",
     "clear_loader_cache",
     "create_loader",
+    "get_decode_flights",
     "get_loader",
     "is_jpeg_file",
     "is_png_file",
     "png_has_alpha",
+    "reset_decode_flights",
 ]
@@ -14,6 +14,8 @@ import os
 import threading
 from typing import Any
 
+from ..image_header import HEADER_PROBE_BYTES, ImageHeaderInfo, parse_image_header, read_image_header
+
 logger = logging.getLogger(__name__)
 
 # 加载器实例缓存（get_loader 全局复用，避免热路径重复构造策略对象）
@@ -91,8 +93,26 @@ def check_quartz_availability() -> bool:
         return False
 
 
+def _encoded_nsdata(file_path: str) -> Any | None:
+    """编码字节层命中时，返回可直接作为 NSData 传入的原始字节（不再读盘、不复制）
+
+    PyObjC 把支持缓冲协议的对象桥接为 NSData 代理（OC_PythonData）：不复制字节，
+    代理持有 Python 对象引用。懒解码的 CGImage/NSImage 会保留其数据源，因此
+    传入的是缓存条目自身的 bytearray——条目被淘汰后由图像对象继续持有，
+    内存中始终只有一份编码字节，而不是在缓存之外再钉住一份 NSData 副本。
+    """
+    from ..encoded_cache import peek_encoded_bytes
+
+    view = peek_encoded_bytes(file_path)
+    if view is None:
+        return None
+    data = view.obj
+    view.release()
+    return data
+
+
 def load_with_nsimage(file_path: str) -> Any | None:
-    """使用NSImage加载（快速，适合小文件）
+    """使用NSImage加载（快速，适合小文件；编码字节层命中时从内存字节解码）
 
     Args:
         file_path: 文件路径
@@ -103,6 +123,11 @@ def load_with_nsimage(file_path: str) -> Any | None:
     try:
         from AppKit import NSImage
 
+        data = _encoded_nsdata(file_path)
+        if data is not None:
+            image = NSImage.alloc().initWithData_(data)
+            if image is not None:
+                return image
         return NSImage.alloc().initWithContentsOfFile_(file_path)
     except Exception as e:
         logger.exception("NSImage加载失败 %s: %s", file_path, e)
@@ -143,6 +168,7 @@ def load_with_quartz(file_path: str, target_size: tuple[int, int] | None = None,
       代理CGImage不解码像素，仅在GPU需要时才解码屏幕可见区域。
       注意：项目已放弃运行期 EXIF 方向修正（图片集在筛选前由外部工作流统一纠正朝向），
       解码与渲染均不做方向变换，保持零拷贝直绘。
+    编码字节层（core/encoded_cache）已预读该文件时，图像源直接由内存字节创建。
 
     Args:
         file_path: 文件路径
@@ -157,6 +183,7 @@ def load_with_quartz(file_path: str, target_size: tuple[int, int] | None = None,
         from Quartz import (
             CGImageSourceCreateImageAtIndex,
             CGImageSourceCreateThumbnailAtIndex,
+            CGImageSourceCreateWithData,
             CGImageSourceCreateWithURL,
             kCGImageSourceCreateThumbnailFromImageAlways,
             kCGImageSourceCreateThumbnailFromImageIfAbsent,
@@ -167,8 +194,11 @@ def load_with_quartz(file_path: str, target_size: tuple[int, int] | None = None,
             kCGImageSourceThumbnailMaxPixelSize,
         )
 
-        url = NSURL.fileURLWithPath_(file_path)
-        source = CGImageSourceCreateWithURL(url, None)
+        data = _encoded_nsdata(file_path)
+        source = CGImageSourceCreateWithData(data, None) if data is not None else None
+        if not source:
+            url = NSURL.fileURLWithPath_(file_path)
+            source = CGImageSourceCreateWithURL(url, None)
 
         if not source:
             logger.warning("无法创建CGImageSource: %s", file_path)
@@ -286,6 +316,53 @@ def cgimage_to_nsimage(cgimage: Any) -> Any | None:
         return None
 
 
+def cgimage_from_frame(frame: Any) -> Any | None:
+    """把解码子进程的共享内存 RGBA 帧包装为 CGImage
+
+    slab 在帧 release 后即被复用，因此像素复制一次进 NSData（每帧唯一的
+    一次复制）；调用方在本函数返回后即可 release 帧。
+
+    Args:
+        frame: decode_pool.DecodedFrame（is_shared 为 True）
+
+    Returns:
+        CGImage对象，失败返回None
+    """
+    try:
+        from Foundation import NSData
+        from Quartz import (
+            CGColorSpaceCreateDeviceRGB,
+            CGDataProviderCreateWithCFData,
+            CGImageCreate,
+            kCGBitmapByteOrder32Big,
+            kCGImageAlphaLast,
+            kCGImageAlphaPremultipliedLast,
+            kCGRenderingIntentDefault,
+        )
+
+        if frame is None or not frame.is_shared:
+            return None
+        nbytes = frame.stride * frame.height
+        data = NSData.dataWithBytes_length_(frame.pixels[:nbytes], nbytes)
+        alpha = kCGImageAlphaPremultipliedLast if frame.mode == "RGBa" else kCGImageAlphaLast
+        return CGImageCreate(
+            frame.width,
+            frame.height,
+            8,
+            32,
+            frame.stride,
+            CGColorSpaceCreateDeviceRGB(),
+            alpha | kCGBitmapByteOrder32Big,
+            CGDataProviderCreateWithCFData(data),
+            None,
+            False,
+            kCGRenderingIntentDefault,
+        )
+    except Exception as e:
+        logger.exception("共享内存帧转CGImage失败: %s", e)
+        return None
+
+
 def extract_embedded_preview(file_path: str) -> Any | None:
     """从 JPEG/HEIC 文件中提取内嵌预览图（不解码全分辨率图像）
 
@@ -300,14 +377,93 @@ def extract_embedded_preview(file_path: str) -> Any | None:
         CGImageRef（预览图），无内嵌预览图时返回 None
     """
     try:
-        from Foundation import NSURL, NSData
+        from ..range_cache import open_remote_reader
+
+        # 远程文件经区间缓存读取：只取头部与预览所在区间，不复制整个文件
+        # 头部无法解析（HEIC 等）时落到下方 Quartz 回退
+        remote = open_remote_reader(file_path)
+        if remote is not None:
+            with remote:
+                header = parse_image_header(remote.pread(0, HEADER_PROBE_BYTES), remote.size)
+                if header is not None:
+                    return _extract_preview_from_reader(remote, header)
+
+        # 首选：头部解析 MPF 索引（单次 pread）；JPEG/PNG 头部可判定时
+        # 无 MPF 的文件直接返回，不再创建 CGImageSource
+        header = read_image_header(file_path)
+        if header is not None:
+            preview_range = header.preview_range
+            if preview_range is None:
+                return None
+            mp_image_start, mp_image_length = preview_range
+        else:
+            located = _locate_mpf_preview_with_quartz(file_path)
+            if located is None:
+                return None
+            mp_image_start, mp_image_length = located
+
+        if mp_image_length <= 0 or mp_image_start <= 0:
+            return None
+
+        # 从文件中读取预览图像数据
+        with open_no_cache(file_path) as f:
+            if f is None:
+                return None
+            f.seek(mp_image_start)
+            preview_data = f.read(mp_image_length)
+
+        return _decode_preview_data(preview_data)
+
+    except Exception as e:
+        logger.debug("提取内嵌预览图失败 %s: %s", file_path, e)
+        return None
+
+
+def _extract_preview_from_reader(reader: Any, header: ImageHeaderInfo) -> Any | None:
+    """按已解析的头部从远程区间视图读取 MPF 预览区间并解码"""
+    if header.preview_range is None:
+        return None
+    mp_image_start, mp_image_length = header.preview_range
+    if mp_image_length <= 0 or mp_image_start <= 0:
+        return None
+    return _decode_preview_data(reader.pread(mp_image_start, mp_image_length))
+
+
+def _decode_preview_data(preview_data: bytes) -> Any | None:
+    """从预览图字节创建懒解码 CGImage"""
+    if not preview_data:
+        return None
+
+    from Foundation import NSData
+    from Quartz import (
+        CGImageSourceCreateImageAtIndex,
+        CGImageSourceCreateWithData,
+        kCGImageSourceShouldCacheImmediately,
+    )
+
+    # 从二进制数据创建 CGImageSource 并解码预览图
+    ns_data = NSData.dataWithBytes_length_(preview_data, len(preview_data))
+    preview_source = CGImageSourceCreateWithData(ns_data, None)
+    if not preview_source:
+        return None
+
+    options = {
+        kCGImageSourceShouldCacheImmediately: False,
+    }
+    return CGImageSourceCreateImageAtIndex(preview_source, 0, options)
+
+
+def _locate_mpf_preview_with_quartz(file_path: str) -> tuple[int, int] | None:
+    """Quartz 回退：通过 CGImageSource 属性字典定位 MPF 预览 (偏移, 长度)
+
+    仅在头部解析无法识别文件（HEIC 等）时使用。
+    """
+    try:
+        from Foundation import NSURL
         from Quartz import (
             CGImageSourceCopyPropertiesAtIndex,
-            CGImageSourceCreateImageAtIndex,
-            CGImageSourceCreateWithData,
             CGImageSourceCreateWithURL,
             kCGImagePropertyMPFDictionary,
-            kCGImageSourceShouldCacheImmediately,
         )
 
         url = NSURL.fileURLWithPath_(file_path)
@@ -368,35 +524,10 @@ def extract_embedded_preview(file_path: str) -> Any | None:
         if mp_image_length is None or mp_image_start is None:
             return None
 
-        mp_image_length = int(mp_image_length)
-        mp_image_start = int(mp_image_start)
-
-        if mp_image_length <= 0 or mp_image_start <= 0:
-            return None
-
-        # 从文件中读取预览图像数据
-        with open_no_cache(file_path) as f:
-            if f is None:
-                return None
-            f.seek(mp_image_start)
-            preview_data = f.read(mp_image_length)
-
-        if not preview_data:
-            return None
-
-        # 从二进制数据创建 CGImageSource 并解码预览图
-        ns_data = NSData.dataWithBytes_length_(preview_data, len(preview_data))
-        preview_source = CGImageSourceCreateWithData(ns_data, None)
-        if not preview_source:
-            return None
-
-        options = {
-            kCGImageSourceShouldCacheImmediately: False,
-        }
-        return CGImageSourceCreateImageAtIndex(preview_source, 0, options)
+        return int(mp_image_start), int(mp_image_length)
 
     except Exception as e:
-        logger.debug("提取内嵌预览图失败 %s: %s", file_path, e)
+        logger.debug("Quartz 定位 MPF 预览失败 %s: %s", file_path, e)
         return None
 
 
@@ -438,6 +569,10 @@ def png_has_alpha(file_path: str) -> bool | None:
     Returns:
         True/False，失败返回None
     """
+    # 首选：头部解析（IHDR 色彩类型 + tRNS），无需创建 CGImageSource
+    info = read_image_header(file_path)
+    if info is not None and info.has_alpha is not None:
+        return info.has_alpha
     try:
         from Foundation import NSURL
         from Quartz import (
@@ -478,6 +613,10 @@ def get_image_dimensions(file_path: str) -> tuple[int, int] | None:
     Returns:
         (width, height) 或 None
     """
+    # 首选：纯 Python 头部解析（单次 pread）；不认识的格式回退 Quartz
+    info = read_image_header(file_path)
+    if info is not None:
+        return info.dimensions
     try:
         from Foundation import NSURL
         from Quartz import (
@@ -0,0 +1,202 @@
+"""
+解码单飞（single-flight）登记表
+
+当前图加载、下一张预读、自适应预取、HOT3 常驻与高质量重载可能在同一时刻
+为同一 (path, target_size) 发起解码，彼此互不知情。登记表让并发调用方共享
+同一个进行中的解码：
+
+- 首个调用方成为 leader 执行解码；解码期间到达的同键调用方等待并拿到同一
+  结果（leader 抛出的异常同样传给它们），解码完成即出表，不缓存结果
+- 优先级提升：前台调用方加入时把共享解码提升为前台优先级，仍在排队等待
+  解码槽位的 leader 立即越过槽位限制开始解码
+- 统计节省的解码次数（joined）与提升次数
+
+用法:
+    flights = get_decode_flights()
+    image = flights.run((path, size), lambda flight: decode(path, size, flight), priority=PRIORITY_NEXT)
+
+    # leader 内部等待解码槽位（被提升为前台时不再排队）
+    acquired = flight.acquire_slot(semaphore)
+
+Author: PlookingII Team
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from ...config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+# 优先级（数值越小越优先）
+PRIORITY_FOREGROUND = 0  # 当前显示的图片 / 用户显式请求
+PRIORITY_NEXT = 1  # 下一张就绪缓冲
+PRIORITY_BACKGROUND = 2  # 自适应预取、HOT3 常驻
+
+# leader 排队等待解码槽位时检查提升的间隔（秒）
+_SLOT_POLL_S = 0.01
+
+
+class DecodeFlight:
+    """一个进行中的解码（leader 执行，加入者等待同一结果）"""
+
+    __slots__ = ("_done", "_error", "_promoted", "_result", "key", "priority", "waiters")
+
+    def __init__(self, key: Hashable, priority: int):
+        self.key = key
+        self.priority = priority
+        self.waiters = 0
+        self._done = threading.Event()
+        self._promoted = threading.Event()
+        self._result: Any = None
+        self._error: BaseException | None = None
+        if priority <= PRIORITY_FOREGROUND:
+            self._promoted.set()
+
+    @property
+    def promoted(self) -> bool:
+        """是否已处于前台优先级（自身为前台或有前台调用方加入）"""
+        return self._promoted.is_set()
+
+    def acquire_slot(self, semaphore: threading.Semaphore) -> bool:
+        """等待解码槽位；处于前台优先级时不排队
+
+        Returns:
+            是否占用了槽位（True 时调用方须 release）
+        """
+        while not self._promoted.is_set():
+            if semaphore.acquire(timeout=_SLOT_POLL_S):
+                return True
+        return False
+
+    def _promote(self, priority: int) -> bool:
+        """调用方持登记表锁"""
+        if priority >= self.priority:
+            return False
+        self.priority = priority
+        if priority <= PRIORITY_FOREGROUND:
+            self._promoted.set()
+        return True
+
+    def _wait(self) -> Any:
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class DecodeSingleFlight:
+    """按键合并并发解码的登记表（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, DecodeFlight] = {}
+        self._stats = {"leaders": 0, "joined": 0, "promoted": 0}
+
+    def run(self, key: Hashable, fn: Callable[[DecodeFlight], Any], priority: int = PRIORITY_BACKGROUND) -> Any:
+        """执行或加入 key 对应的解码
+
+        Args:
+            key: 解码键，通常为 (path, target_size)
+            fn: leader 执行的解码函数，参数为本次 DecodeFlight
+            priority: 调用方优先级；高于进行中解码时提升之
+
+        Returns:
+            解码结果（加入者与 leader 拿到同一对象）
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            joined = flight is not None
+            if joined:
+                flight.waiters += 1
+                self._stats["joined"] += 1
+                if flight._promote(priority):
+                    self._stats["promoted"] += 1
+            else:
+                flight = DecodeFlight(key, priority)
+                self._flights[key] = flight
+                self._stats["leaders"] += 1
+        if joined:
+            logger.debug("decode single-flight join: %s", key)
+            return flight._wait()
+        return self._lead(key, flight, fn)
+
+    def try_run(
+        self, key: Hashable, fn: Callable[[DecodeFlight], Any], priority: int = PRIORITY_BACKGROUND
+    ) -> tuple[bool, Any]:
+        """仅在没有同键解码进行中时执行，不等待（供主线程调用）
+
+        已有同键解码时按 priority 提升它（排队等槽位的 leader 立即开始解码）
+        后立即返回，调用方应改为在后台线程 run() 加入该解码。
+
+        Returns:
+            (是否执行了解码, 解码结果)；未执行时结果为 None
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                if flight._promote(priority):
+                    self._stats["promoted"] += 1
+                return False, None
+            flight = DecodeFlight(key, priority)
+            self._flights[key] = flight
+            self._stats["leaders"] += 1
+        return True, self._lead(key, flight, fn)
+
+    def _lead(self, key: Hashable, flight: DecodeFlight, fn: Callable[[DecodeFlight], Any]) -> Any:
+        try:
+            flight._result = fn(flight)
+        except BaseException as e:
+            flight._error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight._done.set()
+        return flight._result
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        stats["saved_decodes"] = stats["joined"]
+        return stats
+
+
+# 全局单例：同一进程内所有解码调用方共享
+_global_flights: DecodeSingleFlight | None = None
+_flights_lock = threading.Lock()
+
+
+def get_decode_flights() -> DecodeSingleFlight:
+    """获取全局解码单飞登记表"""
+    global _global_flights  # noqa: PLW0603  # 单例模式的合理使用
+    with _flights_lock:
+        if _global_flights is None:
+            _global_flights = DecodeSingleFlight()
+        return _global_flights
+
+
+def reset_decode_flights() -> None:
+    """重置全局登记表（主要用于测试）"""
+    global _global_flights  # noqa: PLW0603  # 单例模式的合理使用
+    with _flights_lock:
+        _global_flights = None
+
+
+__all__ = [
+    "PRIORITY_BACKGROUND",
+    "PRIORITY_FOREGROUND",
+    "PRIORITY_NEXT",
+    "DecodeFlight",
+    "DecodeSingleFlight",
+    "get_decode_flights",
+    "reset_decode_flights",
+]
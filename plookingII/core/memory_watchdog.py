@@ -206,6 +206,18 @@ def _threshold_for(level: str, physical_mb: float) -> float:
     return max(physical_mb * ratio, floor)
 
 
+def get_level_threshold_mb(level: str, physical_mb: float | None = None) -> float:
+    """某清理等级的 RSS 阈值（MB），供缓存容量调优计算扩容余量
+
+    Args:
+        level: 清理等级
+        physical_mb: 物理内存（MB）；None 时自动探测
+    """
+    if physical_mb is None or physical_mb <= 0:
+        physical_mb = get_physical_memory_mb()
+    return _threshold_for(level, physical_mb)
+
+
 def choose_cleanup_level(rss_mb: float, physical_mb: float | None = None) -> str:
     """依据 RSS 判定清理等级（纯函数，可单测）
 
@@ -236,6 +248,7 @@ __all__ = [
     "LEVEL_NONE",
     "LEVEL_PREVENTIVE",
     "choose_cleanup_level",
+    "get_level_threshold_mb",
     "get_physical_memory_mb",
     "get_process_rss_mb",
 ]
@@ -0,0 +1,366 @@
+"""
+图片元数据索引（单库 SQLite，逐文件失效）
+
+取代按目录写 JSON 的尺寸缓存（dimension_cache）：
+- 单个 SQLite 库（`~/Library/Application Support/PlookingII/metadata_index.db`），
+  不再为上千个目录各写一份小文件
+- 逐文件行：(dir, name, size, mtime_ns, width, height, orientation,
+  has_alpha, has_mpf, capture_time)，主键 (dir, name) 的前缀即目录索引
+- capture_time 为 EXIF 拍摄时间（供按拍摄时间排序），NULL 表示尚未探测，
+  空串表示已探测但无 EXIF 时间；旧库打开时自动补列
+- 逐文件增量刷新：以文件大小 + mtime_ns 为失效键，目录中改动一张图只让
+  这一行失效，而不是整目录重扫；已删除文件的行同步清理
+- 批量 upsert：一次事务写入整批探测结果
+- 所有失败静默降级（返回空结果），不影响主流程
+
+用法:
+    index = get_metadata_index()
+    fresh, stale = index.refresh_dir(dir_path, names)
+    # fresh: name → FileMeta（仍有效）；stale: name → (size, mtime_ns)（需重新探测）
+    index.upsert_many(dir_path, [FileMeta(name, size, mtime_ns, w, h), ...])
+
+Author: PlookingII Team
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ..config.constants import APP_NAME
+from ..db.connection import connect_db
+
+logger = logging.getLogger(APP_NAME)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_meta (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    orientation INTEGER,
+    has_alpha INTEGER,
+    has_mpf INTEGER,
+    capture_time TEXT,
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID
+"""
+
+# 旧版库补列（CREATE TABLE IF NOT EXISTS 不会修改已有表）
+_MIGRATIONS = (("capture_time", "ALTER TABLE file_meta ADD COLUMN capture_time TEXT"),)
+
+# SQLite 单条语句变量上限保守值（分批 IN/DELETE）
+_SQL_BATCH = 500
+
+
+@dataclass(frozen=True)
+class FileMeta:
+    """单个文件的元数据行"""
+
+    name: str
+    size: int
+    mtime_ns: int
+    width: int | None = None
+    height: int | None = None
+    orientation: int | None = None
+    has_alpha: bool | None = None
+    has_mpf: bool | None = None
+    # EXIF 拍摄时间 "YYYY:MM:DD HH:MM:SS"；None 未探测，"" 已探测但无
+    capture_time: str | None = None
+
+    @property
+    def dimensions(self) -> tuple[int, int] | None:
+        """有效宽高；未知返回 None"""
+        if self.width and self.height and self.width > 0 and self.height > 0:
+            return (self.width, self.height)
+        return None
+
+
+def _opt_bool(value) -> bool | None:
+    return None if value is None else bool(value)
+
+
+def _opt_int(value) -> int | None:
+    return None if value is None else int(value)
+
+
+class MetadataIndex:
+    """基于 SQLite 的逐文件图片元数据索引"""
+
+    def __init__(self, db_path: str | None = None):
+        """
+        Args:
+            db_path: 数据库路径；None 使用默认应用支持目录（":memory:" 可用于测试）
+        """
+        if db_path is None:
+            app_support_dir = os.path.join(os.path.expanduser("~"), "Library", "Application Support", APP_NAME)
+            db_path = os.path.join(app_support_dir, "metadata_index.db")
+            # 旧版按目录 JSON 的尺寸缓存已由本索引取代，一次性清理
+            shutil.rmtree(os.path.join(app_support_dir, "dimension_cache"), ignore_errors=True)
+        self._db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._stats = {"fresh": 0, "stale": 0, "removed": 0, "upserted": 0}
+
+    # ------------------------------------------------------------------
+    # 连接
+    # ------------------------------------------------------------------
+    def _connection(self):
+        """懒建连接与表结构（调用方持锁）；失败返回 None"""
+        if self._conn is not None:
+            return self._conn
+        try:
+            if self._db_path != ":memory:":
+                os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+            conn = connect_db(self._db_path)
+            conn.execute(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(file_meta)")}
+            for column, ddl in _MIGRATIONS:
+                if column not in columns:
+                    conn.execute(ddl)
+            self._conn = conn
+        except Exception:
+            logger.debug("元数据索引打开失败，忽略: %s", self._db_path, exc_info=True)
+            self._conn = None
+        return self._conn
+
+    @staticmethod
+    def _normalize_dir(dir_path: str) -> str:
+        return os.path.normpath(dir_path)
+
+    # ------------------------------------------------------------------
+    # 读写接口
+    # ------------------------------------------------------------------
+    def load_dir(self, dir_path: str) -> dict[str, FileMeta]:
+        """读取目录下全部行（不校验文件是否变化）
+
+        Returns:
+            文件名 → FileMeta；失败返回空字典
+        """
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return {}
+            try:
+                rows = conn.execute(
+                    "SELECT name, size, mtime_ns, width, height, orientation, has_alpha, has_mpf, capture_time "
+                    "FROM file_meta WHERE dir = ?",
+                    (self._normalize_dir(dir_path),),
+                ).fetchall()
+            except Exception:
+                logger.debug("元数据索引读取失败，忽略: %s", dir_path, exc_info=True)
+                return {}
+        return {
+            r[0]: FileMeta(
+                r[0],
+                int(r[1]),
+                int(r[2]),
+                _opt_int(r[3]),
+                _opt_int(r[4]),
+                _opt_int(r[5]),
+                _opt_bool(r[6]),
+                _opt_bool(r[7]),
+                r[8],
+            )
+            for r in rows
+        }
+
+    def refresh_dir(
+        self, dir_path: str, names: Iterable[str] | None = None
+    ) -> tuple[dict[str, FileMeta], dict[str, tuple[int, int]]]:
+        """逐文件增量校验：按 (size, mtime_ns) 区分仍有效与需重新探测的文件
+
+        目录扫描一次（os.scandir，只取 stat），与索引行逐个比对；
+        已不存在的文件对应的行被删除。
+
+        Args:
+            dir_path: 目录路径
+            names: 仅关心的文件名；None 表示目录下全部已索引/现存文件
+
+        Returns:
+            (fresh, stale)：fresh 为 name → FileMeta（行仍有效）；
+            stale 为 name → (size, mtime_ns)（无行或行已过期，需重新探测）
+        """
+        wanted = set(names) if names is not None else None
+        current: dict[str, tuple[int, int]] = {}
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if wanted is not None and entry.name not in wanted:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    current[entry.name] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return {}, {}
+
+        indexed = self.load_dir(dir_path)
+        fresh: dict[str, FileMeta] = {}
+        stale: dict[str, tuple[int, int]] = {}
+        for name, (size, mtime_ns) in current.items():
+            meta = indexed.get(name)
+            if meta is not None and meta.size == size and meta.mtime_ns == mtime_ns:
+                fresh[name] = meta
+            else:
+                stale[name] = (size, mtime_ns)
+
+        removed = [n for n in indexed if n not in current and (wanted is None or n in wanted)]
+        if removed:
+            self.delete(dir_path, removed)
+        with self._lock:
+            self._stats["fresh"] += len(fresh)
+            self._stats["stale"] += len(stale)
+        return fresh, stale
+
+    def upsert_many(self, dir_path: str, rows: Iterable[FileMeta]) -> int:
+        """批量写入/覆盖目录下的文件行（单事务）
+
+        Returns:
+            写入行数；失败返回 0
+        """
+        d = self._normalize_dir(dir_path)
+        params = [
+            (
+                d,
+                m.name,
+                int(m.size),
+                int(m.mtime_ns),
+                m.width,
+                m.height,
+                m.orientation,
+                None if m.has_alpha is None else int(m.has_alpha),
+                None if m.has_mpf is None else int(m.has_mpf),
+                m.capture_time,
+            )
+            for m in rows
+        ]
+        if not params:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            try:
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(
+                        "INSERT INTO file_meta (dir, name, size, mtime_ns, width, height, orientation, "
+                        "has_alpha, has_mpf, capture_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(dir, name) DO UPDATE SET size=excluded.size, mtime_ns=excluded.mtime_ns, "
+                        "width=excluded.width, height=excluded.height, orientation=excluded.orientation, "
+                        "has_alpha=excluded.has_alpha, has_mpf=excluded.has_mpf, "
+                        "capture_time=excluded.capture_time",
+                        params,
+                    )
+            except Exception:
+                logger.debug("元数据索引写入失败，忽略: %s", dir_path, exc_info=True)
+                return 0
+            self._stats["upserted"] += len(params)
+        return len(params)
+
+    def delete(self, dir_path: str, names: Iterable[str]) -> int:
+        """删除目录下指定文件的行
+
+        Returns:
+            删除行数
+        """
+        d = self._normalize_dir(dir_path)
+        names = list(names)
+        if not names:
+            return 0
+        removed = 0
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            try:
+                with conn:
+                    conn.execute("BEGIN")
+                    for i in range(0, len(names), _SQL_BATCH):
+                        batch = names[i : i + _SQL_BATCH]
+                        placeholders = ",".join("?" * len(batch))
+                        cur = conn.execute(
+                            f"DELETE FROM file_meta WHERE dir = ? AND name IN ({placeholders})",
+                            (d, *batch),
+                        )
+                        removed += max(0, cur.rowcount)
+            except Exception:
+                logger.debug("元数据索引删除失败，忽略: %s", dir_path, exc_info=True)
+                return 0
+            self._stats["removed"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """清空全部索引行"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("DELETE FROM file_meta")
+            except Exception:
+                logger.debug("元数据索引清空失败，忽略", exc_info=True)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+    def get_stats(self) -> dict:
+        """导出索引统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            rows = dirs = 0
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    rows, dirs = conn.execute("SELECT COUNT(*), COUNT(DISTINCT dir) FROM file_meta").fetchone()
+                except Exception:
+                    pass
+            stats.update({"rows": rows, "dirs": dirs, "db_path": self._db_path})
+            return stats
+
+
+# 全局单例（与内存尺寸 LRU 并行：前者会话内热路径，本索引跨启动冷启动）
+_global_index: MetadataIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_metadata_index() -> MetadataIndex:
+    """获取全局元数据索引单例"""
+    global _global_index  # noqa: PLW0603  # 单例模式的合理使用
+    with _index_lock:
+        if _global_index is None:
+            _global_index = MetadataIndex()
+        return _global_index
+
+
+def reset_metadata_index() -> None:
+    """重置全局单例（主要用于测试）"""
+    global _global_index  # noqa: PLW0603  # 单例模式的合理使用
+    with _index_lock:
+        if _global_index is not None:
+            _global_index.close()
+        _global_index = None
+
+
+__all__ = [
+    "FileMeta",
+    "MetadataIndex",
+    "get_metadata_index",
+    "reset_metadata_index",
+]
@@ -5,18 +5,22 @@
 """
 
 import hashlib
-import json
+import io
 import os
-import shutil
 import threading
 import time
 from collections import OrderedDict
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
 from enum import Enum
+from typing import BinaryIO
 
 from ..config.manager import get_config
+from .cache_fill import FILL_CHUNK_BYTES, PARTIAL_SUFFIX, CacheFill
+from .cache_journal import MetadataJournal
 from .enhanced_logging import LogCategory, LogLevel, get_enhanced_logger
 from .error_handling import ErrorCategory, error_context
+from .remote_fetch import FETCH_FOREGROUND, get_fetch_coordinator, remote_file_key
 from .remote_file_detector import get_remote_detector
 
 
@@ -65,10 +69,13 @@ class NetworkCache:
         self.cache_ttl = get_config("network_cache.ttl_seconds", 3600)  # 1小时
         self.cleanup_threshold = get_config("network_cache.cleanup_threshold", 0.8)  # 80%
         self.cache_strategy = CacheStrategy(get_config("network_cache.strategy", "lru"))
+        self.fill_chunk_bytes = int(get_config("network_cache.fill_chunk_kb", FILL_CHUNK_BYTES // 1024)) * 1024
 
         # 缓存目录
         self.cache_dir = self._get_cache_directory()
-        self.metadata_file = os.path.join(self.cache_dir, "cache_metadata.json")
+        # 元数据：紧凑快照 + 追加日志（见 core/cache_journal），不再每次整份重写 JSON
+        self._journal = MetadataJournal(self.cache_dir, get_config("network_cache.journal_sync_seconds", 2.0))
+        self.metadata_file = self._journal.snapshot_path
 
         # 缓存索引
         self.cache_index: dict[str, CacheEntry] = {}
@@ -79,6 +86,13 @@ class NetworkCache:
         self.cache_lock = threading.RLock()
         self.metadata_lock = threading.RLock()
 
+        # 访问更新缓冲达到批量阈值：释放 cache_lock 后写出
+        self._touch_flush_due = False
+
+        # 进行中的流式填充：cache_key -> CacheFill
+        self._active_fills: dict[str, CacheFill] = {}
+        self._fills_lock = threading.Lock()
+
         # 统计信息
         self.stats = {
             "total_cached_files": 0,
@@ -100,12 +114,28 @@ class NetworkCache:
             f"NetworkCache initialized: {self.cache_size_mb}MB, strategy={self.cache_strategy.value}",
         )
 
-    def cache_remote_file(self, remote_path: str) -> str | None:
+    def cache_remote_file(
+        self,
+        remote_path: str,
+        progress_callback: Callable[[int, int | None], None] | None = None,
+        priority: int = FETCH_FOREGROUND,
+    ) -> str | None:
         """
         缓存远程文件到本地
 
+        一遍流式填充（见 core/cache_fill）：分块读取、增量校验、写临时文件后
+        原子改名。填充期间其他线程可通过 get_active_fill 取得进度并读取已
+        完成的前缀。
+
+        未命中时经全局读取协调器（见 core/remote_fetch）执行：同一文件的并发
+        调用共享一次填充，前台请求越过排队中的后台填充；直读或预读已在读取该
+        文件时复用其内容写入缓存，网络上只读一遍。
+
         Args:
             remote_path: 远程文件路径
+            progress_callback: 填充进度回调 (已写入字节数, 总字节数或 None)；
+                加入他人进行中填充的调用方不会收到回调
+            priority: FETCH_FOREGROUND 或 FETCH_BACKGROUND
 
         Returns:
             Optional[str]: 本地缓存路径，如果失败则返回None
@@ -120,63 +150,101 @@ class NetworkCache:
                 cache_key = self._generate_cache_key(remote_path)
                 local_path = self._get_local_cache_path(cache_key)
 
-                # 检查是否已缓存
-                with self.cache_lock:
-                    if cache_key in self.cache_index:
-                        entry = self.cache_index[cache_key]
-                        if entry.is_valid and os.path.exists(local_path):
-                            # 更新访问信息
-                            self._update_access_info(cache_key)
-                            with self.metadata_lock:
-                                self.stats["cache_hits"] += 1
-                            return local_path
-
-                # 缓存文件
-                success = self._copy_file_to_cache(remote_path, local_path)
-                if not success:
-                    return None
+                if self._lookup_cached(cache_key, local_path):
+                    return local_path
 
-                # 获取文件信息
-                file_size = os.path.getsize(local_path)
-                checksum = self._calculate_checksum(local_path)
-
-                # 创建缓存条目
-                entry = CacheEntry(
-                    remote_path=remote_path,
-                    local_path=local_path,
-                    file_size=file_size,
-                    created_time=time.time(),
-                    last_access_time=time.time(),
-                    access_count=1,
-                    checksum=checksum,
+                coordinator = get_fetch_coordinator()
+                result = coordinator.fetch(
+                    remote_file_key(remote_path),
+                    lambda: self._fill_remote_file(cache_key, remote_path, local_path, progress_callback),
+                    priority,
+                )
+                if not isinstance(result, bytes):
+                    return result
+                # 加入的是直读/预读：用已读到的内容写入缓存，不再读远程
+                # （写入同样去重，并发加入者不会同时写同一个临时文件）
+                return coordinator.fetch(
+                    ("store", local_path),
+                    lambda: self._fill_remote_file(
+                        cache_key, remote_path, local_path, progress_callback, lambda _path: io.BytesIO(result)
+                    ),
+                    priority,
                 )
 
-                # 添加到索引
-                with self.cache_lock:
-                    self.cache_index[cache_key] = entry
-                    self._update_access_info(cache_key)
+        except Exception as e:
+            self.logger.log_error(e, "remote_file_cache")
+            return None
 
-                    # 检查缓存空间
-                    self._ensure_cache_space(file_size)
+    def _lookup_cached(self, cache_key: str, local_path: str) -> bool:
+        """命中有效缓存时更新访问信息并计入命中"""
+        with self.cache_lock:
+            entry = self.cache_index.get(cache_key)
+            if entry is not None and entry.is_valid and os.path.exists(local_path):
+                # 更新访问信息
+                self._update_access_info(cache_key)
+                with self.metadata_lock:
+                    self.stats["cache_hits"] += 1
+                hit = True
+            else:
+                hit = False
+        self._flush_touches_if_due()
+        return hit
+
+    def _fill_remote_file(
+        self,
+        cache_key: str,
+        remote_path: str,
+        local_path: str,
+        progress_callback: Callable[[int, int | None], None] | None = None,
+        opener: Callable[[str], BinaryIO] | None = None,
+    ) -> str | None:
+        """填充并登记缓存条目（在读取协调器中执行；opener 见 CacheFill）"""
+        # 排队期间可能已由其他填充完成
+        if self._lookup_cached(cache_key, local_path):
+            return local_path
+
+        # 流式填充：读取、校验与写入一遍完成
+        fill = self._fill_to_cache(cache_key, remote_path, local_path, progress_callback, opener)
+        if fill is None:
+            return None
 
-                    # 更新统计信息
-                    with self.metadata_lock:
-                        self.stats["total_cached_files"] += 1
-                        self.stats["total_cache_size"] += file_size
-                        self.stats["cache_misses"] += 1
+        file_size = fill.bytes_written
+        checksum = fill.checksum
+
+        # 创建缓存条目
+        entry = CacheEntry(
+            remote_path=remote_path,
+            local_path=local_path,
+            file_size=file_size,
+            created_time=time.time(),
+            last_access_time=time.time(),
+            access_count=1,
+            checksum=checksum,
+        )
 
-                # 保存元数据
-                self._save_metadata()
+        # 添加到索引
+        with self.cache_lock:
+            self.cache_index[cache_key] = entry
+            self._update_access_info(cache_key)
+            self._journal.put(cache_key, asdict(entry))
 
-                self.logger.log(
-                    LogLevel.DEBUG, LogCategory.CACHE, f"File cached: {remote_path} -> {local_path} ({file_size} bytes)"
-                )
+            # 检查缓存空间
+            self._ensure_cache_space(file_size)
 
-                return local_path
+            # 更新统计信息
+            with self.metadata_lock:
+                self.stats["total_cached_files"] += 1
+                self.stats["total_cache_size"] += file_size
+                self.stats["cache_misses"] += 1
 
-        except Exception as e:
-            self.logger.log_error(e, "remote_file_cache")
-            return None
+        # 保存元数据
+        self._save_metadata()
+
+        self.logger.log(
+            LogLevel.DEBUG, LogCategory.CACHE, f"File cached: {remote_path} -> {local_path} ({file_size} bytes)"
+        )
+
+        return local_path
 
     def get_cached_path(self, remote_path: str) -> str | None:
         """
@@ -200,7 +268,14 @@ class NetworkCache:
                             self._update_access_info(cache_key)
                             with self.metadata_lock:
                                 self.stats["cache_hits"] += 1
-                            return entry.local_path
+                            local_path = entry.local_path
+                        else:
+                            local_path = None
+                    else:
+                        local_path = None
+                if local_path is not None:
+                    self._flush_touches_if_due()
+                    return local_path
 
                 with self.metadata_lock:
                     self.stats["cache_misses"] += 1
@@ -211,6 +286,11 @@ class NetworkCache:
             self.logger.log_error(e, "cached_path_lookup")
             return None
 
+    def get_active_fill(self, remote_path: str) -> CacheFill | None:
+        """获取正在进行的填充（用于读取已完成的前缀），未在填充时返回 None"""
+        with self._fills_lock:
+            return self._active_fills.get(self._generate_cache_key(remote_path))
+
     def is_cached(self, remote_path: str) -> bool:
         """检查文件是否已缓存"""
         return self.get_cached_path(remote_path) is not None
@@ -239,6 +319,7 @@ class NetworkCache:
 
                         # 从索引中移除
                         del self.cache_index[cache_key]
+                        self._journal.delete(cache_key)
 
                         # 清理访问信息
                         if cache_key in self.access_order:
@@ -250,11 +331,13 @@ class NetworkCache:
                         with self.metadata_lock:
                             self.stats["total_cached_files"] -= 1
                             self.stats["total_cache_size"] -= entry.file_size
+                        removed = True
+                    else:
+                        removed = False
 
-                        self._save_metadata()
-                        return True
-
-                return False
+                if removed:
+                    self._save_metadata()
+                return removed
 
         except Exception as e:
             self.logger.log_error(e, "cached_file_removal")
@@ -278,6 +361,7 @@ class NetworkCache:
                     if os.path.exists(entry.local_path):
                         os.remove(entry.local_path)
                     del self.cache_index[cache_key]
+                    self._journal.delete(cache_key)
 
                     # 清理访问信息
                     if cache_key in self.access_order:
@@ -311,6 +395,7 @@ class NetworkCache:
                     self.cache_index.clear()
                     self.access_order.clear()
                     self.access_counts.clear()
+                    self._journal.clear()
 
                     # 重置统计信息
                     with self.metadata_lock:
@@ -350,8 +435,27 @@ class NetworkCache:
         return cache_dir
 
     def _ensure_cache_directory(self):
-        """确保缓存目录存在"""
+        """确保缓存目录存在，并清除上次进程中断留下的填充临时文件"""
         os.makedirs(self.cache_dir, exist_ok=True)
+        self._sweep_partial_files()
+
+    def _sweep_partial_files(self) -> int:
+        """删除残留的 ``.part`` 临时文件（初始化时本进程尚无进行中的填充）"""
+        removed = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(PARTIAL_SUFFIX):
+                        try:
+                            os.remove(entry.path)
+                            removed += 1
+                        except OSError:
+                            pass
+        except OSError as e:
+            self.logger.log_error(e, "partial_sweep")
+        if removed:
+            self.logger.log(LogLevel.INFO, LogCategory.CACHE, f"Removed {removed} stale partial cache files")
+        return removed
 
     def _generate_cache_key(self, remote_path: str) -> str:
         """生成缓存键
@@ -365,26 +469,38 @@ class NetworkCache:
         """获取本地缓存文件路径"""
         return os.path.join(self.cache_dir, f"{cache_key}.cache")
 
-    def _copy_file_to_cache(self, remote_path: str, local_path: str) -> bool:
-        """复制文件到缓存目录"""
-        try:
-            shutil.copy2(remote_path, local_path)
-            return True
-        except Exception as e:
-            self.logger.log_error(e, f"copy_to_cache_{remote_path}")
-            return False
-
-    def _calculate_checksum(self, file_path: str) -> str:
-        """计算文件校验和
+    def _fill_to_cache(
+        self,
+        cache_key: str,
+        remote_path: str,
+        local_path: str,
+        progress_callback: Callable[[int, int | None], None] | None = None,
+        opener: Callable[[str], BinaryIO] | None = None,
+    ) -> CacheFill | None:
+        """流式填充远程文件到缓存目录（填充期间登记为活动填充）
 
-        Note: MD5仅用于文件完整性检查，不用于安全目的
+        Returns:
+            成功的 CacheFill（含大小与校验和），失败返回 None
         """
+        fill = CacheFill(
+            remote_path,
+            local_path,
+            chunk_size=self.fill_chunk_bytes,
+            opener=opener,
+            progress_callback=progress_callback,
+        )
+        with self._fills_lock:
+            self._active_fills[cache_key] = fill
         try:
-            with open(file_path, "rb") as f:
-                # MD5仅用于文件完整性检查，不用于加密安全
-                return hashlib.md5(f.read(), usedforsecurity=False).hexdigest()
-        except Exception:
-            return ""
+            fill.run()
+        finally:
+            with self._fills_lock:
+                if self._active_fills.get(cache_key) is fill:
+                    del self._active_fills[cache_key]
+        if fill.error is not None:
+            self.logger.log_error(fill.error, f"copy_to_cache_{remote_path}")
+            return None
+        return fill
 
     def _update_access_info(self, cache_key: str):
         """更新访问信息"""
@@ -396,10 +512,19 @@ class NetworkCache:
         # 更新访问计数
         self.access_counts[cache_key] = self.access_counts.get(cache_key, 0) + 1
 
-        # 更新缓存条目
+        # 更新缓存条目（访问更新在日志中缓冲，批量写出）
         if cache_key in self.cache_index:
-            self.cache_index[cache_key].last_access_time = current_time
-            self.cache_index[cache_key].access_count += 1
+            entry = self.cache_index[cache_key]
+            entry.last_access_time = current_time
+            entry.access_count += 1
+            if self._journal.touch(cache_key, current_time, entry.access_count):
+                self._touch_flush_due = True
+
+    def _flush_touches_if_due(self) -> None:
+        """访问更新缓冲满时写出（调用方不持有 cache_lock）"""
+        if self._touch_flush_due:
+            self._touch_flush_due = False
+            self._save_metadata()
 
     def _ensure_cache_space(self, required_size: int):
         """确保有足够的缓存空间"""
@@ -429,6 +554,7 @@ class NetworkCache:
                     evicted_count += 1
 
                     del self.cache_index[cache_key]
+                    self._journal.delete(cache_key)
                     del self.access_order[cache_key]
                     if cache_key in self.access_counts:
                         del self.access_counts[cache_key]
@@ -450,6 +576,7 @@ class NetworkCache:
                     evicted_count += 1
 
                     del self.cache_index[cache_key]
+                    self._journal.delete(cache_key)
                     del self.access_counts[cache_key]
                     if cache_key in self.access_order:
                         del self.access_order[cache_key]
@@ -466,60 +593,57 @@ class NetworkCache:
             )
 
     def _load_metadata(self):
-        """加载缓存元数据"""
+        """加载缓存元数据（快照 + 日志重放）"""
         try:
-            if os.path.exists(self.metadata_file):
-                with open(self.metadata_file) as f:
-                    data = json.load(f)
+            entries, stats = self._journal.load()
+            for key, entry_data in entries.items():
+                self.cache_index[key] = CacheEntry(**entry_data)
 
-                # 恢复缓存索引
-                for key, entry_data in data.get("cache_index", {}).items():
-                    entry = CacheEntry(**entry_data)
-                    self.cache_index[key] = entry
+            # 访问顺序与计数由条目恢复
+            for key, entry in sorted(self.cache_index.items(), key=lambda kv: kv[1].last_access_time):
+                self.access_order[key] = entry.last_access_time
+                self.access_counts[key] = entry.access_count
 
-                # 恢复访问信息
-                self.access_order = OrderedDict(data.get("access_order", {}))
-                self.access_counts = data.get("access_counts", {})
+            # 恢复统计信息
+            self.stats.update(stats)
 
-                # 恢复统计信息
-                self.stats.update(data.get("stats", {}))
-
-                self.logger.log(
-                    LogLevel.DEBUG, LogCategory.CACHE, f"Loaded metadata: {len(self.cache_index)} cached files"
-                )
+            self.logger.log(LogLevel.DEBUG, LogCategory.CACHE, f"Loaded metadata: {len(self.cache_index)} cached files")
 
         except Exception as e:
             self.logger.log_error(e, "metadata_load")
 
-    def _save_metadata(self):
-        """保存缓存元数据"""
-        try:
-            with self.metadata_lock:
-                data = {
-                    "cache_index": {
-                        key: {
-                            "remote_path": entry.remote_path,
-                            "local_path": entry.local_path,
-                            "file_size": entry.file_size,
-                            "created_time": entry.created_time,
-                            "last_access_time": entry.last_access_time,
-                            "access_count": entry.access_count,
-                            "checksum": entry.checksum,
-                            "is_valid": entry.is_valid,
-                        }
-                        for key, entry in self.cache_index.items()
-                    },
-                    "access_order": dict(self.access_order),
-                    "access_counts": self.access_counts,
-                    "stats": self.stats,
-                }
-
-            with open(self.metadata_file, "w") as f:
-                json.dump(data, f, indent=2)
+    def _save_metadata(self, sync: bool = False):
+        """写出元数据变更（追加日志，按间隔 fsync，日志过长时压缩为快照）
 
+        追加写出不持有 cache_lock：变更记录在修改索引时已按序进入日志缓冲，
+        写出与 fsync 由日志自身的锁串行化，查找与填充不必等待磁盘。少见的
+        压缩需要条目快照与日志截断点一致，才在 cache_lock 内进行（加锁顺序
+        与修改索引时相同：先 cache_lock 后日志锁）。
+        """
+        try:
+            self._journal.commit(self._stats_snapshot, sync=sync)
+            if self._journal.should_compact(len(self.cache_index)):
+                with self.cache_lock:
+                    entries, stats = self._snapshot_state()
+                    self._journal.compact(entries, stats)
         except Exception as e:
             self.logger.log_error(e, "metadata_save")
 
+    def _stats_snapshot(self) -> dict:
+        with self.metadata_lock:
+            return dict(self.stats)
+
+    def _snapshot_state(self) -> tuple[dict[str, dict], dict]:
+        """当前全部条目与统计（压缩快照用）"""
+        with self.cache_lock:
+            entries = {key: asdict(entry) for key, entry in self.cache_index.items()}
+        with self.metadata_lock:
+            return entries, dict(self.stats)
+
+    def flush_metadata(self) -> None:
+        """立即写出并 fsync 缓冲的元数据（退出前由 RemoteFileManager.shutdown 调用）"""
+        self._save_metadata(sync=True)
+
 
 # 全局实例
 _network_cache_instance: NetworkCache | None = None
@@ -0,0 +1,153 @@
+"""
+紧凑路径表（目录前缀驻留）
+
+扫描类缓存此前各自保存完整绝对路径：同一目录下的每个文件都重复携带相同的
+目录前缀，按排序方式缓存的结果又各存一份。根目录下有数十万张图片时，这些
+重复字符串占用可观的内存。本模块：
+
+- PathTable 驻留目录前缀：每个目录字符串全进程只存一份，以 dir_id 引用
+- PackedPaths 以列存保存一组路径：dir_id 与文件名起止偏移存于 array('I')，
+  文件名拼接为单个字符串；需要字符串列表时再按需拼接（unpack）
+- reordered() 生成同一组路径的另一种排列，共享原有文件名字符串，
+  多个排序方式的缓存结果不再各自复制路径
+
+目录前缀只增不减（数量受浏览过的目录数约束，远小于文件数）。
+
+用法:
+    table = get_path_table()
+    packed = table.pack(images)
+    images = packed.unpack()
+
+Author: PlookingII Team
+"""
+
+import os
+import threading
+from array import array
+from collections.abc import Iterable
+
+_SEP = os.sep
+
+
+class PackedPaths:
+    """一组按 (dir_id, 文件名) 列存的路径（不可变）
+
+    文件名拼接为一个字符串（blob），每条路径只占 dir_id 与名称起止偏移
+    三个 array 槽位（12 字节）加文件名字符本身，不再逐条持有字符串对象。
+    """
+
+    __slots__ = ("_blob", "_dir_ids", "_ends", "_starts", "_table")
+
+    def __init__(self, table: "PathTable", dir_ids: array, blob: str, starts: array, ends: array):
+        self._table = table
+        self._dir_ids = dir_ids
+        self._blob = blob
+        self._starts = starts
+        self._ends = ends
+
+    def __len__(self) -> int:
+        return len(self._dir_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self._dir_ids)
+
+    def unpack(self) -> list[str]:
+        """还原为完整路径列表（每次返回新列表）"""
+        prefixes = self._table._prefixes
+        blob = self._blob
+        return [prefixes[d] + blob[s:e] for d, s, e in zip(self._dir_ids, self._starts, self._ends, strict=True)]
+
+    def reordered(self, paths: Iterable[str]) -> "PackedPaths | None":
+        """按 paths 的顺序重排本组路径（共享文件名 blob）
+
+        Returns:
+            重排结果；paths 含本组以外的路径时返回 None
+        """
+        position = {p: i for i, p in enumerate(self.unpack())}
+        try:
+            order = [position[p] for p in paths]
+        except KeyError:
+            return None
+        dir_ids, starts, ends = self._dir_ids, self._starts, self._ends
+        return PackedPaths(
+            self._table,
+            array("I", [dir_ids[i] for i in order]),
+            self._blob,
+            array("I", [starts[i] for i in order]),
+            array("I", [ends[i] for i in order]),
+        )
+
+
+class PathTable:
+    """目录前缀驻留表（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dir_ids: dict[str, int] = {}
+        # dir_id → 含结尾分隔符的目录前缀；只追加，读取方无需加锁
+        self._prefixes: list[str] = []
+
+    def intern_dir(self, dir_path: str) -> int:
+        """返回目录的 dir_id（首次出现时登记）"""
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is not None:
+            return dir_id
+        with self._lock:
+            dir_id = self._dir_ids.get(dir_path)
+            if dir_id is None:
+                dir_id = len(self._prefixes)
+                prefix = dir_path if not dir_path or dir_path.endswith(_SEP) else dir_path + _SEP
+                self._prefixes.append(prefix)
+                self._dir_ids[dir_path] = dir_id
+            return dir_id
+
+    def pack(self, paths: Iterable[str]) -> PackedPaths:
+        """把路径列表压缩为 PackedPaths"""
+        dir_ids = array("I")
+        starts = array("I")
+        ends = array("I")
+        names = []
+        offset = 0
+        last_dir = None
+        last_id = 0
+        for path in paths:
+            head, sep, name = path.rpartition(_SEP)
+            # "/a.jpg" 的目录为根目录；无分隔符的相对文件名以空目录登记
+            head = head or sep
+            if head != last_dir:
+                last_dir = head
+                last_id = self.intern_dir(head)
+            dir_ids.append(last_id)
+            starts.append(offset)
+            offset += len(name)
+            ends.append(offset)
+            names.append(name)
+        return PackedPaths(self, dir_ids, "".join(names), starts, ends)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"dirs": len(self._prefixes)}
+
+
+# 全局单例：扫描类缓存共享同一张目录前缀表
+_global_table: PathTable | None = None
+_table_lock = threading.Lock()
+
+
+def get_path_table() -> PathTable:
+    """获取全局路径表"""
+    global _global_table  # noqa: PLW0603  # 单例模式的合理使用
+    with _table_lock:
+        if _global_table is None:
+            _global_table = PathTable()
+        return _global_table
+
+
+def reset_path_table() -> None:
+    """重置全局路径表（主要用于测试）"""
+    global _global_table  # noqa: PLW0603  # 单例模式的合理使用
+    with _table_lock:
+        _global_table = None
+
+
+__all__ = ["PackedPaths", "PathTable", "get_path_table", "reset_path_table"]
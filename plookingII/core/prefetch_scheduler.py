@@ -0,0 +1,266 @@
+"""
+优先级预取调度器
+
+替代“普通线程池 + 任务开始时比对代次”的预取方式：
+- 真正的优先级队列：数值越小越先执行（next1 先于 next2/prev1）
+- 去重：同一 (path, target_size) 只保留一个排队任务，重复提交取更高优先级
+- 代次取消：advance_generation() 把过期代次的排队任务直接出队，
+  快速连按时 CPU 不再花在已被跳过的邻居上
+- 代次内存预算：每一代累计预估内存超过预算的提交直接拒绝
+
+用法:
+    scheduler = PrefetchScheduler(max_workers=2, generation_budget_mb=256)
+    scheduler.advance_generation(gen)
+    scheduler.submit(worker, path, target_size, gen, priority=1, estimated_mb=24.0)
+    scheduler.shutdown()
+
+worker 签名：worker(path, target_size, generation, priority)
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger("plookingII.prefetch_scheduler")
+
+# 单代预取累计预估内存上限（MB）：0 表示不限
+_DEFAULT_GENERATION_BUDGET_MB = 256.0
+
+# 排队任务上限：超过时丢弃优先级最低的排队任务
+_DEFAULT_MAX_QUEUED = 6
+
+
+class _PrefetchTask:
+    """排队中的预取任务（堆元素；失效后惰性出堆）"""
+
+    __slots__ = ("alive", "estimated_mb", "fn", "generation", "key", "priority", "seq")
+
+    def __init__(self, fn: Callable, key: tuple, generation: int, priority: int, estimated_mb: float, seq: int):
+        self.fn = fn
+        self.key = key
+        self.generation = generation
+        self.priority = priority
+        self.estimated_mb = estimated_mb
+        self.seq = seq
+        self.alive = True
+
+    def __lt__(self, other: "_PrefetchTask") -> bool:
+        # 优先级相同按提交顺序（FIFO）
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class PrefetchScheduler:
+    """按优先级执行、按 (path, target_size) 去重、按代次取消的预取调度器"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        generation_budget_mb: float = _DEFAULT_GENERATION_BUDGET_MB,
+        max_queued: int = _DEFAULT_MAX_QUEUED,
+        thread_name_prefix: str = "prefetch",
+    ):
+        self._max_workers = max(1, max_workers)
+        self._budget_mb = max(0.0, float(generation_budget_mb))
+        self._max_queued = max(1, max_queued)
+        self._thread_name_prefix = thread_name_prefix
+        self._cond = threading.Condition(threading.Lock())
+        self._heap: list[_PrefetchTask] = []
+        self._pending: dict[tuple, _PrefetchTask] = {}
+        self._running: set[tuple] = set()
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._generation = 0
+        self._generation_used_mb = 0.0
+        self._shutdown = False
+        self._stats = {
+            "submitted": 0,
+            "executed": 0,
+            "deduplicated": 0,
+            "dropped_stale": 0,
+            "dropped_overflow": 0,
+            "rejected_budget": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 提交与代次
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        fn: Callable,
+        path: str,
+        target_size: tuple | None,
+        generation: int,
+        priority: int = 1,
+        estimated_mb: float = 0.0,
+    ) -> bool:
+        """提交预取任务
+
+        Args:
+            fn: 任务函数，调用为 fn(path, target_size, generation, priority)
+            path: 图片路径
+            target_size: 目标尺寸（去重键的一部分）
+            generation: 提交时的加载代次；低于当前代次的提交直接丢弃
+            priority: 优先级，数值越小越先执行
+            estimated_mb: 预估内存（计入代次预算）
+
+        Returns:
+            bool: 是否已排队（或已有同键任务排队/执行中）；过期/超预算/被挤出返回 False
+        """
+        key = (path, target_size)
+        with self._cond:
+            if self._shutdown:
+                return False
+            if generation > self._generation:
+                self._advance_locked(generation)
+            elif generation < self._generation:
+                self._stats["dropped_stale"] += 1
+                return False
+
+            existing = self._pending.get(key)
+            if existing is not None or key in self._running:
+                self._stats["deduplicated"] += 1
+                if existing is not None and priority < existing.priority:
+                    # 提升优先级：旧元素惰性失效，预算已计入不重复扣减
+                    existing.alive = False
+                    self._push_locked(fn, key, generation, priority, existing.estimated_mb)
+                return True
+
+            estimated_mb = max(0.0, float(estimated_mb))
+            if self._budget_mb and self._generation_used_mb + estimated_mb > self._budget_mb:
+                self._stats["rejected_budget"] += 1
+                return False
+
+            self._generation_used_mb += estimated_mb
+            self._stats["submitted"] += 1
+            self._push_locked(fn, key, generation, priority, estimated_mb)
+            if len(self._pending) > self._max_queued:
+                self._drop_lowest_locked()
+            self._ensure_threads_locked()
+            self._cond.notify()
+            # 新任务本身可能因优先级最低被挤出
+            return key in self._pending
+
+    def advance_generation(self, generation: int) -> int:
+        """进入新代次：丢弃所有过期代次的排队任务，重置代次预算
+
+        Returns:
+            int: 被丢弃的排队任务数
+        """
+        with self._cond:
+            if generation <= self._generation:
+                return 0
+            return self._advance_locked(generation)
+
+    def _advance_locked(self, generation: int) -> int:
+        self._generation = generation
+        self._generation_used_mb = 0.0
+        stale = [t for t in self._pending.values() if t.generation < generation]
+        for task in stale:
+            task.alive = False
+            del self._pending[task.key]
+        if stale:
+            self._stats["dropped_stale"] += len(stale)
+            # 重建堆，避免失效元素堆积
+            self._heap = [t for t in self._heap if t.alive]
+            heapq.heapify(self._heap)
+        return len(stale)
+
+    def _push_locked(self, fn: Callable, key: tuple, generation: int, priority: int, estimated_mb: float) -> None:
+        task = _PrefetchTask(fn, key, generation, priority, estimated_mb, next(self._seq))
+        self._pending[key] = task
+        heapq.heappush(self._heap, task)
+
+    def _drop_lowest_locked(self) -> None:
+        """队列超限：丢弃优先级最低（同级最旧）的排队任务"""
+        victim = max(self._pending.values(), key=lambda t: (t.priority, -t.seq))
+        victim.alive = False
+        del self._pending[victim.key]
+        self._generation_used_mb = max(0.0, self._generation_used_mb - victim.estimated_mb)
+        self._stats["dropped_overflow"] += 1
+
+    # ------------------------------------------------------------------
+    # 工作线程
+    # ------------------------------------------------------------------
+    def _ensure_threads_locked(self) -> None:
+        if len(self._threads) >= self._max_workers:
+            return
+        t = threading.Thread(
+            target=self._worker_loop,
+            name=f"{self._thread_name_prefix}_{len(self._threads)}",
+            daemon=True,
+        )
+        self._threads.append(t)
+        t.start()
+
+    def _next_task(self) -> _PrefetchTask | None:
+        """取出最高优先级的有效任务；关闭时返回 None"""
+        with self._cond:
+            while True:
+                while self._heap and not self._heap[0].alive:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    task = heapq.heappop(self._heap)
+                    task.alive = False
+                    self._pending.pop(task.key, None)
+                    self._running.add(task.key)
+                    return task
+                if self._shutdown:
+                    return None
+                self._cond.wait()
+
+    def _worker_loop(self) -> None:
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            path, target_size = task.key
+            try:
+                task.fn(path, target_size, task.generation, task.priority)
+            except Exception:
+                logger.debug("预取任务执行失败: %s", path, exc_info=True)
+            finally:
+                with self._cond:
+                    self._running.discard(task.key)
+                    self._stats["executed"] += 1
+
+    # ------------------------------------------------------------------
+    # 状态与关闭
+    # ------------------------------------------------------------------
+    def pending_count(self) -> int:
+        """当前排队中的任务数"""
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self) -> dict:
+        """导出调度统计（调试/监控）"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "generation": self._generation,
+                    "pending": len(self._pending),
+                    "running": len(self._running),
+                    "generation_used_mb": round(self._generation_used_mb, 2),
+                    "generation_budget_mb": self._budget_mb,
+                }
+            )
+            return stats
+
+    def shutdown(self, wait: bool = False) -> None:
+        """停止调度：清空排队任务，执行中的任务自然结束"""
+        with self._cond:
+            self._shutdown = True
+            for task in self._pending.values():
+                task.alive = False
+            self._pending.clear()
+            self._heap.clear()
+            threads = list(self._threads)
+            self._cond.notify_all()
+        if wait:
+            for t in threads:
+                t.join(timeout=5.0)
+
+
+__all__ = ["PrefetchScheduler"]
@@ -0,0 +1,493 @@
+"""
+远程文件按区间缓存（稀疏文件 + 区间索引）
+
+NAS 浏览多数时候只需要每张 JPEG 开头的几百 KB：头部、EXIF 与
+extract_embedded_preview 使用的 MPF 大预览。NetworkCache 只能缓存整个文件，
+SMBOptimizer.preload_file_data 只能读一个任意前缀。RangeCache 按字节区间缓存：
+
+- 每个远程文件对应本地一个稀疏文件（按原大小 truncate，只写入取回的区间）
+  与一个区间索引（有序、互不相交的 [start, end) 列表，持久化为 .ranges 旁路文件）
+- 条目以 (path, mtime_ns, size) 标识，本地文件名同样由三者派生：远程文件被
+  修改后旧区间整体作废，仍在读取旧版本的视图继续使用自己的稀疏文件，
+  最后一个视图关闭后才删除
+- 读取时缺失的区间按块（默认 64KB）对齐后从远程补取，经读取协调器
+  （core/remote_fetch）去重，同一区间的并发读取只走一次网络
+- RangeReader 为只读、可 seek 的文件对象，按需补取缺失区间；
+  头部 / 预览 / 全文只是读取范围不同，同一文件多次浏览逐步补全
+- 已缓存字节总数受预算限制，超限按最近最少使用整文件淘汰（打开中的不淘汰）
+
+预览优先显示时，慢速 SMB 上每张图的网络开销从整个文件（~30MB）降为
+头部 + 预览（几百 KB）。
+
+用法:
+    reader = open_remote_reader(path)   # 本地文件返回 None
+    if reader is not None:
+        with reader:
+            header = reader.pread(0, 64 * 1024)
+
+Author: PlookingII Team
+"""
+
+import bisect
+import contextlib
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from ..config.constants import APP_NAME
+from ..config.manager import get_config
+from ..imports import logging
+from .cache_fill import FILL_CHUNK_BYTES
+from .remote_fetch import FETCH_FOREGROUND, get_fetch_coordinator
+from .remote_file_detector import MountType, get_remote_detector
+
+logger = logging.getLogger(APP_NAME)
+
+# 补取粒度：请求区间向外对齐到块边界，相邻小读合并为一次往返
+RANGE_BLOCK_BYTES = 64 * 1024
+
+_DEFAULT_SIZE_MB = 512
+_DATA_SUFFIX = ".sparse"
+_INDEX_SUFFIX = ".ranges"
+
+
+class RangeIndex:
+    """有序、互不相交的半开区间集合 [start, end)"""
+
+    __slots__ = ("_ends", "_starts")
+
+    def __init__(self, ranges: list[tuple[int, int]] | None = None):
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for start, end in ranges or ():
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """加入区间并与相邻/重叠区间合并"""
+        if end <= start:
+            return
+        # 与 [start, end] 相交或相接的区间下标范围 [lo, hi)
+        lo = bisect.bisect_left(self._ends, start)
+        hi = bisect.bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def missing(self, start: int, end: int) -> list[tuple[int, int]]:
+        """[start, end) 中尚未覆盖的子区间"""
+        gaps = []
+        pos = start
+        i = bisect.bisect_right(self._ends, start)
+        while pos < end:
+            if i >= len(self._starts) or self._starts[i] >= end:
+                gaps.append((pos, end))
+                break
+            if self._starts[i] > pos:
+                gaps.append((pos, self._starts[i]))
+            pos = max(pos, self._ends[i])
+            i += 1
+        return gaps
+
+    def covers(self, start: int, end: int) -> bool:
+        return not self.missing(start, end)
+
+    @property
+    def total(self) -> int:
+        """已覆盖字节数"""
+        return sum(e - s for s, e in zip(self._starts, self._ends, strict=True))
+
+    def to_list(self) -> list[tuple[int, int]]:
+        return list(zip(self._starts, self._ends, strict=True))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+class _SparseEntry:
+    """一个远程文件的本地稀疏副本"""
+
+    __slots__ = ("data_path", "dropped", "index", "index_path", "lock", "mtime_ns", "path", "readers", "size")
+
+    def __init__(self, path: str, mtime_ns: int, size: int, data_path: str, index_path: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.data_path = data_path
+        self.index_path = index_path
+        self.index = RangeIndex()
+        self.lock = threading.Lock()
+        self.readers = 0
+        # 已出表（作废/淘汰/清空）但仍有打开的视图：最后一个视图关闭时删除文件
+        self.dropped = False
+
+
+class RangeReader(io.RawIOBase):
+    """只读、可 seek 的远程文件视图；读取时按需补取缺失区间"""
+
+    def __init__(self, cache: "RangeCache", entry: _SparseEntry, priority: int = FETCH_FOREGROUND):
+        super().__init__()
+        self._cache = cache
+        self._entry = entry
+        self._priority = priority
+        self._pos = 0
+
+    @property
+    def name(self) -> str:
+        return self._entry.path
+
+    @property
+    def size(self) -> int:
+        return self._entry.size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._entry.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed RangeReader")
+        data = self.pread(self._pos, len(b))
+        n = len(data)
+        memoryview(b).cast("B")[:n] = data
+        self._pos += n
+        return n
+
+    def pread(self, offset: int, length: int) -> bytes:
+        """读取 [offset, offset+length)（不移动读取位置）"""
+        return self._cache._read_entry(self._entry, offset, length, self._priority)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._cache._release(self._entry)
+        super().close()
+
+
+class RangeCache:
+    """按 (path, mtime_ns, size) 区分、按字节区间缓存远程文件（线程安全）"""
+
+    def __init__(self, cache_dir: str, max_bytes: int, block_size: int = RANGE_BLOCK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+        self.block_size = max(4096, int(block_size))
+        self._lock = threading.RLock()
+        # path → 条目；顺序即 LRU（末尾最新）
+        self._entries: OrderedDict[str, _SparseEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._remote_devices: dict[int, bool] = {}
+        self._stats = {"hits": 0, "fetches": 0, "fetched_bytes": 0, "evictions": 0, "invalidations": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+
+    # —— 打开 ——
+    def open(self, path: str, priority: int = FETCH_FOREGROUND) -> RangeReader:
+        """打开远程文件的区间视图（stat 失败时抛出 OSError）"""
+        st = os.stat(path)
+        entry = self._get_entry(path, st.st_mtime_ns, st.st_size)
+        return RangeReader(self, entry, priority)
+
+    def read(self, path: str, offset: int, length: int, priority: int = FETCH_FOREGROUND) -> bytes:
+        """读取远程文件的 [offset, offset+length)，缺失部分按需补取"""
+        with self.open(path, priority) as reader:
+            return reader.pread(offset, length)
+
+    def is_remote(self, path: str, st: os.stat_result | None = None) -> bool:
+        """按设备号缓存的远程判定（每个挂载点只探测一次；类型未知视为本地）"""
+        if st is None:
+            st = os.stat(path)
+        remote = self._remote_devices.get(st.st_dev)
+        if remote is None:
+            mount_type = get_remote_detector().get_mount_type(os.path.dirname(path) or path)
+            remote = mount_type not in (MountType.LOCAL, MountType.UNKNOWN)
+            self._remote_devices[st.st_dev] = remote
+        return remote
+
+    def cached_ranges(self, path: str) -> list[tuple[int, int]]:
+        """已缓存的区间（未缓存时为空）"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return []
+        with entry.lock:
+            return entry.index.to_list()
+
+    # —— 条目管理 ——
+    def _file_stem(self, path: str, mtime_ns: int, size: int) -> str:
+        """本地文件名前缀：远程文件每个版本各自一份稀疏文件，新旧条目互不覆盖"""
+        raw = f"{path}\0{mtime_ns}\0{size}"
+        digest = hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
+        return os.path.join(self.cache_dir, digest)
+
+    def _get_entry(self, path: str, mtime_ns: int, size: int) -> _SparseEntry:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.mtime_ns != mtime_ns or entry.size != size):
+                # 远程文件已变更：旧区间作废
+                self._stats["invalidations"] += 1
+                self._drop_locked(entry)
+                entry = None
+            if entry is None:
+                stem = self._file_stem(path, mtime_ns, size)
+                entry = _SparseEntry(path, mtime_ns, size, stem + _DATA_SUFFIX, stem + _INDEX_SUFFIX)
+                self._entries[path] = entry
+            else:
+                self._entries.move_to_end(path)
+            entry.readers += 1
+            return entry
+
+    def _release(self, entry: _SparseEntry) -> None:
+        with self._lock:
+            entry.readers = max(0, entry.readers - 1)
+            if entry.dropped and not entry.readers:
+                self._remove_files(entry)
+            self._evict_locked()
+
+    def _drop_locked(self, entry: _SparseEntry) -> None:
+        """条目出表并不再计入预算；仍有打开的视图时文件延后到最后一个视图关闭再删除"""
+        if entry.dropped:
+            return
+        if self._entries.get(entry.path) is entry:
+            del self._entries[entry.path]
+        entry.dropped = True
+        with entry.lock:
+            self._total_bytes -= entry.index.total
+        if not entry.readers:
+            self._remove_files(entry)
+
+    @staticmethod
+    def _remove_files(entry: _SparseEntry) -> None:
+        with entry.lock:
+            entry.index = RangeIndex()
+            for p in (entry.index_path, entry.data_path):
+                with contextlib.suppress(OSError):
+                    os.remove(p)
+
+    def _evict_locked(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        for entry in list(self._entries.values()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if entry.readers:
+                continue
+            self._drop_locked(entry)
+            self._stats["evictions"] += 1
+
+    def _load_existing(self) -> None:
+        """启动时读取已有区间索引（按修改时间恢复 LRU 顺序）"""
+        found = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(_INDEX_SUFFIX):
+                continue
+            index_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                found.append((os.stat(index_path).st_mtime, data, index_path))
+            except (OSError, ValueError):
+                with contextlib.suppress(OSError):
+                    os.remove(index_path)
+        for _, data, index_path in sorted(found, key=lambda item: item[0]):
+            try:
+                stem = index_path[: -len(_INDEX_SUFFIX)]
+                entry = _SparseEntry(
+                    data["path"], int(data["mtime_ns"]), int(data["size"]), stem + _DATA_SUFFIX, index_path
+                )
+                entry.index = RangeIndex([(int(s), int(e)) for s, e in data["ranges"]])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not os.path.exists(entry.data_path):
+                continue
+            self._entries[entry.path] = entry
+            self._total_bytes += entry.index.total
+        with self._lock:
+            self._evict_locked()
+
+    # —— 读取与补取 ——
+    def _read_entry(self, entry: _SparseEntry, offset: int, length: int, priority: int) -> bytes:
+        end = min(entry.size, offset + max(0, length))
+        if offset >= end:
+            return b""
+        with entry.lock:
+            gaps = entry.index.missing(offset, end)
+        if gaps:
+            self._fetch_gaps(entry, gaps, priority)
+        else:
+            with self._lock:
+                self._stats["hits"] += 1
+        fd = os.open(entry.data_path, os.O_RDONLY)
+        try:
+            return os.pread(fd, end - offset, offset)
+        finally:
+            os.close(fd)
+
+    def _fetch_gaps(self, entry: _SparseEntry, gaps: list[tuple[int, int]], priority: int) -> None:
+        """缺失区间按块对齐后补取（经读取协调器去重）"""
+        block = self.block_size
+        coordinator = get_fetch_coordinator()
+        for gap_start, gap_end in gaps:
+            start = gap_start // block * block
+            end = min(entry.size, -(-gap_end // block) * block)
+            coordinator.fetch(
+                ("range", entry.data_path, start, end),
+                lambda s=start, e=end: self._fill(entry, s, e),
+                priority,
+            )
+
+    def _fill(self, entry: _SparseEntry, start: int, end: int) -> None:
+        """从远程读取 [start, end) 写入稀疏文件，并登记到区间索引"""
+        with entry.lock:
+            gaps = entry.index.missing(start, end)
+        if not gaps:
+            return
+        fetched = 0
+        src = os.open(entry.path, os.O_RDONLY)
+        try:
+            st = os.fstat(src)
+            if st.st_mtime_ns != entry.mtime_ns or st.st_size != entry.size:
+                # 打开视图后远程文件已变更：不把新版本的字节写进旧版本的稀疏文件
+                raise OSError(f"remote file changed while reading: {entry.path}")
+            dst = os.open(entry.data_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(dst).st_size != entry.size:
+                    os.ftruncate(dst, entry.size)
+                for gap_start, gap_end in gaps:
+                    pos = gap_start
+                    while pos < gap_end:
+                        chunk = os.pread(src, min(FILL_CHUNK_BYTES, gap_end - pos), pos)
+                        if not chunk:
+                            raise OSError(f"remote file shorter than expected: {entry.path}")
+                        os.pwrite(dst, chunk, pos)
+                        pos += len(chunk)
+                    fetched += gap_end - gap_start
+                # 数据先落盘，索引再声明覆盖，崩溃后不会把空洞当作已缓存
+                os.fsync(dst)
+            finally:
+                os.close(dst)
+        finally:
+            os.close(src)
+
+        with entry.lock:
+            before = entry.index.total
+            for gap_start, gap_end in gaps:
+                entry.index.add(gap_start, gap_end)
+            added = entry.index.total - before
+            ranges = entry.index.to_list()
+        with self._lock:
+            # 填充期间条目可能已因远程变更/淘汰出表：不再写索引，避免覆盖新条目
+            if self._entries.get(entry.path) is entry:
+                self._write_index(entry, ranges)
+                self._total_bytes += added
+            self._stats["fetches"] += 1
+            self._stats["fetched_bytes"] += fetched
+            self._evict_locked()
+
+    def _write_index(self, entry: _SparseEntry, ranges: list[tuple[int, int]]) -> None:
+        payload = {"path": entry.path, "mtime_ns": entry.mtime_ns, "size": entry.size, "ranges": ranges}
+        tmp = entry.index_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, entry.index_path)
+        except OSError as e:
+            logger.warning("区间缓存索引写入失败: %s", e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+
+    # —— 维护 ——
+    def clear(self) -> None:
+        """清空全部区间缓存（打开中的视图继续读取，其文件在关闭后删除）"""
+        with self._lock:
+            for entry in list(self._entries.values()):
+                self._drop_locked(entry)
+            self._total_bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"files": len(self._entries), "cached_bytes": self._total_bytes, "max_bytes": self.max_bytes})
+            return stats
+
+
+def _default_cache_dir() -> str:
+    if os.name == "nt":  # Windows
+        return os.path.join(os.getenv("APPDATA", ""), "PlookingII", "range_cache")
+    return os.path.join(os.path.expanduser("~"), ".plookingII", "range_cache")
+
+
+# 全局单例
+_global_cache: RangeCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_range_cache() -> RangeCache:
+    """获取全局区间缓存"""
+    global _global_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _cache_lock:
+        if _global_cache is None:
+            _global_cache = RangeCache(
+                _default_cache_dir(),
+                int(get_config("range_cache.size_mb", _DEFAULT_SIZE_MB)) * 1024 * 1024,
+                int(get_config("range_cache.block_kb", RANGE_BLOCK_BYTES // 1024)) * 1024,
+            )
+        return _global_cache
+
+
+def reset_range_cache() -> None:
+    """重置全局区间缓存（主要用于测试）"""
+    global _global_cache  # noqa: PLW0603  # 单例模式的合理使用
+    with _cache_lock:
+        _global_cache = None
+
+
+def open_remote_reader(path: str, priority: int = FETCH_FOREGROUND) -> RangeReader | None:
+    """远程文件返回区间视图；本地文件、无法访问或区间缓存关闭时返回 None"""
+    if not get_config("range_cache.enabled", True):
+        return None
+    try:
+        st = os.stat(path)
+        cache = get_range_cache()
+        if not cache.is_remote(path, st):
+            return None
+        return RangeReader(cache, cache._get_entry(path, st.st_mtime_ns, st.st_size), priority)
+    except OSError:
+        return None
+
+
+__all__ = [
+    "RANGE_BLOCK_BYTES",
+    "RangeCache",
+    "RangeIndex",
+    "RangeReader",
+    "get_range_cache",
+    "open_remote_reader",
+    "reset_range_cache",
+]
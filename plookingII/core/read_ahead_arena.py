@@ -0,0 +1,324 @@
+"""
+预读缓冲区（匿名 mmap 内存池 + slab 分配 + 按字节 LRU）
+
+SMBOptimizer.read_ahead_cache 此前是 path → bytes 的 dict：每次预读 f.read()
+新分配一个完整 bytes，上限按 50 条 / 100MB 由 _evict_read_ahead_if_needed
+逐次求和淘汰；取用方再把 bytes 复制进 NSData/PIL。翻阅 NAS 目录时 RSS 在
+分配与释放之间反复涨落，复制带宽也翻倍。ReadAheadArena 改为：
+
+- 启动时预留一块匿名 mmap（虚拟地址，按需缺页），按固定 slab（默认 256KB，
+  页对齐）切分；每个缓冲占用连续若干 slab。本地文件（如网络缓存副本）经
+  readinto 直接读入，不产生中间 bytes；已在内存中的内容复制一次写入
+- 按字节预算淘汰最近最少使用的缓冲，被钉住（pinned）的缓冲不淘汰；
+  释放的 slab 以 madvise 归还物理页，RSS 不随历史峰值滞留
+- 内存池只负责以固定上限约束预读占用的 RSS，取用时仍复制：
+  SMBOptimizer.get_cached_file_data 把缓冲复制为 bytes 交出。ImageIO/NSImage
+  惰性持有数据源直到解码完成，而 slab 在 release 后即可被复用，因此 view 不交给
+  解码器。acquire() 返回钉住的 ArenaBuffer（只读 view），仅供在 release 前
+  同步读完的调用方使用
+
+用法:
+    arena = ReadAheadArena(100 * 1024 * 1024)
+    arena.load_file(path, local_copy)
+    with arena.acquire(path) as buf:
+        data = buf.tobytes()
+
+Author: PlookingII Team
+"""
+
+import contextlib
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Self
+
+from ..config.constants import APP_NAME
+from ..imports import logging
+
+logger = logging.getLogger(APP_NAME)
+
+# slab 大小：页大小的整数倍，兼顾小文件浪费与分配表长度
+DEFAULT_SLAB_BYTES = 256 * 1024
+
+# 释放 slab 时归还物理页（macOS 为 MADV_FREE，Linux 为 MADV_DONTNEED）
+_MADV_RELEASE = getattr(mmap, "MADV_FREE", None) or getattr(mmap, "MADV_DONTNEED", None)
+
+
+class _ArenaEntry:
+    """一个缓冲：占用 [first_slab, first_slab + slabs) 的前 length 字节"""
+
+    __slots__ = ("dropped", "first_slab", "key", "length", "pins", "slabs")
+
+    def __init__(self, key: Hashable, first_slab: int, slabs: int, length: int):
+        self.key = key
+        self.first_slab = first_slab
+        self.slabs = slabs
+        self.length = length
+        self.pins = 0
+        # 已出表（被替换/清空）但仍被钉住：最后一次 release 时释放 slab
+        self.dropped = False
+
+
+class ArenaBuffer:
+    """钉住的只读缓冲（release 或 with 结束后解除钉住）"""
+
+    __slots__ = ("_arena", "_entry", "view")
+
+    def __init__(self, arena: "ReadAheadArena", entry: _ArenaEntry, view: memoryview):
+        self._arena = arena
+        self._entry = entry
+        self.view = view
+
+    @property
+    def key(self) -> Hashable:
+        return self._entry.key
+
+    def __len__(self) -> int:
+        return self._entry.length
+
+    def tobytes(self) -> bytes:
+        """复制为 bytes（需要长期持有数据的调用方使用）"""
+        return self.view.tobytes()
+
+    def open(self) -> io.BufferedReader:
+        """以文件对象读取（按解码器请求的块复制，不产生整份副本）"""
+        return io.BufferedReader(_ViewReader(self.view))
+
+    def release(self) -> None:
+        if self._arena is None:
+            return
+        arena, self._arena = self._arena, None
+        with contextlib.suppress(BufferError):
+            self.view.release()
+        arena._unpin(self._entry)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class _ViewReader(io.RawIOBase):
+    """memoryview 上的只读文件对象"""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos : self._pos + len(b)]
+        n = len(chunk)
+        memoryview(b).cast("B")[:n] = chunk
+        self._pos += n
+        return n
+
+
+class ReadAheadArena:
+    """按字节预算、slab 分配的预读缓冲池（线程安全）"""
+
+    def __init__(self, capacity_bytes: int, slab_bytes: int = DEFAULT_SLAB_BYTES):
+        """
+        Args:
+            capacity_bytes: 内存池总字节数（向下取整到 slab 的整数倍）
+            slab_bytes: slab 大小（向上取整到页大小的整数倍）
+        """
+        page = mmap.PAGESIZE
+        self.slab_bytes = max(page, -(-int(slab_bytes) // page) * page)
+        self.slab_count = max(1, int(capacity_bytes) // self.slab_bytes)
+        self.capacity = self.slab_count * self.slab_bytes
+        self._mm = mmap.mmap(-1, self.capacity)
+        self._lock = threading.Lock()
+        # slab 占用表：0 空闲 / 1 占用
+        self._used = bytearray(self.slab_count)
+        # key → 条目；顺序即 LRU（末尾最新）
+        self._entries: OrderedDict[Hashable, _ArenaEntry] = OrderedDict()
+        self._used_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0, "rejected": 0}
+
+    # —— 写入 ——
+    def put(self, key: Hashable, data) -> bool:
+        """复制一段数据进池（bytes / bytearray / memoryview）"""
+        src = memoryview(data).cast("B")
+        entry = self._allocate(key, len(src))
+        if entry is None:
+            return False
+        start = entry.first_slab * self.slab_bytes
+        self._mm[start : start + len(src)] = src
+        self._publish(entry)
+        return True
+
+    def load_file(self, key: Hashable, file_path: str, size: int | None = None) -> bool:
+        """把文件（或前 size 字节）经 readinto 直接读入池中
+
+        Returns:
+            是否已缓存；文件超出内存池容量或读取失败返回 False
+        """
+        with open(file_path, "rb", buffering=0) as f:
+            length = os.fstat(f.fileno()).st_size
+            if size is not None:
+                length = min(length, max(0, size))
+            entry = self._allocate(key, length)
+            if entry is None:
+                return False
+            try:
+                start = entry.first_slab * self.slab_bytes
+                with memoryview(self._mm) as mv:
+                    target = mv[start : start + length]
+                    filled = 0
+                    while filled < length:
+                        n = f.readinto(target[filled:])
+                        if not n:
+                            break
+                        filled += n
+                    target.release()
+                entry.length = filled
+            except BaseException:
+                self._discard(entry)
+                raise
+        self._publish(entry)
+        return True
+
+    def _allocate(self, key: Hashable, length: int) -> _ArenaEntry | None:
+        """分配连续 slab（不足时按 LRU 淘汰未钉住的缓冲）；条目发布前对读取方不可见"""
+        slabs = max(1, -(-length // self.slab_bytes))
+        with self._lock:
+            if slabs > self.slab_count:
+                self._stats["rejected"] += 1
+                return None
+            first = self._find_run(slabs)
+            while first is None:
+                if not self._evict_one():
+                    self._stats["rejected"] += 1
+                    return None
+                first = self._find_run(slabs)
+            self._used[first : first + slabs] = b"\x01" * slabs
+            entry = _ArenaEntry(key, first, slabs, length)
+            # 填充期间钉住，防止被并发分配淘汰
+            entry.pins = 1
+            return entry
+
+    def _find_run(self, slabs: int) -> int | None:
+        """首次适配：第一段长度 ≥ slabs 的空闲 slab"""
+        run = b"\x00" * slabs
+        pos = self._used.find(run)
+        return None if pos < 0 else pos
+
+    def _publish(self, entry: _ArenaEntry) -> None:
+        with self._lock:
+            old = self._entries.pop(entry.key, None)
+            if old is not None:
+                self._drop_locked(old)
+            entry.pins -= 1
+            self._entries[entry.key] = entry
+            self._used_bytes += entry.slabs * self.slab_bytes
+            self._stats["stored"] += 1
+
+    def _discard(self, entry: _ArenaEntry) -> None:
+        with self._lock:
+            self._free_locked(entry)
+
+    # —— 读取 ——
+    def acquire(self, key: Hashable) -> ArenaBuffer | None:
+        """钉住并返回缓冲；不存在时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.pins += 1
+            self._stats["hits"] += 1
+        start = entry.first_slab * self.slab_bytes
+        with memoryview(self._mm) as mv:
+            view = mv[start : start + entry.length].toreadonly()
+        return ArenaBuffer(self, entry, view)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _unpin(self, entry: _ArenaEntry) -> None:
+        with self._lock:
+            entry.pins -= 1
+            if entry.pins <= 0 and entry.dropped:
+                self._free_locked(entry)
+
+    # —— 淘汰与释放 ——
+    def _evict_one(self) -> bool:
+        for key, entry in self._entries.items():
+            if entry.pins <= 0:
+                del self._entries[key]
+                self._drop_locked(entry)
+                self._stats["evictions"] += 1
+                return True
+        return False
+
+    def _drop_locked(self, entry: _ArenaEntry) -> None:
+        """条目出表：未钉住立即释放 slab，否则等最后一次 release"""
+        self._used_bytes -= entry.slabs * self.slab_bytes
+        entry.dropped = True
+        if entry.pins <= 0:
+            self._free_locked(entry)
+
+    def _free_locked(self, entry: _ArenaEntry) -> None:
+        first, slabs = entry.first_slab, entry.slabs
+        self._used[first : first + slabs] = bytes(slabs)
+        if _MADV_RELEASE is not None:
+            with contextlib.suppress(OSError, ValueError):
+                self._mm.madvise(_MADV_RELEASE, first * self.slab_bytes, slabs * self.slab_bytes)
+
+    def discard(self, key: Hashable) -> bool:
+        """移除缓冲（被钉住时延后到 release 释放）"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._drop_locked(entry)
+            return True
+
+    def clear(self) -> None:
+        """清空全部缓冲（被钉住的延后到 release 释放）"""
+        with self._lock:
+            for entry in self._entries.values():
+                self._drop_locked(entry)
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "entries": len(self._entries),
+                    "used_bytes": self._used_bytes,
+                    "capacity_bytes": self.capacity,
+                    "pinned": sum(1 for e in self._entries.values() if e.pins > 0),
+                    "free_slabs": self._used.count(0),
+                }
+            )
+            return stats
+
+
+__all__ = ["DEFAULT_SLAB_BYTES", "ArenaBuffer", "ReadAheadArena"]
@@ -0,0 +1,328 @@
+"""
+远程文件读穿（read-through）取数协调器
+
+NetworkCache.cache_remote_file、RemoteFileManager.load_remote_image 与
+SMBOptimizer.preload_file_data 可能同时为同一远程文件发起读取，彼此互不知情，
+每个调用方各自走一遍网络。FetchCoordinator 统一调度这些读取：
+
+- 单飞：同键的读取在排队或执行期间只存在一个，后到的调用方拿到同一个 Future，
+  完成即出表，不缓存结果（结果由调用方自己的缓存保存）。整文件读取统一使用
+  remote_file_key(远程路径)：无论缓存填充、直读还是预读先发起，其余调用方都
+  复用这一次读取的结果（本地副本路径或文件内容，见 fetched_bytes）
+- 有界 I/O 线程池：并发读取数受 max_workers 限制，不再由各模块各自的线程池
+  叠加出多倍并发
+- 两个优先级：前台（当前显示 / 用户显式请求）先于后台（预取、预读）出队；
+  前台调用方加入排队中的后台读取时将其提升为前台；后台读取至多占用
+  max_workers - 1 个线程，始终为前台保留一个空闲线程
+- 在协调器工作线程内发起的读取（新键，或同键仍在排队）直接内联执行，避免
+  线程池被嵌套等待占满
+
+用法:
+    coordinator = get_fetch_coordinator()
+    result = coordinator.fetch(remote_file_key(path), lambda: read(path), priority=FETCH_FOREGROUND)
+    data = fetched_bytes(result)
+
+    # 后台读取：不等待结果
+    future = coordinator.submit(remote_file_key(path), read_fn, priority=FETCH_BACKGROUND)
+
+Author: PlookingII Team
+"""
+
+import heapq
+import itertools
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+from ..config.constants import APP_NAME
+from ..config.manager import get_config
+from ..imports import logging
+
+logger = logging.getLogger(APP_NAME)
+
+# 优先级（数值越小越优先）
+FETCH_FOREGROUND = 0  # 当前显示 / 用户显式请求
+FETCH_BACKGROUND = 1  # 预取、预读
+
+_DEFAULT_MAX_WORKERS = 4
+
+
+class _FetchTask:
+    """排队中的读取（堆元素；提升优先级后旧元素惰性失效）"""
+
+    __slots__ = ("alive", "fn", "future", "key", "priority", "seq")
+
+    def __init__(self, key: Hashable, fn: Callable[[], Any], future: Future, priority: int, seq: int):
+        self.key = key
+        self.fn = fn
+        self.future = future
+        self.priority = priority
+        self.seq = seq
+        self.alive = True
+
+    def __lt__(self, other: "_FetchTask") -> bool:
+        # 优先级相同按提交顺序（FIFO）
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class FetchCoordinator:
+    """按键去重、按优先级出队的有界远程读取线程池"""
+
+    def __init__(self, max_workers: int = _DEFAULT_MAX_WORKERS, thread_name_prefix: str = "RemoteFetch"):
+        self._max_workers = max(1, int(max_workers))
+        # 后台读取最多占用的线程数：至少保留一个线程给前台
+        self._background_limit = max(1, self._max_workers - 1)
+        self._thread_name_prefix = thread_name_prefix
+        self._cond = threading.Condition(threading.Lock())
+        self._heap: list[_FetchTask] = []
+        # 排队或执行中的读取：key → 当前有效任务（提升后指向新任务，共享 Future）
+        self._inflight: dict[Hashable, _FetchTask] = {}
+        self._running_background = 0
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._local = threading.local()
+        self._shutdown = False
+        self._stats = {
+            "submitted": 0,
+            "joined": 0,
+            "promoted": 0,
+            "executed": 0,
+            "inline": 0,
+            "failed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 提交
+    # ------------------------------------------------------------------
+    def submit(self, key: Hashable, fn: Callable[[], Any], priority: int = FETCH_BACKGROUND) -> Future:
+        """提交读取；同键读取进行中时加入并返回同一个 Future
+
+        Args:
+            key: 去重键（同一远程资源的所有调用方须使用相同的键）
+            fn: 读取函数，无参数；返回值/异常即 Future 的结果
+            priority: FETCH_FOREGROUND 或 FETCH_BACKGROUND
+
+        Returns:
+            Future: 读取结果
+        """
+        in_worker = getattr(self._local, "worker", False)
+        with self._cond:
+            task = self._inflight.get(key)
+            if task is not None:
+                self._stats["joined"] += 1
+                if not task.alive:
+                    # 已在执行：等待其结果
+                    return task.future
+                if in_worker:
+                    # 工作线程等待排队中的同键读取会占住线程，全部线程如此即死锁：
+                    # 取出该任务（堆中元素失效）在本线程内联执行
+                    task.alive = False
+                    self._stats["inline"] += 1
+                else:
+                    if priority < task.priority:
+                        # 仍在排队：旧元素失效，以新优先级重新入堆（共享 Future）
+                        task.alive = False
+                        self._push_locked(key, task.fn, task.future, priority)
+                        self._stats["promoted"] += 1
+                        self._cond.notify_all()
+                    return task.future
+            else:
+                future: Future = Future()
+                if self._shutdown:
+                    future.set_exception(RuntimeError("FetchCoordinator has been shut down"))
+                    return future
+                self._stats["submitted"] += 1
+                if not in_worker:
+                    self._push_locked(key, fn, future, priority)
+                    self._ensure_threads_locked()
+                    self._cond.notify_all()
+                    return future
+                # 工作线程内的嵌套读取：登记后内联执行，不占用也不等待队列
+                task = _FetchTask(key, fn, future, priority, next(self._seq))
+                task.alive = False
+                self._inflight[key] = task
+                self._stats["inline"] += 1
+
+        self._execute(task)
+        return task.future
+
+    def fetch(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        priority: int = FETCH_FOREGROUND,
+        timeout: float | None = None,
+    ) -> Any:
+        """提交并等待读取结果（读取函数抛出的异常原样抛出）"""
+        return self.submit(key, fn, priority).result(timeout)
+
+    def _push_locked(self, key: Hashable, fn: Callable[[], Any], future: Future, priority: int) -> None:
+        task = _FetchTask(key, fn, future, priority, next(self._seq))
+        self._inflight[key] = task
+        heapq.heappush(self._heap, task)
+
+    # ------------------------------------------------------------------
+    # 工作线程
+    # ------------------------------------------------------------------
+    def _ensure_threads_locked(self) -> None:
+        if len(self._threads) >= self._max_workers:
+            return
+        t = threading.Thread(
+            target=self._worker_loop,
+            name=f"{self._thread_name_prefix}_{len(self._threads)}",
+            daemon=True,
+        )
+        self._threads.append(t)
+        t.start()
+
+    def _next_task(self) -> _FetchTask | None:
+        """取出最高优先级的有效任务；后台任务受保留线程限制。关闭时返回 None"""
+        with self._cond:
+            while True:
+                while self._heap and not self._heap[0].alive:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    top = self._heap[0]
+                    if top.priority < FETCH_BACKGROUND or self._running_background < self._background_limit:
+                        heapq.heappop(self._heap)
+                        top.alive = False
+                        if top.priority >= FETCH_BACKGROUND:
+                            self._running_background += 1
+                        return top
+                if self._shutdown:
+                    return None
+                self._cond.wait()
+
+    def _worker_loop(self) -> None:
+        self._local.worker = True
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            try:
+                self._execute(task)
+            finally:
+                if task.priority >= FETCH_BACKGROUND:
+                    with self._cond:
+                        self._running_background -= 1
+                        self._cond.notify_all()
+
+    def _execute(self, task: _FetchTask) -> None:
+        future = task.future
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = task.fn()
+                except BaseException as e:
+                    with self._cond:
+                        self._stats["failed"] += 1
+                    logger.debug("远程读取失败: %r", task.key, exc_info=True)
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            with self._cond:
+                current = self._inflight.get(task.key)
+                if current is not None and current.future is future:
+                    del self._inflight[task.key]
+                self._stats["executed"] += 1
+
+    # ------------------------------------------------------------------
+    # 状态与关闭
+    # ------------------------------------------------------------------
+    def is_inflight(self, key: Hashable) -> bool:
+        """该键的读取是否正在排队或执行"""
+        with self._cond:
+            return key in self._inflight
+
+    def get_stats(self) -> dict[str, Any]:
+        """导出调度统计（joined 即节省的远程读取次数）"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "queued": sum(1 for t in self._heap if t.alive),
+                    "inflight": len(self._inflight),
+                    "running_background": self._running_background,
+                    "max_workers": self._max_workers,
+                }
+            )
+            return stats
+
+    def shutdown(self, wait: bool = False) -> None:
+        """停止调度：取消排队中的读取，执行中的读取自然结束"""
+        with self._cond:
+            self._shutdown = True
+            for task in self._heap:
+                if task.alive:
+                    task.alive = False
+                    task.future.cancel()
+                    if self._inflight.get(task.key) is task:
+                        del self._inflight[task.key]
+            self._heap.clear()
+            threads = list(self._threads)
+            self._cond.notify_all()
+        if wait:
+            for t in threads:
+                t.join(timeout=5.0)
+
+
+def remote_file_key(remote_path: str) -> tuple:
+    """整文件读取的去重键（缓存填充、直读与整文件预读共用）
+
+    以此键提交的读取函数须返回本地完整副本路径（str）或文件内容（bytes），
+    失败返回 None 或抛出异常。
+    """
+    return ("file", remote_path)
+
+
+def fetched_bytes(result: Any) -> bytes | None:
+    """把整文件读取结果转为文件内容：本地副本从本地盘读取，不再走网络
+
+    Returns:
+        文件内容；失败结果或本地副本已不可读时返回 None
+    """
+    if isinstance(result, bytes):
+        return result
+    if isinstance(result, str):
+        try:
+            with open(result, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    return None
+
+
+# 全局单例：所有远程读取方共享同一个协调器
+_global_coordinator: FetchCoordinator | None = None
+_coordinator_lock = threading.Lock()
+
+
+def get_fetch_coordinator() -> FetchCoordinator:
+    """获取全局远程读取协调器"""
+    global _global_coordinator  # noqa: PLW0603  # 单例模式的合理使用
+    with _coordinator_lock:
+        if _global_coordinator is None:
+            _global_coordinator = FetchCoordinator(get_config("remote_fetch.max_workers", _DEFAULT_MAX_WORKERS))
+        return _global_coordinator
+
+
+def reset_fetch_coordinator() -> None:
+    """关闭并重置全局协调器（主要用于测试）"""
+    global _global_coordinator  # noqa: PLW0603  # 单例模式的合理使用
+    with _coordinator_lock:
+        if _global_coordinator is not None:
+            _global_coordinator.shutdown()
+        _global_coordinator = None
+
+
+__all__ = [
+    "FETCH_BACKGROUND",
+    "FETCH_FOREGROUND",
+    "FetchCoordinator",
+    "fetched_bytes",
+    "get_fetch_coordinator",
+    "remote_file_key",
+    "reset_fetch_coordinator",
+]
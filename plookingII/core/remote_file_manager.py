@@ -16,6 +16,7 @@ from ..config.manager import get_config
 from .enhanced_logging import LogCategory, LogLevel, get_enhanced_logger
 from .error_handling import ErrorCategory, error_context
 from .network_cache import get_network_cache
+from .remote_fetch import FETCH_BACKGROUND, FETCH_FOREGROUND, fetched_bytes, get_fetch_coordinator, remote_file_key
 from .remote_file_detector import MountInfo, MountType, get_remote_detector
 from .smb_optimizer import ReadStrategy, get_smb_optimizer
 
@@ -345,8 +346,10 @@ class RemoteFileManager:
             return stats
 
     def shutdown(self):
-        """关闭线程池，释放资源"""
+        """关闭线程池并写出缓冲的缓存元数据，释放资源"""
         self.executor.shutdown(wait=False)
+        # 不足一批的访问更新只在内存缓冲中：退出前写出并 fsync
+        self.network_cache.flush_metadata()
 
     def clear_cache(self):
         """清空缓存"""
@@ -480,7 +483,7 @@ class RemoteFileManager:
             # 先尝试缓存文件
             from_cache = False
             if self.auto_cache_enabled:
-                cache_path = self.network_cache.cache_remote_file(file_path)
+                cache_path = self.network_cache.cache_remote_file(file_path, priority=FETCH_FOREGROUND)
                 if cache_path:
                     # 从缓存读取
                     with open(cache_path, "rb") as f:
@@ -522,10 +525,17 @@ class RemoteFileManager:
             )
 
     def _load_directly(self, file_path: str, file_info: RemoteFileInfo, start_time: float) -> LoadingResult:
-        """直接加载文件"""
+        """直接加载文件（与同一文件的缓存填充、预读共享一次网络读取）"""
         try:
-            with open(file_path, "rb") as f:
-                data = f.read()
+            data = self._read_from_active_fill(file_path)
+            if data is None:
+                result = get_fetch_coordinator().fetch(
+                    remote_file_key(file_path), lambda: self._read_file(file_path), FETCH_FOREGROUND
+                )
+                data = fetched_bytes(result)
+            if data is None:
+                # 加入的缓存填充失败（如本地磁盘已满）或副本已被淘汰：直接读取
+                data = self._read_file(file_path)
 
             end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
@@ -553,6 +563,25 @@ class RemoteFileManager:
                 error=e,
             )
 
+    def _read_from_active_fill(self, file_path: str) -> bytes | None:
+        """文件正由缓存填充复制时等待其完成并读本地副本，避免再从网络读一遍
+
+        Returns:
+            文件内容；没有进行中的填充或填充失败时返回 None
+        """
+        fill = self.network_cache.get_active_fill(file_path)
+        if fill is None or not fill.wait():
+            return None
+        try:
+            return self._read_file(fill.local_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_file(file_path: str) -> bytes:
+        with open(file_path, "rb") as f:
+            return f.read()
+
     def _preload_batch(self, file_paths: list[str]) -> list[LoadingResult]:
         """批量预加载文件"""
         results = []
@@ -586,8 +615,8 @@ class RemoteFileManager:
         start_time = time.perf_counter()
 
         try:
-            # 缓存文件
-            cache_path = self.network_cache.cache_remote_file(file_path)
+            # 缓存文件（批量预加载为后台优先级，不挡前台请求）
+            cache_path = self.network_cache.cache_remote_file(file_path, priority=FETCH_BACKGROUND)
 
             if cache_path:
                 # 从缓存读取
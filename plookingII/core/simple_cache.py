@@ -7,19 +7,27 @@
 - 简单优于复杂：使用标准库 OrderedDict 实现 LRU
 - 性能优先：减少抽象层开销
 - 易于维护：代码清晰，注释完整
-- 线程安全：使用简单的锁机制
+- 线程安全：按键哈希分片加锁，统计计数增量维护
+- NSCache 记账漂移由后台线程定期对账，不阻塞读写与统计
 
 Author: PlookingII Team
 """
 
 import contextlib
+import itertools
 import logging
 import threading
 import time
-from collections import OrderedDict
+import weakref
+from collections import OrderedDict, deque
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
+from .cache_mrc import MissRatioCurveEstimator
+from .cache_policy import POLICY_LRU, CacheTraceRecorder, create_policy
+from .image_sequence import ImageSequence
+
 try:
     import Foundation
 
@@ -30,6 +38,38 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 默认分片数：解码、预取与主线程并发读写时各自落入不同分片，互不阻塞
+_DEFAULT_SHARDS = 8
+
+# NSCache 记账对账的后台扫描周期（秒）
+_RECONCILE_INTERVAL_S = 10.0
+
+# 准入策略的读缓冲：命中先入无锁队列（满则丢弃最旧），积累到阈值后尝试
+# 非阻塞获取策略锁批量回放，读路径永不等待策略锁
+_READ_BUFFER_SIZE = 256
+_READ_BUFFER_DRAIN = 32
+
+# 目标尺寸长边档位：窗口小幅缩放/换屏落在同一档位，复用已缓存的渲染
+TARGET_BUCKETS = (1024, 1536, 2048, 2560, 3072, 4096, 5120, 6144)
+
+# 已缓存档位长边达到所需的该倍数时才派生较小渲染（差距不大时直接复用大档位）
+_DERIVE_MIN_RATIO = 1.5
+
+# PIL.Image.Resampling.BILINEAR（避免为类型判断导入 PIL）
+_PIL_BILINEAR = 2
+
+# 固定（pin）持有者及其优先级：数值越小越重要；紧急回收时按优先级强制解除
+PIN_OWNER_CURRENT = "current"
+PIN_OWNER_ZOOM = "zoom"
+PIN_OWNER_NEIGHBOR = "neighbor"
+PIN_PRIORITIES = {PIN_OWNER_CURRENT: 0, PIN_OWNER_ZOOM: 1, PIN_OWNER_NEIGHBOR: 2}
+# 未登记持有者的优先级（最先被强制解除）
+_PIN_PRIORITY_DEFAULT = 3
+
+# 同一路径长边相差不足该比例的档位视为重复：写入新档位时替换旧档位，
+# 避免窗口尺寸微调时同一张图堆积多份近似分辨率
+_TIER_DEDUP_RATIO = 0.1
+
 
 @dataclass
 class CacheEntry:
@@ -112,14 +152,255 @@ def estimate_image_memory_mb(image) -> float:
         return 10.0
 
 
+@dataclass(frozen=True)
+class TierHit:
+    """分辨率档位查找结果"""
+
+    value: Any
+    tier: int  # 长边像素；0 表示未知尺寸
+    satisfied: bool  # 是否满足请求尺寸；否则为即时占位，调用方应调度升级
+
+
+def _tier_key(path: str, tier: int) -> str:
+    """档位条目键：未知尺寸档位直接用路径（兼容旧键），其余附加长边（NUL 不会出现在路径中）"""
+    return path if tier <= 0 else f"{path}\x00{tier}"
+
+
+def _path_of(key: str) -> str:
+    return key.split("\x00", 1)[0]
+
+
+def _target_edge(target_size) -> int:
+    """请求尺寸 → 所需长边像素；未指定返回 0"""
+    try:
+        if not target_size:
+            return 0
+        return int(max(target_size[0], target_size[1]))
+    except (TypeError, ValueError, IndexError):
+        return 0
+
+
+def _image_tier(value) -> int:
+    dims = image_pixel_dimensions(value)
+    return max(dims) if dims else 0
+
+
+def quantize_target_size(target_size: tuple | None) -> tuple | None:
+    """目标尺寸量化：长边向上取到最近档位（保持宽高比）；超出最大档位时原样返回"""
+    edge = _target_edge(target_size)
+    if edge <= 0:
+        return target_size
+    for bucket in TARGET_BUCKETS:
+        if edge <= bucket:
+            scale = bucket / edge
+            return (max(1, round(target_size[0] * scale)), max(1, round(target_size[1] * scale)))
+    return (int(target_size[0]), int(target_size[1]))
+
+
+def resample_image(image, target_size: tuple) -> Any | None:
+    """快速降采样到目标尺寸内（保持宽高比，不读盘、不经过解码器）
+
+    PIL 图像先整数倍 reduce 再双线性插值；CGImage/NSImage 以中等插值质量
+    重绘到位图上下文。无需缩小或失败时返回 None。
+    """
+    try:
+        dims = image_pixel_dimensions(image)
+        edge = _target_edge(target_size)
+        if not dims or edge <= 0 or max(dims) <= edge:
+            return None
+        scale = edge / max(dims)
+        width, height = max(1, round(dims[0] * scale)), max(1, round(dims[1] * scale))
+        if hasattr(image, "resize") and isinstance(getattr(image, "size", None), tuple):
+            return image.resize((width, height), _PIL_BILINEAR, reducing_gap=2.0)
+
+        from Quartz import (
+            CGBitmapContextCreate,
+            CGBitmapContextCreateImage,
+            CGColorSpaceCreateDeviceRGB,
+            CGContextDrawImage,
+            CGContextSetInterpolationQuality,
+            CGRectMake,
+            kCGImageAlphaPremultipliedLast,
+            kCGInterpolationMedium,
+        )
+
+        cgimage = image
+        if hasattr(image, "CGImageForProposedRect_context_hints_"):
+            cgimage = image.CGImageForProposedRect_context_hints_(None, None, None)
+            if isinstance(cgimage, tuple):
+                cgimage = cgimage[0]
+        ctx = CGBitmapContextCreate(
+            None, width, height, 8, 0, CGColorSpaceCreateDeviceRGB(), kCGImageAlphaPremultipliedLast
+        )
+        if ctx is None or cgimage is None:
+            return None
+        CGContextSetInterpolationQuality(ctx, kCGInterpolationMedium)
+        CGContextDrawImage(ctx, CGRectMake(0, 0, width, height), cgimage)
+        return CGBitmapContextCreateImage(ctx)
+    except Exception:
+        logger.debug("resample_image failed", exc_info=True)
+        return None
+
+
+class _ShardEntry:
+    """分片内的条目记录（一个路径的一个分辨率档位）
+
+    value 在 NSCache 分支为 None（值由 NSCache 持有）；tier 为长边像素
+    （0 表示未知尺寸/非图像值）；reduced 标记降采样档位。
+    """
+
+    __slots__ = ("path", "reduced", "size_mb", "tick", "tier", "value")
+
+    def __init__(self, path: str, tier: int, value: Any, size_mb: float, tick: int, reduced: bool = False):
+        self.path = path
+        self.tier = tier
+        self.value = value
+        self.size_mb = size_mb
+        self.tick = tick
+        self.reduced = reduced
+
+
+class _CacheShard:
+    """缓存分片：独立锁 + 两条按访问顺序排列的 LRU（全分辨率/未知、降采样）+ 增量计数
+
+    同一路径的全部档位落在同一分片（按路径哈希），tiers 索引 路径 → {档位: 条目键}。
+    被固定（pins 中有持有者）的路径，其档位仍计入条目数与内存，但不在 LRU 中，不会被淘汰；
+    pin_refs 在 NSCache 模式下持有固定档位的强引用（NSCache 自动驱逐后仍可命中）。
+    """
+
+    __slots__ = (
+        "derives",
+        "entries",
+        "evictions",
+        "hits",
+        "lock",
+        "lru",
+        "memory_mb",
+        "misses",
+        "pin_refs",
+        "pins",
+        "tiers",
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: dict[str, _ShardEntry] = {}
+        # lru[0]：全分辨率/未知档位；lru[1]：降采样档位（淘汰时享有宽限）
+        self.lru: tuple[OrderedDict[str, _ShardEntry], OrderedDict[str, _ShardEntry]] = (OrderedDict(), OrderedDict())
+        self.tiers: dict[str, dict[int, str]] = {}
+        # 路径 → {持有者: 引用计数}
+        self.pins: dict[str, dict[str, int]] = {}
+        self.pin_refs: dict[str, Any] = {}
+        self.memory_mb = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.derives = 0
+
+    def insert(self, key: str, entry: _ShardEntry) -> None:
+        """写入条目（调用方持锁，且已移除同键旧条目）"""
+        self.entries[key] = entry
+        if entry.path not in self.pins:
+            self.lru[entry.reduced][key] = entry
+        self.tiers.setdefault(entry.path, {})[entry.tier] = key
+        self.memory_mb += entry.size_mb
+
+    def unlink(self, key: str) -> _ShardEntry | None:
+        """移除条目并维护索引与内存记账（调用方持锁）"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.lru[entry.reduced].pop(key, None)
+        self.pin_refs.pop(key, None)
+        path_tiers = self.tiers.get(entry.path)
+        if path_tiers is not None:
+            path_tiers.pop(entry.tier, None)
+            if not path_tiers:
+                del self.tiers[entry.path]
+        self.memory_mb -= entry.size_mb
+        return entry
+
+    def touch(self, key: str, entry: _ShardEntry, tick: int) -> None:
+        """命中：移至所在 LRU 末尾并刷新访问时钟（调用方持锁；固定条目不在 LRU 中）"""
+        lru = self.lru[entry.reduced]
+        if key in lru:
+            lru.move_to_end(key)
+        entry.tick = tick
+
+    def hold(self, path: str) -> list[str]:
+        """路径首次被固定：其档位移出 LRU（调用方持锁），返回档位条目键"""
+        keys = list(self.tiers.get(path, {}).values())
+        for key in keys:
+            self.lru[self.entries[key].reduced].pop(key, None)
+        return keys
+
+    def release(self, path: str) -> list[tuple[str, float]]:
+        """路径最后一个持有者解除：档位按访问时钟放回 LRU 末尾（调用方持锁）
+
+        Returns:
+            [(条目键, 大小MB)]，供准入策略重新登记
+        """
+        self.pins.pop(path, None)
+        entries = sorted(
+            ((key, self.entries[key]) for key in self.tiers.get(path, {}).values()), key=lambda item: item[1].tick
+        )
+        for key, entry in entries:
+            self.pin_refs.pop(key, None)
+            self.lru[entry.reduced][key] = entry
+        return [(key, entry.size_mb) for key, entry in entries]
+
+    def oldest_tick(self, reduced_bonus: int = 0) -> int | None:
+        """分片内最久未用条目的有效访问时钟（降采样档位加宽限）；空分片返回 None
+
+        先无锁窥视两条 LRU 的队头（各只读一个元素），与写线程并发修改冲突时再加锁重读。
+        """
+        try:
+            return self._head_tick(reduced_bonus)
+        except RuntimeError:
+            with self.lock:
+                return self._head_tick(reduced_bonus)
+
+    def _head_tick(self, reduced_bonus: int) -> int | None:
+        best = None
+        for reduced, lru in enumerate(self.lru):
+            if lru:
+                tick = next(iter(lru.values())).tick + (reduced_bonus if reduced else 0)
+                if best is None or tick < best:
+                    best = tick
+        return best
+
+    def pop_oldest(self, reduced_bonus: int = 0) -> tuple[str, _ShardEntry] | None:
+        with self.lock:
+            victim = None
+            best = None
+            for reduced, lru in enumerate(self.lru):
+                if lru:
+                    key, entry = next(iter(lru.items()))
+                    tick = entry.tick + (reduced_bonus if reduced else 0)
+                    if best is None or tick < best:
+                        victim, best = key, tick
+            if victim is None:
+                return None
+            return victim, self.unlink(victim)
+
+    def drop_if_same(self, key: str, entry: _ShardEntry) -> bool:
+        """仅当 key 仍指向同一条目时移除（条目被并发覆盖/移除、或被固定并持有强引用时不动）"""
+        with self.lock:
+            if self.entries.get(key) is not entry or key in self.pin_refs:
+                return False
+            self.unlink(key)
+            self.evictions += 1
+            return True
+
+
 class SimpleImageCache:
     """简化的图片缓存实现
 
     特性：
-    - LRU 淘汰策略
+    - LRU 淘汰策略（分片存储，全局访问时钟保证跨分片的精确 LRU）
     - 内存大小限制
-    - 线程安全
-    - 简单的统计
+    - 线程安全：按键哈希分片，每片独立锁；任何操作同一时刻最多持有一把分片锁
+    - O(1) 统计：计数随读写增量维护，get_stats 不遍历条目、不探测 NSCache
 
     示例：
         cache = SimpleImageCache(max_items=50, max_memory_mb=500)
@@ -127,13 +408,24 @@ class SimpleImageCache:
         image = cache.get('img1.jpg')
     """
 
-    def __init__(self, max_items: int = 20, max_memory_mb: float = 2000.0, name: str = "default"):
+    def __init__(
+        self,
+        max_items: int = 20,
+        max_memory_mb: float = 2000.0,
+        name: str = "default",
+        shards: int = _DEFAULT_SHARDS,
+        use_nscache: bool | None = None,
+        policy: str = POLICY_LRU,
+    ):
         """初始化缓存
 
         Args:
             max_items: 最大缓存项数
             max_memory_mb: 最大内存占用(MB)
             name: 缓存名称（用于日志）
+            shards: 分片数（每片独立锁）
+            use_nscache: 是否使用 NSCache 持有值；None 表示可用即使用
+            policy: 准入/淘汰策略，"lru"（默认）或 "tinylfu"（抗扫描的 W-TinyLFU）
 
         Note:
             默认值变更说明 (v1.7.2):
@@ -152,90 +444,323 @@ class SimpleImageCache:
         self.max_items = max_items
         self.max_memory_mb = max_memory_mb
 
-        self._lock = threading.RLock()
-
-        if _NSCACHE_AVAILABLE:
-            # 使用 NSCache 替代 OrderedDict
+        # 分片：键按哈希落入固定分片，读写只锁所在分片；每片的 OrderedDict
+        # 按访问顺序排列，条目携带全局访问时钟，各片队头中时钟最小者即
+        # 全局最久未用条目（淘汰时逐片短暂加锁比较，不嵌套持锁）
+        self._shards = tuple(_CacheShard() for _ in range(max(1, shards)))
+        # itertools.count 的 next() 在 CPython 下原子，无需加锁
+        self._clock = itertools.count(1)
+        # 串行化淘汰：多个写线程同时看到超限时只由一个线程淘汰，避免过度淘汰
+        self._evict_lock = threading.Lock()
+        # 降采样档位的淘汰宽限（访问时钟单位）：比同龄的全分辨率档位多撑
+        # max_items 次访问，内存紧张时先释放大块的全分辨率像素
+        self.reduced_tier_bonus = max(1, max_items)
+
+        if use_nscache is None:
+            use_nscache = _NSCACHE_AVAILABLE
+        if use_nscache:
+            # NSCache 持有值（系统内存压力下可自动驱逐），分片只保存记账与 LRU 顺序
             self._ns_cache = Foundation.NSCache.alloc().init()
             self._ns_cache.setCountLimit_(max_items)
             self._ns_cache.setTotalCostLimit_(int(max_memory_mb * 1024 * 1024))
-            self._items: OrderedDict[str, Any] | None = None
+            _reconcile_sweeper.register(self)
         else:
             self._ns_cache = None
-            self._items = OrderedDict()
 
-        # 统计信息（手动追踪，NSCache 不暴露内部计数）
-        # 使用 OrderedDict 记录插入/命中顺序，作为 NSCache 分支的近似 LRU
-        # 顺序（供 evict_oldest 按"最久未用"优先淘汰）
-        self._item_sizes: OrderedDict[str, float] = OrderedDict()
-        self._item_count = 0
-        self._current_memory_mb = 0.0
-        self._hits = 0
-        self._misses = 0
-        self._evictions = 0
+        # 可选准入策略：启用后由策略决定淘汰（取代全局 LRU），锁顺序为
+        # 策略锁 → 分片锁，读路径只写读缓冲，不获取策略锁
+        self._policy = create_policy(policy, max_items, max_memory_mb)
+        self._policy_lock = threading.Lock()
+        self._read_buffer: deque[tuple[str, bool]] = deque(maxlen=_READ_BUFFER_SIZE)
+        self._trace: CacheTraceRecorder | None = None
+        self._mrc: MissRatioCurveEstimator | None = None
+
+        logger.info(
+            "SimpleImageCache '%s' initialized: max_items=%s, max_memory=%sMB, shards=%d, policy=%s",
+            name,
+            max_items,
+            max_memory_mb,
+            len(self._shards),
+            self._policy.name if self._policy is not None else POLICY_LRU,
+        )
 
-        logger.info("SimpleImageCache '%s' initialized: max_items=%s, max_memory=%sMB", name, max_items, max_memory_mb)
+    def _shard_for(self, key: str) -> _CacheShard:
+        """按路径选择分片（同一路径的全部档位落在同一分片）"""
+        return self._shards[hash(_path_of(key)) % len(self._shards)]
+
+    def _totals(self) -> tuple[int, float]:
+        """(条目数, 记账内存 MB)：按分片计数求和，O(分片数)"""
+        count = 0
+        memory = 0.0
+        for shard in self._shards:
+            count += len(shard.entries)
+            memory += shard.memory_mb
+        return count, memory
 
     def get(self, key: str, target_size: tuple | None = None) -> Any | None:
-        """获取缓存项
+        """获取缓存项（最佳可用分辨率档位）
 
         Args:
-            key: 缓存键
-            target_size: 保留参数，兼容外部调用
+            key: 缓存键（图片路径）
+            target_size: 请求尺寸；None 时返回最大档位
 
         Returns:
             缓存的值，未找到返回 None
         """
-        with self._lock:
-            if self._ns_cache is not None:
-                value = self._ns_cache.objectForKey_(key)
-            else:
-                value = self._items.get(key)
-                if value is not None:
-                    # LRU: 移到最后
-                    self._items.move_to_end(key)
-            if value is not None:
-                self._hits += 1
-                # 统一维护近似 LRU 顺序：命中即移至末尾，供 evict_oldest
-                # 按"最久未用"优先淘汰（_item_sizes 为 OrderedDict，O(1)）
-                if key in self._item_sizes:
-                    self._item_sizes.move_to_end(key)
-                return value
-            self._misses += 1
+        hit = self.get_best(key, target_size)
+        return hit.value if hit is not None else None
+
+    def get_best(self, key: str, target_size: tuple | None = None) -> TierHit | None:
+        """按请求尺寸查找最佳档位
+
+        优先返回长边不小于请求尺寸的最小档位（satisfied=True）；都不够大时返回
+        最大的较小档位作为即时占位（satisfied=False，调用方应调度升级）。
+        未知尺寸档位视为满足。
+
+        Returns:
+            TierHit；该路径无任何档位返回 None
+        """
+        entry_key, hit = self._lookup(key, _target_edge(target_size))
+        if self._trace is not None:
+            self._trace.record("get", key)
+        if self._mrc is not None:
+            self._mrc.record_get(key)
+        if self._policy is not None:
+            self._read_buffer.append((entry_key, hit is not None))
+            if len(self._read_buffer) >= _READ_BUFFER_DRAIN and self._policy_lock.acquire(blocking=False):
+                try:
+                    self._drain_reads()
+                finally:
+                    self._policy_lock.release()
+        return hit
+
+    def contains_tier(self, key: str, target_size: tuple | None = None) -> bool:
+        """是否已有满足请求尺寸的档位（只读探测：不计命中、不更新 LRU）"""
+        shard = self._shard_for(key)
+        with shard.lock:
+            return any(satisfied for _, _, satisfied in self._tier_candidates(shard, key, _target_edge(target_size)))
+
+    @staticmethod
+    def can_derive(hit: TierHit | None, target_size: tuple | None) -> bool:
+        """命中档位是否大到值得派生较小渲染（见 derive）"""
+        need = _target_edge(target_size)
+        return hit is not None and hit.satisfied and need > 0 and hit.tier >= need * _DERIVE_MIN_RATIO
+
+    def derive(self, key: str, target_size: tuple, resampler: Callable | None = None) -> TierHit | None:
+        """由已缓存的较大档位派生目标尺寸的渲染（快速重采样，不读盘、不解码）
+
+        取满足请求尺寸的最小已知档位；其长边不足所需的 _DERIVE_MIN_RATIO 倍时不派生。
+        派生结果作为降采样档位写入缓存，之后同尺寸请求直接命中。
+
+        Args:
+            key: 缓存键（图片路径）
+            target_size: 请求尺寸（建议先经 quantize_target_size 量化）
+            resampler: 重采样函数 (image, target_size) -> image，默认 resample_image
+
+        Returns:
+            派生档位的 TierHit；无可用来源或重采样失败返回 None
+        """
+        need = _target_edge(target_size)
+        if need <= 0:
+            return None
+        shard = self._shard_for(key)
+        with shard.lock:
+            sources = [
+                (entry_key, entry)
+                for entry_key, entry, satisfied in self._tier_candidates(shard, key, need)
+                if satisfied and entry.tier > 0
+            ]
+        if not sources or sources[0][1].tier < need * _DERIVE_MIN_RATIO:
+            return None
+        entry_key, entry = sources[0]
+        source = entry.value if self._ns_cache is None else self._ns_cache.objectForKey_(entry_key)
+        if source is None:
             return None
+        derived = (resampler or resample_image)(source, target_size)
+        if derived is None:
+            return None
+        tier = _image_tier(derived) or need
+        self.put(key, derived, size_mb=estimate_image_memory_mb(derived), tier=tier, full_resolution=False)
+        with shard.lock:
+            shard.derives += 1
+        return TierHit(derived, tier, True)
+
+    @staticmethod
+    def _tier_candidates(shard: _CacheShard, path: str, need: int) -> list[tuple[str, _ShardEntry, bool]]:
+        """按优先顺序列出路径的档位 (条目键, 条目, 是否满足)（调用方持分片锁）
 
-    def put(self, key: str, value: Any, size_mb: float = 1.0):
-        """添加到缓存
+        顺序：不小于所需长边的档位（由小到大）→ 未知尺寸档位 → 较小档位（由大到小）；
+        未指定尺寸时：未知尺寸档位 → 已知档位（由大到小）。
+        """
+        path_tiers = shard.tiers.get(path)
+        if not path_tiers:
+            return []
+        known = sorted(t for t in path_tiers if t > 0)
+        unknown = [0] if 0 in path_tiers else []
+        if need <= 0:
+            order = [(t, True) for t in unknown + known[::-1]]
+        else:
+            order = (
+                [(t, True) for t in known if t >= need]
+                + [(t, True) for t in unknown]
+                + [(t, False) for t in reversed(known) if t < need]
+            )
+        return [(path_tiers[t], shard.entries[path_tiers[t]], satisfied) for t, satisfied in order]
+
+    def _lookup(self, path: str, need: int) -> tuple[str, TierHit | None]:
+        """查找并记账命中/未命中，返回 (命中条目键或路径, 结果)"""
+        shard = self._shard_for(path)
+        if self._ns_cache is None:
+            with shard.lock:
+                for key, entry, satisfied in self._tier_candidates(shard, path, need):
+                    if entry.value is None:
+                        continue
+                    shard.touch(key, entry, next(self._clock))
+                    shard.hits += 1
+                    return key, TierHit(entry.value, entry.tier, satisfied)
+                shard.misses += 1
+                return path, None
+
+        # NSCache 自身线程安全：探测在分片锁外进行，只在更新 LRU/计数时加锁
+        with shard.lock:
+            candidates = self._tier_candidates(shard, path, need)
+        stale = []
+        found = None
+        for key, entry, satisfied in candidates:
+            value = self._ns_cache.objectForKey_(key)
+            if value is None:
+                value = shard.pin_refs.get(key)
+            if value is not None:
+                found = (key, entry, TierHit(value, entry.tier, satisfied))
+                break
+            stale.append((key, entry))
+        with shard.lock:
+            if found is not None:
+                shard.hits += 1
+                if shard.entries.get(found[0]) is found[1]:
+                    shard.touch(found[0], found[1], next(self._clock))
+            else:
+                shard.misses += 1
+        # 记账仍在但 NSCache 已自动驱逐：顺带修正（仅当探测前后是同一条目）
+        dropped = [key for key, entry in stale if shard.drop_if_same(key, entry)]
+        if dropped:
+            self._forget(dropped)
+        if found is None:
+            return path, None
+        return found[0], found[2]
+
+    def _drain_reads(self) -> None:
+        """把读缓冲中的访问回放给策略（调用方持有策略锁）"""
+        buffer = self._read_buffer
+        while buffer:
+            try:
+                key, hit = buffer.popleft()
+            except IndexError:
+                break
+            self._policy.record_access(key, hit)
+
+    def _forget(self, keys) -> None:
+        """缓存侧已移除的键同步给策略"""
+        if self._policy is None:
+            return
+        with self._policy_lock:
+            for key in keys:
+                self._policy.on_remove(key)
+
+    def _drop_key(self, key: str) -> bool:
+        """按策略决定淘汰指定键（计入淘汰数）"""
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None or entry.path in shard.pins:
+                # 不存在，或在策略选出后被并发固定：固定条目不受策略淘汰
+                return False
+            shard.unlink(key)
+            shard.evictions += 1
+            if self._ns_cache is not None:
+                self._ns_cache.removeObjectForKey_(key)
+        logger.debug("Cache EVICT [%s]: %s (%s)", self.name, key, self._policy.name)
+        return True
+
+    def set_trace_recorder(self, recorder: CacheTraceRecorder | None) -> None:
+        """设置访问轨迹记录器（None 关闭），轨迹供 cache_policy.replay_trace 回放"""
+        self._trace = recorder
+
+    def set_mrc_estimator(self, estimator: MissRatioCurveEstimator | None) -> None:
+        """设置在线 MRC 估计器（None 关闭），按路径记录读写供 cache_mrc 估计各容量下的命中率"""
+        self._mrc = estimator
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        size_mb: float = 1.0,
+        tier: int | None = None,
+        full_resolution: bool | None = None,
+        pin_owner: str | None = None,
+    ):
+        """添加到缓存（按分辨率档位存储，同一路径的不同档位互不覆盖）
 
         Args:
-            key: 缓存键
+            key: 缓存键（图片路径）
             value: 缓存值
             size_mb: 值的内存大小(MB)
+            tier: 档位长边像素；None 时从图像尺寸推断（非图像值为 0）
+            full_resolution: 是否原图分辨率；False 标记为降采样档位（淘汰时享有宽限），
+                None 表示未知（按全分辨率对待）
+            pin_owner: 写入的同时由该持有者固定（与写入在同一分片锁内完成，其间不会被淘汰）
         """
-        with self._lock:
-            # 如果键已存在，先移除旧的（更新统计）
-            if key in self._item_sizes:
-                self._current_memory_mb -= self._item_sizes.pop(key)
-                self._item_count -= 1
-
+        if tier is None:
+            tier = _image_tier(value)
+        reduced = full_resolution is False and tier > 0
+        entry_key = _tier_key(key, tier)
+        shard = self._shard_for(key)
+        replaced = []
+        with shard.lock:
+            # 如果档位已存在，先移除旧的（更新统计）
+            shard.unlink(entry_key)
+            if tier > 0:
+                for other, other_key in list(shard.tiers.get(key, {}).items()):
+                    if other > 0 and abs(other - tier) <= tier * _TIER_DEDUP_RATIO:
+                        shard.unlink(other_key)
+                        replaced.append(other_key)
+                        if self._ns_cache is not None:
+                            self._ns_cache.removeObjectForKey_(other_key)
+            pinned = key in shard.pins
             if self._ns_cache is not None:
                 cost_bytes = int(size_mb * 1024 * 1024)
-                self._ns_cache.setObject_forKey_cost_(value, key, cost_bytes)
-            else:
-                self._items[key] = value
-                self._items.move_to_end(key)
-
-            self._item_sizes[key] = size_mb
-            self._item_count += 1
-            self._current_memory_mb += size_mb
-
-            # LRU 淘汰（OrderedDict 降级分支）：必须在计数更新后执行，
-            # 否则 while 条件看到的仍是旧计数，永远不会触发淘汰
-            if self._ns_cache is None:
-                self._evict_lru_if_needed()
+                self._ns_cache.setObject_forKey_cost_(value, entry_key, cost_bytes)
+                if pinned:
+                    shard.pin_refs[entry_key] = value
+                value = None
+            shard.insert(entry_key, _ShardEntry(key, tier, value, size_mb, next(self._clock), reduced))
+            held = self._pin_locked(shard, key, pin_owner) if pin_owner is not None else None
+            if held is not None:
+                replaced += held
+                pinned = True
+        if replaced:
+            self._forget(replaced)
+
+        if self._trace is not None:
+            self._trace.record("put", key, size_mb)
+        if self._mrc is not None:
+            self._mrc.record_put(key, size_mb)
+        if self._policy is not None:
+            # 准入策略：先回放积压的读取，再由策略决定淘汰（可能拒绝新条目本身）；
+            # 固定路径的档位不交给策略管理
+            with self._policy_lock:
+                self._drain_reads()
+                if not pinned:
+                    for victim in self._policy.on_insert(entry_key, size_mb):
+                        self._drop_key(victim)
+                self._evict_policy_overflow()
+        elif self._ns_cache is None:
+            # LRU 淘汰（OrderedDict 降级分支；NSCache 自行按上限驱逐）：
+            # 在释放分片锁后执行，淘汰其他分片时不嵌套持锁
+            self._evict_lru_if_needed()
 
     def remove(self, key: str) -> bool:
-        """移除缓存项
+        """移除缓存项（该路径的全部档位）
 
         Args:
             key: 缓存键
@@ -243,31 +768,216 @@ class SimpleImageCache:
         Returns:
             是否成功移除
         """
-        with self._lock:
-            if key in self._item_sizes:
-                self._current_memory_mb -= self._item_sizes.pop(key)
-                self._item_count -= 1
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.pins.pop(key, None)
+            keys = list(shard.tiers.get(key, {}).values())
+            for entry_key in keys:
+                shard.unlink(entry_key)
                 if self._ns_cache is not None:
-                    self._ns_cache.removeObjectForKey_(key)
-                else:
-                    self._items.pop(key, None)
-                logger.debug("Cache REMOVE [%s]: %s", self.name, key)
-                return True
+                    self._ns_cache.removeObjectForKey_(entry_key)
+        if not keys:
             return False
+        self._forget(keys)
+        logger.debug("Cache REMOVE [%s]: %s (%d tiers)", self.name, key, len(keys))
+        return True
 
     def clear(self):
         """清空缓存"""
-        with self._lock:
-            count = self._item_count
-            memory = self._current_memory_mb
+        count = 0
+        memory = 0.0
+        for shard in self._shards:
+            with shard.lock:
+                count += len(shard.entries)
+                memory += shard.memory_mb
+                shard.entries.clear()
+                for lru in shard.lru:
+                    lru.clear()
+                shard.tiers.clear()
+                shard.pins.clear()
+                shard.pin_refs.clear()
+                shard.memory_mb = 0.0
+        if self._ns_cache is not None:
+            self._ns_cache.removeAllObjects()
+        if self._policy is not None:
+            with self._policy_lock:
+                self._read_buffer.clear()
+                self._policy.clear()
+        logger.info("Cache CLEAR [%s]: removed %s items, freed %.2fMB", self.name, count, memory)
+
+    # ------------------------------------------------------------------
+    # 固定（引用计数常驻）
+    # ------------------------------------------------------------------
+    def pin(self, key: str, owner: str = PIN_OWNER_NEIGHBOR) -> bool:
+        """固定路径的全部档位（引用计数，同一持有者可多次固定）
+
+        固定条目仍计入条目数与内存预算，但不会被 LRU/准入策略淘汰；NSCache 模式下
+        额外持有强引用，系统自动驱逐后仍可命中。
+
+        Args:
+            key: 缓存键（图片路径）
+            owner: 持有者（决定紧急回收时的解除顺序，见 PIN_PRIORITIES）
+
+        Returns:
+            是否已固定（路径不在缓存中返回 False）
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            held = self._pin_locked(shard, key, owner)
+        if held is None:
+            return False
+        if held:
+            self._forget(held)
+        return True
+
+    def _pin_locked(self, shard: _CacheShard, key: str, owner: str) -> list[str] | None:
+        """查找并固定路径（调用方持分片锁，查找与固定之间不会被淘汰）
+
+        Returns:
+            首次固定时移出 LRU 的档位条目键（需同步给策略）；路径不在缓存中
+            （NSCache 模式下档位对象均已被系统驱逐）返回 None
+        """
+        if not shard.tiers.get(key):
+            return None
+        owners = shard.pins.get(key)
+        held = []
+        if owners is None:
+            refs = {}
             if self._ns_cache is not None:
-                self._ns_cache.removeAllObjects()
-            else:
-                self._items.clear()
-            self._item_sizes.clear()
-            self._item_count = 0
-            self._current_memory_mb = 0.0
-            logger.info("Cache CLEAR [%s]: removed %s items, freed %.2fMB", self.name, count, memory)
+                for entry_key in shard.tiers[key].values():
+                    value = self._ns_cache.objectForKey_(entry_key)
+                    if value is not None:
+                        refs[entry_key] = value
+                if not refs:
+                    return None
+            owners = shard.pins[key] = {}
+            held = shard.hold(key)
+            shard.pin_refs.update(refs)
+        owners[owner] = owners.get(owner, 0) + 1
+        return held
+
+    def unpin(self, key: str, owner: str = PIN_OWNER_NEIGHBOR) -> bool:
+        """释放一次固定；最后一个引用释放后档位恢复为可淘汰
+
+        Returns:
+            该持有者此前是否持有固定
+        """
+        shard = self._shard_for(key)
+        released = []
+        with shard.lock:
+            owners = shard.pins.get(key)
+            if not owners or owner not in owners:
+                return False
+            owners[owner] -= 1
+            if owners[owner] <= 0:
+                del owners[owner]
+            if not owners:
+                released = shard.release(key)
+        if released:
+            self._readmit(released)
+        return True
+
+    def unpin_owner(self, owner: str, keep=()) -> int:
+        """解除某持有者在 keep 之外路径上的全部固定（不论引用计数）
+
+        Returns:
+            被解除的路径数
+        """
+        keep = set(keep)
+        return self._strip_pins(lambda path, o: o == owner and path not in keep)
+
+    def force_unpin(self, max_priority: int = 0) -> int:
+        """紧急模式：强制解除优先级数值大于 max_priority 的持有者的全部固定
+
+        例如 force_unpin(PIN_PRIORITIES[PIN_OWNER_CURRENT]) 只保留当前图片。
+
+        Returns:
+            被解除的 (路径, 持有者) 数
+        """
+        return self._strip_pins(lambda _path, o: PIN_PRIORITIES.get(o, _PIN_PRIORITY_DEFAULT) > max_priority)
+
+    def unpin_all(self) -> int:
+        """解除全部固定（切换文件夹/关闭时）"""
+        return self._strip_pins(lambda _path, _owner: True)
+
+    def _strip_pins(self, should_strip: Callable[[str, str], bool]) -> int:
+        stripped = 0
+        released = []
+        for shard in self._shards:
+            with shard.lock:
+                for path, owners in list(shard.pins.items()):
+                    for owner in [o for o in owners if should_strip(path, o)]:
+                        del owners[owner]
+                        stripped += 1
+                    if not owners:
+                        released += shard.release(path)
+        if released:
+            self._readmit(released)
+        return stripped
+
+    def _readmit(self, released: list[tuple[str, float]]) -> None:
+        """解除固定的档位重新交给淘汰机制（可能立即触发超额淘汰）"""
+        if self._policy is not None:
+            with self._policy_lock:
+                self._drain_reads()
+                for entry_key, size_mb in released:
+                    for victim in self._policy.on_insert(entry_key, size_mb):
+                        self._drop_key(victim)
+                self._evict_policy_overflow()
+        elif self._ns_cache is None:
+            self._evict_lru_if_needed()
+
+    def is_pinned(self, key: str, owner: str | None = None) -> bool:
+        """路径是否被固定（owner 指定时仅看该持有者）"""
+        owners = self._shard_for(key).pins.get(key)
+        return bool(owners) and (owner is None or owner in owners)
+
+    def pinned_paths(self, owner: str | None = None) -> list[str]:
+        """被固定的路径（owner 指定时仅列出该持有者的）"""
+        paths = []
+        for shard in self._shards:
+            with shard.lock:
+                paths += [p for p, owners in shard.pins.items() if owner is None or owner in owners]
+        return paths
+
+    def _evict_policy_overflow(self) -> None:
+        """准入策略模式：固定档位不受策略管理，总量（含固定字节）超限时继续按策略淘汰（调用方持策略锁）"""
+        count, memory = self._totals()
+        while count > self.max_items or memory > self.max_memory_mb:
+            victims = self._policy.pop_victims(1)
+            if not victims:
+                break
+            for victim in victims:
+                self._drop_key(victim)
+            count, memory = self._totals()
+
+    def _pop_global_oldest(self) -> tuple[str, _ShardEntry] | None:
+        """淘汰全局最久未用条目（调用方持有 _evict_lock）
+
+        降采样档位的访问时钟加 reduced_tier_bonus 宽限参与比较，同龄时先淘汰全分辨率档位。
+
+        Returns:
+            (被淘汰的键, 条目)；缓存为空返回 None
+        """
+        while True:
+            victim = None
+            victim_tick = None
+            for shard in self._shards:
+                if not shard.entries:
+                    continue
+                tick = shard.oldest_tick(self.reduced_tier_bonus)
+                if tick is not None and (victim_tick is None or tick < victim_tick):
+                    victim, victim_tick = shard, tick
+            if victim is None:
+                return None
+            popped = victim.pop_oldest(self.reduced_tier_bonus)
+            if popped is None:
+                # 比较期间该分片被并发清空：重新选择
+                continue
+            victim.evictions += 1
+            if self._ns_cache is not None:
+                self._ns_cache.removeObjectForKey_(popped[0])
+            return popped
 
     def evict_oldest(self, count: int = 1) -> int:
         """从 LRU 端淘汰 count 个条目（NSCache 与 OrderedDict 分支通用）
@@ -275,7 +985,7 @@ class SimpleImageCache:
         修复说明 (v2.8.0)：旧实现仅在 count >= 条目总数时才清空，导致
         ImageManager 的清理函数（evict_oldest(size-1) 等"保留 N 项"调用）
         在正常规模下永远空转，缓存强引用无法释放。现改为真正淘汰 count 个
-        LRU 端条目；NSCache 分支以 _item_sizes 的插入/命中顺序近似 LRU。
+        LRU 端条目；NSCache 分支以分片内的命中顺序与全局访问时钟确定 LRU。
 
         Args:
             count: 要淘汰的条目数（<=0 时无动作）
@@ -283,100 +993,161 @@ class SimpleImageCache:
         Returns:
             实际淘汰的条目数
         """
-        with self._lock:
-            evicted = 0
-            for key in list(self._item_sizes.keys())[: max(0, count)]:
-                self._current_memory_mb -= self._item_sizes.pop(key)
-                self._item_count -= 1
-                if self._ns_cache is not None:
-                    self._ns_cache.removeObjectForKey_(key)
-                else:
-                    self._items.pop(key, None)
-                evicted += 1
+        evicted = 0
+        if self._policy is not None:
+            # 准入策略：按策略价值从低到高淘汰（试用段 → 窗口 → 保护段）
+            with self._policy_lock:
+                self._drain_reads()
+                for key in self._policy.pop_victims(max(0, count)):
+                    evicted += self._drop_key(key)
             if evicted:
-                self._evictions += evicted
                 logger.debug("Cache EVICT_OLDEST [%s]: evicted %d items", self.name, evicted)
             return evicted
+        with self._evict_lock:
+            while evicted < count and self._pop_global_oldest() is not None:
+                evicted += 1
+        if evicted:
+            logger.debug("Cache EVICT_OLDEST [%s]: evicted %d items", self.name, evicted)
+        return evicted
 
     def _evict_lru_if_needed(self):
         """OrderedDict 降级实现：超出限制时淘汰最旧项"""
-        while self._item_count > self.max_items or self._current_memory_mb > self.max_memory_mb:
-            if not self._items:
-                break
-            oldest_key, _ = self._items.popitem(last=False)
-            if oldest_key in self._item_sizes:
-                self._current_memory_mb -= self._item_sizes.pop(oldest_key)
-                self._item_count -= 1
-                self._evictions += 1
-                logger.debug("Cache EVICT [%s]: %s (LRU)", self.name, oldest_key)
+        count, memory = self._totals()
+        if count <= self.max_items and memory <= self.max_memory_mb:
+            return
+        with self._evict_lock:
+            # 持有淘汰锁后重新求和一次，之后按淘汰条目本地递减，不再逐片求和
+            count, memory = self._totals()
+            while count > self.max_items or memory > self.max_memory_mb:
+                popped = self._pop_global_oldest()
+                if popped is None:
+                    break
+                key, entry = popped
+                count -= 1
+                memory -= entry.size_mb
+                logger.debug("Cache EVICT [%s]: %s (LRU)", self.name, key)
+
+    def resize(self, max_items: int, max_memory_mb: float) -> int:
+        """调整容量上限（容量自动调优用）；缩容时立即淘汰超出部分
+
+        Returns:
+            因缩容淘汰的条目数
+        """
+        self.max_items = max(1, int(max_items))
+        self.max_memory_mb = float(max_memory_mb)
+        self.reduced_tier_bonus = self.max_items
+        if self._ns_cache is not None:
+            self._ns_cache.setCountLimit_(self.max_items)
+            self._ns_cache.setTotalCostLimit_(int(self.max_memory_mb * 1024 * 1024))
+        if self._mrc is not None:
+            self._mrc.set_capacity(self.max_items, self.max_memory_mb)
+
+        before = len(self)
+        if self._policy is not None:
+            with self._policy_lock:
+                self._drain_reads()
+                for victim in self._policy.resize(self.max_items, self.max_memory_mb):
+                    self._drop_key(victim)
+                self._evict_policy_overflow()
+        else:
+            self._evict_lru_if_needed()
+        evicted = max(0, before - len(self))
+        logger.info(
+            "SimpleImageCache '%s' resized: max_items=%d, max_memory=%.0fMB, evicted=%d",
+            self.name,
+            self.max_items,
+            self.max_memory_mb,
+            evicted,
+        )
+        return evicted
 
     def get_current_memory_mb(self) -> float:
         """获取当前缓存内存使用量（MB）"""
-        with self._lock:
-            return self._current_memory_mb
+        return self._totals()[1]
 
     def reconcile(self) -> int:
         """对账 NSCache 实际持有对象与内部记账，修正自动驱逐导致的漂移
 
-        NSCache 在系统内存压力或成本上限触发时会自动驱逐对象，
-        此时内部 _item_sizes/_item_count/_current_memory_mb 不会同步更新，
-        会导致内存清理阈值判断失真。定期调用（如内存检查周期）可恢复准确性。
+        NSCache 在系统内存压力或成本上限触发时会自动驱逐对象，此时分片记账
+        不会同步更新。对账由后台扫描线程定期执行（也可手动调用）：逐片在锁内
+        快照条目，锁外探测 NSCache，再仅移除未被并发覆盖的失效条目，
+        探测期间不阻塞读写线程。
 
         Returns:
             本次修正（剔除）的条目数
         """
-        with self._lock:
-            if self._ns_cache is None or not self._item_sizes:
-                return 0
-            stale = [k for k in list(self._item_sizes) if self._ns_cache.objectForKey_(k) is None]
-            for k in stale:
-                self._current_memory_mb -= self._item_sizes.pop(k)
-                self._item_count -= 1
-                self._evictions += 1
-            if stale:
-                logger.debug(
-                    "Cache RECONCILE [%s]: removed %d stale entries, memory %.1fMB",
-                    self.name,
-                    len(stale),
-                    self._current_memory_mb,
-                )
-            return len(stale)
+        if self._ns_cache is None:
+            return 0
+        removed = []
+        for shard in self._shards:
+            with shard.lock:
+                snapshot = list(shard.entries.items())
+            for key, entry in snapshot:
+                if self._ns_cache.objectForKey_(key) is None and shard.drop_if_same(key, entry):
+                    removed.append(key)
+        self._forget(removed)
+        if removed:
+            logger.debug(
+                "Cache RECONCILE [%s]: removed %d stale entries, memory %.1fMB",
+                self.name,
+                len(removed),
+                self.get_current_memory_mb(),
+            )
+        return len(removed)
 
     def get_stats(self) -> dict:
-        """获取缓存统计信息
+        """获取缓存统计信息（增量计数求和，不遍历条目、不对账）
 
         Returns:
             统计信息字典
         """
-        with self._lock:
-            # 先对账，确保内存/条目统计反映 NSCache 实际状态
-            self.reconcile()
-
-            total_requests = self._hits + self._misses
-            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0.0
-
-            return {
-                "name": self.name,
-                "size": self._item_count,
-                "max_items": self.max_items,
-                "memory_mb": round(self._current_memory_mb, 2),
-                "max_memory_mb": self.max_memory_mb,
-                "memory_usage_pct": round((self._current_memory_mb / self.max_memory_mb * 100), 2)
-                if self.max_memory_mb > 0
-                else 0.0,
-                "hits": self._hits,
-                "misses": self._misses,
-                "hit_rate_pct": round(hit_rate, 2),
-                "evictions": self._evictions,
-            }
+        count, memory = self._totals()
+        hits = sum(s.hits for s in self._shards)
+        misses = sum(s.misses for s in self._shards)
+        evictions = sum(s.evictions for s in self._shards)
+        total_requests = hits + misses
+        hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0.0
+
+        stats = {
+            "name": self.name,
+            "size": count,
+            "max_items": self.max_items,
+            "memory_mb": round(memory, 2),
+            "max_memory_mb": self.max_memory_mb,
+            "memory_usage_pct": round((memory / self.max_memory_mb * 100), 2) if self.max_memory_mb > 0 else 0.0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate_pct": round(hit_rate, 2),
+            "evictions": evictions,
+            "shards": len(self._shards),
+            "paths": sum(len(s.tiers) for s in self._shards),
+            "reduced_tiers": sum(len(s.lru[1]) for s in self._shards),
+            "derived": sum(s.derives for s in self._shards),
+            "pinned": sum(len(s.pins) for s in self._shards),
+            "pinned_mb": round(self._pinned_mb(), 2),
+            "policy": POLICY_LRU,
+        }
+        if self._policy is not None:
+            stats.update(self._policy.get_stats())
+        return stats
+
+    def _pinned_mb(self) -> float:
+        total = 0.0
+        for shard in self._shards:
+            if not shard.pins:
+                continue
+            with shard.lock:
+                for path in shard.pins:
+                    total += sum(shard.entries[k].size_mb for k in shard.tiers.get(path, {}).values())
+        return total
 
     def __len__(self) -> int:
         """返回缓存项数量"""
-        return self._item_count
+        return self._totals()[0]
 
     def __contains__(self, key: str) -> bool:
-        """检查键是否存在"""
-        return key in self._item_sizes
+        """检查路径是否有任一档位"""
+        return key in self._shard_for(key).tiers
 
     def __repr__(self) -> str:
         stats = self.get_stats()
@@ -388,6 +1159,54 @@ class SimpleImageCache:
         )
 
 
+class _ReconcileSweeper:
+    """NSCache 记账对账的后台扫描线程（进程内共享一个，弱引用持有各缓存）
+
+    首个 NSCache 分支的缓存注册时启动；缓存被回收后自动退出扫描集合，
+    集合为空时线程退出。
+    """
+
+    def __init__(self, interval_s: float = _RECONCILE_INTERVAL_S):
+        self.interval_s = interval_s
+        self._caches: weakref.WeakSet = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, cache: "SimpleImageCache") -> None:
+        with self._lock:
+            self._caches.add(cache)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="SimpleCacheReconcile", daemon=True)
+                self._thread.start()
+
+    def sweep(self) -> int:
+        """对全部已注册缓存执行一次对账，返回修正条目总数"""
+        with self._lock:
+            caches = list(self._caches)
+        removed = 0
+        for cache in caches:
+            try:
+                removed += cache.reconcile()
+            except Exception:
+                logger.debug("Cache reconcile sweep failed [%s]", getattr(cache, "name", "?"), exc_info=True)
+        return removed
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.interval_s)
+            self._wakeup.clear()
+            with self._lock:
+                # 已注册的缓存全部被回收：线程退出，下次注册时重新启动
+                if not self._caches:
+                    self._thread = None
+                    return
+            self.sweep()
+
+
+_reconcile_sweeper = _ReconcileSweeper()
+
+
 # 全局缓存实例（单例模式）
 _global_cache: SimpleImageCache | None = None
 _global_cache_lock = threading.Lock()
@@ -540,24 +1359,23 @@ class BidirectionalCachePool(SimpleImageCache):
 
         super().__init__(*args, **kwargs)
 
-        # 内部状态
-        self._current_sequence = []
+        # 内部状态：序列与 window.images 共享同一 ImageSequence，
+        # 精选/撤回增删后无需重建 path -> index 映射（index_of 为 O(log n)）
+        self._current_sequence: ImageSequence = ImageSequence()
         self._current_index = -1
-        # path -> index 映射：避免每次导航都做 O(n) list.index()
-        # （大文件夹场景每次按键会带来主线程毫秒级字符串比较）
-        self._path_to_index: dict[str, int] = {}
 
         logger.debug("Using BidirectionalCachePool (compatibility mode)")
 
     def set_current_image_sync(self, image_path: str, sync_key: str) -> None:
         """设置当前图片（兼容方法，O(1) 索引查找）"""
         try:
-            if image_path in self._path_to_index:
-                self._current_index = self._path_to_index[image_path]
-            elif image_path in self._current_sequence:
-                # 防御性回退：正常应命中缓存，这里避免重复 O(n)
-                self._current_index = self._current_sequence.index(image_path)
-                self._path_to_index[image_path] = self._current_index
+            sequence = self._current_sequence
+            if isinstance(sequence, ImageSequence):
+                index = sequence.index_of(image_path)
+            else:
+                index = sequence.index(image_path) if image_path in sequence else None
+            if index is not None:
+                self._current_index = index
         except Exception:
             pass
 
@@ -566,11 +1384,14 @@ class BidirectionalCachePool(SimpleImageCache):
         # 简化：不做实际预加载，只记录设置
 
     def set_sequence(self, images: list) -> None:
-        """设置图片序列（兼容方法）"""
-        self._current_sequence = images if images else []
-        self._path_to_index = {}
-        if images:
-            self._path_to_index = {p: i for i, p in enumerate(images)}
+        """设置图片序列（兼容方法）
+
+        传入 ImageSequence 时直接共享（O(1)），普通列表转换一次。
+        """
+        if isinstance(images, ImageSequence):
+            self._current_sequence = images
+        else:
+            self._current_sequence = ImageSequence(images or ())
         self._current_index = 0 if images else -1
 
     def shutdown(self) -> None:
@@ -580,14 +1401,22 @@ class BidirectionalCachePool(SimpleImageCache):
 
 
 __all__ = [
+    "PIN_OWNER_CURRENT",
+    "PIN_OWNER_NEIGHBOR",
+    "PIN_OWNER_ZOOM",
+    "PIN_PRIORITIES",
+    "TARGET_BUCKETS",
     # 向后兼容
     "AdvancedImageCache",
     "BidirectionalCachePool",
     "CacheEntry",
     "SimpleImageCache",
+    "TierHit",
     "UnifiedCacheManager",
     "estimate_image_memory_mb",
     "get_global_cache",
     "image_pixel_dimensions",
+    "quantize_target_size",
+    "resample_image",
     "reset_global_cache",
 ]
@@ -16,6 +16,9 @@ from typing import Any
 from ..config.manager import get_config
 from .enhanced_logging import LogCategory, LogLevel, get_enhanced_logger
 from .error_handling import ErrorCategory, error_context
+from .range_cache import get_range_cache
+from .read_ahead_arena import DEFAULT_SLAB_BYTES, ReadAheadArena
+from .remote_fetch import FETCH_BACKGROUND, FETCH_FOREGROUND, fetched_bytes, get_fetch_coordinator, remote_file_key
 from .remote_file_detector import MountType, get_remote_detector
 
 
@@ -80,11 +83,11 @@ class SMBOptimizer:
         self.directory_cache: dict[str, tuple[list[str], float]] = {}
         self.directory_cache_lock = threading.RLock()
 
-        # 预读缓冲（大小限制防止长时间运行无限增长）
-        self.read_ahead_cache: dict[str, bytes] = {}
-        self.read_ahead_lock = threading.RLock()
-        self._MAX_READ_AHEAD_ENTRIES = 50  # 最多缓存 50 个文件的预读数据
-        self._MAX_READ_AHEAD_MEMORY_MB = 100  # 预读数据总内存上限 100MB
+        # 预读缓冲：预留的 mmap 内存池，按字节预算 LRU 淘汰（见 core/read_ahead_arena）
+        self.read_ahead_arena = ReadAheadArena(
+            get_config("smb.read_ahead_arena_mb", 100) * 1024 * 1024,
+            get_config("smb.read_ahead_slab_kb", DEFAULT_SLAB_BYTES // 1024) * 1024,
+        )
 
         # 性能统计
         self.stats = {
@@ -261,13 +264,17 @@ class SMBOptimizer:
             self.logger.log_error(e, "directory_listing_cache")
             return []
 
-    def preload_file_data(self, file_path: str, size: int | None = None) -> bool:
+    def preload_file_data(self, file_path: str, size: int | None = None, priority: int = FETCH_BACKGROUND) -> bool:
         """
         预加载文件数据到缓存
 
+        经全局读取协调器（见 core/remote_fetch）执行：整文件预读与同一文件的缓存
+        填充、直读共享一次网络读取；前缀预读经区间缓存。
+
         Args:
             file_path: 文件路径
             size: 预加载大小，None表示整个文件
+            priority: FETCH_FOREGROUND 或 FETCH_BACKGROUND
 
         Returns:
             bool: 是否成功预加载
@@ -278,42 +285,81 @@ class SMBOptimizer:
                     return False
 
                 # 检查是否已缓存
-                with self.read_ahead_lock:
-                    if file_path in self.read_ahead_cache:
-                        return True
+                if file_path in self.read_ahead_arena:
+                    return True
 
-                # 读取文件数据
-                start_time = time.perf_counter()
-                try:
-                    with open(file_path, "rb") as f:
-                        data = f.read() if size is None else f.read(size)
-                except (OSError, PermissionError) as e:
-                    self.logger.log_error(e, f"file_preload_{file_path}")
-                    return False
+                coordinator = get_fetch_coordinator()
+                if size is not None:
+                    return coordinator.fetch(
+                        ("read_ahead", file_path, size), lambda: self._read_ahead_prefix(file_path, size), priority
+                    )
+                # 整文件：与缓存填充、直读共用一次网络读取
+                result = coordinator.fetch(
+                    remote_file_key(file_path), lambda: self._read_file_bytes(file_path), priority
+                )
+                return self._store_read_ahead(file_path, result)
 
-                end_time = time.perf_counter()
-                latency_ms = (end_time - start_time) * 1000
+        except Exception as e:
+            self.logger.log_error(e, "file_preload")
+            return False
 
-                # 缓存数据（带大小上限保护）
-                with self.read_ahead_lock:
-                    self.read_ahead_cache[file_path] = data
-                    self._evict_read_ahead_if_needed()
+    def _read_ahead_prefix(self, file_path: str, size: int) -> bool:
+        """读取文件前缀并放入预读缓冲（在读取协调器中执行）
 
-                self.logger.log(
-                    LogLevel.DEBUG,
-                    LogCategory.PERFORMANCE,
-                    f"File preloaded: {file_path} ({len(data)} bytes, {latency_ms:.2f}ms)",
-                )
+        前缀经区间缓存读取：再次浏览时从本地稀疏文件读取，不再走网络。
+        """
+        # 排队期间可能已由其他预读完成
+        if file_path in self.read_ahead_arena:
+            return True
 
-                return True
+        start_time = time.perf_counter()
+        try:
+            stored = self.read_ahead_arena.put(file_path, get_range_cache().read(file_path, 0, size))
+        except OSError as e:
+            self.logger.log_error(e, f"file_preload_{file_path}")
+            return False
+        self._log_read_ahead(file_path, stored, start_time)
+        return stored
 
-        except Exception as e:
-            self.logger.log_error(e, "file_preload")
+    def _store_read_ahead(self, file_path: str, result: Any) -> bool:
+        """把整文件读取结果放入预读缓冲；超出内存池容量时不缓存并返回 False
+
+        结果为本地缓存副本路径时经 readinto 从本地盘直接读入内存池，为文件内容时
+        复制进内存池。
+        """
+        if file_path in self.read_ahead_arena:
+            return True
+
+        start_time = time.perf_counter()
+        try:
+            if isinstance(result, str):
+                stored = self.read_ahead_arena.load_file(file_path, result)
+            elif isinstance(result, bytes):
+                stored = self.read_ahead_arena.put(file_path, result)
+            else:
+                stored = False
+        except OSError as e:
+            self.logger.log_error(e, f"file_preload_{file_path}")
             return False
+        self._log_read_ahead(file_path, stored, start_time)
+        return stored
+
+    def _log_read_ahead(self, file_path: str, stored: bool, start_time: float) -> None:
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.logger.log(
+            LogLevel.DEBUG,
+            LogCategory.PERFORMANCE,
+            f"File preloaded: {file_path} (stored={stored}, {latency_ms:.2f}ms)",
+        )
+
+    @staticmethod
+    def _read_file_bytes(file_path: str) -> bytes:
+        with open(file_path, "rb") as f:
+            return f.read()
 
     def get_cached_file_data(self, file_path: str) -> bytes | None:
         """
-        获取缓存的文件数据
+        获取缓存的文件数据（从内存池复制为 bytes）
 
         Args:
             file_path: 文件路径
@@ -321,42 +367,29 @@ class SMBOptimizer:
         Returns:
             Optional[bytes]: 缓存的数据，如果不存在则返回None
         """
-        with self.read_ahead_lock:
-            return self.read_ahead_cache.get(file_path)
+        buf = self.read_ahead_arena.acquire(file_path)
+        if buf is None:
+            return None
+        with buf:
+            return buf.tobytes()
 
     def get_performance_stats(self) -> dict[str, Any]:
         """获取性能统计信息"""
         with self.stats_lock:
-            return self.stats.copy()
+            stats = self.stats.copy()
+        stats["read_ahead"] = self.read_ahead_arena.get_stats()
+        return stats
 
     def shutdown(self):
         """关闭线程池，释放资源"""
         self.executor.shutdown(wait=False)
-        with self.read_ahead_lock:
-            self.read_ahead_cache.clear()
-
-    def _evict_read_ahead_if_needed(self) -> None:
-        """预读缓存大小保护：超过上限时淘汰最旧条目"""
-        cache = self.read_ahead_cache
-        if len(cache) <= self._MAX_READ_AHEAD_ENTRIES:
-            total_mb = sum(len(v) for v in cache.values()) / (1024 * 1024)
-            if total_mb <= self._MAX_READ_AHEAD_MEMORY_MB:
-                return
-        # LRU 淘汰：移除最旧的条目直到满足限制
-        keys = list(cache.keys())
-        while len(cache) > self._MAX_READ_AHEAD_ENTRIES or (
-            cache and sum(len(v) for v in cache.values()) / (1024 * 1024) > self._MAX_READ_AHEAD_MEMORY_MB
-        ):
-            if not keys:
-                break
-            cache.pop(keys.pop(0), None)
+        self.read_ahead_arena.clear()
 
     def clear_cache(self):
         """清空所有缓存"""
         with self.directory_cache_lock:
             self.directory_cache.clear()
-        with self.read_ahead_lock:
-            self.read_ahead_cache.clear()
+        self.read_ahead_arena.clear()
 
         self.logger.log(LogLevel.INFO, LogCategory.SYSTEM, "SMB optimizer cache cleared")
 
@@ -369,11 +402,16 @@ class SMBOptimizer:
             return False
 
     def _read_single_file(self, file_path: str) -> ReadResult:
-        """读取单个文件"""
+        """读取单个文件（与同一文件的缓存填充、直读、预读共享一次网络读取）"""
         start_time = time.perf_counter()
         try:
-            with open(file_path, "rb") as f:
-                data = f.read()
+            result = get_fetch_coordinator().fetch(
+                remote_file_key(file_path), lambda: self._read_file_bytes(file_path), FETCH_FOREGROUND
+            )
+            data = fetched_bytes(result)
+            if data is None:
+                # 加入的缓存填充失败或副本已被淘汰：直接读取
+                data = self._read_file_bytes(file_path)
 
             end_time = time.perf_counter()
             latency_ms = (end_time - start_time) * 1000
@@ -0,0 +1,231 @@
+"""
+图片排序方式（可插拔，排序键每个文件只计算一次）
+
+目录内图片此前按码位 ``images.sort()`` 排序，相机导出的 IMG_2.jpg 会排在
+IMG_10.jpg 之后；若改用逐次比较的 key 函数（每次比较都重新解析文件名/读
+EXIF），在 2 万张的目录上会非常慢。本模块：
+
+- 以注册表管理排序方式：name（码位，旧行为）/ natural（自然排序，默认）/
+  mtime / exif（拍摄时间）/ size，可通过 register_sort_order 扩展
+- 每种排序方式由"键构建器"一次性为整个目录生成排序键（每个文件只算一次），
+  再按键排序下标；排序结果由 DirectoryImageListCache 按 (目录, 排序方式)
+  缓存，切换排序方式命中缓存时无需重新排序
+- exif 键来自 MetadataIndex 中持久化的拍摄时间（跨启动复用），缺失的文件
+  批量探测头部后写回；无 EXIF 时间的文件以 mtime 代替，与有拍摄时间的
+  文件按同一时间轴交错
+
+自然排序键：数字段按数值比较（前导零更多者在后），文本段 casefold 后经
+locale.strxfrm 转换（遵循当前区域设置的排序规则）。
+
+Author: PlookingII Team
+"""
+
+import locale
+import logging
+import os
+import re
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import replace
+
+from ..config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+SORT_NAME = "name"
+SORT_NATURAL = "natural"
+SORT_MTIME = "mtime"
+SORT_EXIF = "exif"
+SORT_SIZE = "size"
+
+DEFAULT_SORT_ORDER = SORT_NATURAL
+
+# 键构建器：(目录, 路径列表, 已知文件信息 path → FileInfo) → 与路径一一对应的排序键
+KeyBuilder = Callable[[str, list[str], Mapping], list]
+
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+def _collate(text: str) -> str:
+    try:
+        return locale.strxfrm(text)
+    except (ValueError, OSError):
+        return text
+
+
+def natural_key(name: str) -> tuple:
+    """自然排序键：数字段按数值、文本段按区域排序规则（不区分大小写）
+
+    各段带类型标记 (0=数字, 1=文本)，数字段与文本段之间不会发生跨类型比较。
+    """
+    key = []
+    for i, part in enumerate(_DIGITS_RE.split(name)):
+        if i % 2:
+            key.append((0, int(part), len(part)))
+        elif part:
+            key.append((1, _collate(part.casefold())))
+    return tuple(key)
+
+
+def folder_sort_key(path: str) -> tuple:
+    """文件夹排序键：按文件夹名自然排序，名称相同时按完整路径稳定排序"""
+    name = os.path.basename(path.rstrip(os.sep))
+    return (natural_key(name), name, path)
+
+
+def _file_stat(path: str, infos: Mapping) -> tuple[float, int]:
+    """(mtime, size)：优先使用扫描阶段已得到的文件信息，缺失时 stat"""
+    info = infos.get(path)
+    if info is not None and getattr(info, "exists", False):
+        return info.mtime, info.size_bytes
+    try:
+        st = os.stat(path)
+        return st.st_mtime, st.st_size
+    except OSError:
+        return 0.0, 0
+
+
+def _natural_file_key(path: str) -> tuple:
+    name = os.path.basename(path)
+    return (natural_key(name), name)
+
+
+def _name_keys(dir_path: str, paths: list[str], infos: Mapping) -> list:
+    return list(paths)
+
+
+def _natural_keys(dir_path: str, paths: list[str], infos: Mapping) -> list:
+    return [_natural_file_key(p) for p in paths]
+
+
+def _mtime_keys(dir_path: str, paths: list[str], infos: Mapping) -> list:
+    return [(_file_stat(p, infos)[0], _natural_file_key(p)) for p in paths]
+
+
+def _size_keys(dir_path: str, paths: list[str], infos: Mapping) -> list:
+    return [(_file_stat(p, infos)[1], _natural_file_key(p)) for p in paths]
+
+
+def _mtime_as_exif(mtime: float) -> str:
+    """mtime → EXIF 时间格式（本地时间），使无 EXIF 的文件与拍摄时间同轴比较"""
+    try:
+        return time.strftime("%Y:%m:%d %H:%M:%S", time.localtime(mtime))
+    except (OverflowError, OSError, ValueError):
+        return ""
+
+
+def load_capture_times(dir_path: str, names: list[str]) -> dict[str, str]:
+    """读取目录内文件的拍摄时间（索引命中直接返回，缺失的探测头部后写回）
+
+    Returns:
+        文件名 → 拍摄时间；已探测但无 EXIF 时间为空串，不可访问的文件缺失
+    """
+    from .image_header import read_image_headers
+    from .metadata_index import FileMeta, get_metadata_index
+
+    index = get_metadata_index()
+    fresh, stale = index.refresh_dir(dir_path, names)
+    result = {name: meta.capture_time for name, meta in fresh.items() if meta.capture_time is not None}
+    pending = [n for n in names if n not in result and (n in fresh or n in stale)]
+    if not pending:
+        return result
+
+    headers = read_image_headers([os.path.join(dir_path, n) for n in pending])
+    rows = []
+    for name in pending:
+        header = headers.get(os.path.join(dir_path, name))
+        capture_time = (header.capture_time if header is not None else None) or ""
+        result[name] = capture_time
+        meta = fresh.get(name)
+        if meta is not None:
+            rows.append(replace(meta, capture_time=capture_time))
+        elif header is not None:
+            size, mtime_ns = stale[name]
+            rows.append(
+                FileMeta(
+                    name,
+                    size,
+                    mtime_ns,
+                    header.width,
+                    header.height,
+                    header.orientation,
+                    header.has_alpha,
+                    header.has_mpf,
+                    capture_time,
+                )
+            )
+        else:
+            size, mtime_ns = stale[name]
+            rows.append(FileMeta(name, size, mtime_ns, capture_time=capture_time))
+    index.upsert_many(dir_path, rows)
+    return result
+
+
+def _exif_keys(dir_path: str, paths: list[str], infos: Mapping) -> list:
+    try:
+        capture = load_capture_times(dir_path, [os.path.basename(p) for p in paths])
+    except Exception:
+        logger.debug("读取拍摄时间失败，按 mtime 排序: %s", dir_path, exc_info=True)
+        capture = {}
+    keys = []
+    for p in paths:
+        stamp = capture.get(os.path.basename(p)) or _mtime_as_exif(_file_stat(p, infos)[0])
+        keys.append((stamp, _natural_file_key(p)))
+    return keys
+
+
+_registry: dict[str, KeyBuilder] = {
+    SORT_NAME: _name_keys,
+    SORT_NATURAL: _natural_keys,
+    SORT_MTIME: _mtime_keys,
+    SORT_EXIF: _exif_keys,
+    SORT_SIZE: _size_keys,
+}
+
+
+def register_sort_order(name: str, builder: KeyBuilder) -> None:
+    """注册（或覆盖）排序方式"""
+    _registry[name] = builder
+
+
+def available_sort_orders() -> tuple[str, ...]:
+    """已注册的排序方式"""
+    return tuple(_registry)
+
+
+def is_sort_order(name: str) -> bool:
+    return name in _registry
+
+
+def sort_paths(dir_path: str, paths: list[str], order: str = DEFAULT_SORT_ORDER, infos: Mapping | None = None) -> list:
+    """按排序方式排序目录内的文件路径（每个文件的排序键只计算一次）
+
+    Args:
+        dir_path: 目录路径
+        paths: 目录内文件路径
+        order: 排序方式；未注册时按自然排序
+        infos: 已知文件信息 path → FileInfo（避免重复 stat）
+
+    Returns:
+        排序后的新列表
+    """
+    builder = _registry.get(order, _natural_keys)
+    keys = builder(dir_path, paths, infos or {})
+    return [paths[i] for i in sorted(range(len(paths)), key=keys.__getitem__)]
+
+
+__all__ = [
+    "DEFAULT_SORT_ORDER",
+    "SORT_EXIF",
+    "SORT_MTIME",
+    "SORT_NAME",
+    "SORT_NATURAL",
+    "SORT_SIZE",
+    "available_sort_orders",
+    "folder_sort_key",
+    "is_sort_order",
+    "load_capture_times",
+    "natural_key",
+    "register_sort_order",
+    "sort_paths",
+]
@@ -0,0 +1,356 @@
+"""
+目录树增量快照（跨启动持久化）
+
+每次打开根目录都 os.walk 整棵树、再逐目录枚举判断是否含图，在 NAS 上的
+大型归档（数万目录）需要数分钟。本模块按根目录持久化一份目录树快照：
+每个目录记录 mtime、图片数与子目录名列表。重新打开时：
+- 每个目录只做一次 stat；mtime 未变的目录直接复用快照中的子目录列表
+  与图片数，不再枚举
+- 只有 mtime 变化（增删/重命名了条目）或新出现的目录才重新枚举
+- 目录 mtime 只反映直接条目的变化，深层改动不会冒泡到祖先，因此仍需
+  逐级 stat 子目录，但 stat 远比枚举便宜
+
+mtime 粒度保护：SMB/FAT 等文件系统 mtime 精度可达 1-2 秒，快照时刻附近
+被修改的目录不信任快照（强制重新枚举），避免同一秒内的改动被漏掉。
+
+文件结构：
+    <app_support>/tree_snapshots/<root_hash>.json
+    JSON: {"version": 1, "root": "...", "scanned_at_ns": 0,
+           "dirs": {"相对路径": [mtime_ns, 图片数, ["子目录", ...]], ...}}
+
+Author: PlookingII Team
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ..config.constants import APP_NAME
+
+logger = logging.getLogger(APP_NAME)
+
+# 版本 2：不再统计隐藏文件（旧快照可能含 AppleDouble "._*" 计数，整体作废）
+_SNAPSHOT_VERSION = 2
+
+# mtime 粒度保护窗口（纳秒）：快照前该时间内修改过的目录不信任快照
+_MTIME_GUARD_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class DirNode:
+    """单个目录的快照节点"""
+
+    mtime_ns: int
+    image_count: int
+    children: tuple[str, ...] = ()
+
+
+@dataclass
+class TreeScanResult:
+    """一次增量遍历的结果"""
+
+    root: str
+    # 绝对路径 → 节点（按确定顺序：串行遍历为先序，并行遍历为完成顺序）
+    nodes: dict[str, DirNode] = field(default_factory=dict)
+    reused: int = 0
+    rescanned: int = 0
+
+    @property
+    def directories(self) -> list[str]:
+        """遍历到的全部目录（含根目录）"""
+        return list(self.nodes)
+
+    @property
+    def image_directories(self) -> list[str]:
+        """含图片的目录"""
+        return [d for d, n in self.nodes.items() if n.image_count > 0]
+
+
+def _enumerate_dir(dirpath: str, exts: tuple[str, ...]) -> tuple[int, tuple[str, ...]] | None:
+    """单次 scandir：统计图片数并收集子目录名；不可访问返回 None
+
+    跳过以 "." 开头的条目（与其他扫描器一致）：SMB/exFAT 上的 AppleDouble
+    "._IMG_0001.jpg" 不计为图片，隐藏目录不遍历。
+    """
+    count = 0
+    children = []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        children.append(entry.name)
+                    elif entry.name.lower().endswith(exts):
+                        count += 1
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    children.sort()
+    return count, tuple(children)
+
+
+def resolve_dir_node(
+    dirpath: str,
+    exts: tuple[str, ...],
+    prev: DirNode | None,
+    scanned_at_ns: int = 0,
+    st: os.stat_result | None = None,
+) -> tuple[DirNode, bool] | None:
+    """确定单个目录的节点：一次 stat，mtime 未变且不在粒度保护窗口内则复用快照
+
+    Args:
+        st: 调用方已取得的目录 stat 结果（避免重复 stat）
+
+    Returns:
+        (节点, 是否复用快照)；目录不可访问返回 None
+    """
+    try:
+        mtime_ns = (st or os.stat(dirpath)).st_mtime_ns
+    except OSError:
+        return None
+    if prev is not None and prev.mtime_ns == mtime_ns and mtime_ns < scanned_at_ns - _MTIME_GUARD_NS:
+        return prev, True
+    enumerated = _enumerate_dir(dirpath, exts)
+    if enumerated is None:
+        return None
+    return DirNode(mtime_ns, enumerated[0], enumerated[1]), False
+
+
+def iter_walk(
+    root: str,
+    exts: tuple[str, ...],
+    previous: dict[str, DirNode] | None = None,
+    scanned_at_ns: int = 0,
+    dir_filter: Callable[[str, str], bool] | None = None,
+    result: TreeScanResult | None = None,
+) -> Iterator[tuple[str, DirNode]]:
+    """流式增量遍历：每确定一个目录节点即产出 (绝对路径, 节点)
+
+    产出顺序为先序（同级按名称升序），与 incremental_walk 的 nodes 顺序一致；
+    传入 result 时同步累积节点与复用/重扫统计，遍历结束即为完整快照。
+
+    Args:
+        root: 根目录
+        exts: 图片扩展名（小写，含点号）
+        previous: 上次快照（绝对路径 → 节点）；None 表示全量遍历
+        scanned_at_ns: 上次快照时间（用于 mtime 粒度保护）
+        dir_filter: 子目录过滤 (父目录路径, 子目录名) → 是否进入；None 表示全部进入
+        result: 可选的累积结果对象
+    """
+    previous = previous or {}
+    if result is None:
+        result = TreeScanResult(root=root)
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        resolved = resolve_dir_node(dirpath, exts, previous.get(dirpath), scanned_at_ns)
+        if resolved is None:
+            continue
+        node, reused = resolved
+        if reused:
+            result.reused += 1
+        else:
+            result.rescanned += 1
+        result.nodes[dirpath] = node
+        children = node.children
+        if dir_filter is not None:
+            children = tuple(c for c in children if dir_filter(dirpath, c))
+        # 逆序入栈：出栈顺序与名称升序一致
+        stack.extend(os.path.join(dirpath, c) for c in reversed(children))
+        yield dirpath, node
+
+
+def incremental_walk(
+    root: str,
+    exts: tuple[str, ...],
+    previous: dict[str, DirNode] | None = None,
+    scanned_at_ns: int = 0,
+    dir_filter: Callable[[str, str], bool] | None = None,
+) -> TreeScanResult:
+    """基于上次快照增量遍历目录树
+
+    Args:
+        root: 根目录
+        exts: 图片扩展名（小写，含点号）
+        previous: 上次快照（绝对路径 → 节点）；None 表示全量遍历
+        scanned_at_ns: 上次快照时间（用于 mtime 粒度保护）
+        dir_filter: 子目录过滤 (父目录路径, 子目录名) → 是否进入；None 表示全部进入
+
+    Returns:
+        TreeScanResult：新的完整快照 + 复用/重扫统计
+    """
+    result = TreeScanResult(root=root)
+    for _ in iter_walk(root, exts, previous, scanned_at_ns, dir_filter, result):
+        pass
+    return result
+
+
+class TreeSnapshotStore:
+    """按根目录持久化目录树快照"""
+
+    def __init__(self, cache_dir: str | None = None, max_roots: int = 64):
+        """
+        Args:
+            cache_dir: 快照目录；None 使用默认应用支持目录
+            max_roots: 保留的根目录快照上限（按修改时间 LRU 清理）
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.path.expanduser("~"), "Library", "Application Support", APP_NAME, "tree_snapshots"
+            )
+        self._cache_dir = Path(cache_dir)
+        self._max_roots = max(1, max_roots)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _root_key(root: str) -> str:
+        normalized = os.path.normpath(root)
+        return hashlib.md5(normalized.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+
+    def _snapshot_file(self, root: str) -> Path:
+        return self._cache_dir / f"{self._root_key(root)}.json"
+
+    def load(self, root: str) -> tuple[dict[str, DirNode], int]:
+        """读取根目录快照
+
+        Returns:
+            (绝对路径 → 节点, 快照时间 ns)；无快照/损坏时返回 ({}, 0)
+        """
+        root = os.path.normpath(root)
+        try:
+            with self._lock:
+                data = json.loads(self._snapshot_file(root).read_text(encoding="utf-8"))
+            if not isinstance(data, dict) or data.get("version") != _SNAPSHOT_VERSION or data.get("root") != root:
+                return {}, 0
+            nodes: dict[str, DirNode] = {}
+            for rel, raw in data.get("dirs", {}).items():
+                mtime_ns, count, children = raw
+                path = root if rel == "." else os.path.join(root, rel)
+                nodes[path] = DirNode(int(mtime_ns), int(count), tuple(str(c) for c in children))
+            return nodes, int(data.get("scanned_at_ns", 0))
+        except FileNotFoundError:
+            return {}, 0
+        except (OSError, ValueError, TypeError, json.JSONDecodeError):
+            logger.debug("目录树快照读取失败，忽略: %s", root)
+            return {}, 0
+
+    def save(self, root: str, nodes: dict[str, DirNode], scanned_at_ns: int | None = None) -> bool:
+        """原子写入根目录快照（临时文件 + os.replace）"""
+        root = os.path.normpath(root)
+        if scanned_at_ns is None:
+            scanned_at_ns = time.time_ns()
+        payload = {
+            "version": _SNAPSHOT_VERSION,
+            "root": root,
+            "scanned_at_ns": scanned_at_ns,
+            "dirs": {
+                os.path.relpath(path, root): [n.mtime_ns, n.image_count, list(n.children)] for path, n in nodes.items()
+            },
+        }
+        try:
+            with self._lock:
+                os.makedirs(self._cache_dir, exist_ok=True)
+                target = self._snapshot_file(root)
+                tmp = target.with_suffix(".tmp")
+                tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp, target)
+                self._prune_lru()
+            return True
+        except OSError:
+            logger.debug("目录树快照写入失败，忽略: %s", root)
+            return False
+
+    def iter_scan(
+        self,
+        root: str,
+        exts: tuple[str, ...],
+        dir_filter: Callable[[str, str], bool] | None = None,
+        result: TreeScanResult | None = None,
+        walk_fn: Callable[..., Iterator[tuple[str, DirNode]]] = iter_walk,
+    ) -> Iterator[tuple[str, DirNode]]:
+        """加载快照 → 流式增量遍历 → 完整遍历结束后写回新快照
+
+        中途关闭生成器（例如扫描被新的根目录取代）不会写入半棵树。
+
+        Args:
+            walk_fn: 遍历函数，签名同 iter_walk（可替换为并行遍历器的 walk）
+        """
+        root = os.path.normpath(root)
+        if result is None:
+            result = TreeScanResult(root=root)
+        previous, scanned_at_ns = self.load(root)
+        started_ns = time.time_ns()
+        yield from walk_fn(root, exts, previous, scanned_at_ns, dir_filter, result)
+        if result.rescanned or len(result.nodes) != len(previous):
+            self.save(root, result.nodes, started_ns)
+
+    def scan(
+        self,
+        root: str,
+        exts: tuple[str, ...],
+        dir_filter: Callable[[str, str], bool] | None = None,
+    ) -> TreeScanResult:
+        """加载快照 → 增量遍历 → 写回新快照"""
+        result = TreeScanResult(root=os.path.normpath(root))
+        for _ in self.iter_scan(root, exts, dir_filter, result):
+            pass
+        return result
+
+    def clear(self) -> None:
+        """删除全部快照"""
+        try:
+            if self._cache_dir.exists():
+                for f in self._cache_dir.glob("*.json"):
+                    f.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def _prune_lru(self) -> None:
+        try:
+            files = sorted(self._cache_dir.glob("*.json"), key=lambda f: f.stat().st_mtime)
+            for f in files[: max(0, len(files) - self._max_roots)]:
+                f.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+# 全局单例
+_global_store: TreeSnapshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_tree_snapshot_store() -> TreeSnapshotStore:
+    """获取全局目录树快照存储单例"""
+    global _global_store  # noqa: PLW0603  # 单例模式的合理使用
+    with _store_lock:
+        if _global_store is None:
+            _global_store = TreeSnapshotStore()
+        return _global_store
+
+
+def reset_tree_snapshot_store() -> None:
+    """重置全局单例（主要用于测试）"""
+    global _global_store  # noqa: PLW0603  # 单例模式的合理使用
+    with _store_lock:
+        _global_store = None
+
+
+__all__ = [
+    "DirNode",
+    "TreeScanResult",
+    "TreeSnapshotStore",
+    "get_tree_snapshot_store",
+    "incremental_walk",
+    "iter_walk",
+    "reset_tree_snapshot_store",
+    "resolve_dir_node",
+]
@@ -8,6 +8,8 @@
   每 N 次记录 1 次，将开销压到微秒级
 - 慢事件捕获：超过阈值的操作（如大文件夹扫描、网络盘跳转）单独留存
 - 内存采样：后台线程定期采样当前进程 RSS，报告会话内存走势与峰值
+- 计数器：无耗时的事件计数（如渲染缓存的命中/派生/解码次数）
+- 报告附加节：组件注册的表格（如图片缓存的 MRC 命中率估计），落盘时取值
 - 会话报告：应用退出（或定期）时输出 JSON + Markdown 报告，自动轮转
   保留最近 N 份，供后续离线分析
 
@@ -27,6 +29,7 @@ import os
 import threading
 import time
 from collections import deque
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any, Literal, Self
 
@@ -220,6 +223,8 @@ class PerfTracker:
         self._lock = threading.Lock()
         self._ops: dict[str, _OpStats] = {}
         self._op_seq: dict[str, int] = {}
+        self._counters: dict[str, int] = {}
+        self._sections: dict[str, tuple[str, Callable[[], list[dict[str, Any]]]]] = {}
         self._slow_events: deque = deque(maxlen=SLOW_EVENT_BUDGET)
         self._memory_samples: deque = deque(maxlen=1024)
         self._session_start = time.time()
@@ -285,6 +290,22 @@ class PerfTracker:
                 self._last_memory_sample_at = now
                 self._sample_memory_locked(now)
 
+    def count(self, name: str, n: int = 1) -> None:
+        """累加事件计数器（不受采样率影响；关闭时近乎零开销）"""
+        if not self._enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def register_report_section(self, key: str, title: str, provider: Callable[[], list[dict[str, Any]]]) -> None:
+        """注册报告附加节：provider 在生成摘要时调用，返回表格行（同名覆盖）"""
+        with self._lock:
+            self._sections[key] = (title, provider)
+
+    def unregister_report_section(self, key: str) -> None:
+        with self._lock:
+            self._sections.pop(key, None)
+
     def timeit(self, op: str, **meta: Any) -> PerfTimer:
         """计时上下文管理器"""
         return PerfTimer(self, op, **meta)
@@ -332,6 +353,15 @@ class PerfTracker:
     # ------------------------------------------------------------------
     def get_summary(self) -> dict[str, Any]:
         """导出当前会话聚合摘要（不落盘）"""
+        with self._lock:
+            sections_src = list(self._sections.items())
+        # provider 在锁外调用（可能获取组件自身的锁）
+        sections = {}
+        for key, (title, provider) in sections_src:
+            try:
+                sections[key] = {"title": title, "rows": list(provider())}
+            except Exception:
+                logger.debug("报告附加节 %s 生成失败", key, exc_info=True)
         with self._lock:
             ops = {name: stats.to_dict() for name, stats in sorted(self._ops.items())}
             memory_mb = self._memory_summary_locked()
@@ -344,6 +374,8 @@ class PerfTracker:
                 "session_start": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._session_start)),
                 "session_duration_s": round(time.time() - self._session_start, 1),
                 "operations": ops,
+                "counters": dict(sorted(self._counters.items())),
+                "sections": sections,
                 "slow_events": slow,
                 "memory_mb": memory_mb,
             }
@@ -451,6 +483,25 @@ class PerfTracker:
                     f"| {s['p50_ms']} | {s['p95_ms']} | {s['p99_ms']} | {s['min_ms']} | {s['max_ms']} |"
                 )
 
+        counters = summary.get("counters", {})
+        if counters:
+            lines += ["", "## 计数器", "", "| 名称 | 次数 |", "| --- | --- |"]
+            lines += [f"| {name} | {value} |" for name, value in counters.items()]
+
+        for section in summary.get("sections", {}).values():
+            rows = section.get("rows") or []
+            if not rows:
+                continue
+            headers = list(rows[0])
+            lines += [
+                "",
+                f"## {section.get('title', '')}",
+                "",
+                "| " + " | ".join(headers) + " |",
+                "| " + " | ".join("---" for _ in headers) + " |",
+            ]
+            lines += ["| " + " | ".join(str(row.get(h, "-")) for h in headers) + " |" for row in rows]
+
         memory = summary.get("memory_mb", {})
         if memory.get("samples"):
             lines += [
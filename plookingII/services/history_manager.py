@@ -139,6 +139,7 @@ class HistoryManager:
                     "current_index": getattr(self.window, "current_index", 0),
                     "keep_folder": getattr(self.window, "keep_folder", ""),
                     "current_folder": getattr(self.window, "current_folder", ""),
+                    "current_image": self._current_image_path(),
                     "timestamp": current_time,
                 }
 
@@ -153,6 +154,15 @@ class HistoryManager:
         except Exception as e:
             logger.warning("保存任务进度失败: %s", e)
 
+    def _current_image_path(self) -> str:
+        """当前图片路径（恢复时按路径定位，不受排序方式变化影响）"""
+        images = getattr(self.window, "images", None) or []
+        index = getattr(self.window, "current_index", 0)
+        try:
+            return images[index] if 0 <= index < len(images) else ""
+        except (IndexError, TypeError):
+            return ""
+
     def save_task_progress_immediate(self) -> None:
         """
         立即保存任务进度（同步版本）
@@ -6,7 +6,7 @@ import os
 负责处理文件夹扫描、导航、历史记录等逻辑。
 """
 
-import concurrent.futures
+import bisect
 import contextlib
 import logging
 import shutil
@@ -17,7 +17,9 @@ from AppKit import NSAlert, NSApplication
 from ...config.constants import APP_NAME, IMAGE_PROCESSING_CONFIG, SUPPORTED_IMAGE_EXTS
 from ...config.ui_strings import get_ui_string
 from ...core.history import TaskHistoryManager
+from ...core.image_sequence import ImageSequence
 from ...core.simple_cache import estimate_image_memory_mb
+from ...core.sort_order import folder_sort_key
 from ...imports import logging, os, threading, time
 from ...monitor import get_perf_tracker, perf_timed
 from ...services.recent import RecentFoldersManager
@@ -28,6 +30,10 @@ logger = logging.getLogger(APP_NAME)
 class FolderManager:
     """文件夹管理器，负责文件夹扫描、导航和历史记录"""
 
+    # 流式扫描结果投递到主线程的批量阈值（个数 / 秒），兼顾首帧延迟与主线程开销
+    _STREAM_MERGE_BATCH = 64
+    _STREAM_MERGE_INTERVAL_S = 0.25
+
     def __init__(self, main_window):
         """初始化文件夹管理器
 
@@ -53,6 +59,12 @@ class FolderManager:
         # 文件夹倒序浏览开关
         self.reverse_folder_order = False
 
+        # 流式并入子文件夹时缓存的排序状态（见 _subfolder_merge_state）
+        self._merge_sort_state = None
+
+        # 图片排序切换代次：后台排序完成时丢弃被后续切换取代的结果
+        self._sort_generation = 0
+
         # 跳过文件夹历史记录机制
         self._skipped_folders_history = []
         self._max_skip_history = 10
@@ -175,53 +187,26 @@ class FolderManager:
                         # 阶段2：后台深度扫描
                         threading.Thread(target=deep_scan_completion, daemon=True).start()
 
-                    # 阶段2：深度遍历整棵目录树，完成后合并 subfolders
+                    # 阶段2：流式深度遍历整棵目录树，边发现边并入 subfolders
                     def deep_scan_completion():
                         try:
                             if gen != self._load_root_generation:
                                 return
-                            full_subfolders = self._scan_subfolders(root_folder)
-                            self._last_scanned_dir_count = len(self._gather_directories_to_scan(root_folder))
+                            full_subfolders = self._stream_subfolders(
+                                gen, root_folder, lambda batch, _first: self._merge_discovered_subfolders(gen, batch)
+                            )
+                            if full_subfolders is None:
+                                return
                             full_single_mode = self._last_scanned_dir_count == 1
-
-                            if full_subfolders:
-                                full_subfolders = self._filter_selection_folders(full_subfolders)
-
-                            def merge_results():
-                                if gen != self._load_root_generation:
-                                    return
-                                # 合并：保留当前浏览进度，更新 subfolders
-                                old_index = getattr(self.main_window, "current_subfolder_index", 0)
-                                old_path = getattr(self.main_window, "current_folder", "")
-                                self.main_window.subfolders = full_subfolders
-                                self.single_folder_mode = full_single_mode
-                                # 尝试恢复当前浏览位置
-                                try:
-                                    if old_path and old_path in full_subfolders:
-                                        self.main_window.current_subfolder_index = full_subfolders.index(old_path)
-                                    else:
-                                        self.main_window.current_subfolder_index = min(
-                                            old_index, len(full_subfolders) - 1
-                                        )
-                                except Exception:
-                                    self.main_window.current_subfolder_index = 0
-                                self.main_window.status_bar_controller.set_status_message(
-                                    f"扫描完成: {len(full_subfolders)} 个文件夹"
-                                )
-                                try:
-                                    self.main_window._update_status_display_immediate()
-                                except Exception:
-                                    pass
-                                # 合并完成后持久化完整文件夹列表，保证下次打开时进度可恢复
-                                self._save_task_progress_immediate()
-
-                            self._post_to_main(merge_results)
+                            self._post_to_main(
+                                lambda: self._finalize_streamed_subfolders(gen, full_subfolders, full_single_mode)
+                            )
                         except Exception:
                             logger.exception("深度扫描补全失败")
 
                     self._post_to_main(show_first_then_scan_deep)
-                else:
-                    # 直系无图片，走完整扫描路径
+                elif restore_history and thm.load_task_progress():
+                    # 直系无图片且存在历史记录：恢复需要完整列表，走完整扫描路径
                     subfolders = self._scan_subfolders(root_folder)
                     single_folder_mode = getattr(self, "_last_scanned_dir_count", 0) == 1
                     self._post_to_main(
@@ -229,6 +214,29 @@ class FolderManager:
                             gen, root_folder, subfolders, single_folder_mode, restore_history, thm
                         )
                     )
+                else:
+                    # 直系无图片（深层目录树）：流式发现，首批结果即开始浏览，其余边扫边并入
+                    def on_batch(batch, first):
+                        if not first:
+                            self._merge_discovered_subfolders(gen, batch)
+                            return
+                        self._finish_load_from_root(gen, root_folder, self._sort_subfolders(batch), False, False, thm)
+
+                    subfolders = self._stream_subfolders(gen, root_folder, on_batch)
+                    if subfolders is None:
+                        return
+                    single_folder_mode = getattr(self, "_last_scanned_dir_count", 0) == 1
+                    # 是否已投递首批在后台线程确定：有结果即已投递（主线程按投递顺序执行，收尾在首批之后）
+                    if subfolders:
+                        self._post_to_main(
+                            lambda: self._finalize_streamed_subfolders(gen, subfolders, single_folder_mode)
+                        )
+                    else:
+                        self._post_to_main(
+                            lambda: self._finish_load_from_root(
+                                gen, root_folder, subfolders, single_folder_mode, restore_history, thm
+                            )
+                        )
             except Exception:
                 logger.exception("后台扫描文件夹失败: %s", root_folder)
                 subfolders = []
@@ -241,6 +249,144 @@ class FolderManager:
 
         threading.Thread(target=scan_worker, daemon=True).start()
 
+    def _stream_subfolders(self, gen, root_folder, on_batch):
+        """后台线程：消费 iter_subfolders，按批投递到主线程并返回完整排序列表
+
+        每累积 _STREAM_MERGE_BATCH 个结果或距上次投递超过
+        _STREAM_MERGE_INTERVAL_S 秒即投递一批，on_batch 在主线程执行。
+        只要发现了子文件夹就至少投递一批，首批标记在后台线程确定。
+
+        Args:
+            gen: 发起扫描时的代次
+            root_folder: 根文件夹路径
+            on_batch: 主线程回调 on_batch(batch, first)，batch 为本批新发现的
+                子文件夹列表（未排序），first 表示是否为首批
+
+        Returns:
+            list | None: 完整的排序后子文件夹列表；代次过期（扫描被取代）返回 None
+        """
+        scan_start = time.perf_counter()
+        found = []
+        batch = []
+        last_flush = scan_start
+        scan_success = True
+        stream = self.iter_subfolders(root_folder)
+        try:
+            for path in stream:
+                if gen != self._load_root_generation:
+                    return None
+                found.append(path)
+                batch.append(path)
+                now = time.perf_counter()
+                if len(batch) >= self._STREAM_MERGE_BATCH or now - last_flush >= self._STREAM_MERGE_INTERVAL_S:
+                    pending, batch, last_flush = batch, [], now
+                    first = len(found) == len(pending)
+                    self._post_to_main(lambda b=pending, f=first: on_batch(b, f))
+            if batch:
+                first = len(found) == len(batch)
+                self._post_to_main(lambda b=batch, f=first: on_batch(b, f))
+            return self._sort_subfolders(found)
+        except Exception:
+            scan_success = False
+            raise
+        finally:
+            # 提前退出时关闭生成器：停止并行遍历，不写入半棵树的目录快照
+            stream.close()
+            self._record_folder_scan(scan_start, scan_success, len(found), streamed=True)
+
+    def _merge_discovered_subfolders(self, gen, discovered):
+        """主线程：把流式发现的子文件夹按排序位置并入 subfolders（保持当前浏览位置）
+
+        Args:
+            gen: 发起扫描时的代次，过期批次直接丢弃
+            discovered: 本批新发现的子文件夹列表
+        """
+        if gen != self._load_root_generation:
+            return
+        merged = self.main_window.subfolders
+        if not isinstance(merged, list):
+            merged = self.main_window.subfolders = list(merged or [])
+        keys, known = self._subfolder_merge_state(merged)
+        fresh = [p for p in self._filter_selection_folders(discovered) if p not in known]
+        if not fresh:
+            return
+        old_path = getattr(self.main_window, "current_folder", "")
+        current_index = getattr(self.main_window, "current_subfolder_index", 0)
+        if old_path in known and not (0 <= current_index < len(merged) and merged[current_index] == old_path):
+            current_index = merged.index(old_path)
+        tracking = bool(old_path) and old_path in known
+        for path in fresh:
+            if path in known:
+                continue
+            key = folder_sort_key(path)
+            pos = bisect.bisect_left(keys, key)
+            keys.insert(pos, key)
+            # keys 恒为升序；倒序浏览时列表位置与升序位置镜像
+            index = len(keys) - 1 - pos if self.reverse_folder_order else pos
+            merged.insert(index, path)
+            known.add(path)
+            if tracking and index <= current_index:
+                current_index += 1
+        if tracking:
+            self.main_window.current_subfolder_index = current_index
+        try:
+            walker = getattr(self, "_last_tree_walker", None)
+            scanned = walker.get_progress()["dirs_done"] if walker is not None else 0
+            self.main_window.status_bar_controller.set_status_message(
+                f"已扫描 {scanned} 个目录，发现 {len(merged)} 个文件夹（扫描中...）"
+            )
+            self.main_window._update_status_display_immediate()
+        except Exception:
+            pass
+
+    def _subfolder_merge_state(self, subfolders):
+        """返回与 subfolders 同步的 (升序排序键列表, 路径集合)
+
+        排序键按列表缓存，流式并入时逐个二分插入，避免每批对整个列表重新
+        计算排序键并排序；列表被替换、被其他路径改动或浏览方向切换后重建。
+        """
+        state = self._merge_sort_state
+        if (
+            state is None
+            or state[0] is not subfolders
+            or len(state[1]) != len(subfolders)
+            or state[3] != self.reverse_folder_order
+        ):
+            keys = sorted(folder_sort_key(p) for p in subfolders)
+            state = self._merge_sort_state = (subfolders, keys, set(subfolders), self.reverse_folder_order)
+        return state[1], state[2]
+
+    def _finalize_streamed_subfolders(self, gen, full_subfolders, single_folder_mode):
+        """主线程：流式扫描结束后以完整列表收尾（保留当前浏览进度并持久化）
+
+        Args:
+            gen: 发起扫描时的代次，过期结果直接丢弃
+            full_subfolders: 完整的排序后子文件夹列表
+            single_folder_mode: 是否单文件夹模式
+        """
+        if gen != self._load_root_generation:
+            return
+        full_subfolders = self._filter_selection_folders(full_subfolders)
+        old_index = getattr(self.main_window, "current_subfolder_index", 0)
+        old_path = getattr(self.main_window, "current_folder", "")
+        self.main_window.subfolders = full_subfolders
+        self.single_folder_mode = single_folder_mode
+        # 尝试恢复当前浏览位置
+        try:
+            if old_path and old_path in full_subfolders:
+                self.main_window.current_subfolder_index = full_subfolders.index(old_path)
+            else:
+                self.main_window.current_subfolder_index = max(0, min(old_index, len(full_subfolders) - 1))
+        except Exception:
+            self.main_window.current_subfolder_index = 0
+        self.main_window.status_bar_controller.set_status_message(f"扫描完成: {len(full_subfolders)} 个文件夹")
+        try:
+            self.main_window._update_status_display_immediate()
+        except Exception:
+            pass
+        # 合并完成后持久化完整文件夹列表，保证下次打开时进度可恢复
+        self._save_task_progress_immediate()
+
     def _finish_load_from_root(
         self, gen, root_folder, subfolders, single_folder_mode, restore_history, task_history_manager=None
     ):
@@ -334,7 +480,7 @@ class FolderManager:
             logger.exception("结束工作会话时发生错误")
 
     def _scan_subfolders(self, root_folder):
-        """并行化扫描所有包含图片的子文件夹
+        """并行扫描所有包含图片的子文件夹（完整排序列表）
 
         Args:
             root_folder: 根文件夹路径
@@ -343,84 +489,100 @@ class FolderManager:
             list: 包含图片的子文件夹列表
         """
         scan_start = time.perf_counter()
-        exts = SUPPORTED_IMAGE_EXTS
         subfolders = []
-        scan_lock = threading.Lock()
         scan_success = True
 
         try:
-            directories_to_scan = self._gather_directories_to_scan(root_folder)
-            # 记录目录总数，供调用方判断单文件夹模式（避免再次 os.walk 整棵树）
-            self._last_scanned_dir_count = len(directories_to_scan)
-            if not directories_to_scan:
-                return []
-
-            # 执行并行扫描
-            self._execute_parallel_scan(directories_to_scan, exts, subfolders, scan_lock)
-
-            # 排序并返回结果（按文件夹名升序，不区分大小写）
-            try:
-                subfolders.sort(key=lambda p: os.path.basename(p).lower(), reverse=self.reverse_folder_order)
-            except Exception:
-                subfolders.sort(reverse=self.reverse_folder_order)
-            return subfolders
+            subfolders.extend(self.iter_subfolders(root_folder))
+            return self._sort_subfolders(subfolders)
         except Exception:
             scan_success = False
             raise
         finally:
-            # 轻量性能跟踪：整棵目录树扫描耗时
-            self.perf.record(
-                "folder_scan",
-                (time.perf_counter() - scan_start) * 1000,
-                success=scan_success,
-                folders=len(subfolders),
+            self._record_folder_scan(scan_start, scan_success, len(subfolders))
+
+    def _record_folder_scan(self, scan_start, success, folder_count, **meta):
+        """轻量性能跟踪：整棵目录树扫描耗时（含快照复用/重新枚举的目录数）"""
+        tree_scan = getattr(self, "_last_tree_scan", None)
+        walker = getattr(self, "_last_tree_walker", None)
+        if walker is not None:
+            progress = walker.get_progress()
+            logger.debug(
+                "目录树遍历: %d 个目录 (复用 %d), %.1f 目录/秒, 窃取 %d 次, 错误 %d",
+                progress["dirs_done"],
+                progress["dirs_reused"],
+                progress["dirs_per_s"],
+                progress["steals"],
+                progress["errors"],
             )
+        self.perf.record(
+            "folder_scan",
+            (time.perf_counter() - scan_start) * 1000,
+            success=success,
+            folders=folder_count,
+            dirs_reused=tree_scan.reused if tree_scan else 0,
+            dirs_rescanned=tree_scan.rescanned if tree_scan else 0,
+            **meta,
+        )
 
-    def _execute_parallel_scan(self, directories_to_scan, exts, subfolders, scan_lock):
-        """执行并行目录扫描
-
-        Args:
-            directories_to_scan: 要扫描的目录列表
-            exts: 支持的图片扩展名
-            subfolders: 结果列表
-            scan_lock: 线程锁
-        """
-
-        def scan_directory(dirpath):
-            try:
-                if self._dir_contains_images(dirpath, exts):
-                    with scan_lock:
-                        subfolders.append(dirpath)
-            except Exception:
-                # 忽略无法访问或扫描失败的目录
-                pass
+    def _sort_subfolders(self, subfolders):
+        """按文件夹名自然排序（不区分大小写，遵循 reverse_folder_order），原地排序并返回"""
+        try:
+            subfolders.sort(key=folder_sort_key, reverse=self.reverse_folder_order)
+        except Exception:
+            subfolders.sort(reverse=self.reverse_folder_order)
+        return subfolders
 
-        max_workers = min(16, len(directories_to_scan))
-        if max_workers > 1:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                executor.map(scan_directory, directories_to_scan)
-        else:
-            for dirpath in directories_to_scan:
-                scan_directory(dirpath)
+    def iter_subfolders(self, root_folder):
+        """流式发现含图片的子文件夹：每确定一个含图目录即产出
 
-    def _gather_directories_to_scan(self, root_folder):
-        """收集所有需要扫描的目录（跳过当前层级的“精选”目录）
+        由工作窃取式并行遍历器（ParallelTreeWalker）同时完成目录发现与
+        含图判断，并复用持久化目录树快照（mtime 未变的目录不再枚举）。
+        产出顺序为并行完成顺序；文件夹列表按文件夹名全局排序，深层目录
+        可能排在任意位置，因此由调用方排序或按排序位置并入（见
+        _merge_discovered_subfolders）。生成器被提前关闭时不写入目录快照。
+        快照不可用时直接并行遍历（不读写快照）。
 
         Args:
             root_folder: 根文件夹路径
 
-        Returns:
-            list: 需要扫描的目录列表
+        Yields:
+            str: 含图片的文件夹路径（已排除精选目录）
         """
-        directories_to_scan = []
-        for dirpath, dirnames, _ in os.walk(root_folder):
-            # 跳过与当前父级目录名匹配的精选目录，例如 父/父 精选
-            parent_name = os.path.basename(dirpath) if dirpath else ""
-            selection_name = f"{parent_name} 精选" if parent_name else "精选"
-            # 双层过滤：精确匹配 + 通用“精选/精選”后缀（覆盖简繁变体）
-            dirnames[:] = [d for d in dirnames if d != selection_name and not d.endswith(("精选", "精選"))]
-            directories_to_scan.append(dirpath)
-        return directories_to_scan
+        from ...core.file_info_batch_loader import ParallelTreeWalker
+        from ...core.tree_snapshot import TreeScanResult
+
+        exts = tuple(e.lower() for e in SUPPORTED_IMAGE_EXTS)
+        walker = ParallelTreeWalker()
+        result = TreeScanResult(root=os.path.normpath(root_folder))
+        self._last_tree_walker = walker
+        self._last_tree_scan = result
+        try:
+            from ...core.tree_snapshot import get_tree_snapshot_store
+
+            stream = get_tree_snapshot_store().iter_scan(
+                root_folder, exts, self._should_descend, result, walk_fn=walker.walk
+            )
+        except Exception:
+            logger.debug("目录树快照不可用，直接并行遍历: %s", root_folder, exc_info=True)
+            stream = walker.walk(result.root, exts, dir_filter=self._should_descend, result=result)
+
+        try:
+            for dirpath, node in stream:
+                if node.image_count > 0 and self._filter_selection_folders([dirpath]):
+                    yield dirpath
+        finally:
+            stream.close()
+        # 记录目录总数，供调用方判断单文件夹模式
+        self._last_scanned_dir_count = len(result.nodes)
+
+    @staticmethod
+    def _should_descend(dirpath: str, name: str) -> bool:
+        """是否进入子目录：跳过与父级目录名匹配的精选目录（例如 父/父 精选）"""
+        parent_name = os.path.basename(dirpath) if dirpath else ""
+        selection_name = f"{parent_name} 精选" if parent_name else "精选"
+        # 双层过滤：精确匹配 + 通用“精选/精選”后缀（覆盖简繁变体）
+        return name != selection_name and not name.endswith(("精选", "精選"))
 
     def _shallow_scan(self, root_folder: str, exts: tuple) -> list:
         """快速浅层扫描：仅检查根目录及直系子文件夹（单层，不递归）
@@ -453,7 +615,7 @@ class FolderManager:
         except (OSError, PermissionError):
             pass
         # 排序以保证确定顺序
-        result.sort(key=lambda p: os.path.basename(p).lower())
+        result.sort(key=folder_sort_key)
         return result
 
     def _dir_contains_images(self, dirpath, exts):
@@ -485,13 +647,15 @@ class FolderManager:
             except (OSError, PermissionError):
                 return False
 
-    def load_current_subfolder(self, restore_index=None, async_first_load=False):
+    def load_current_subfolder(self, restore_index=None, async_first_load=False, restore_path=None):
         """加载当前子文件夹的图片，支持恢复到指定图片索引
 
         Args:
             restore_index: 要恢复的图片索引
             async_first_load: 首图是否强制后台异步加载（拖放/打开文件夹后
                 首图必然缓存未命中，异步可避免主线程同步解码卡顿）
+            restore_path: 要恢复的图片路径；在列表中时优先于 restore_index
+                （排序方式变化后序号会指向其他图片）
         """
         if (
             not self.main_window.subfolders
@@ -529,8 +693,10 @@ class FolderManager:
             os.path.join(base_dir, self._compute_selection_folder_name(base_dir)) if base_dir else ""
         )
 
-        # 恢复历史索引，否则始终从第一张图片开始
-        if restore_index is not None and 0 <= restore_index < len(self.main_window.images):
+        # 恢复历史位置（优先按路径），否则始终从第一张图片开始
+        if restore_path and restore_path in self.main_window.images:
+            self.main_window.current_index = self.main_window.images.index(restore_path)
+        elif restore_index is not None and 0 <= restore_index < len(self.main_window.images):
             self.main_window.current_index = restore_index
         else:
             self.main_window.current_index = 0
@@ -608,7 +774,8 @@ class FolderManager:
             folder_path: 文件夹路径
 
         Returns:
-            list: 图片文件的完整路径列表，按文件名排序
+            ImageSequence: 图片文件的完整路径序列，按当前排序方式（默认自然排序）排序；
+                作为 window.images 与双向缓存池共享，精选移除为 O(log n)
         """
         exts = SUPPORTED_IMAGE_EXTS
         images = []
@@ -619,7 +786,7 @@ class FolderManager:
             from ...core.file_info_batch_loader import get_file_info_loader
 
             loader = get_file_info_loader()
-            return loader.get_directory_images(folder_path, filter_exts=exts)
+            return ImageSequence(loader.get_directory_images(folder_path, filter_exts=exts))
         except Exception:
             # 文件夹访问失败时返回空列表
             # 回退到旧方法（兼容性）
@@ -629,9 +796,9 @@ class FolderManager:
                         image_path = os.path.join(folder_path, filename)
                         images.append(image_path)
                 images.sort()
-                return images
+                return ImageSequence(images)
             except Exception:
-                return []
+                return ImageSequence()
 
     def _is_selection_folder(self, folder_path: str) -> bool:
         """检测给定路径是否为“精选”目录（不应作为导航目标）
@@ -1323,7 +1490,12 @@ class FolderManager:
                 self.main_window.current_index = current_index
                 self.main_window.keep_folder = history_data.get("keep_folder", "")
                 self.main_window.current_folder = history_data.get("current_folder", None)
-                self.load_current_subfolder(restore_index=current_index, async_first_load=True)
+                restore_path = history_data.get("current_image") or self._legacy_restore_path(
+                    self.main_window.current_folder, current_index
+                )
+                self.load_current_subfolder(
+                    restore_index=current_index, async_first_load=True, restore_path=restore_path
+                )
             elif result == 1001:  # 重新开始
                 self.main_window.current_subfolder_index = 0
                 self.main_window.current_index = 0
@@ -1340,20 +1512,94 @@ class FolderManager:
             self.main_window.current_index = 0
             self.load_current_subfolder()
 
+    @staticmethod
+    def _legacy_restore_path(folder, index):
+        """旧版本历史记录只保存了图片序号（当时按文件名排序）：换算为图片路径
+
+        默认排序改为自然排序后，旧序号在新顺序下指向其他图片；按旧顺序取出
+        路径后再在新列表中定位。无法换算时返回 None（回退到按序号恢复）。
+        """
+        if not folder:
+            return None
+        try:
+            from ...core.file_info_batch_loader import get_file_info_loader
+            from ...core.sort_order import SORT_NAME
+
+            legacy = get_file_info_loader().get_directory_images(
+                folder, filter_exts=SUPPORTED_IMAGE_EXTS, order=SORT_NAME
+            )
+            return legacy[index] if 0 <= index < len(legacy) else None
+        except Exception:
+            logger.debug("换算旧历史记录图片位置失败: %s", folder, exc_info=True)
+            return None
+
     def _save_task_progress_immediate(self):
         """立即保存任务进度 - 用于重要操作"""
         if self.task_history_manager is not None:
+            images = self.main_window.images or []
+            index = self.main_window.current_index
             current_data = {
                 "subfolders": self.main_window.subfolders,
                 "current_subfolder_index": self.main_window.current_subfolder_index,
-                "current_index": self.main_window.current_index,
+                "current_index": index,
                 "keep_folder": self.main_window.keep_folder,
                 "current_folder": getattr(self.main_window, "current_folder", None),
+                "current_image": images[index] if 0 <= index < len(images) else "",
             }
             # 重要操作使用同步保存确保数据完整性
             self.task_history_manager.save_task_progress(current_data)
             self.main_window._last_save_time = time.time()
 
+    def set_image_sort_order(self, order):
+        """切换文件夹内图片的排序方式，保持当前浏览的图片不变
+
+        排序结果按 (目录, 排序方式) 缓存，来回切换无需重新排序。排序在后台
+        线程计算（拍摄时间排序需读取每个文件的头部），完成后回到主线程应用；
+        期间切换了文件夹或再次切换排序方式则丢弃结果。
+
+        Args:
+            order: 排序方式（natural / name / mtime / exif / size，见 core/sort_order）
+
+        Returns:
+            bool: 是否切换成功（排序方式有效即返回 True，列表随后异步更新）
+        """
+        from ...core.file_info_batch_loader import get_file_info_loader
+
+        if not get_file_info_loader().set_sort_order(order):
+            return False
+        folder = getattr(self.main_window, "current_folder", None)
+        if not folder:
+            return True
+        self._sort_generation += 1
+        gen = self._sort_generation
+
+        def sort_worker():
+            try:
+                reordered = self._load_folder_images(folder)
+            except Exception:
+                logger.exception("图片排序失败: %s", folder)
+                return
+            self._post_to_main(lambda: self._apply_image_order(gen, folder, reordered))
+
+        threading.Thread(target=sort_worker, daemon=True).start()
+        return True
+
+    def _apply_image_order(self, gen, folder, reordered):
+        """主线程：应用后台排序结果，保持当前图片并同步双向缓存池序列"""
+        if gen != self._sort_generation or getattr(self.main_window, "current_folder", None) != folder:
+            return
+        images = self.main_window.images or []
+        index = getattr(self.main_window, "current_index", 0)
+        current = images[index] if 0 <= index < len(images) else None
+        self.main_window.images = reordered
+        if current in reordered:
+            self.main_window.current_index = reordered.index(current)
+        self.main_window.image_manager.sync_bidi_sequence(self.main_window.images)
+        try:
+            self.main_window._update_status_display_immediate()
+        except Exception:
+            pass
+
     def set_reverse_folder_order(self, reverse):
         """设置文件夹倒序浏览
 
@@ -1413,9 +1659,9 @@ class FolderManager:
         except (OSError, PermissionError):
             pass
 
-        # 按文件夹名升序排序（不区分大小写）
+        # 按文件夹名自然排序（不区分大小写）
         try:
-            sibling_folders.sort(key=lambda p: os.path.basename(p).lower())
+            sibling_folders.sort(key=folder_sort_key)
         except Exception:
             sibling_folders.sort()
 
@@ -10,12 +10,25 @@ import os
 import threading
 import time
 from collections import OrderedDict, deque
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 
 from ...config.constants import APP_NAME, IMAGE_PROCESSING_CONFIG
 from ...config.manager import get_config, set_config
 from ...core.bounded_executor import BoundedExecutor
+from ...core.cache_mrc import DEFAULT_MRC_SAMPLE_RATE, CacheAutoTuner, MissRatioCurveEstimator
+from ...core.cache_policy import POLICY_LRU, CacheTraceRecorder
+from ...core.decode_pool import estimate_tier_bytes, get_decode_pool
+from ...core.display_cache import get_display_cache
+from ...core.encoded_cache import get_encoded_cache, reset_encoded_cache
+from ...core.image_header import read_image_header, read_image_headers
 from ...core.image_processing import HybridImageProcessor
+from ...core.image_sequence import ImageSequence
+from ...core.loading.single_flight import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_FOREGROUND,
+    PRIORITY_NEXT,
+    get_decode_flights,
+)
 from ...core.memory_watchdog import (
     LEVEL_AGGRESSIVE,
     LEVEL_EMERGENCY,
@@ -23,14 +36,20 @@ from ...core.memory_watchdog import (
     LEVEL_NONE,
     LEVEL_PREVENTIVE,
     choose_cleanup_level,
+    get_level_threshold_mb,
     get_physical_memory_mb,
     get_process_rss_mb,
 )
+from ...core.prefetch_scheduler import PrefetchScheduler
 from ...core.simple_cache import (
+    PIN_OWNER_CURRENT,
+    PIN_OWNER_NEIGHBOR,
+    PIN_PRIORITIES,
     AdvancedImageCache,
     BidirectionalCachePool,
     estimate_image_memory_mb,
     image_pixel_dimensions,
+    quantize_target_size,
 )
 
 # 使用统一监控系统
@@ -42,6 +61,9 @@ logger = logging.getLogger(APP_NAME)
 # 高度压缩的 24MP JPEG 可能仅 6MB，但主线程解码需 80-150ms
 _FAST_SYNC_MAX_PIXELS = 12_000_000  # 12MP
 
+# _load_image_with_concurrency(wait=False) 的返回值：同键解码进行中，未等待
+_DECODE_IN_FLIGHT = object()
+
 
 class ImageManager:
     """图像管理器，负责图像加载、缓存和处理策略"""
@@ -52,6 +74,12 @@ class ImageManager:
     _BG_TASK_THROTTLE_SEC = 0.5
     # 扩展预取节流：连续导航时不每次都触发 hot3 和自适应预取
     _PREFETCH_THROTTLE_SEC = 0.3
+    # 单代自适应预取的预估内存预算（MB）：超大图连按时不为邻居堆积解码
+    _PREFETCH_GENERATION_BUDGET_MB = 384.0
+    # 显示级磁盘缓存回填门槛（MB）：小文件直接解码已足够快，不落盘
+    _DISPLAY_TIER_MIN_SOURCE_MB = 2.0
+    # 长边达到原图该比例（约 90% 像素量）的缓存档位视为全分辨率，无需升级
+    _FULL_RES_EDGE_RATIO = 0.95
 
     def __init__(self, main_window):
         """初始化图像管理器
@@ -74,7 +102,44 @@ class ImageManager:
 
         # 高级图像缓存（max_items 自适应物理内存）
         adaptive_max_items, adaptive_max_memory = self._compute_cache_params()
-        self.image_cache = AdvancedImageCache(max_items=adaptive_max_items, max_memory_mb=adaptive_max_memory)
+        # 准入策略可选 W-TinyLFU（快速拖动/预取扫过时保住反复回看的图片）
+        self.image_cache = AdvancedImageCache(
+            max_items=adaptive_max_items,
+            max_memory_mb=adaptive_max_memory,
+            policy=get_config("feature.cache_admission_policy", POLICY_LRU),
+        )
+        # 可选：记录缓存访问轨迹（JSON Lines），供 cache_policy.compare_policies 离线对比策略
+        self._cache_trace = None
+        trace_path = get_config("feature.cache_trace_path", "")
+        if trace_path:
+            try:
+                self._cache_trace = CacheTraceRecorder(trace_path)
+                self.image_cache.set_trace_recorder(self._cache_trace)
+            except Exception:
+                logger.warning("无法打开缓存轨迹文件: %s", trace_path)
+        # 在线 MRC 估计：0.5x/1x/2x/4x 容量下的命中率进入会话性能报告，
+        # 可选的自动调优在看门狗空闲周期按估计调整容量（扩容不超过预防阈值余量）
+        self._cache_mrc = None
+        self._cache_autotuner = None
+        if get_config("feature.cache_mrc", True):
+            self._cache_mrc = MissRatioCurveEstimator(
+                adaptive_max_items,
+                adaptive_max_memory,
+                sample_rate=get_config("cache.mrc_sample_rate", DEFAULT_MRC_SAMPLE_RATE),
+            )
+            self.image_cache.set_mrc_estimator(self._cache_mrc)
+            with contextlib.suppress(Exception):
+                self.perf.register_report_section(
+                    "image_cache_mrc", "图片缓存命中率曲线（MRC 估计）", self._cache_mrc.report_rows
+                )
+            if get_config("feature.cache_autotune", False):
+                self._cache_autotuner = CacheAutoTuner(adaptive_max_items, adaptive_max_memory)
+
+        # 编码字节层：预读前后 K 张的原始文件字节（远比解码位图省内存），
+        # 解码时直接从内存字节创建图像源，网络盘/USB 盘的读盘延迟移出关键路径
+        self._encoded_cache = get_encoded_cache() if get_config("feature.encoded_prefetch", True) else None
+        # 邻居预取在解码子进程中完成（共享内存回传像素），解码内存不留在主进程
+        self._pool_prefetch = get_config("feature.pool_prefetch", True)
 
         # 竖向图片缓存优化配置
         self._portrait_cache_config = {
@@ -118,6 +183,17 @@ class ImageManager:
         self._prefetch_executor = BoundedExecutor(
             ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch"), max_queued=6
         )
+        # 自适应预取调度器：真正按优先级出队，按 (path, target_size) 去重，
+        # 代次推进时过期邻居直接出队，不再等线程醒来才比对代次
+        self._prefetch_scheduler = PrefetchScheduler(
+            max_workers=2, generation_budget_mb=self._PREFETCH_GENERATION_BUDGET_MB, thread_name_prefix="adaptive"
+        )
+
+        # 显示级磁盘缓存：重访/重启后直接加载降采样渲染图，免去整张大图解码
+        self._display_tier = get_display_cache()
+        self._display_tier_pending: set[str] = set()
+        # 已提交到解码子进程池的回填请求（path → Future）：代次推进时取消仍在排队的
+        self._display_tier_decodes: dict = {}
 
         # 内存监控线程
         self._memory_monitor_running = False
@@ -145,6 +221,9 @@ class ImageManager:
         self._next_ready_path = None
         self._load_generation = 0
         self._decode_lock = threading.Lock()
+        # 解码单飞：当前图/下一张/预取/HOT3/高质量重载对同一 (path, target_size)
+        # 的并发解码合并为一次，前台调用方加入时提升共享解码的优先级
+        self._decode_flights = get_decode_flights()
         self._last_index = None
         self._nav_history = []  # [(timestamp, direction)] 最近导航事件
         self._last_sequence_sync = 0  # 上次序列同步时间
@@ -154,11 +233,6 @@ class ImageManager:
         self._path_index: dict[str, int] | None = None
         self._images_snapshot = None
 
-        # HOT3 强引用锁：保证当前/上一张/下一张不被 NSCache 驱逐
-        # NSCache 在内存压力下由系统控制淘汰，无法保证 HOT3 常驻；
-        # 使用独立 dict 强引用确保导航回退永远零延迟
-        self._hot3_lock: dict[str, object] = {}
-
         # 当前图片元信息缓存（避免 status_bar 重复 I/O）
         self._current_image_resolution = None  # "WxH" 字符串或空字符串
         self._current_image_size_mb = None  # "X.XXMB" 字符串或空字符串
@@ -217,6 +291,8 @@ class ImageManager:
             self._load_generation += 1
         except Exception:
             self._load_generation = 1
+        # 排队中的过期预取立即出队（不受扩展预取节流影响）
+        self._cancel_stale_prefetches()
 
         # 记录导航方向与速度
         try:
@@ -332,11 +408,23 @@ class ImageManager:
             self._post_display_tasks(image_path, target_size, t_start, display_method)
             return
 
-        # 4. 缓存未命中，执行加载策略
-        #    MPF 内嵌预览图在后台异步提取（不阻塞主线程，见 _schedule_embedded_preview_async）
+        # 4. 内存未命中：先在后台查显示级磁盘缓存，命中即显示，未命中再回到主线程执行加载策略
+        if self._schedule_display_tier_load(image_path, target_size, async_first_load):
+            self._post_display_tasks(image_path, target_size, t_start, "display_tier_probe")
+            return
+
+        # 5. 缓存未命中，执行加载策略
+        self._load_uncached(image_path, target_size, async_first_load)
+        self._post_display_tasks(image_path, target_size, t_start, "background_or_progressive")
+
+    def _load_uncached(self, image_path: str, target_size, async_first_load=False):
+        """缓存均未命中：执行加载策略并后台回填显示级磁盘缓存
+
+        MPF 内嵌预览图在后台异步提取（不阻塞主线程，见 _schedule_embedded_preview_async）。
+        """
         self._schedule_embedded_preview_async(image_path)
         self._execute_loading_with_strategy(image_path, target_size, async_first_load=async_first_load)
-        self._post_display_tasks(image_path, target_size, t_start, "background_or_progressive")
+        self._schedule_display_tier_fill(image_path, target_size)
 
     def _update_status_and_notices(self):
         """更新状态栏并显示一次性通知"""
@@ -402,7 +490,6 @@ class ImageManager:
         # 非精简模式：扩展预取（hot3 + 自适应）—— 节流
         if not self.slim_mode and now - self._last_prefetch_time >= self._PREFETCH_THROTTLE_SEC:
             self._last_prefetch_time = now
-            self._cancel_stale_prefetches()
             self._schedule_adaptive_prefetch(image_path, target_size)
             self._ensure_hot3_residency(image_path, target_size)
 
@@ -453,6 +540,9 @@ class ImageManager:
     def _try_display_cached_image(self, image_path: str, target_size: tuple) -> bool:
         """尝试显示缓存的图像
 
+        按所需尺寸取最佳可用档位：足够大的档位直接显示；只有较小档位时先作为
+        即时占位显示，再后台升级到所需分辨率。
+
         Args:
             image_path: 图像文件路径
             target_size: 目标尺寸
@@ -460,68 +550,221 @@ class ImageManager:
         Returns:
             bool: 是否成功显示缓存的图像
         """
+        wanted = self._wanted_cache_size(image_path, target_size)
         try:
-            cached_image = self.image_cache.get(image_path, target_size=target_size)
+            hit = self.image_cache.get_best(image_path, target_size=wanted)
         except Exception as e:
-            cached_image = None
-            logger.debug("image_cache.get failed: %s", e)
+            hit = None
+            logger.debug("image_cache.get_best failed: %s", e)
 
-        if cached_image:
+        if hit is not None and hit.value:
             # 缓存命中，立即显示
-            self._display_image_immediate(cached_image)
+            self._display_image_immediate(hit.value)
             self._schedule_background_tasks()
-            # 全分辨率浏览模式下，命中低分辨率条目时后台升级（代次保护）
-            self._maybe_upgrade_cached_image(image_path, cached_image)
+            if not hit.satisfied:
+                # 命中的是较小档位（占位），后台升级（代次保护）
+                self.perf.count("render_cache.placeholder")
+                self._schedule_tier_upgrade(image_path, target_size)
+            else:
+                self.perf.count("render_cache.hit")
+                if self.image_cache.can_derive(hit, wanted):
+                    # 命中档位远大于所需（如窗口缩小后）：后台派生较小渲染
+                    self._schedule_tier_derive(image_path, wanted)
             return True
 
         return False
 
-    def _maybe_upgrade_cached_image(self, image_path: str, cached_image) -> None:
-        """缓存命中但条目为低分辨率时，后台加载全分辨率版本并升级显示
+    def _wanted_cache_size(self, image_path: str, target_size) -> tuple | None:
+        """缓存查找所需尺寸：视图目标尺寸；全分辨率浏览时为原图尺寸（留少量容差）
 
-        预取/下一张缓冲写入的是视图级分辨率；在全分辨率浏览模式下
-        （full_res_browse），命中这类条目后仅显示会"偏软"。此处按代次
-        保护地调度一次全分辨率后台加载，完成后无缝替换显示并更新缓存。
+        全分辨率浏览且原图尺寸未知时返回 None（任意档位均视为满足）。
+        """
+        if target_size:
+            return target_size
+        if not self._full_res_browse:
+            return None
+        dims = self._get_cached_dimensions_only(image_path)
+        if not dims or dims[0] <= 0 or dims[1] <= 0:
+            return None
+        return (int(dims[0] * self._FULL_RES_EDGE_RATIO), int(dims[1] * self._FULL_RES_EDGE_RATIO))
+
+    def _cache_image(self, image_path: str, img, pin_owner: str | None = None) -> None:
+        """写入内存缓存（按分辨率档位存储；原图尺寸已知时标记是否为降采样档位）
+
+        pin_owner 非空时写入即由该持有者固定（写入与固定之间不会被淘汰）。
+        """
+        try:
+            full_resolution = None
+            file_dims = getattr(self, "_image_dimensions_cache", {}).get(image_path)
+            img_dims = image_pixel_dimensions(img)
+            if file_dims and img_dims and max(file_dims) > 0:
+                full_resolution = max(img_dims) >= max(file_dims) * self._FULL_RES_EDGE_RATIO
+            self.image_cache.put(
+                image_path,
+                img,
+                size_mb=estimate_image_memory_mb(img),
+                full_resolution=full_resolution,
+                pin_owner=pin_owner,
+            )
+        except Exception:
+            logger.debug("_cache_image failed: %s", image_path, exc_info=True)
+
+    def _schedule_display_tier_load(self, image_path: str, target_size, async_first_load=False) -> bool:
+        """后台查找并解码显示级磁盘缓存（~300KB 渲染图，免去原图解码）
+
+        查找需要对源文件 realpath/stat（网络盘上为一次往返），首次使用还要
+        扫描缓存目录建立索引，因此不在主线程执行。命中时投递到主线程显示
+        并回填内存缓存；未命中时投递到主线程执行常规加载策略（代次保护）。
 
         Args:
             image_path: 图像文件路径
-            cached_image: 当前缓存条目对应的图像对象
+            target_size: 显示目标尺寸
+            async_first_load: 未命中时透传给加载策略
+
+        Returns:
+            bool: 是否已提交后台查找（全分辨率浏览等不适用时返回 False）
         """
-        if not self._full_res_browse:
-            return
+        if self._display_tier.bucket_for(target_size) is None:
+            return False
+        gen = self._load_generation
+
+        def probe():
+            image = None
+            if gen == self._load_generation:
+                image = self._load_from_display_tier(image_path, target_size)
+
+            def apply():
+                if gen != self._load_generation:
+                    return
+                if image:
+                    self._cache_image(image_path, image)
+                    self._display_image_immediate(image)
+                    self._schedule_background_tasks()
+                    return
+                self._load_uncached(image_path, target_size, async_first_load)
+
+            self._post_to_main(apply)
+
         try:
-            file_dims = self._get_cached_dimensions(image_path)
-            if not file_dims or file_dims[0] <= 0 or file_dims[1] <= 0:
-                return
-            img_dims = image_pixel_dimensions(cached_image)
-            if img_dims is None:
-                return
-            # 已接近全分辨率（≥90% 像素量）则无需重复加载
-            if img_dims[0] * img_dims[1] >= int(file_dims[0] * file_dims[1] * 0.9):
+            self._executor.submit(probe)
+        except Exception:
+            logger.debug("display tier probe submit failed: %s", image_path, exc_info=True)
+            return False
+        return True
+
+    def _load_from_display_tier(self, image_path: str, target_size):
+        """从显示级磁盘缓存加载渲染图（后台线程调用；全分辨率浏览不使用）
+
+        Returns:
+            图像对象；未命中返回 None
+        """
+        try:
+            cached_file = self._display_tier.lookup(image_path, target_size)
+            if not cached_file:
+                return None
+            from ...core.decode_threads import run_decode
+            from ...core.loading.helpers import load_with_nsimage
+
+            # 临时线程解码：线程退出即 drain autorelease pool（同内嵌预览提取）
+            return run_decode(load_with_nsimage, cached_file)
+        except Exception:
+            logger.debug("display tier lookup failed: %s", image_path, exc_info=True)
+            return None
+
+    def _schedule_display_tier_fill(self, image_path: str, target_size) -> None:
+        """后台生成显示级渲染图并写入磁盘缓存（供下次重访/重启直接命中）
+
+        解码在子进程池中完成（输出即显示级 JPEG），不占用主进程解码内存；
+        小文件、全分辨率浏览或已有渲染图时跳过（文件大小与已有渲染图均在
+        工作线程检查，主线程不访问网络路径）。排队中的任务可能被有界执行器
+        淘汰取消，pending 标记由 Future 完成回调清除；已进入解码池队列但尚未
+        发给子进程的请求在导航离开时取消（_cancel_stale_prefetches），
+        不占用邻居预取的子进程。
+
+        Args:
+            image_path: 图像文件路径
+            target_size: 显示目标尺寸
+        """
+        try:
+            bucket = self._display_tier.bucket_for(target_size)
+            if bucket is None or image_path in self._display_tier_pending:
                 return
+            self._display_tier_pending.add(image_path)
+
+            def worker():
+                try:
+                    if self._get_file_size_safely(image_path) < self._DISPLAY_TIER_MIN_SOURCE_MB:
+                        return
+                    if self._display_tier.contains(image_path, target_size):
+                        return
+                    pool = get_decode_pool()
+                    decode = pool.decode_async(image_path, target_size=(bucket, bucket))
+                    self._display_tier_decodes[image_path] = decode
+                    try:
+                        rendition = decode.result()
+                    except CancelledError:
+                        return
+                    finally:
+                        self._display_tier_decodes.pop(image_path, None)
+                    if not isinstance(rendition, str):
+                        return
+                    try:
+                        self._display_tier.store_file(image_path, bucket, rendition)
+                    finally:
+                        pool.cleanup_file(rendition)
+                except Exception:
+                    logger.debug("display tier fill failed: %s", image_path, exc_info=True)
 
+            future = self._prefetch_executor.submit(worker)
+            future.add_done_callback(lambda _f: self._display_tier_pending.discard(image_path))
+        except Exception:
+            self._display_tier_pending.discard(image_path)
+
+    def _schedule_tier_derive(self, image_path: str, wanted) -> None:
+        """后台由已缓存的较大档位派生所需尺寸的渲染（重采样，不读盘、不解码）"""
+
+        def derive():
+            try:
+                if self.image_cache.derive(image_path, wanted) is not None:
+                    self.perf.count("render_cache.derive")
+            except Exception:
+                logger.debug("_schedule_tier_derive failed", exc_info=True)
+
+        self._submit_noncritical(derive)
+
+    def _schedule_tier_upgrade(self, image_path: str, target_size) -> None:
+        """缓存只有较小档位时，后台加载所需分辨率并升级显示
+
+        预取/下一张缓冲写入的是视图级分辨率；在全分辨率浏览模式下
+        （full_res_browse）或视图放大后，命中这类档位仅显示会"偏软"。此处按代次
+        保护地调度一次后台加载，完成后无缝替换显示，并作为新档位写入缓存
+        （较小档位保留，供后续导航即时占位）。
+
+        Args:
+            image_path: 图像文件路径
+            target_size: 目标尺寸；None 表示全分辨率
+        """
+        try:
             gen = self._load_generation
 
             def upgrade():
                 try:
                     if gen != self._load_generation:
                         return
-                    img = self._load_image_with_concurrency(image_path, None)
+                    img = self._load_image_with_concurrency(image_path, target_size, PRIORITY_FOREGROUND)
                     if img is None:
                         return
                     if gen != self._load_generation:
                         return
                     self._post_to_main(lambda: self._display_image_immediate(img))
-                    with contextlib.suppress(Exception):
-                        size_mb = estimate_image_memory_mb(img)
-                        self.image_cache.put(image_path, img, size_mb=size_mb)
+                    self._cache_image(image_path, img)
                 except Exception:
-                    logger.debug("_maybe_upgrade_cached_image failed", exc_info=True)
+                    logger.debug("_schedule_tier_upgrade failed", exc_info=True)
 
             # 非关键后台任务：队列积压超限时丢弃（快速导航时升级任务很快过期）
             self._submit_noncritical(upgrade)
         except Exception:
-            logger.debug("_maybe_upgrade_cached_image check failed", exc_info=True)
+            logger.debug("_schedule_tier_upgrade submit failed", exc_info=True)
 
     def _execute_loading_strategy(self, image_path: str, target_size: tuple, async_first_load=False):
         """执行加载策略
@@ -611,7 +854,13 @@ class ImageManager:
             image_path: 图像文件路径
         """
         try:
-            image = self._load_image_optimized(image_path, target_size=None)
+            image = self._load_image_with_concurrency(image_path, None, PRIORITY_FOREGROUND, wait=False)
+            if image is _DECODE_IN_FLIGHT:
+                # 同键解码（HOT3 常驻 / 后台全分辨率加载）进行中：主线程不等待，
+                # 已将其提升为前台优先级，改由后台线程加入并显示结果
+                self._start_background_load(image_path, None)
+                self._schedule_background_tasks()
+                return
             if image:
                 self._display_image_immediate(image)
                 # 快速显示后仅提交后台任务和下一张预读（扩展预取由 _post_display_tasks 统一节流）
@@ -670,19 +919,23 @@ class ImageManager:
             )
 
     def _get_dynamic_target_size(self):
-        """根据当前视图尺寸与缩放比动态确定目标尺寸"""
+        """根据当前视图尺寸与缩放比动态确定目标尺寸
+
+        结果按长边量化到固定档位（quantize_target_size）：窗口小幅缩放或换屏后
+        目标尺寸仍落在同一档位，直接复用已缓存的渲染，不再重新解码。
+        """
         try:
             zoom = 1.0
             if hasattr(self.main_window, "image_view") and self.main_window.image_view:
                 zoom = getattr(self.main_window.image_view, "zoom_scale", 1.0) or 1.0
             base_w, base_h = self._get_target_size_for_view(scale_factor=1)
             if zoom <= 1.0:
-                return (base_w, base_h)
+                return quantize_target_size((base_w, base_h))
             max_os = 1.5
             eff = min(max(1.0, float(zoom)), max_os)
-            return (int(base_w * eff), int(base_h * eff))
+            return quantize_target_size((int(base_w * eff), int(base_h * eff)))
         except Exception:
-            return self._get_target_size_for_view(scale_factor=1)
+            return quantize_target_size(self._get_target_size_for_view(scale_factor=1))
 
     def _is_portrait_image(self, image_path):
         """检测图像是否为竖向（高度>宽度）
@@ -854,7 +1107,7 @@ class ImageManager:
 
         def background_load():
             try:
-                image = self._load_image_with_concurrency(image_path, target_size)
+                image = self._load_image_with_concurrency(image_path, target_size, PRIORITY_FOREGROUND)
                 if gen != self._load_generation:
                     # 已导航到新图片，丢弃过时结果，避免旧图覆盖当前显示
                     return
@@ -892,7 +1145,19 @@ class ImageManager:
             logger.debug("提交非关键任务失败", exc_info=True)
             return None
 
-    def _load_image_with_concurrency(self, image_path: str, target_size):
+    def _load_image_with_concurrency(
+        self, image_path: str, target_size, priority: int = PRIORITY_BACKGROUND, wait: bool = True, loader=None
+    ):
+        """解码图片（同键并发调用合并为一次解码，后台优先级受解码槽位并发控制）
+
+        Args:
+            image_path: 图像文件路径
+            target_size: 目标尺寸
+            priority: 调用方优先级（PRIORITY_FOREGROUND 当前图 / PRIORITY_NEXT / PRIORITY_BACKGROUND）
+            wait: 同键解码进行中时是否等待其结果；False 时（主线程调用）不等待，
+                提升该解码后返回 _DECODE_IN_FLIGHT
+            loader: 领头调用方使用的解码函数，默认 _load_image_optimized
+        """
         try:
             # 动态并发控制：根据 CPU 核心数自适应，多核 Mac 上充分利用解码能力
             if not hasattr(self, "_decode_semaphore"):
@@ -901,12 +1166,34 @@ class ImageManager:
                 # Quartz 懒代理不解码像素，信号量等待是不必要的；
                 # 实际解码主要发生在缩略图/全分辨率路径，保守设置为 cores//2
                 self._decode_semaphore = threading.BoundedSemaphore(value=max(2, cpu_count // 2))
-            start = time.time()
-            with self._decode_semaphore:
-                result = self._load_image_optimized(image_path, target_size=target_size)
-            # 归档实际解码耗时到经验表（供 P2-1 自适应两阶段消费）
-            if result is not None:
-                self._record_decode_experience(image_path, (time.time() - start) * 1000)
+            led = []
+
+            def decode(flight):
+                led.append(True)
+                start = time.time()
+                # 前台解码（或被前台调用方提升的共享解码）不排队等待槽位；
+                # 下一张就绪缓冲一向不占用槽位（与接入单飞前一致）
+                acquired = priority > PRIORITY_NEXT and flight.acquire_slot(self._decode_semaphore)
+                try:
+                    result = (loader or self._load_image_optimized)(image_path, target_size=target_size)
+                finally:
+                    if acquired:
+                        self._decode_semaphore.release()
+                # 归档实际解码耗时到经验表（供 P2-1 自适应两阶段消费）
+                if result is not None:
+                    self.perf.count("render_cache.decode")
+                    self._record_decode_experience(image_path, (time.time() - start) * 1000)
+                return result
+
+            if not wait:
+                ran, result = self._decode_flights.try_run((image_path, target_size), decode, priority)
+                if not ran:
+                    self.perf.count("render_cache.decode_deferred")
+                    return _DECODE_IN_FLIGHT
+                return result
+            result = self._decode_flights.run((image_path, target_size), decode, priority)
+            if not led:
+                self.perf.count("render_cache.decode_shared")
             return result
         except Exception:
             logger.exception("_load_image_with_concurrency failed for %s", image_path)
@@ -1083,7 +1370,7 @@ class ImageManager:
                         return
                     # 使用更安全的预取尺寸：当目标尺寸为None（全分辨率）时，改用视图级动态尺寸
                     prefetch_target = target_size if target_size else self._get_dynamic_target_size()
-                    img = self._load_image_optimized(path, target_size=prefetch_target)
+                    img = self._load_image_with_concurrency(path, prefetch_target, PRIORITY_NEXT)
                     if img is None:
                         return
                     # 写入缓冲（仍需检查代次）
@@ -1100,11 +1387,12 @@ class ImageManager:
             logger.debug("_prepare_next_image_async failed", exc_info=True)
 
     def _get_path_index(self, path: str) -> int | None:
-        """返回图片路径在当前 images 列表中的索引（O(1) 缓存查找）
+        """返回图片路径在当前 images 列表中的索引
 
-        images 列表在文件夹切换时整体重新赋值（身份变化）或长度变化，
-        检测到变化时一次性重建 O(n) 的 path->index 映射，
-        之后所有相邻查找均为 O(1)，避免每次导航在主线程做 O(n) index()。
+        images 为 ImageSequence（文件夹加载的常规情形）时直接 O(log n) 查找，
+        精选/撤回增删后无需重建映射。普通列表在文件夹切换时整体重新赋值
+        （身份变化）或长度变化，检测到变化时一次性重建 O(n) 的 path->index
+        映射，之后相邻查找均为 O(1)。
 
         Args:
             path: 图片文件路径
@@ -1114,6 +1402,8 @@ class ImageManager:
         """
         try:
             images = getattr(self.main_window, "images", None) or []
+            if isinstance(images, ImageSequence):
+                return images.index_of(path)
             if (
                 self._path_index is None
                 or self._images_snapshot is not images
@@ -1232,41 +1522,102 @@ class ImageManager:
             if opp:
                 candidates.append((opp, 2))
 
+            self._schedule_encoded_prefetch(current_path, direction)
+
             gen = self._load_generation
+            prefetch_target = target_size if target_size else self._get_dynamic_target_size()
+            # 预估解码内存按档位计入代次预算：主线程不逐张读头部（网络盘上每次都是往返）
+            estimated_mb = estimate_tier_bytes(prefetch_target) / (1024 * 1024)
 
             for path, priority in candidates:
-                # 扩展预取走独立线程池，避免挤占当前图/下一张的关键解码线程
-                self._prefetch_executor.submit(self._prefetch_worker, path, target_size, gen, priority)
+                # 已缓存（档位不小于预取尺寸）的邻居无需排队
+                if self.image_cache.contains_tier(path, prefetch_target):
+                    continue
+                # 独立调度器按优先级出队，避免挤占当前图/下一张的关键解码线程
+                self._prefetch_scheduler.submit(
+                    self._prefetch_worker,
+                    path,
+                    target_size,
+                    gen,
+                    priority=priority,
+                    estimated_mb=estimated_mb,
+                )
         except Exception:
             logger.debug("_schedule_adaptive_prefetch failed", exc_info=True)
 
+    def _schedule_encoded_prefetch(self, current_path: str, direction: int) -> None:
+        """按距离由近到远预读编码字节窗口（导航方向占 3/4，反方向占 1/4）"""
+        cache = getattr(self, "_encoded_cache", None)
+        if cache is None or cache.window <= 0:
+            return
+        try:
+            backward = max(1, cache.window // 4)
+            paths = []
+            for distance in range(1, cache.window + 1):
+                ahead = self._get_path_by_offset(current_path, distance * direction)
+                if ahead:
+                    paths.append(ahead)
+                if distance <= backward:
+                    behind = self._get_path_by_offset(current_path, -distance * direction)
+                    if behind:
+                        paths.append(behind)
+            cache.prefetch(paths)
+        except Exception:
+            logger.debug("_schedule_encoded_prefetch failed", exc_info=True)
+
     def _prefetch_worker(self, path: str, target_size: tuple, expected_gen: int, priority: int) -> None:
         try:
             # 开始前检查是否仍是最新一代
             if expected_gen != self._load_generation:
                 return
-            # 先检查缓存避免重复工作
-            if self.image_cache.get(path, target_size=target_size):
-                return
             # 预取使用视图级目标尺寸：预加载目的是加速下一次导航，
             # 只需视图分辨率（~2000-3000px），全分辨率浪费 4x 内存和时间
             prefetch_target = target_size if target_size else self._get_dynamic_target_size()
-            img = self._load_image_with_concurrency(path, prefetch_target)
+            # 先检查缓存避免重复工作
+            if self.image_cache.contains_tier(path, prefetch_target):
+                return
+            loader = self._decode_in_pool if self._pool_prefetch else None
+            img = self._load_image_with_concurrency(path, prefetch_target, loader=loader)
             if img is None:
                 return
             # 放入预加载缓存层
             if expected_gen != self._load_generation:
                 return
-            with contextlib.suppress(Exception):
-                size_mb = estimate_image_memory_mb(img)
-                self.image_cache.put(path, img, size_mb=size_mb)
+            self._cache_image(path, img)
         except Exception:
             logger.debug("_prefetch_worker failed", exc_info=True)
 
+    def _decode_in_pool(self, image_path: str, target_size=None):
+        """预取解码：子进程把像素写入共享内存，主进程包装为 CGImage
+
+        解码内存留在子进程（随周期重启回收），两个预取线程的请求分布到各子进程
+        并行解码；子进程池不可用或共享内存不适用（尺寸未知/预算不足）时
+        回退主进程解码。
+        """
+        pool = get_decode_pool()
+        if pool.uses_subprocess:
+            frame = pool.decode_frame(image_path, target_size, fallback_to_file=False)
+            if frame is not None:
+                from ...core.loading.helpers import cgimage_from_frame
+
+                with frame:
+                    img = cgimage_from_frame(frame)
+                if img is not None:
+                    return img
+        return self._load_image_optimized(image_path, target_size=target_size)
+
     def _cancel_stale_prefetches(self) -> None:
-        # 基于代次的软取消，线程会在开始/结束前检查 expected_gen
-        # 此处仅提升代次已在 show_current_image 中完成
-        pass
+        # 代次提升后调用：把过期代次的排队预取直接出队，
+        # 已在执行的任务仍由 _prefetch_worker 在开始/结束前检查 expected_gen
+        with contextlib.suppress(Exception):
+            dropped = self._prefetch_scheduler.advance_generation(self._load_generation)
+            if dropped:
+                logger.debug("丢弃过期预取任务 %d 个", dropped)
+        # 离开的图片的显示级回填：尚在解码池排队的请求取消（已发给子进程的照常完成）
+        with contextlib.suppress(Exception):
+            cancelled = sum(1 for f in list(self._display_tier_decodes.values()) if f.cancel())
+            if cancelled:
+                logger.debug("取消排队中的显示级回填 %d 个", cancelled)
 
     def _get_path_by_offset(self, current_path: str, offset: int) -> str:
         try:
@@ -1315,7 +1666,9 @@ class ImageManager:
                         return
                     full_image = self.image_cache.load_image_with_strategy(image_path, "optimized", local_target_size)
                     if full_image is None:
-                        full_image = self._load_image_optimized(image_path, target_size=local_target_size)
+                        full_image = self._load_image_with_concurrency(
+                            image_path, local_target_size, PRIORITY_FOREGROUND
+                        )
                     if full_image and gen == self._load_generation:
                         self._post_to_main(lambda: self._display_image_immediate(full_image))
             except Exception:
@@ -1328,6 +1681,7 @@ class ImageManager:
 
         缓存命中直接返回；未命中时读取文件元数据（可能触发 I/O），
         仅供后台线程调用，主线程请使用 _get_cached_dimensions_only。
+        元数据优先走纯 Python 头部解析（单次 pread），不认识的格式回退 Quartz。
 
         Args:
             image_path: 图像文件路径
@@ -1339,19 +1693,21 @@ class ImageManager:
             cached = self._get_cached_dimensions_only(image_path)
             if cached:
                 return cached
-            dims = None
-            try:
-                from Foundation import NSURL
-                from Quartz import CGImageSourceCopyPropertiesAtIndex, CGImageSourceCreateWithURL
-
-                url = NSURL.fileURLWithPath_(image_path)
-                source = CGImageSourceCreateWithURL(url, None)
-                if source:
-                    props = CGImageSourceCopyPropertiesAtIndex(source, 0, None)
-                    if props:
-                        dims = (props.get("PixelWidth", 0), props.get("PixelHeight", 0))
-            except Exception:
-                pass
+            header = read_image_header(image_path)
+            dims = header.dimensions if header is not None else None
+            if dims is None:
+                try:
+                    from Foundation import NSURL
+                    from Quartz import CGImageSourceCopyPropertiesAtIndex, CGImageSourceCreateWithURL
+
+                    url = NSURL.fileURLWithPath_(image_path)
+                    source = CGImageSourceCreateWithURL(url, None)
+                    if source:
+                        props = CGImageSourceCopyPropertiesAtIndex(source, 0, None)
+                        if props:
+                            dims = (props.get("PixelWidth", 0), props.get("PixelHeight", 0))
+                except Exception:
+                    pass
             if dims and dims[0] > 0:
                 self._cache_image_dimensions(image_path, dims)
             return dims
@@ -1365,9 +1721,10 @@ class ImageManager:
         使后续导航热路径的竖向检测 / 像素阈值判断全部命中缓存，
         主线程不再触碰元数据 I/O。
 
-        跨启动加速（P3-4）：优先命中目录级持久化尺寸缓存（以目录 mtime
-        失效），二次打开同一目录直接批量回填内存缓存，跳过逐文件元数据
-        读取；未命中则逐个读取并顺带写回持久化缓存。
+        跨启动加速（P3-4）：优先命中 SQLite 元数据索引（按文件大小 + mtime
+        逐文件失效），仍有效的行直接批量回填内存缓存；新增/改动的文件才
+        批量并行探测头部（纯 I/O），头部无法解析的文件再逐个回退 Quartz，
+        结果批量写回索引。
 
         Args:
             image_paths: 图片路径列表
@@ -1380,51 +1737,18 @@ class ImageManager:
             if not paths:
                 return
 
-            # 目录级持久化缓存键：以 paths 所在目录 + mtime 为失效依据
-            dir_path = os.path.dirname(paths[0]) if paths else ""
-            dir_mtime = -1.0
-            try:
-                if dir_path:
-                    dir_mtime = os.stat(dir_path).st_mtime
-            except OSError:
-                dir_mtime = -1.0
-
             def worker():
                 try:
-                    if not dir_path:
-                        return
-                    # P3-4：先查目录级持久化缓存
-                    try:
-                        from ...core.dimension_cache import get_dimension_cache
+                    from ...core.metadata_index import get_metadata_index
 
-                        persisted = get_dimension_cache().load(dir_path, dir_mtime)
-                    except Exception:
-                        persisted = None
-
-                    if persisted:
-                        # 命中：批量回填内存 LRU，跳过逐文件元数据 I/O
-                        for p in paths:
-                            name = os.path.basename(p)
-                            dims = persisted.get(name)
-                            if dims:
-                                self._cache_image_dimensions(p, dims)
-                        return
-
-                    # 未命中：逐个读取并收集，顺带写回持久化缓存
-                    collected: dict[str, tuple[int, int]] = {}
+                    index = get_metadata_index()
+                    by_dir: dict[str, list[str]] = {}
                     for p in paths:
+                        by_dir.setdefault(os.path.dirname(p), []).append(p)
+                    for dir_path, dir_paths in by_dir.items():
                         if getattr(self.main_window, "_shutting_down", False):
                             return
-                        if self._get_cached_dimensions_only(p) is not None:
-                            continue
-                        dims = self._get_cached_dimensions(p)
-                        if dims and dims[0] > 0:
-                            collected[os.path.basename(p)] = dims
-                    try:
-                        if collected:
-                            get_dimension_cache().save(dir_path, dir_mtime, collected)
-                    except Exception:
-                        pass
+                        self._prewarm_dir_dimensions(index, dir_path, dir_paths)
                 except Exception:
                     pass
 
@@ -1432,6 +1756,61 @@ class ImageManager:
         except Exception:
             pass
 
+    def _prewarm_dir_dimensions(self, index, dir_path: str, dir_paths: list[str]) -> None:
+        """单目录尺寸预热：索引命中直接回填，过期/缺失的文件探测后批量写回
+
+        Args:
+            index: MetadataIndex 实例
+            dir_path: 目录路径
+            dir_paths: 该目录下待预热的图片路径
+        """
+        from ...core.metadata_index import FileMeta
+
+        fresh, stale = index.refresh_dir(dir_path, [os.path.basename(p) for p in dir_paths])
+        pending = []
+        for p in dir_paths:
+            meta = fresh.get(os.path.basename(p))
+            if meta is not None:
+                if meta.dimensions:
+                    self._cache_image_dimensions(p, meta.dimensions)
+                if meta.has_mpf is False:
+                    self._remember_no_mpf(p)
+            elif os.path.basename(p) in stale:
+                pending.append(p)
+        if not pending:
+            return
+
+        headers = read_image_headers(pending)
+        rows = []
+        for p in pending:
+            if getattr(self.main_window, "_shutting_down", False):
+                return
+            name = os.path.basename(p)
+            size, mtime_ns = stale[name]
+            header = headers.get(p)
+            if header is not None:
+                self._cache_image_dimensions(p, header.dimensions)
+                rows.append(
+                    FileMeta(
+                        name,
+                        size,
+                        mtime_ns,
+                        header.width,
+                        header.height,
+                        header.orientation,
+                        header.has_alpha,
+                        header.has_mpf,
+                        header.capture_time or "",
+                    )
+                )
+                continue
+            # 头部无法解析（HEIC/TIFF 等）：逐个回退 Quartz，仅记录尺寸
+            dims = self._get_cached_dimensions(p)
+            if dims and dims[0] > 0:
+                rows.append(FileMeta(name, size, mtime_ns, dims[0], dims[1]))
+        if rows:
+            index.upsert_many(dir_path, rows)
+
     def _maybe_two_stage_for_ultra(self, image_path: str, target_size: tuple) -> bool:
         """根据文件大小/像素数/解码经验决定是否采用两阶段显示（预览→全清晰度）
 
@@ -1575,61 +1954,45 @@ class ImageManager:
                 logger.debug("_post_to_main failed", exc_info=True)
 
     def _ensure_hot3_residency(self, current_path: str, target_size: tuple) -> None:
-        """确保 当前/上一张/下一张 常驻（HOT3 强引用保护）
+        """确保 当前/上一张/下一张 常驻（HOT3：缓存固定）
 
-        机制：
-        1. 主缓存层（NSCache/OrderedDict LRU）—— 正常缓存淘汰
-        2. HOT3 强引用锁（_hot3_lock dict）—— 保证当前+邻居永不驱逐
-
-        NSCache 在内存压力下由系统控制淘汰，即使有 LRU 记账也无法阻止
-        系统驱逐当前正在显示的图片。独立的 dict 强引用确保：
+        通过主缓存的引用计数固定（pin）实现：固定条目计入缓存预算但不会被
+        LRU/准入策略淘汰，NSCache 模式下另持强引用，系统自动驱逐后仍可命中。
+        当前图片与邻居使用不同持有者，内存紧急时可只保留当前图片：
         - 左右方向键回退永远零延迟
-        - 仅在切换文件夹时主动清理 _hot3_lock
+        - 离开 HOT3 的路径随导航解除固定，切换文件夹时全部解除
         """
         try:
-            neighbors = [current_path]
-            prev_path = self._get_adjacent_path(current_path, -1)
-            next_path = self._get_adjacent_path(current_path, +1)
-            if prev_path:
-                neighbors.append(prev_path)
-            if next_path:
-                neighbors.append(next_path)
-
-            # 清理过期 HOT3 条目（不在邻居列表中的）
-            stale = [p for p in self._hot3_lock if p not in neighbors]
-            for p in stale:
-                del self._hot3_lock[p]
+            neighbors = [
+                p for p in (self._get_adjacent_path(current_path, -1), self._get_adjacent_path(current_path, +1)) if p
+            ]
+
+            # 解除离开 HOT3 的固定（旧的当前图若成为邻居，由邻居持有者重新固定）
+            self.image_cache.unpin_owner(PIN_OWNER_CURRENT, keep=(current_path,))
+            self.image_cache.unpin_owner(PIN_OWNER_NEIGHBOR, keep=neighbors)
 
             gen = self._load_generation
 
-            def promote_and_lock(path: str, expected_gen: int):
+            def promote_and_pin(path: str, owner: str, expected_gen: int):
                 try:
                     if expected_gen != self._load_generation:
                         return
-                    # 已在 HOT3 锁中则跳过
-                    if path in self._hot3_lock:
+                    if self.image_cache.is_pinned(path, owner):
                         return
-                    # 先查主缓存
-                    cached = self.image_cache.get(path)
-                    if cached is not None:
-                        self._hot3_lock[path] = cached
+                    # 命中即固定：查找与固定在同一分片锁内完成，两步之间不会被淘汰
+                    if self.image_cache.pin(path, owner):
                         return
-                    # 加载并双重存储：主缓存 + HOT3 锁
                     img = self._load_image_with_concurrency(path, None)
-                    if img is None:
-                        return
-                    if expected_gen != self._load_generation:
+                    if img is None or expected_gen != self._load_generation:
                         return
-                    self._hot3_lock[path] = img
-                    with contextlib.suppress(Exception):
-                        size_mb = estimate_image_memory_mb(img)
-                        self.image_cache.put(path, img, size_mb=size_mb)
+                    self._cache_image(path, img, pin_owner=owner)
                 except Exception:
-                    logger.debug("promote_and_lock hot3 failed", exc_info=True)
+                    logger.debug("promote_and_pin hot3 failed", exc_info=True)
 
+            # HOT3 常驻走独立预取线程池，与关键解码路径隔离
+            self._prefetch_executor.submit(promote_and_pin, current_path, PIN_OWNER_CURRENT, gen)
             for p in neighbors:
-                # HOT3 常驻走独立预取线程池，与关键解码路径隔离
-                self._prefetch_executor.submit(promote_and_lock, p, gen)
+                self._prefetch_executor.submit(promote_and_pin, p, PIN_OWNER_NEIGHBOR, gen)
         except Exception:
             logger.debug("_ensure_hot3_residency failed", exc_info=True)
 
@@ -1796,6 +2159,7 @@ class ImageManager:
         level = choose_cleanup_level(rss_mb, get_physical_memory_mb())
         if level == LEVEL_NONE:
             self._last_watchdog_level = LEVEL_NONE
+            self._maybe_autotune_cache(rss_mb)
             return
         # 等级变化才告警，避免 RSS 持续超标时每周期刷屏
         if level != getattr(self, "_last_watchdog_level", LEVEL_NONE):
@@ -1810,34 +2174,55 @@ class ImageManager:
             self._aggressive_memory_cleanup()
             self._release_double_buffer()
         elif level == LEVEL_EMERGENCY:
+            # 先强制解除非当前图片的固定，随后的淘汰才能回收这些邻居
+            self._trim_hot3_keep_current()
             self._emergency_memory_cleanup()
             self._release_double_buffer()
-            self._trim_hot3_keep_current()
+            encoded = getattr(self, "_encoded_cache", None)
+            if encoded is not None:
+                encoded.clear()
             with contextlib.suppress(Exception):
                 self._no_mpf_cache.clear()
             import gc
 
             gc.collect()
 
+    def _maybe_autotune_cache(self, rss_mb: float):
+        """看门狗空闲周期：按 MRC 估计调整主缓存容量（扩容量受预防阈值余量约束）"""
+        tuner = getattr(self, "_cache_autotuner", None)
+        mrc = getattr(self, "_cache_mrc", None)
+        if tuner is None or mrc is None:
+            return
+        try:
+            headroom_mb = get_level_threshold_mb(LEVEL_PREVENTIVE, get_physical_memory_mb()) - rss_mb
+            suggestion = tuner.suggest(mrc, headroom_mb)
+            if suggestion is None:
+                return
+            max_items, max_memory_mb = suggestion
+            logger.info(
+                "缓存容量自动调优: %d项/%.0fMB → %d项/%.0fMB (MRC %s)",
+                self.image_cache.max_items,
+                self.image_cache.max_memory_mb,
+                max_items,
+                max_memory_mb,
+                mrc.get_stats()["hit_rate_pct"],
+            )
+            self.image_cache.resize(max_items, max_memory_mb)
+            self.perf.count("image_cache.autotune")
+        except Exception:
+            logger.debug("cache autotune failed", exc_info=True)
+
     def _release_double_buffer(self):
         """释放"下一张就绪"双缓冲（非当前显示图，可安全回收）"""
         self._next_ready_image = None
         self._next_ready_path = None
 
     def _trim_hot3_keep_current(self):
-        """HOT3 强引用锁：仅保留当前路径，其余邻居引用可被回收"""
+        """紧急回收：强制解除当前图片以外的全部固定（邻居等），使其可被淘汰"""
         try:
-            images = self.main_window.images
-            if not images or self.main_window.current_index >= len(images):
-                self._hot3_lock.clear()
-                return
-            current = images[self.main_window.current_index]
-            for p in list(self._hot3_lock):
-                if p != current:
-                    del self._hot3_lock[p]
+            self.image_cache.force_unpin(PIN_PRIORITIES[PIN_OWNER_CURRENT])
         except Exception:
-            with contextlib.suppress(Exception):
-                self._hot3_lock.clear()
+            logger.debug("_trim_hot3_keep_current failed", exc_info=True)
 
     def _apply_background_policy(self):
         """应用后台策略"""
@@ -1893,8 +2278,8 @@ class ImageManager:
             # 清空旧序列
             self.bidi_pool.clear()
 
-            # 清空 HOT3 强引用锁（切换文件夹时主动释放）
-            self._hot3_lock.clear()
+            # 解除 HOT3 固定（切换文件夹时主动释放）
+            self.image_cache.unpin_all()
 
             # 设置新序列
             self.bidi_pool.set_sequence(images)
@@ -1977,8 +2362,13 @@ class ImageManager:
                 view_frame = self.main_window.image_view.frame()
                 target_size = (int(view_frame.size.width * 4), int(view_frame.size.height * 4))
 
-                high_quality_image = self.image_cache.load_image_with_strategy(
-                    image_path, "auto", target_size, force_reload=True
+                # 连续请求（或与其他解码同键）时合并为一次强制重载
+                high_quality_image = self._decode_flights.run(
+                    (image_path, target_size),
+                    lambda _flight: self.image_cache.load_image_with_strategy(
+                        image_path, "auto", target_size, force_reload=True
+                    ),
+                    PRIORITY_FOREGROUND,
                 )
 
                 if high_quality_image:
@@ -2008,19 +2398,28 @@ class ImageManager:
                 self._pending_timer.cancel()
                 self._pending_timer = None
                 self._pending_image = None
-            # 清空 HOT3 强引用锁
-            self._hot3_lock.clear()
+            # 解除 HOT3 固定
+            self.image_cache.unpin_all()
             self._memory_monitor_running = False
             if hasattr(self, "_executor"):
                 self._executor.shutdown(wait=False)
             if hasattr(self, "_prefetch_executor"):
                 self._prefetch_executor.shutdown(wait=False)
+            if hasattr(self, "_prefetch_scheduler"):
+                self._prefetch_scheduler.shutdown(wait=False)
             if self.hybrid_processor:
                 stopper = getattr(self.hybrid_processor, "stop_processing", None)
                 if callable(stopper):
                     stopper(wait=False)
             if self.bidi_pool:
                 self.bidi_pool.shutdown()
+            if getattr(self, "_encoded_cache", None) is not None:
+                reset_encoded_cache()
+                self._encoded_cache = None
+            if self._cache_trace is not None:
+                self.image_cache.set_trace_recorder(None)
+                self._cache_trace.close()
+                self._cache_trace = None
         except Exception:
             pass
 
@@ -2030,6 +2429,8 @@ class ImageManager:
                 self._executor.shutdown(wait=False)
             if hasattr(self, "_prefetch_executor"):
                 self._prefetch_executor.shutdown(wait=False)
+            if hasattr(self, "_prefetch_scheduler"):
+                self._prefetch_scheduler.shutdown(wait=False)
 
     @staticmethod
     def _compute_cache_params() -> tuple[int, float]:
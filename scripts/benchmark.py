@@ -11,11 +11,28 @@ PlookingII 可重复性能基准脚本（P3-2）
 3. 缓存命中率（%）—— 二次遍历同一图片集
 4. RSS 内存曲线（MB）—— 加载过程中的起始/峰值/结束
 5. 文件夹跳转延迟（ms）—— 目录图片列表冷/热扫描
+6. 解码子进程传输（ms）—— JPEG 临时文件 vs 共享内存 RGBA 帧
+7. 目录树遍历（ms）—— 合成 N 目录树：旧流程（串行 os.walk + 线程池判图）
+   vs 工作窃取并行遍历（冷 / 复用快照）
+8. 缓存锁竞争（ops/s）—— 多线程读写 SimpleImageCache（OrderedDict 降级模式）
+   + 统计轮询线程：单锁（1 分片）vs 分片锁
+9. 缓存策略命中率（%）—— 浏览轨迹回放：LRU vs W-TinyLFU（合成轨迹或 --cache-trace）
+10. 路径存储内存（MB）—— 合成 50 万文件的目录树：完整路径 + 普通 FileInfo
+    vs 目录前缀驻留（PackedPaths）+ slots FileInfo
+11. 网络缓存填充（ms / MB）—— 注入往返延迟与带宽上限的本地 SMB 替身：
+    copy2 式 64KiB 复制 + 整体读取 MD5 vs 流式分块填充（总耗时、首 MiB 可读时间、峰值分配）
+12. 预读缓冲（ms / MB）—— 按 100MB 预算顺序翻阅 N 个文件：path → bytes dict
+    vs mmap 内存池 + 只读 memoryview（总耗时、Python 堆峰值分配、RSS 峰值增量）
 
 用法:
     python scripts/benchmark.py                     # 运行全量基准
     python scripts/benchmark.py --quick             # 快速模式（20 张）
     python scripts/benchmark.py --output out.json   # 指定输出文件
+    python scripts/benchmark.py --tree-dirs 100000  # 10 万目录的目录树遍历基准
+    python scripts/benchmark.py --cache-trace t.jsonl  # 回放记录的缓存轨迹（feature.cache_trace_path）
+    python scripts/benchmark.py --path-files 1000000   # 100 万文件的路径存储内存基准
+    python scripts/benchmark.py --fill-mb 200          # 200MB 文件的网络缓存填充基准
+    python scripts/benchmark.py --read-ahead-files 200 # 翻阅 200 个文件的预读缓冲基准
 
 输出:
     默认输出 JSON 到 stdout，可指定文件。包含应用版本、时间戳与各指标。
@@ -193,14 +210,534 @@ def _measure_folder_scan(root: Path) -> dict:
     return {"cold_ms": round(cold_ms, 2), "hot_ms": round(hot_ms, 2)}
 
 
-def run_benchmark(quick: bool = False) -> dict:
-    """运行完整基准，返回指标字典"""
+def _reload_decoded_file(file_path: str) -> None:
+    """主进程侧再次解码文件传输的 JPEG（文件传输的第二次编解码）"""
+    try:
+        from AppKit import NSImage
+
+        NSImage.alloc().initWithContentsOfFile_(file_path)
+    except ImportError:
+        from PIL import Image
+
+        with Image.open(file_path) as im:
+            im.load()
+
+
+def _measure_decode_transport(paths: list[Path]) -> dict:
+    """度量解码子进程结果传输：文件（编码+落盘+父进程再解码）vs 共享内存帧"""
+    from plookingII.core.decode_pool import DecodePool
+
+    target = (1920, 1280)
+    sample = [p for p in paths if p.suffix.lower() in (".jpg", ".png")][:40]
+    pool = DecodePool(max_workers=1, max_tasks_per_worker=10_000)
+    try:
+        # 预热：子进程导入解码库
+        pool.cleanup_file(pool.decode(str(sample[0]), target))
+
+        file_times = []
+        for p in sample:
+            start = time.perf_counter()
+            out = pool.decode(str(p), target)
+            if out:
+                _reload_decoded_file(out)
+                pool.cleanup_file(out)
+            file_times.append((time.perf_counter() - start) * 1000)
+
+        shm_times = []
+        for p in sample:
+            start = time.perf_counter()
+            frame = pool.decode_frame(str(p), target)
+            if frame is not None:
+                frame.release()
+            shm_times.append((time.perf_counter() - start) * 1000)
+
+        return {
+            "file": _summary_ms(file_times),
+            "shared_memory": _summary_ms(shm_times),
+            "pool": pool.get_stats(),
+        }
+    finally:
+        pool.shutdown()
+
+
+def _make_synthetic_tree(root: Path, n_dirs: int, fanout: int = 10) -> int:
+    """按层生成约 n_dirs 个目录的合成目录树，每 4 个目录放一张空图片；返回目录数"""
+    level = [root]
+    created = 1
+    while created < n_dirs:
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                if created >= n_dirs:
+                    break
+                d = parent / f"d{i:02d}"
+                d.mkdir()
+                if created % 4 == 0:
+                    (d / "x.jpg").touch()
+                next_level.append(d)
+                created += 1
+        level = next_level
+    return created
+
+
+def _measure_tree_walk(n_dirs: int) -> dict:
+    """度量目录树遍历：旧流程 vs 工作窃取并行遍历（冷 / 复用快照）
+
+    文件在刚生成时已进入内核目录缓存，"冷"仅指应用侧无快照；
+    在 NAS 上的真实冷遍历差距会更大。
+    """
+    import concurrent.futures
+    import os
+
+    from plookingII.core.file_info_batch_loader import ParallelTreeWalker
+    from plookingII.core.tree_snapshot import TreeScanResult
+
+    exts = (".jpg",)
+    with tempfile.TemporaryDirectory(prefix="plookingii_tree_") as tmp:
+        root = Path(tmp) / "tree"
+        root.mkdir()
+        dirs = _make_synthetic_tree(root, n_dirs)
+
+        # 旧流程：串行 os.walk 收集目录，再线程池逐目录判断是否含图
+        start = time.perf_counter()
+        gathered = [dirpath for dirpath, _, _ in os.walk(root)]
+
+        def contains(d):
+            with os.scandir(d) as it:
+                return any(e.name.lower().endswith(exts) for e in it)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as pool:
+            legacy_found = sum(pool.map(contains, gathered))
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        walker = ParallelTreeWalker()
+        cold = TreeScanResult(root=str(root))
+        start = time.perf_counter()
+        for _ in walker.walk(str(root), exts, result=cold):
+            pass
+        cold_ms = (time.perf_counter() - start) * 1000
+        cold_progress = walker.get_progress()
+
+        # 复用快照：快照时间取未来，使全部目录落在 mtime 保护窗口之外
+        warm = TreeScanResult(root=str(root))
+        start = time.perf_counter()
+        for _ in walker.walk(str(root), exts, cold.nodes, time.time_ns() + 10**10, result=warm):
+            pass
+        warm_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "dirs": dirs,
+            "image_dirs": len(cold.image_directories),
+            "legacy_found": legacy_found,
+            "legacy_ms": round(legacy_ms, 2),
+            "parallel_cold_ms": round(cold_ms, 2),
+            "parallel_warm_ms": round(warm_ms, 2),
+            "parallel_dirs_per_s": cold_progress["dirs_per_s"],
+            "steals": cold_progress["steals"],
+            "reused": warm.reused,
+        }
+
+
+def _measure_cache_contention(threads: int = 8, ops_per_thread: int = 20_000) -> dict:
+    """度量 SimpleImageCache 多线程锁竞争：单锁（1 分片）vs 分片锁
+
+    固定走 OrderedDict 降级模式（Linux 亦可运行）；工作线程 90% get / 10% put，
+    另有一个线程持续调用 get_stats（模拟状态栏刷新）。
+    """
+    import random
+    import threading
+
+    from plookingII.core.simple_cache import _DEFAULT_SHARDS, SimpleImageCache
+
+    key_space = 400
+
+    def run(shards: int) -> dict:
+        cache = SimpleImageCache(
+            max_items=key_space // 2, max_memory_mb=1e9, name=f"bench{shards}", shards=shards, use_nscache=False
+        )
+        for i in range(key_space // 2):
+            cache.put(f"k{i}", i)
+        done = threading.Event()
+        stats_ms: list[float] = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(ops_per_thread):
+                key = f"k{rng.randrange(key_space)}"
+                if rng.random() < 0.1:
+                    cache.put(key, key)
+                else:
+                    cache.get(key)
+
+        def poller():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                cache.get_stats()
+                stats_ms.append((time.perf_counter() - t0) * 1000)
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        stats_thread = threading.Thread(target=poller)
+        stats_thread.start()
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        stats_thread.join()
+        stats = cache.get_stats()
+        return {
+            "shards": shards,
+            "ops_per_s": round(threads * ops_per_thread / elapsed),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "hit_rate_pct": stats["hit_rate_pct"],
+            "get_stats": _summary_ms(stats_ms),
+        }
+
+    return {
+        "threads": threads,
+        "ops_per_thread": ops_per_thread,
+        "single_lock": run(1),
+        "sharded": run(_DEFAULT_SHARDS),
+    }
+
+
+def _synthetic_navigation_trace(steps: int = 2_000, seed: int = 7) -> list:
+    """合成浏览轨迹：顺序翻图 + 预取、反复回看少量收藏图、快速拖动、下一文件夹预取"""
+    import random
+
+    rng = random.Random(seed)
+    sizes: dict = {}
+
+    def size_of(key):
+        return sizes.setdefault(key, round(rng.uniform(30.0, 100.0), 1))
+
+    events = []
+
+    def view(key):
+        # 显示：查缓存，未命中解码后回填
+        events.append(("get", key, 0.0))
+        events.append(("put", key, size_of(key)))
+
+    folder = 0
+    pos = 0
+    favorites = [f"f0/{i:04d}.jpg" for i in rng.sample(range(300), 6)]
+    for _ in range(steps):
+        r = rng.random()
+        if r < 0.25:
+            view(rng.choice(favorites))
+        elif r < 0.27:
+            # 快速拖动：一口气扫过 150 张
+            for _ in range(150):
+                pos += 1
+                view(f"f{folder}/{pos % 300:04d}.jpg")
+        elif r < 0.28:
+            # 预取下一个文件夹的前 40 张（只写不读）
+            for i in range(40):
+                key = f"f{folder + 1}/{i:04d}.jpg"
+                events.append(("put", key, size_of(key)))
+        else:
+            pos += 1
+            view(f"f{folder}/{pos % 300:04d}.jpg")
+            for ahead in range(1, 3):
+                key = f"f{folder}/{(pos + ahead) % 300:04d}.jpg"
+                events.append(("put", key, size_of(key)))
+    return events
+
+
+def _measure_cache_policy(trace_path: str = "", steps: int = 2_000) -> dict:
+    """度量缓存策略命中率：同一浏览轨迹分别回放 LRU 与 W-TinyLFU
+
+    容量取 ImageManager 的典型值（20 张 / 2000MB）。
+    """
+    from plookingII.core.cache_policy import compare_policies, load_trace
+
+    if trace_path:
+        events, source = load_trace(trace_path), trace_path
+    else:
+        events, source = _synthetic_navigation_trace(steps), "synthetic"
+    results = compare_policies(events, max_items=20, max_memory_mb=2000.0)
+    return {"source": source, "events": len(events), **results}
+
+
+def _measure_path_storage(n_files: int, files_per_dir: int = 100) -> dict:
+    """度量扫描缓存的路径存储内存（tracemalloc，仅内存中的合成路径，不落盘）
+
+    - file_info：n_files 条扫描记录，无 __slots__ 的 FileInfo（旧形态）vs 现行 slots FileInfo
+    - dir_listings：全部目录的图片列表 + 一种排序结果，完整路径元组（旧
+      DirectoryImageListCache 形态）vs PackedPaths（目录前缀驻留、排序结果复用文件名）
+
+    每个目录的路径在度量内新生成，模拟扫描产生的新字符串。
+    """
+    import dataclasses
+    import gc
+    import tracemalloc
+
+    from plookingII.core.file_info_batch_loader import DirectoryImageListCache, FileInfo
+
+    legacy_file_info = dataclasses.make_dataclass(
+        "LegacyFileInfo",
+        [(f.name, f.type, dataclasses.field(default=f.default)) for f in dataclasses.fields(FileInfo)],
+    )
+    n_dirs = max(1, n_files // files_per_dir)
+    dirs = [f"/Volumes/Photos/Archive/{i // 100:03d}/Shoot_{i:05d}" for i in range(n_dirs)]
+
+    def listing(d):
+        return [f"{d}/IMG_{j:04d}.jpg" for j in range(files_per_dir)]
+
+    def measure(build) -> float:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            held = build()  # noqa: F841  # 度量期间保持引用
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return round(current / (1024 * 1024), 2)
+
+    def infos(cls):
+        def build():
+            return [
+                cls(path=p, size_bytes=4_000_000, size_mb=3.8, extension="jpg", exists=True, is_file=True)
+                for d in dirs
+                for p in listing(d)
+            ]
+
+        return build
+
+    def legacy_listings():
+        cache = {}
+        for d in dirs:
+            images = tuple(listing(d))
+            cache[d] = (0.0, images, {"natural": images[::-1]})
+        return cache
+
+    def packed_listings():
+        cache = DirectoryImageListCache(max_size=n_dirs)
+        for d in dirs:
+            images = listing(d)
+            cache.put(d, 0.0, images)
+            cache.put_ordered(d, 0.0, "natural", images[::-1])
+        return cache
+
+    file_info = {"legacy_mb": measure(infos(legacy_file_info)), "slots_mb": measure(infos(FileInfo))}
+    dir_listings = {"legacy_mb": measure(legacy_listings), "packed_mb": measure(packed_listings)}
+    return {"files": n_dirs * files_per_dir, "dirs": n_dirs, "file_info": file_info, "dir_listings": dir_listings}
+
+
+class _SlowRemoteFile:
+    """SMB 替身：每次读取请求注入固定往返延迟，并按带宽上限补足传输时间"""
+
+    def __init__(self, path: str, rtt_ms: float = 2.0, mb_per_s: float = 110.0):
+        self._f = open(path, "rb", buffering=0)  # noqa: SIM115  # 由 close/__exit__ 关闭
+        self._rtt = rtt_ms / 1000.0
+        self._bytes_per_s = mb_per_s * 1024 * 1024
+
+    def _throttle(self, n: int) -> None:
+        time.sleep(self._rtt + n / self._bytes_per_s)
+
+    def readinto(self, b) -> int:
+        n = self._f.readinto(b)
+        self._throttle(n)
+        return n
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._throttle(len(data))
+        return data
+
+    def fileno(self) -> int:
+        return self._f.fileno()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _measure_cache_fill(size_mb: int, rtt_ms: float = 2.0, mb_per_s: float = 110.0) -> dict:
+    """度量网络缓存填充：旧流程（copy2 式复制后整体读取算 MD5）vs CacheFill 流式填充
+
+    旧流程的复制按 shutil 在 macOS/Linux 上的 64KiB 块经 SMB 替身读取，首 MiB
+    需等复制结束才可读；流式填充的首 MiB 可读时间取自 wait_for 回调。
+    """
+    import hashlib
+    import os
+    import shutil
+    import threading
+    import tracemalloc
+
+    from plookingII.core.cache_fill import CacheFill
+
+    def opener(path):
+        return _SlowRemoteFile(path, rtt_ms, mb_per_s)
+
+    with tempfile.TemporaryDirectory(prefix="plookingii_fill_") as tmp:
+        remote = os.path.join(tmp, "remote.jpg")
+        with open(remote, "wb") as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+
+        # 旧流程：复制 → 整体读取 → MD5
+        legacy_dst = os.path.join(tmp, "legacy.cache")
+        tracemalloc.start()
+        start = time.perf_counter()
+        with opener(remote) as src, open(legacy_dst, "wb") as dst:
+            shutil.copyfileobj(src, dst, 64 * 1024)
+        legacy_first_mib_ms = (time.perf_counter() - start) * 1000
+        with open(legacy_dst, "rb") as f:
+            legacy_checksum = hashlib.md5(f.read(), usedforsecurity=False).hexdigest()
+        legacy_ms = (time.perf_counter() - start) * 1000
+        _, legacy_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # 流式填充
+        fill = CacheFill(remote, os.path.join(tmp, "stream.cache"), opener=opener)
+        first_mib = {}
+        waiter = threading.Thread(
+            target=lambda: fill.wait_for(1024 * 1024) and first_mib.setdefault("t", time.perf_counter())
+        )
+        tracemalloc.start()
+        start = time.perf_counter()
+        waiter.start()
+        fill.run()
+        stream_ms = (time.perf_counter() - start) * 1000
+        _, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        waiter.join()
+
+        return {
+            "size_mb": size_mb,
+            "rtt_ms": rtt_ms,
+            "bandwidth_mb_s": mb_per_s,
+            "checksum_match": fill.checksum == legacy_checksum,
+            "legacy": {
+                "total_ms": round(legacy_ms, 2),
+                "first_mib_ms": round(legacy_first_mib_ms, 2),
+                "peak_alloc_mb": round(legacy_peak / (1024 * 1024), 2),
+            },
+            "streaming": {
+                "total_ms": round(stream_ms, 2),
+                "first_mib_ms": round((first_mib.get("t", time.perf_counter()) - start) * 1000, 2),
+                "peak_alloc_mb": round(stream_peak / (1024 * 1024), 2),
+            },
+        }
+
+
+def _measure_read_ahead(n_files: int, file_mb: int = 8, budget_mb: int = 100) -> dict:
+    """度量预读缓冲：旧 dict[path, bytes]（50 条 / 100MB 上限逐次求和淘汰）vs ReadAheadArena
+
+    每个文件预读后立即由"解码方"消费一次（MD5 代替解码，两种方式都直接读缓冲，
+    不额外复制）。RSS 需要 psutil，缺失时只报告 tracemalloc 峰值。
+    """
+    import hashlib
+    import os
+    import tracemalloc
+
+    from plookingII.core.read_ahead_arena import ReadAheadArena
+
+    try:
+        import psutil
+
+        proc = psutil.Process()
+    except ImportError:
+        proc = None
+
+    def rss_mb() -> float:
+        return proc.memory_info().rss / (1024 * 1024) if proc else 0.0
+
+    def run(preload, consume) -> dict:
+        base = rss_mb()
+        peak = base
+        tracemalloc.start()
+        start = time.perf_counter()
+        for p in files:
+            preload(p)
+            consume(p)
+            peak = max(peak, rss_mb())
+        elapsed = (time.perf_counter() - start) * 1000
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "total_ms": round(elapsed, 2),
+            "peak_alloc_mb": round(heap_peak / (1024 * 1024), 2),
+            "rss_peak_delta_mb": round(peak - base, 1) if proc else None,
+        }
+
+    with tempfile.TemporaryDirectory(prefix="plookingii_readahead_") as tmp:
+        files = []
+        payload = os.urandom(file_mb * 1024 * 1024)
+        for i in range(n_files):
+            path = os.path.join(tmp, f"IMG_{i:05d}.JPG")
+            with open(path, "wb") as f:
+                f.write(payload)
+            files.append(path)
+
+        # 旧实现（原样复刻 SMBOptimizer 的 dict 缓冲与淘汰逻辑）
+        cache: dict[str, bytes] = {}
+        max_entries, max_mb = 50, budget_mb
+
+        def legacy_preload(path):
+            with open(path, "rb") as f:
+                cache[path] = f.read()
+            keys = list(cache.keys())
+            while len(cache) > max_entries or (cache and sum(len(v) for v in cache.values()) / 1048576 > max_mb):
+                if not keys:
+                    break
+                cache.pop(keys.pop(0), None)
+
+        def legacy_consume(path):
+            hashlib.md5(cache[path], usedforsecurity=False).digest()
+
+        legacy = run(legacy_preload, legacy_consume)
+        cache.clear()
+
+        arena = ReadAheadArena(budget_mb * 1024 * 1024)
+
+        def arena_consume(path):
+            with arena.acquire(path) as buf:
+                hashlib.md5(buf.view, usedforsecurity=False).digest()
+
+        pooled = run(lambda path: arena.load_file(path, path), arena_consume)
+        pooled["evictions"] = arena.get_stats()["evictions"]
+        arena.clear()
+
+        return {"files": n_files, "file_mb": file_mb, "budget_mb": budget_mb, "legacy": legacy, "arena": pooled}
+
+
+def run_benchmark(
+    quick: bool = False,
+    tree_dirs: int = 0,
+    cache_trace: str = "",
+    path_files: int = 0,
+    fill_mb: int = 0,
+    read_ahead_files: int = 0,
+) -> dict:
+    """运行完整基准，返回指标字典
+
+    Args:
+        quick: 快速模式
+        tree_dirs: 目录树遍历基准的目录数；0 表示按模式取默认值
+        cache_trace: 缓存访问轨迹文件；空表示使用合成浏览轨迹
+        path_files: 路径存储内存基准的文件数；0 表示按模式取默认值
+        fill_mb: 网络缓存填充基准的文件大小（MB）；0 表示按模式取默认值
+        read_ahead_files: 预读缓冲基准翻阅的文件数；0 表示按模式取默认值
+    """
     try:
         from plookingII.__version__ import __version__
     except Exception:
         __version__ = "unknown"
 
     image_count = 20 if quick else 100
+    tree_dirs = tree_dirs or (2_000 if quick else 20_000)
+    path_files = path_files or (50_000 if quick else 500_000)
+    fill_mb = fill_mb or (16 if quick else 60)
+    read_ahead_files = read_ahead_files or (30 if quick else 120)
 
     with tempfile.TemporaryDirectory(prefix="plookingii_bench_") as tmp:
         root = Path(tmp) / "photos"
@@ -219,6 +756,13 @@ def run_benchmark(quick: bool = False) -> dict:
                 "cache_hit_rate": _measure_cache_hit_rate(paths),
                 "rss_curve": _measure_rss_curve(paths),
                 "folder_scan": _measure_folder_scan(root),
+                "decode_transport": _measure_decode_transport(paths),
+                "tree_walk": _measure_tree_walk(tree_dirs),
+                "cache_contention": _measure_cache_contention(ops_per_thread=5_000 if quick else 20_000),
+                "cache_policy": _measure_cache_policy(cache_trace, steps=500 if quick else 2_000),
+                "path_storage": _measure_path_storage(path_files),
+                "cache_fill": _measure_cache_fill(fill_mb),
+                "read_ahead": _measure_read_ahead(read_ahead_files),
             },
         }
 
@@ -227,10 +771,22 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="PlookingII 性能基准")
     parser.add_argument("--quick", action="store_true", help="快速模式（20 张图片）")
     parser.add_argument("--output", type=str, default="", help="输出 JSON 文件路径（默认 stdout）")
+    parser.add_argument("--tree-dirs", type=int, default=0, help="目录树遍历基准的目录数（默认 2k/20k）")
+    parser.add_argument("--cache-trace", type=str, default="", help="回放的缓存访问轨迹（JSON Lines，默认合成轨迹）")
+    parser.add_argument("--path-files", type=int, default=0, help="路径存储内存基准的文件数（默认 5 万/50 万）")
+    parser.add_argument("--fill-mb", type=int, default=0, help="网络缓存填充基准的文件大小 MB（默认 16/60）")
+    parser.add_argument("--read-ahead-files", type=int, default=0, help="预读缓冲基准翻阅的文件数（默认 30/120）")
     args = parser.parse_args()
 
     print("🧪 运行 PlookingII 性能基准...")
-    results = run_benchmark(quick=args.quick)
+    results = run_benchmark(
+        quick=args.quick,
+        tree_dirs=args.tree_dirs,
+        cache_trace=args.cache_trace,
+        path_files=args.path_files,
+        fill_mb=args.fill_mb,
+        read_ahead_files=args.read_ahead_files,
+    )
 
     output = json.dumps(results, ensure_ascii=False, indent=2)
     if args.output:
@@ -251,6 +807,48 @@ def main() -> int:
         print(f"  RSS: start={rss['start_mb']}MB peak={rss['peak_mb']}MB")
     scan = m["folder_scan"]
     print(f"  文件夹扫描: cold={scan['cold_ms']}ms hot={scan['hot_ms']}ms")
+    transport = m["decode_transport"]
+    print(
+        f"  解码传输: file avg={transport['file'].get('avg_ms', 0)}ms "
+        f"shm avg={transport['shared_memory'].get('avg_ms', 0)}ms"
+    )
+    tree = m["tree_walk"]
+    print(
+        f"  目录树遍历({tree['dirs']} 目录): legacy={tree['legacy_ms']}ms "
+        f"parallel={tree['parallel_cold_ms']}ms warm={tree['parallel_warm_ms']}ms"
+    )
+    contention = m["cache_contention"]
+    print(
+        f"  缓存锁竞争({contention['threads']} 线程): single={contention['single_lock']['ops_per_s']} ops/s "
+        f"sharded={contention['sharded']['ops_per_s']} ops/s"
+    )
+    policy = m["cache_policy"]
+    print(
+        f"  缓存策略命中率({policy['source']}): lru={policy['lru']['hit_rate_pct']}% "
+        f"tinylfu={policy['tinylfu']['hit_rate_pct']}%"
+    )
+    storage = m["path_storage"]
+    print(
+        f"  路径存储({storage['files']} 文件): FileInfo legacy={storage['file_info']['legacy_mb']}MB "
+        f"slots={storage['file_info']['slots_mb']}MB; 目录列表 legacy={storage['dir_listings']['legacy_mb']}MB "
+        f"packed={storage['dir_listings']['packed_mb']}MB"
+    )
+    fill = m["cache_fill"]
+    print(
+        f"  网络缓存填充({fill['size_mb']}MB, rtt={fill['rtt_ms']}ms): "
+        f"legacy={fill['legacy']['total_ms']}ms (首MiB {fill['legacy']['first_mib_ms']}ms, "
+        f"峰值 {fill['legacy']['peak_alloc_mb']}MB) "
+        f"streaming={fill['streaming']['total_ms']}ms (首MiB {fill['streaming']['first_mib_ms']}ms, "
+        f"峰值 {fill['streaming']['peak_alloc_mb']}MB)"
+    )
+    ra = m["read_ahead"]
+    print(
+        f"  预读缓冲({ra['files']}×{ra['file_mb']}MB, 预算 {ra['budget_mb']}MB): "
+        f"legacy={ra['legacy']['total_ms']}ms (堆峰值 {ra['legacy']['peak_alloc_mb']}MB, "
+        f"RSS +{ra['legacy']['rss_peak_delta_mb']}MB) "
+        f"arena={ra['arena']['total_ms']}ms (堆峰值 {ra['arena']['peak_alloc_mb']}MB, "
+        f"RSS +{ra['arena']['rss_peak_delta_mb']}MB)"
+    )
     return 0
 
 
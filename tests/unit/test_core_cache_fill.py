@@ -0,0 +1,88 @@
+"""
+测试 core/cache_fill.py
+
+覆盖流式缓存填充：
+- 单遍完成复制与 MD5，原子改名后不残留临时文件
+- 填充进行中可等待并读取已完成的前缀
+- 源文件读取失败时删除临时文件并记录错误
+"""
+
+import hashlib
+import io
+import os
+import threading
+
+from plookingII.core.cache_fill import PARTIAL_SUFFIX, CacheFill
+
+
+class _GatedReader(io.RawIOBase):
+    """每次 readinto 前等待放行，用于在填充中途观察进度"""
+
+    def __init__(self, data: bytes, fail_after: int | None = None):
+        self._src = io.BytesIO(data)
+        self.gate = threading.Semaphore(0)
+        self._fail_after = fail_after
+        self._reads = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        self.gate.acquire()
+        self._reads += 1
+        if self._fail_after is not None and self._reads > self._fail_after:
+            raise OSError("network dropped")
+        return self._src.readinto(b)
+
+
+class TestCacheFill:
+    def test_run_copies_hashes_and_renames(self, tmp_path):
+        data = os.urandom(50_000)
+        src = tmp_path / "remote.jpg"
+        src.write_bytes(data)
+        dst = tmp_path / "local.cache"
+
+        fill = CacheFill(str(src), str(dst), chunk_size=8192)
+        assert fill.run() is True
+
+        assert dst.read_bytes() == data
+        assert fill.checksum == hashlib.md5(data, usedforsecurity=False).hexdigest()
+        assert fill.progress() == (50_000, 50_000)
+        assert fill.succeeded
+        assert not os.path.exists(str(dst) + PARTIAL_SUFFIX)
+
+    def test_prefix_readable_before_fill_completes(self, tmp_path):
+        data = os.urandom(3 * 4096 + 100)
+        reader = _GatedReader(data)
+        dst = tmp_path / "local.cache"
+        fill = CacheFill("remote.jpg", str(dst), chunk_size=4096, opener=lambda _p: reader)
+
+        worker = threading.Thread(target=fill.run)
+        worker.start()
+        reader.gate.release()  # 放行第一块
+        assert fill.read_prefix(1000, timeout=2.0) == data[:1000]
+        assert fill.bytes_written == 4096
+        assert not fill.done
+        # 第二块尚未放行：等待超时
+        assert fill.wait_for(5000, timeout=0.05) is False
+
+        for _ in range(4):
+            reader.gate.release()
+        assert fill.wait(timeout=2.0) is True
+        worker.join(2.0)
+        assert fill.read_prefix(10**6) == data
+        assert fill.checksum == hashlib.md5(data, usedforsecurity=False).hexdigest()
+
+    def test_failure_removes_partial_file(self, tmp_path):
+        reader = _GatedReader(os.urandom(10_000), fail_after=1)
+        dst = tmp_path / "local.cache"
+        fill = CacheFill("remote.jpg", str(dst), chunk_size=4096, opener=lambda _p: reader)
+        for _ in range(3):
+            reader.gate.release()
+
+        assert fill.run() is False
+        assert isinstance(fill.error, OSError)
+        assert not dst.exists()
+        assert not os.path.exists(str(dst) + PARTIAL_SUFFIX)
+        assert fill.wait_for(10**6, timeout=0.1) is False
+        assert fill.read_prefix(10**6, timeout=0.1) is None
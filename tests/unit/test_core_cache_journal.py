@@ -0,0 +1,112 @@
+"""
+测试 core/cache_journal.py
+
+覆盖网络缓存元数据日志：
+- 追加记录重放（put / del / touch / clear / stats）
+- 末尾半行的崩溃恢复
+- 压缩为快照并截断日志；压缩后继续追加
+- 旧版 cache_metadata.json 迁移
+"""
+
+import json
+import os
+
+from plookingII.core.cache_journal import JOURNAL_NAME, LEGACY_METADATA_NAME, SNAPSHOT_NAME, MetadataJournal
+
+
+def _entry(name, size=10, t=1.0, n=1):
+    return {
+        "remote_path": f"/Volumes/nas/{name}.jpg",
+        "local_path": f"/tmp/{name}.cache",
+        "file_size": size,
+        "created_time": t,
+        "last_access_time": t,
+        "access_count": n,
+        "checksum": "",
+        "is_valid": True,
+    }
+
+
+class TestMetadataJournal:
+    def test_replay_applies_records_in_order(self, tmp_path):
+        journal = MetadataJournal(str(tmp_path))
+        journal.put("a", _entry("a"))
+        journal.put("b", _entry("b"))
+        journal.touch("a", 5.0, 3)
+        journal.delete("b")
+        journal.commit({"cache_hits": 2})
+        journal.close()
+
+        entries, stats = MetadataJournal(str(tmp_path)).load()
+        assert set(entries) == {"a"}
+        assert entries["a"]["last_access_time"] == 5.0
+        assert entries["a"]["access_count"] == 3
+        assert stats == {"cache_hits": 2}
+
+        journal = MetadataJournal(str(tmp_path))
+        journal.load()
+        journal.clear()
+        journal.commit()
+        assert MetadataJournal(str(tmp_path)).load()[0] == {}
+
+    def test_touches_are_buffered_until_commit_or_batch(self, tmp_path):
+        journal = MetadataJournal(str(tmp_path), touch_batch=3)
+        journal.put("a", _entry("a"))
+        journal.commit()
+        size = os.path.getsize(tmp_path / JOURNAL_NAME)
+
+        assert journal.touch("a", 2.0, 2) is False
+        assert journal.touch("a", 3.0, 3) is False
+        assert journal.touch("b", 1.0, 1) is False
+        # 第 3 个不同键达到批量阈值：提示调用方提交，touch 本身不写盘
+        assert journal.touch("c", 1.0, 1) is True
+        assert os.path.getsize(tmp_path / JOURNAL_NAME) == size
+        journal.commit()
+        assert os.path.getsize(tmp_path / JOURNAL_NAME) > size
+        assert MetadataJournal(str(tmp_path)).load()[0]["a"]["access_count"] == 3
+
+    def test_torn_tail_is_discarded_and_truncated(self, tmp_path):
+        journal = MetadataJournal(str(tmp_path))
+        journal.put("a", _entry("a"))
+        journal.commit()
+        journal.close()
+        good_size = os.path.getsize(tmp_path / JOURNAL_NAME)
+        with open(tmp_path / JOURNAL_NAME, "ab") as f:
+            f.write(b'{"op":"put","k":"b","e":{"remote')
+
+        recovered = MetadataJournal(str(tmp_path))
+        entries, _ = recovered.load()
+        assert set(entries) == {"a"}
+        assert os.path.getsize(tmp_path / JOURNAL_NAME) == good_size
+        assert recovered.get_stats()["recovered_bytes"] > 0
+
+        # 恢复后继续追加从整行开始
+        recovered.put("c", _entry("c"))
+        recovered.commit()
+        assert set(MetadataJournal(str(tmp_path)).load()[0]) == {"a", "c"}
+
+    def test_compaction_writes_snapshot_and_truncates_journal(self, tmp_path):
+        journal = MetadataJournal(str(tmp_path), compact_min_records=10, compact_ratio=2.0)
+        live = {}
+        for i in range(12):
+            key = f"k{i % 3}"
+            live[key] = _entry(key, t=float(i))
+            journal.put(key, live[key])
+            journal.commit(live_entries=len(live), snapshot_state=lambda: (dict(live), {"n": len(live)}))
+
+        assert journal.get_stats()["compactions"] >= 1
+        with open(tmp_path / SNAPSHOT_NAME, encoding="utf-8") as f:
+            assert "\n" not in f.read()
+        entries, stats = MetadataJournal(str(tmp_path)).load()
+        assert entries == live
+        assert stats["n"] == 3
+
+    def test_legacy_json_is_migrated(self, tmp_path):
+        legacy = {"cache_index": {"a": _entry("a")}, "access_order": {"a": 1.0}, "stats": {"cache_hits": 4}}
+        (tmp_path / LEGACY_METADATA_NAME).write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+
+        entries, stats = MetadataJournal(str(tmp_path)).load()
+        assert set(entries) == {"a"}
+        assert stats["cache_hits"] == 4
+        assert (tmp_path / SNAPSHOT_NAME).exists()
+        assert not (tmp_path / LEGACY_METADATA_NAME).exists()
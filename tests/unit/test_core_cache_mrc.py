@@ -0,0 +1,111 @@
+"""
+测试 core/cache_mrc.py
+
+覆盖在线缺失率曲线估计与容量自动调优：
+- 全量采样时估计与真实 LRU 命中一致（条目与内存双重上限）
+- 空间采样按哈希选键，幽灵栈有界
+- SimpleImageCache 接入估计器与 resize 缩容淘汰
+- 自动调优：边际收益驱动扩容/缩容，扩容受看门狗余量与倍率上限约束
+"""
+
+from plookingII.core.cache_mrc import CacheAutoTuner, MissRatioCurveEstimator
+from plookingII.core.cache_policy import POLICY_TINYLFU
+from plookingII.core.simple_cache import SimpleImageCache
+
+
+def _replay(cache, keys, size_mb=1.0):
+    for key in keys:
+        if cache.get(key) is None:
+            cache.put(key, key, size_mb=size_mb)
+
+
+class TestMissRatioCurveEstimator:
+    def test_full_sampling_matches_lru(self):
+        """循环访问 6 个键：容量 4 全部缺失，容量 8 除首轮外全部命中"""
+        mrc = MissRatioCurveEstimator(max_items=4, max_memory_mb=1000.0, sample_rate=1.0)
+        cache = SimpleImageCache(max_items=4, max_memory_mb=1000.0, use_nscache=False)
+        cache.set_mrc_estimator(mrc)
+        _replay(cache, [f"k{i % 6}" for i in range(60)])
+
+        ratios = mrc.hit_ratios()
+        assert mrc.samples == 60
+        assert mrc.cold_misses == 6
+        assert ratios[1.0] == cache.get_stats()["hits"] / 60 == 0.0
+        assert ratios[0.5] == 0.0
+        assert ratios[2.0] == ratios[4.0] == 54 / 60
+
+    def test_memory_limit_applies(self):
+        """条目上限足够但内存不足时按缺失计"""
+        mrc = MissRatioCurveEstimator(max_items=100, max_memory_mb=10.0, sample_rate=1.0)
+        for key in ("a", "b", "c") * 3:
+            mrc.record_get(key)
+            mrc.record_put(key, 4.0)
+        ratios = mrc.hit_ratios()
+        assert ratios[1.0] == 0.0
+        assert ratios[4.0] == 6 / 9
+
+    def test_sampling_and_bounded_ghost(self):
+        mrc = MissRatioCurveEstimator(max_items=10, max_memory_mb=1000.0, sample_rate=0.25)
+        for i in range(2000):
+            mrc.record_get(f"/photos/{i}.jpg")
+            mrc.record_put(f"/photos/{i}.jpg", 1.0)
+        assert 300 < mrc.samples < 700
+        assert mrc.get_stats()["tracked"] <= mrc._max_tracked
+
+    def test_set_capacity_resets_counts(self):
+        mrc = MissRatioCurveEstimator(max_items=4, max_memory_mb=100.0, sample_rate=1.0)
+        mrc.record_get("a")
+        mrc.set_capacity(8, 200.0)
+        assert mrc.samples == 0
+        assert mrc.hit_ratios() == {}
+        rows = mrc.report_rows()
+        assert [row["条目上限"] for row in rows] == [4, 8, 16, 32]
+        assert rows[1]["估计命中率"] == "-"
+
+
+class TestResize:
+    def test_shrink_evicts_and_updates_estimator(self):
+        for policy in ("lru", POLICY_TINYLFU):
+            cache = SimpleImageCache(max_items=8, max_memory_mb=1000.0, use_nscache=False, policy=policy)
+            mrc = MissRatioCurveEstimator(max_items=8, max_memory_mb=1000.0)
+            cache.set_mrc_estimator(mrc)
+            for i in range(8):
+                cache.put(f"k{i}", i)
+            assert cache.resize(3, 500.0) == 5
+            assert len(cache) == 3
+            assert mrc.max_items == 3
+            assert mrc.max_memory_mb == 500.0
+            if cache._policy is not None:
+                assert len(cache._policy) == len(cache)
+
+
+class TestCacheAutoTuner:
+    @staticmethod
+    def _estimator(ratios, samples=500, max_items=20, max_memory_mb=2000.0):
+        mrc = MissRatioCurveEstimator(max_items=max_items, max_memory_mb=max_memory_mb)
+        mrc.samples = samples
+        mrc.hit_ratios = lambda: ratios
+        return mrc
+
+    def test_grows_within_headroom(self):
+        tuner = CacheAutoTuner(20, 2000.0)
+        mrc = self._estimator({0.5: 0.3, 1.0: 0.5, 2.0: 0.7, 4.0: 0.75})
+        assert tuner.suggest(mrc, headroom_mb=5000.0) == (40, 4000.0)
+        assert tuner.suggest(mrc, headroom_mb=1000.0) == (30, 3000.0)
+        assert tuner.suggest(mrc, headroom_mb=200.0) is None
+
+    def test_growth_capped_by_max_factor(self):
+        tuner = CacheAutoTuner(20, 2000.0)
+        mrc = self._estimator({0.5: 0.3, 1.0: 0.5, 2.0: 0.7}, max_items=80, max_memory_mb=8000.0)
+        assert tuner.suggest(mrc, headroom_mb=10000.0) is None
+
+    def test_shrinks_when_half_is_enough(self):
+        tuner = CacheAutoTuner(20, 2000.0)
+        mrc = self._estimator({0.5: 0.6, 1.0: 0.605, 2.0: 0.61})
+        assert tuner.suggest(mrc, headroom_mb=5000.0) == (10, 1000.0)
+        floor = self._estimator({0.5: 0.6, 1.0: 0.605, 2.0: 0.61}, max_items=10, max_memory_mb=1000.0)
+        assert tuner.suggest(floor, headroom_mb=5000.0) is None
+
+    def test_waits_for_samples(self):
+        tuner = CacheAutoTuner(20, 2000.0)
+        assert tuner.suggest(self._estimator({0.5: 0.1, 1.0: 0.2, 2.0: 0.9}, samples=10), 5000.0) is None
@@ -0,0 +1,154 @@
+"""
+测试 core/cache_policy.py
+
+覆盖 W-TinyLFU 准入策略：
+- 频率草图计数、饱和与老化
+- 抗扫描：反复访问的条目不被一次性扫描冲掉（对比 LRU）
+- 按大小准入：大图必须比它挤掉的条目更热
+- SimpleImageCache 接入策略后的淘汰/移除/清空同步
+- 轨迹记录、读取与策略回放对比
+"""
+
+from plookingII.core.cache_policy import (
+    POLICY_LRU,
+    POLICY_TINYLFU,
+    CacheTraceRecorder,
+    FrequencySketch,
+    WTinyLFUPolicy,
+    compare_policies,
+    load_trace,
+    replay_trace,
+)
+from plookingII.core.simple_cache import SimpleImageCache
+
+
+def _tinylfu_cache(max_items=10, max_memory_mb=1000.0):
+    return SimpleImageCache(
+        max_items=max_items, max_memory_mb=max_memory_mb, shards=4, use_nscache=False, policy=POLICY_TINYLFU
+    )
+
+
+class TestFrequencySketch:
+    def test_counts_saturate_and_age(self):
+        sketch = FrequencySketch(capacity=100)
+        for _ in range(20):
+            sketch.increment("hot")
+        sketch.increment("cold")
+        assert sketch.frequency("hot") == 15
+        assert sketch.frequency("cold") >= 1
+        assert sketch.frequency("never") <= sketch.frequency("cold")
+
+        sketch._age()
+        assert sketch.frequency("hot") == 7
+
+    def test_aging_triggered_by_sample_size(self):
+        """累计增量达到采样上限后自动减半"""
+        sketch = FrequencySketch(capacity=2)
+        for _ in range(5):
+            sketch.increment("a")
+        for i in range(40):
+            sketch.increment(f"k{i}")
+        assert sketch.frequency("a") < 5
+
+
+class TestWTinyLFUPolicy:
+    def test_scan_does_not_flush_frequent_keys(self):
+        """一次性扫描 100 个新键后，反复访问的键仍在缓存中；纯 LRU 已被冲掉"""
+        tiny = _tinylfu_cache()
+        lru = SimpleImageCache(max_items=10, max_memory_mb=1000.0, use_nscache=False)
+        for cache in (tiny, lru):
+            for _ in range(5):
+                for key in ("fav1", "fav2"):
+                    if cache.get(key) is None:
+                        cache.put(key, key)
+            for i in range(100):
+                cache.put(f"scan{i}", i)
+
+        assert "fav1" in tiny
+        assert "fav2" in tiny
+        assert "fav1" not in lru
+        assert tiny.get_stats()["rejected"] > 0
+        assert len(tiny) <= 10
+
+    def test_large_candidate_must_beat_every_victim(self):
+        """按大小准入：需要挤掉主区条目的大图，频率不高于受害者时被拒绝，更热时准入"""
+        policy = WTinyLFUPolicy(max_items=10, max_memory_mb=100.0, window_pct=0.3)
+        fillers = iter(f"f{i}" for i in range(100))
+
+        def push_out_of_window():
+            for _ in range(policy.window_items):
+                policy.on_insert(next(fillers), 0.1)
+
+        for key in ("a", "b", "c"):
+            policy.on_insert(key, 20.0)
+            for _ in range(3):
+                policy.record_access(key, True)
+        push_out_of_window()
+        assert all(k in policy for k in ("a", "b", "c"))
+
+        policy.on_insert("big", 20.0)
+        push_out_of_window()
+        assert "big" not in policy
+        assert all(k in policy for k in ("a", "b", "c"))
+
+        for _ in range(6):
+            policy.record_access("big2", False)
+        policy.on_insert("big2", 20.0)
+        push_out_of_window()
+        assert "big2" in policy
+        assert sum(k in policy for k in ("a", "b", "c")) == 2
+
+    def test_cache_stays_in_sync_with_policy(self):
+        """淘汰/移除/清空后策略记录的键与缓存一致"""
+        cache = _tinylfu_cache(max_items=5)
+        for i in range(8):
+            cache.put(f"k{i}", i)
+        assert len(cache._policy) == len(cache) <= 5
+
+        cache.remove(next(k for k in (f"k{i}" for i in range(8)) if k in cache))
+        assert len(cache._policy) == len(cache)
+
+        assert cache.evict_oldest(2) == 2
+        assert len(cache._policy) == len(cache)
+
+        cache.clear()
+        assert len(cache._policy) == len(cache) == 0
+        stats = cache.get_stats()
+        assert stats["policy"] == POLICY_TINYLFU
+        assert stats["window"] == stats["probation"] == stats["protected"] == 0
+
+
+class TestTraceReplay:
+    def test_record_load_and_compare(self, tmp_path):
+        """记录的轨迹可读回并在两种策略下回放；损坏行被跳过"""
+        path = str(tmp_path / "trace.jsonl")
+        recorder = CacheTraceRecorder(path, flush_every=1)
+        cache = SimpleImageCache(max_items=3, use_nscache=False)
+        cache.set_trace_recorder(recorder)
+        cache.get("a")
+        cache.put("a", 1, size_mb=2.5)
+        cache.get("a")
+        recorder.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("{broken\n")
+
+        events = load_trace(path)
+        assert events == [("get", "a", 0.0), ("put", "a", 2.5), ("get", "a", 0.0)]
+
+        results = compare_policies(events, max_items=3, max_memory_mb=100.0)
+        assert set(results) == {POLICY_LRU, POLICY_TINYLFU}
+        assert results[POLICY_LRU]["hits"] == 1
+        assert results[POLICY_LRU]["misses"] == 1
+
+    def test_replay_fill_and_prefetch_semantics(self):
+        """get 未命中自行回填，紧随的同键 put 跳过；预取 put 写入后可命中"""
+        events = [
+            ("get", "x", 0.0),
+            ("put", "x", 1.0),
+            ("put", "y", 1.0),
+            ("get", "y", 0.0),
+            ("get", "x", 0.0),
+        ]
+        result = replay_trace(events, POLICY_LRU, max_items=5, max_memory_mb=100.0)
+        assert result["hits"] == 2
+        assert result["misses"] == 1
@@ -9,7 +9,11 @@
 """
 
 import os
+import pickle
+import signal
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 from plookingII.core.decode_pool import DecodePool, get_decode_pool, reset_decode_pool
 
@@ -107,3 +111,234 @@ class TestDecodePool:
             assert p1 is p2
         finally:
             reset_decode_pool()
+
+
+def _write_png_header(path: Path, width: int, height: int) -> Path:
+    """写入仅含 IHDR 的 PNG 头（供容量预估，不需可解码）"""
+    import struct
+    import zlib
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + chunk)
+    return path
+
+
+class TestSharedFrameTransport:
+    """共享内存帧传输（主进程回退路径，不依赖真实解码器）"""
+
+    @staticmethod
+    def _inprocess_pool(monkeypatch, **kwargs) -> DecodePool:
+        from plookingII.core import decode_pool
+
+        def _no_spawn(_method):
+            raise OSError("spawn disabled")
+
+        monkeypatch.setattr(decode_pool.mp, "get_context", _no_spawn)
+        return DecodePool(max_workers=1, **kwargs)
+
+    def test_estimate_tier_bytes_bounds_frame(self):
+        from plookingII.core.decode_pool import estimate_tier_bytes
+
+        assert estimate_tier_bytes(None) == 0
+        # 长边取满的正方形上界，行跨度按 64 字节对齐
+        assert estimate_tier_bytes((2560, 1600)) == 2560 * 4 * 2560
+        assert estimate_tier_bytes((1000, 10)) == 4032 * 1000
+
+    def test_slab_size_class_and_reuse(self):
+        from plookingII.core.decode_pool import _SharedSlabPool
+
+        slabs = _SharedSlabPool(16 * 1024 * 1024)
+        try:
+            assert slabs.size_class(1) == 1024 * 1024
+            assert slabs.size_class(5_000_000) == 5 * 1024 * 1024
+            first = slabs.acquire(3_000_000)
+            slabs.release(first)
+            second = slabs.acquire(3_100_000)
+            assert second is first
+            assert slabs.get_stats()["reused"] == 1
+        finally:
+            slabs.close()
+        assert slabs.get_stats()["allocated_mb"] == 0
+
+    def test_slab_budget_exhausted_returns_none(self):
+        from plookingII.core.decode_pool import _SharedSlabPool
+
+        slabs = _SharedSlabPool(4 * 1024 * 1024)
+        try:
+            held = slabs.acquire(3 * 1024 * 1024)
+            assert held is not None
+            assert slabs.acquire(3 * 1024 * 1024) is None
+            # 归还后空闲 slab 可被回收以满足其他分档
+            slabs.release(held)
+            assert slabs.acquire(2 * 1024 * 1024) is not None
+        finally:
+            slabs.close()
+
+    def test_slab_destroy_failure_stays_counted(self):
+        """视图仍被导出时 slab 无法关闭：继续计入总量，之后重试回收"""
+        from plookingII.core.decode_pool import _SharedSlabPool
+
+        slabs = _SharedSlabPool(8 * 1024 * 1024)
+        shm = slabs.acquire(1024 * 1024)
+        view = shm.buf[:16]
+        slabs.close()
+        stats = slabs.get_stats()
+        assert stats["allocated_mb"] == 1.0
+        assert stats["doomed"] == 1
+
+        view.release()
+        slabs.close()
+        stats = slabs.get_stats()
+        assert stats["allocated_mb"] == 0
+        assert stats["doomed"] == 0
+
+    def test_decode_frame_shared_pixels(self, tmp_path, monkeypatch):
+        from plookingII.core import decode_worker
+
+        src = _write_png_header(tmp_path / "a.png", 64, 32)
+        pixels = bytes(range(256)) * (64 * 32 * 4 // 256)
+        monkeypatch.setattr(decode_worker, "_quartz_available", lambda: False)
+        monkeypatch.setattr(decode_worker, "_decode_rgba_pil", lambda _p, _t: (64, 32, 256, memoryview(pixels)))
+        pool = self._inprocess_pool(monkeypatch, shm_budget_mb=8)
+        try:
+            frame = pool.decode_frame(str(src))
+            assert frame is not None
+            with frame:
+                assert frame.is_shared
+                assert (frame.width, frame.height, frame.stride) == (64, 32, 256)
+                assert bytes(frame.pixels) == pixels
+            assert frame.pixels is None
+            stats = pool.get_stats()
+            assert stats["frames"]["shared"] == 1
+            assert stats["shm"]["in_use"] == 0
+        finally:
+            pool.shutdown()
+
+    def test_decode_frame_overflow_without_slab_falls_back_to_file(self, tmp_path, monkeypatch):
+        """子进程报告溢出且更大的 slab 超出预算：回退文件传输而非返回 None"""
+        from plookingII.core import decode_worker
+
+        src = _write_png_header(tmp_path / "a.png", 64, 32)
+        out = tmp_path / "dec.jpg"
+        out.write_bytes(b"jpeg")
+        monkeypatch.setattr(decode_worker, "_decode_to_shared", lambda *_a: {"overflow": 64 * 1024 * 1024})
+        monkeypatch.setattr(decode_worker, "_decode_to_file", lambda _p, _t, _d: str(out))
+        pool = self._inprocess_pool(monkeypatch, shm_budget_mb=8)
+        try:
+            frame = pool.decode_frame(str(src))
+            assert frame is not None
+            assert frame.file_path == str(out)
+            frame.release()
+            frames = pool.get_stats()["frames"]
+            assert frames["overflow"] == 1
+            assert frames["file_fallback"] == 1
+            assert pool.get_stats()["shm"]["in_use"] == 0
+        finally:
+            pool.shutdown()
+
+    def test_release_with_exported_pixels_returns_slab(self, tmp_path, monkeypatch):
+        """调用方仍持有像素导出时 release 不抛出，slab 照常归还"""
+        from plookingII.core import decode_worker
+
+        src = _write_png_header(tmp_path / "a.png", 64, 32)
+        pixels = bytes(64 * 32 * 4)
+        monkeypatch.setattr(decode_worker, "_quartz_available", lambda: False)
+        monkeypatch.setattr(decode_worker, "_decode_rgba_pil", lambda _p, _t: (64, 32, 256, memoryview(pixels)))
+        pool = self._inprocess_pool(monkeypatch, shm_budget_mb=8)
+        try:
+            frame = pool.decode_frame(str(src))
+            exported = pickle.PickleBuffer(frame.pixels)  # 持有 memoryview 自身的导出
+            frame.release()
+            assert frame.pixels is None
+            assert pool.get_stats()["shm"]["in_use"] == 0
+            del exported
+        finally:
+            pool.shutdown()
+
+    def test_decode_frame_unknown_size_falls_back_to_file(self, tmp_path, monkeypatch):
+        from plookingII.core import decode_worker
+
+        src = tmp_path / "a.heic"
+        src.write_bytes(b"\x00" * 64)
+        out = tmp_path / "dec.jpg"
+        out.write_bytes(b"jpeg")
+        monkeypatch.setattr(decode_worker, "_decode_to_file", lambda _p, _t, _d: str(out))
+        pool = self._inprocess_pool(monkeypatch)
+        try:
+            frame = pool.decode_frame(str(src), target_size=(100, 100))
+            assert frame is not None
+            assert not frame.is_shared
+            assert frame.file_path == str(out)
+            frame.release()
+            assert not out.exists()
+            assert pool.get_stats()["frames"]["file_fallback"] == 1
+            assert pool.decode_frame(str(src), target_size=(100, 100), fallback_to_file=False) is None
+        finally:
+            pool.shutdown()
+
+
+class TestPipelinedDecode:
+    """请求 ID 协议 + 在途队列 + 异步 Future（失败路径不依赖解码器）"""
+
+    def test_decode_async_spreads_across_workers(self, tmp_path):
+        pool = DecodePool(max_workers=2, max_tasks_per_worker=100, pipeline_depth=1)
+        try:
+            futures = [pool.decode_async(str(tmp_path / f"missing_{i}.jpg"), (800, 600)) for i in range(6)]
+            assert [f.result(timeout=30) for f in futures] == [None] * 6
+            stats = pool.get_stats()
+            assert sum(stats["tasks_per_worker"]) == 6
+            assert all(t >= 1 for t in stats["tasks_per_worker"])
+            assert stats["queued"] == 0
+        finally:
+            pool.shutdown()
+
+    def test_queued_requests_can_be_cancelled(self, tmp_path):
+        pool = DecodePool(max_workers=1, max_tasks_per_worker=100, pipeline_depth=1)
+        try:
+            futures = [pool.decode_async(str(tmp_path / f"missing_{i}.jpg")) for i in range(4)]
+            # 首个请求已发送（在途不可取消），其余仍在待发队列
+            assert futures[-1].cancel() is True
+            assert pool.cancel_queued() == 2
+            assert futures[0].result(timeout=30) is None
+            assert all(f.cancelled() for f in futures[1:])
+            assert pool.get_stats()["cancelled"] == 2
+        finally:
+            pool.shutdown()
+
+    def test_cancel_queued_keeps_retried_requests(self, tmp_path):
+        """子进程异常退出后重试的请求已在运行，cancel_queued 不丢弃，重发后仍会完成"""
+        pool = DecodePool(max_workers=1, max_tasks_per_worker=100, pipeline_depth=1)
+        try:
+            worker = pool._slots[0].process
+            os.kill(worker.pid, signal.SIGSTOP)
+            future = pool.decode_async(str(tmp_path / "missing.jpg"))
+            with patch.object(pool, "_pump"):
+                os.kill(worker.pid, signal.SIGKILL)
+                deadline = time.monotonic() + 10
+                while not pool._queue and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                assert pool.cancel_queued() == 0
+            assert not future.cancelled()
+            pool._pump()
+            assert future.result(timeout=30) is None
+        finally:
+            pool.shutdown()
+
+    def test_recycle_after_max_tasks_with_pipelining(self, tmp_path):
+        pool = DecodePool(max_workers=1, max_tasks_per_worker=2, pipeline_depth=2)
+        try:
+            futures = [pool.decode_async(str(tmp_path / f"missing_{i}.jpg")) for i in range(5)]
+            assert [f.result(timeout=60) for f in futures] == [None] * 5
+            stats = pool.get_stats()
+            assert stats["workers"] == 1
+            assert all(t <= 2 for t in stats["tasks_per_worker"])
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_resolves_queued_requests(self, tmp_path):
+        pool = DecodePool(max_workers=1, max_tasks_per_worker=100, pipeline_depth=1)
+        futures = [pool.decode_async(str(tmp_path / f"missing_{i}.jpg")) for i in range(3)]
+        pool.shutdown()
+        assert [f.result(timeout=10) for f in futures] == [None] * 3
+        assert pool.decode_async(str(tmp_path / "late.jpg")).result() is None
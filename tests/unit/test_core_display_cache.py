@@ -0,0 +1,123 @@
+"""
+测试 core/display_cache.py
+
+覆盖显示级渲染图磁盘缓存：
+- 长边档位选择与更大档位命中
+- 源文件 mtime/大小变化后不再命中
+- LRU 字节预算淘汰（访问刷新次序，跨实例保留）
+- 原子写入：残留临时文件在扫描时清理
+- 单例与重置
+"""
+
+import os
+
+from plookingII.core.display_cache import DisplayTierCache, get_display_cache, reset_display_cache
+
+
+def _source(tmp_path, name="a.jpg", data=b"x" * 4096):
+    p = tmp_path / "photos" / name
+    p.parent.mkdir(exist_ok=True)
+    p.write_bytes(data)
+    return str(p)
+
+
+def _rendition(tmp_path, size=1000):
+    p = tmp_path / f"render_{size}.jpg"
+    p.write_bytes(b"\xff\xd8" + b"r" * (size - 2))
+    return str(p)
+
+
+class TestDisplayTierCache:
+    def test_bucket_selection(self, tmp_path):
+        """目标长边向上取档；全分辨率/超大尺寸不落盘"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"))
+        assert cache.bucket_for((1000, 800)) == 1024
+        assert cache.bucket_for((1440, 2560)) == 3072
+        assert cache.bucket_for((2048, 1536)) == 2048
+        assert cache.bucket_for(None) is None
+        assert cache.bucket_for((5000, 3000)) is None
+
+    def test_store_and_lookup_roundtrip(self, tmp_path):
+        """写入后按目标尺寸命中，可用更大档位替代"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"))
+        src = _source(tmp_path)
+        assert cache.lookup(src, (1800, 1200)) is None
+
+        stored = cache.store_file(src, 2048, _rendition(tmp_path))
+        assert stored is not None
+        assert cache.lookup(src, (1800, 1200)) == stored
+        # 目标更小：2048 档可替代 1024 档
+        assert cache.lookup(src, (800, 600)) == stored
+        # 目标更大：2048 档不满足 3072 档
+        assert cache.lookup(src, (2600, 1800)) is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["entries"] == 1
+
+    def test_source_change_invalidates(self, tmp_path):
+        """源文件内容变化（大小/mtime）后旧渲染图不再命中"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"))
+        src = _source(tmp_path)
+        cache.store_file(src, 1024, _rendition(tmp_path))
+        assert cache.lookup(src, (1000, 800)) is not None
+
+        with open(src, "ab") as f:
+            f.write(b"more")
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert cache.lookup(src, (1000, 800)) is None
+
+    def test_lru_budget_eviction(self, tmp_path):
+        """超出字节预算时淘汰最久未访问的渲染图"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"), max_bytes=2500)
+        a, b, c = (_source(tmp_path, n) for n in ("a.jpg", "b.jpg", "c.jpg"))
+        cache.store_file(a, 1024, _rendition(tmp_path))
+        cache.store_file(b, 1024, _rendition(tmp_path))
+        assert cache.lookup(a, (1000, 800)) is not None  # a 变为最近使用
+        cache.store_file(c, 1024, _rendition(tmp_path))
+
+        assert cache.lookup(b, (1000, 800)) is None
+        assert cache.lookup(a, (1000, 800)) is not None
+        assert cache.lookup(c, (1000, 800)) is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["total_bytes"] <= 2500
+
+    def test_rendition_larger_than_budget_not_kept(self, tmp_path):
+        """单个渲染图超过总预算时不保留"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"), max_bytes=500)
+        src = _source(tmp_path)
+        assert cache.store_file(src, 1024, _rendition(tmp_path, 1000)) is None
+        assert cache.lookup(src, (1000, 800)) is None
+
+    def test_index_rebuilt_and_tmp_cleaned(self, tmp_path):
+        """新实例扫描磁盘重建索引，并清理崩溃残留的临时文件"""
+        cache_dir = tmp_path / "cache"
+        src = _source(tmp_path)
+        stored = DisplayTierCache(cache_dir=str(cache_dir)).store_file(src, 1024, _rendition(tmp_path))
+        leftover = os.path.join(os.path.dirname(stored), "dead_1024.jpg.tmp123_456")
+        with open(leftover, "wb") as f:
+            f.write(b"partial")
+
+        fresh = DisplayTierCache(cache_dir=str(cache_dir))
+        assert fresh.lookup(src, (1000, 800)) == stored
+        assert not os.path.exists(leftover)
+        assert fresh.get_stats()["entries"] == 1
+
+    def test_missing_source_and_clear(self, tmp_path):
+        """源文件不存在时安全未命中；clear 清空所有条目"""
+        cache = DisplayTierCache(cache_dir=str(tmp_path / "cache"))
+        assert cache.store_file(str(tmp_path / "missing.jpg"), 1024, _rendition(tmp_path)) is None
+        src = _source(tmp_path)
+        cache.store_file(src, 1024, _rendition(tmp_path))
+        cache.clear()
+        assert cache.lookup(src, (1000, 800)) is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_singleton_and_reset(self):
+        """全局单例可复用，reset 后重建"""
+        reset_display_cache()
+        try:
+            assert get_display_cache() is get_display_cache()
+        finally:
+            reset_display_cache()
@@ -0,0 +1,124 @@
+"""
+测试 core/encoded_cache.py
+
+覆盖编码字节缓存层：
+- 整文件读取后以 memoryview 零拷贝返回
+- 文件变化后自动失效；校验间隔内命中不重复 stat
+- 字节预算：窗口外条目优先淘汰，超大文件不缓存
+- 后台按窗口顺序预读；新窗口替换未读取的旧窗口
+- 解码端仅在单例已创建时查询，取得的是缓存条目自身（不复制）
+"""
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from plookingII.core import encoded_cache
+from plookingII.core.encoded_cache import EncodedBytesCache, get_encoded_cache, peek_encoded_bytes
+
+
+def _write(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(bytes([len(name) % 256]) * size)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def _reset_singleton():
+    encoded_cache.reset_encoded_cache()
+    yield
+    encoded_cache.reset_encoded_cache()
+
+
+class TestEncodedBytesCache:
+    def test_read_returns_zero_copy_view(self, tmp_path):
+        path = _write(tmp_path, "a.jpg", 4096)
+        cache = EncodedBytesCache(max_mb=1)
+
+        assert cache.get(path) is None
+        assert cache.read(path) is True
+        view = cache.get(path)
+        assert isinstance(view, memoryview)
+        assert bytes(view) == Path(path).read_bytes()
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["reads"] == 1
+        assert stats["read_bytes"] == 4096
+
+    def test_modified_file_invalidates_entry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(encoded_cache, "_REVALIDATE_SEC", 0.0)
+        path = _write(tmp_path, "a.jpg", 1024)
+        cache = EncodedBytesCache(max_mb=1)
+        cache.read(path)
+
+        with open(path, "ab") as f:
+            f.write(b"more")
+        assert cache.get(path) is None
+        assert path not in cache
+        assert cache.get_stats()["stale"] == 1
+
+    def test_hits_within_revalidate_window_skip_stat(self, tmp_path):
+        """校验间隔内的命中复用上次 stat 结果（网络盘上每次 stat 都是往返）"""
+        path = _write(tmp_path, "a.jpg", 1024)
+        cache = EncodedBytesCache(max_mb=1)
+        cache.read(path)
+
+        with patch.object(encoded_cache.os, "stat") as stat:
+            for _ in range(3):
+                assert cache.get(path) is not None
+        stat.assert_not_called()
+
+    def test_budget_evicts_outside_window_first(self, tmp_path):
+        """超出预算时先淘汰不在当前窗口内的条目，超大文件直接跳过"""
+        cache = EncodedBytesCache(max_mb=1, window=4)
+        old = _write(tmp_path, "old.jpg", 200_000)
+        cache.read(old)
+        a, b, c = (_write(tmp_path, f"{n}.jpg", 200_000) for n in "abc")
+        cache._window_paths = frozenset((a, b, c))
+        cache.read(a)
+        cache.read(b)
+        cache.read(old)  # 刷新 LRU：old 最新但不在窗口内
+        cache.read(c)
+        cache.read(_write(tmp_path, "d.jpg", 250_000))
+
+        assert old not in cache
+        assert all(p in cache for p in (a, b, c))
+        assert cache.get_stats()["memory_mb"] <= 1.0
+
+        assert cache.read(_write(tmp_path, "huge.jpg", 400_000)) is False
+        assert cache.get_stats()["skipped"] == 1
+
+    def test_prefetch_reads_window_in_background(self, tmp_path):
+        paths = [_write(tmp_path, f"{i}.jpg", 2048) for i in range(5)]
+        cache = EncodedBytesCache(max_mb=1, window=3)
+        cache.prefetch(paths)
+
+        deadline = time.time() + 2.0
+        while len(cache) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert [p in cache for p in paths] == [True, True, True, False, False]
+        cache.shutdown()
+        assert len(cache) == 0
+
+
+class TestSingleton:
+    def test_peek_does_not_create_singleton(self, tmp_path):
+        path = _write(tmp_path, "a.jpg", 512)
+        assert peek_encoded_bytes(path) is None
+        assert encoded_cache._global_cache is None
+
+        get_encoded_cache().read(path)
+        assert bytes(peek_encoded_bytes(path)) == Path(path).read_bytes()
+
+    def test_decoder_receives_cached_buffer_without_copy(self, tmp_path):
+        from plookingII.core.loading.helpers import _encoded_nsdata
+
+        path = _write(tmp_path, "a.jpg", 512)
+        assert _encoded_nsdata(path) is None
+        cache = get_encoded_cache()
+        cache.read(path)
+        assert _encoded_nsdata(path) is cache._entries[path].data
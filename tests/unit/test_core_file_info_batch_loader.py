@@ -5,12 +5,17 @@
 - 对外返回副本，调用方原地修改不得污染共享缓存（H1 回归）
 - 目录 mtime 变化触发失效
 - LRU 淘汰与缓存命中
+- 工作窃取式并行目录树遍历（与串行遍历结果一致、快照复用、提前关闭）
 """
 
 import os
+import threading
+import time
+from types import SimpleNamespace
 from unittest.mock import patch
 
-from plookingII.core.file_info_batch_loader import DirectoryImageListCache, FileInfoBatchLoader
+from plookingII.core.file_info_batch_loader import DirectoryImageListCache, FileInfoBatchLoader, ParallelTreeWalker
+from plookingII.core.tree_snapshot import TreeScanResult, incremental_walk
 
 
 class TestDirectoryImageListCache:
@@ -201,3 +206,102 @@ class TestFileInfoBatchLoader:
         os.utime(str(photos), (future, future))
 
         assert loader.directory_contains_images(str(photos), filter_exts=(".jpg",)) is True
+
+
+def _make_tree(root, fanout=3, depth=3):
+    """合成目录树：每层 fanout 个子目录，叶子目录各含一张图片"""
+    dirs = [root]
+    for _ in range(depth):
+        dirs = [os.path.join(d, f"d{i}") for d in dirs for i in range(fanout)]
+    for d in dirs:
+        os.makedirs(d)
+        with open(os.path.join(d, "x.jpg"), "wb") as f:
+            f.write(b"1")
+    return dirs
+
+
+class TestParallelTreeWalker:
+    def test_matches_serial_walk(self, tmp_path):
+        """并行遍历得到的节点集合与串行遍历一致，并统计进度"""
+        root = str(tmp_path / "root")
+        leaves = _make_tree(root)
+        walker = ParallelTreeWalker(max_workers=4, per_mount_inflight=2)
+        result = TreeScanResult(root=root)
+        produced = dict(walker.walk(root, (".jpg",), result=result))
+
+        expected = incremental_walk(root, (".jpg",)).nodes
+        assert produced == expected
+        assert result.nodes == expected
+        assert sorted(result.image_directories) == sorted(leaves)
+
+        progress = walker.get_progress()
+        assert progress["dirs_done"] == len(expected) == 40
+        assert progress["image_dirs"] == 27
+        assert progress["queued"] == 0
+        assert progress["in_flight"] == 0
+        assert progress["finished"] is True
+
+    def test_dir_filter_and_snapshot_reuse(self, tmp_path):
+        """dir_filter 剪枝子树；mtime 未变的目录复用快照节点"""
+        root = str(tmp_path / "root")
+        _make_tree(root, fanout=2, depth=2)
+        past = time.time() - 60
+        for dirpath, _, _ in os.walk(root):
+            os.utime(dirpath, (past, past))
+
+        walker = ParallelTreeWalker(max_workers=3)
+        first = TreeScanResult(root=root)
+        for _ in walker.walk(root, (".jpg",), dir_filter=lambda parent, name: name != "d1", result=first):
+            pass
+        assert len(first.nodes) == 3  # root, root/d0, root/d0/d0
+
+        second = TreeScanResult(root=root)
+        for _ in walker.walk(root, (".jpg",), first.nodes, time.time_ns(), result=second):
+            pass
+        assert second.reused == 3
+        assert second.rescanned == 4
+        assert len(second.nodes) == 7
+
+    def test_nested_mount_uses_its_own_device_limit(self, tmp_path):
+        """子目录是另一个挂载点时，其子树按自身 st_dev 限流"""
+        root = str(tmp_path / "root")
+        _make_tree(root, fanout=2, depth=2)
+        mount = os.path.join(root, "d1")
+        real_stat = os.stat
+
+        def fake_stat(path, *args, **kwargs):
+            st = real_stat(path, *args, **kwargs)
+            if str(path).startswith(mount):
+                return SimpleNamespace(st_dev=st.st_dev + 1, st_mtime_ns=st.st_mtime_ns)
+            return st
+
+        devices = []
+        real_sem = threading.BoundedSemaphore
+
+        def record_sem(value):
+            devices.append(value)
+            return real_sem(value)
+
+        walker = ParallelTreeWalker(max_workers=2, per_mount_inflight=1)
+        with (
+            patch("plookingII.core.file_info_batch_loader.os.stat", side_effect=fake_stat),
+            patch("plookingII.core.file_info_batch_loader.threading.BoundedSemaphore", side_effect=record_sem),
+        ):
+            produced = dict(walker.walk(root, (".jpg",)))
+        assert len(produced) == 7
+        # 根所在设备与挂载点设备各一个信号量
+        assert len(devices) == 2
+
+    def test_close_early_stops_workers(self, tmp_path):
+        """提前关闭生成器时工作线程退出，不再产出结果"""
+        root = str(tmp_path / "root")
+        _make_tree(root, fanout=4, depth=3)
+        walker = ParallelTreeWalker(max_workers=2)
+        stream = walker.walk(root, (".jpg",))
+        next(stream)
+        stream.close()
+        assert walker.get_progress()["finished"] is True
+
+    def test_missing_root_yields_nothing(self, tmp_path):
+        """根目录不存在时不产出任何节点"""
+        assert list(ParallelTreeWalker().walk(str(tmp_path / "missing"), (".jpg",))) == []
@@ -315,6 +315,7 @@ class TestSaveTaskProgress:
         conn.close()
 
         assert "current_folder" in columns
+        assert "current_image" in columns
 
     def test_save_task_progress_updates_subfolders(self, history_manager):
         """测试保存进度更新子文件夹"""
@@ -396,6 +397,7 @@ class TestLoadTaskProgress:
             "current_index": 15,
             "keep_folder": "/test/keep",
             "current_folder": "/test/album",
+            "current_image": "/test/album/IMG_10.jpg",
             "subfolders": ["/s1", "/s2", "/s3"],
         }
         history_manager.save_task_progress(save_data)
@@ -408,6 +410,7 @@ class TestLoadTaskProgress:
         assert loaded_data["current_index"] == 15
         assert loaded_data["keep_folder"] == "/test/keep"
         assert loaded_data["current_folder"] == "/test/album"
+        assert loaded_data["current_image"] == "/test/album/IMG_10.jpg"
         assert loaded_data["subfolders"] == ["/s1", "/s2", "/s3"]
 
     def test_load_task_progress_with_no_data(self, temp_root_folder):
@@ -0,0 +1,216 @@
+"""
+测试 core/image_header.py
+
+覆盖纯 Python 头部解析：
+- JPEG SOF 宽高、EXIF 方向（II/MM 字节序）与拍摄时间、MPF 子图像偏移
+- PNG IHDR 宽高、色彩类型与 tRNS 透明判定
+- 前缀不足/损坏/未知格式安全返回 None
+- 单文件读取与批量并行探测
+- helpers.get_image_dimensions / png_has_alpha 首选头部解析
+"""
+
+import struct
+import zlib
+
+from plookingII.core.image_header import (
+    ImageHeaderInfo,
+    parse_image_header,
+    read_image_header,
+    read_image_headers,
+)
+
+
+def _segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _sof0(width: int, height: int) -> bytes:
+    return _segment(0xC0, struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x11\x00" * 3)
+
+
+def _exif(orientation: int, little: bool = False) -> bytes:
+    fmt = "<" if little else ">"
+    tiff = (b"II" if little else b"MM") + struct.pack(fmt + "HI", 42, 8)
+    tiff += struct.pack(fmt + "H", 1) + struct.pack(fmt + "HHIHH", 0x0112, 3, 1, orientation, 0)
+    tiff += struct.pack(fmt + "I", 0)
+    return _segment(0xE1, b"Exif\x00\x00" + tiff)
+
+
+def _exif_datetimes(ifd0_time: bytes | None, original: bytes | None, little: bool = False) -> bytes:
+    """构造含 IFD0 DateTime 与 Exif 子 IFD DateTimeOriginal 的 APP1"""
+    fmt = "<" if little else ">"
+    ifd0_entries = []
+    blobs = b""
+    # 布局：TIFF 头(8) + IFD0(2 + 2*12 + 4) + Exif IFD(2 + 12 + 4) + 字符串区
+    ifd0_at = 8
+    exif_at = ifd0_at + 2 + 2 * 12 + 4
+    data_at = exif_at + 2 + 12 + 4
+    if ifd0_time is not None:
+        ifd0_entries.append(struct.pack(fmt + "HHII", 0x0132, 2, 20, data_at + len(blobs)))
+        blobs += ifd0_time + b"\x00"
+    ifd0_entries.append(struct.pack(fmt + "HHII", 0x8769, 4, 1, exif_at))
+    while len(ifd0_entries) < 2:
+        ifd0_entries.append(struct.pack(fmt + "HHII", 0x0131, 2, 1, 0))
+    exif_entry = struct.pack(fmt + "HHII", 0x9003, 2, 20 if original is not None else 0, data_at + len(blobs))
+    if original is not None:
+        blobs += original + b"\x00"
+    tiff = (b"II" if little else b"MM") + struct.pack(fmt + "HI", 42, ifd0_at)
+    tiff += struct.pack(fmt + "H", 2) + b"".join(ifd0_entries) + struct.pack(fmt + "I", 0)
+    tiff += struct.pack(fmt + "H", 1) + exif_entry + struct.pack(fmt + "I", 0)
+    return _segment(0xE1, b"Exif\x00\x00" + tiff + blobs)
+
+
+def _mpf(entries: list[tuple[int, int]]) -> bytes:
+    """构造 MPF APP2：entries 为 (相对 MPF TIFF 头的偏移, 长度)"""
+    count = 2
+    ifd_size = 2 + count * 12 + 4
+    entry_offset = 8 + ifd_size
+    tiff = b"MM" + struct.pack(">HI", 42, 8)
+    tiff += struct.pack(">H", count)
+    tiff += struct.pack(">HHII", 0xB001, 4, 1, len(entries))
+    tiff += struct.pack(">HHII", 0xB002, 7, 16 * len(entries), entry_offset)
+    tiff += struct.pack(">I", 0)
+    for offset, size in entries:
+        tiff += struct.pack(">IIIHH", 0, size, offset, 0, 0)
+    return _segment(0xE2, b"MPF\x00" + tiff)
+
+
+def _jpeg(*segments: bytes) -> bytes:
+    return b"\xff\xd8" + b"".join(segments) + b"\xff\xda\x00\x02" + b"\x00" * 16 + b"\xff\xd9"
+
+
+def _png(width: int, height: int, color_type: int, extra_chunks: tuple[tuple[bytes, bytes], ...] = ()) -> bytes:
+    def chunk(ctype: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data))
+
+    out = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+    for ctype, data in extra_chunks:
+        out += chunk(ctype, data)
+    return out + chunk(b"IDAT", zlib.compress(b"\x00")) + chunk(b"IEND", b"")
+
+
+class TestJpegHeader:
+    def test_sof0_dimensions(self):
+        info = parse_image_header(_jpeg(_segment(0xE0, b"JFIF\x00" + b"\x00" * 9), _sof0(6000, 4000)))
+        assert info == ImageHeaderInfo("jpeg", 6000, 4000, 1, False, ())
+
+    def test_progressive_sof2(self):
+        data = _jpeg(_segment(0xC2, struct.pack(">BHHB", 8, 480, 640, 3) + b"\x00" * 9))
+        info = parse_image_header(data)
+        assert info is not None
+        assert info.dimensions == (640, 480)
+
+    def test_exif_orientation_both_byte_orders(self):
+        for little in (False, True):
+            info = parse_image_header(_jpeg(_exif(6, little=little), _sof0(100, 50)))
+            assert info is not None
+            assert info.orientation == 6
+            # 宽高保持存储尺寸，不按方向交换
+            assert info.dimensions == (100, 50)
+
+    def test_exif_capture_time(self):
+        """优先 Exif 子 IFD 的 DateTimeOriginal，缺失时回退 IFD0 DateTime；全零值忽略"""
+        for little in (False, True):
+            data = _jpeg(_exif_datetimes(b"2024:01:02 03:04:05", b"2023:12:31 23:59:58", little), _sof0(8, 8))
+            assert parse_image_header(data).capture_time == "2023:12:31 23:59:58"
+
+        data = _jpeg(_exif_datetimes(b"2024:01:02 03:04:05", None), _sof0(8, 8))
+        assert parse_image_header(data).capture_time == "2024:01:02 03:04:05"
+
+        data = _jpeg(_exif_datetimes(None, b"0000:00:00 00:00:00"), _sof0(8, 8))
+        assert parse_image_header(data).capture_time is None
+        assert parse_image_header(_jpeg(_exif(1), _sof0(8, 8))).capture_time is None
+
+    def test_mpf_offsets_are_absolute(self):
+        data = _jpeg(_exif(1), _mpf([(0, 5000), (1200, 300)]), _sof0(8, 8))
+        info = parse_image_header(data, file_size=10_000)
+        assert info is not None
+        assert info.has_mpf is True
+        mpf_tiff_start = data.index(b"MPF\x00") + 4
+        assert info.preview_range == (mpf_tiff_start + 1200, 300)
+
+    def test_mpf_out_of_bounds_entry_dropped(self):
+        data = _jpeg(_mpf([(0, 5000), (1200, 300)]), _sof0(8, 8))
+        info = parse_image_header(data, file_size=1000)
+        assert info is not None
+        assert info.has_mpf is False
+        assert info.preview_range is None
+
+    def test_sof_beyond_prefix_returns_none(self):
+        data = _jpeg(_segment(0xE1, b"\x00" * 2000), _sof0(10, 10))
+        assert parse_image_header(data[:1000]) is None
+
+    def test_sos_before_sof_returns_none(self):
+        assert parse_image_header(b"\xff\xd8\xff\xda\x00\x02\x00\x00") is None
+
+
+class TestPngHeader:
+    def test_rgba_has_alpha(self):
+        info = parse_image_header(_png(320, 200, 6))
+        assert info is not None
+        assert info.format == "png"
+        assert info.dimensions == (320, 200)
+        assert info.has_alpha is True
+
+    def test_rgb_without_trns(self):
+        info = parse_image_header(_png(10, 20, 2))
+        assert info is not None
+        assert info.has_alpha is False
+
+    def test_palette_with_trns(self):
+        info = parse_image_header(_png(10, 20, 3, ((b"PLTE", b"\x00" * 3), (b"tRNS", b"\x00"))))
+        assert info is not None
+        assert info.has_alpha is True
+
+    def test_alpha_unknown_when_truncated_before_idat(self):
+        data = _png(10, 20, 2, ((b"iCCP", b"\x00" * 500),))
+        info = parse_image_header(data[:100])
+        assert info is not None
+        assert info.dimensions == (10, 20)
+        assert info.has_alpha is None
+
+
+class TestReadHeader:
+    def test_unknown_format_returns_none(self):
+        assert parse_image_header(b"GIF89a" + b"\x00" * 20) is None
+        assert parse_image_header(b"") is None
+
+    def test_read_single_file(self, tmp_path):
+        p = tmp_path / "a.jpg"
+        p.write_bytes(_jpeg(_sof0(1920, 1080)))
+        info = read_image_header(str(p))
+        assert info is not None
+        assert info.dimensions == (1920, 1080)
+
+    def test_read_missing_file_returns_none(self, tmp_path):
+        assert read_image_header(str(tmp_path / "missing.jpg")) is None
+
+    def test_batch_probe_skips_failures(self, tmp_path):
+        good = tmp_path / "good.png"
+        good.write_bytes(_png(4, 3, 2))
+        bad = tmp_path / "bad.jpg"
+        bad.write_bytes(b"not an image")
+        paths = [str(good), str(bad), str(tmp_path / "missing.jpg")]
+        for workers in (1, 4):
+            result = read_image_headers(paths, max_workers=workers)
+            assert set(result) == {str(good)}
+            assert result[str(good)].dimensions == (4, 3)
+
+
+class TestHelpersUseHeaderParser:
+    def test_get_image_dimensions_without_quartz(self, tmp_path):
+        from plookingII.core.loading.helpers import get_image_dimensions
+
+        p = tmp_path / "a.jpg"
+        p.write_bytes(_jpeg(_sof0(800, 600)))
+        assert get_image_dimensions(str(p)) == (800, 600)
+
+    def test_png_has_alpha_without_quartz(self, tmp_path):
+        from plookingII.core.loading.helpers import png_has_alpha
+
+        rgba = tmp_path / "a.png"
+        rgba.write_bytes(_png(2, 2, 6))
+        rgb = tmp_path / "b.png"
+        rgb.write_bytes(_png(2, 2, 2))
+        assert png_has_alpha(str(rgba)) is True
+        assert png_has_alpha(str(rgb)) is False
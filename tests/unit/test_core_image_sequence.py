@@ -0,0 +1,138 @@
+"""
+测试 core/image_sequence.py
+
+覆盖 ImageSequence：
+- 与 list 行为一致（随机增删改对照）
+- 跨块分裂/清空后的下标定位与 index()
+- 重复元素时 index() 回退线性查找
+- BidirectionalCachePool 共享序列
+"""
+
+import random
+
+import pytest
+
+from plookingII.core import image_sequence
+from plookingII.core.image_sequence import ImageSequence
+from plookingII.core.simple_cache import BidirectionalCachePool
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """缩小块长度，让少量元素即可触发分裂与合并路径"""
+    monkeypatch.setattr(image_sequence, "_LOAD", 4)
+
+
+def _paths(n):
+    return [f"/photos/IMG_{i:05d}.jpg" for i in range(n)]
+
+
+class TestImageSequence:
+    def test_list_compatible_basics(self):
+        seq = ImageSequence(_paths(5))
+        assert len(seq) == 5
+        assert seq
+        assert seq[0] == "/photos/IMG_00000.jpg"
+        assert seq[-1] == "/photos/IMG_00004.jpg"
+        assert seq[1:3] == _paths(5)[1:3]
+        assert seq == _paths(5)
+        assert list(seq) == _paths(5)
+        assert "/photos/IMG_00003.jpg" in seq
+        assert "/nope.jpg" not in seq
+        assert seq.index("/photos/IMG_00003.jpg") == 3
+        assert seq.index_of("/nope.jpg") is None
+        with pytest.raises(ValueError, match="is not in"):
+            seq.index("/nope.jpg")
+        with pytest.raises(IndexError):
+            seq[5]
+        assert not ImageSequence()
+
+    def test_pop_and_insert_keep_indexes_consistent(self, small_blocks):
+        items = _paths(40)
+        seq = ImageSequence(items)
+
+        # 精选：逐张移除当前图；撤回：插回原位置
+        removed = seq.pop(10)
+        items.pop(10)
+        assert seq == items
+        assert seq.index(items[10]) == 10
+        assert removed not in seq
+        seq.insert(10, removed)
+        items.insert(10, removed)
+        assert seq == items
+        assert seq.index(removed) == 10
+
+        # 整块清空后仍可正确定位
+        for _ in range(12):
+            seq.pop(0)
+            items.pop(0)
+        assert seq == items
+        assert all(seq.index(p) == i for i, p in enumerate(items))
+
+    def test_matches_list_under_random_operations(self, small_blocks):
+        rng = random.Random(7)
+        items = _paths(60)
+        seq = ImageSequence(items)
+        counter = 1000
+        for _ in range(600):
+            op = rng.random()
+            if op < 0.45 and items:
+                i = rng.randrange(-len(items), len(items))
+                assert seq.pop(i) == items.pop(i)
+            elif op < 0.9:
+                i = rng.randrange(-len(items) - 3, len(items) + 3)
+                path = f"/photos/NEW_{counter}.jpg"
+                counter += 1
+                seq.insert(i, path)
+                items.insert(i, path)
+            elif items:
+                i = rng.randrange(len(items))
+                path = f"/photos/SET_{counter}.jpg"
+                counter += 1
+                seq[i] = path
+                items[i] = path
+            assert len(seq) == len(items)
+        assert seq == items
+        assert all(seq.index(p) == i for i, p in enumerate(items))
+        assert all(seq[i] == p for i, p in enumerate(items))
+
+    def test_duplicates_fall_back_to_linear_index(self, small_blocks):
+        seq = ImageSequence(["a", "b", "a", "c"])
+        assert seq.index("a") == 0
+        seq.pop(0)
+        assert seq.index("a") == 1
+        with pytest.raises(ValueError, match="is not in"):
+            seq.index("a", 2)
+
+    def test_slice_delete_sort_and_clear(self):
+        seq = ImageSequence(["c", "a", "b", "d"])
+        del seq[1:3]
+        assert seq == ["c", "d"]
+        seq.sort()
+        assert seq == ["c", "d"]
+        seq.extend(["b", "a"])
+        seq.sort(reverse=True)
+        assert seq == ["d", "c", "b", "a"]
+        assert seq.index("a") == 3
+        seq.clear()
+        assert seq == []
+        assert len(seq) == 0
+
+
+class TestBidirectionalPoolSharing:
+    def test_shared_sequence_tracks_removals(self):
+        pool = BidirectionalCachePool()
+        images = ImageSequence(_paths(10))
+        pool.set_sequence(images)
+        assert pool._current_sequence is images
+
+        images.pop(3)
+        pool.set_current_image_sync("/photos/IMG_00005.jpg", "k")
+        assert pool._current_index == 4
+
+    def test_plain_list_is_wrapped(self):
+        pool = BidirectionalCachePool()
+        pool.set_sequence(["a.jpg", "b.jpg"])
+        assert isinstance(pool._current_sequence, ImageSequence)
+        pool.set_current_image_sync("b.jpg", "k")
+        assert pool._current_index == 1
@@ -0,0 +1,194 @@
+"""
+测试 core/loading/single_flight.py
+
+覆盖解码单飞登记表：
+- 并发同键调用只执行一次解码，所有调用方拿到同一结果
+- leader 异常传给加入者；完成后出表，之后的调用重新解码
+- 前台调用方加入时提升优先级，排队等待槽位的 leader 越过槽位开始解码
+- try_run 不加入进行中的解码（主线程调用不阻塞）
+- 单例获取与重置
+"""
+
+import threading
+import time
+
+import pytest
+
+from plookingII.core.loading import single_flight
+from plookingII.core.loading.single_flight import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_FOREGROUND,
+    PRIORITY_NEXT,
+    DecodeSingleFlight,
+    get_decode_flights,
+)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestDecodeSingleFlight:
+    def test_concurrent_callers_share_one_decode(self):
+        flights = DecodeSingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def decode(_flight):
+            calls.append(1)
+            release.wait(2.0)
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.run(("a.jpg", (800, 600)), decode)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        assert _wait_until(lambda: flights.get_stats()["joined"] == 3)
+        release.set()
+        for t in threads:
+            t.join(2.0)
+
+        assert len(calls) == 1
+        assert len(results) == 4
+        assert all(r is results[0] for r in results)
+        stats = flights.get_stats()
+        assert stats["leaders"] == 1
+        assert stats["saved_decodes"] == 3
+        assert stats["in_flight"] == 0
+
+        # 完成后出表：同键再次调用重新解码；不同尺寸互不合并
+        flights.run(("a.jpg", (800, 600)), decode)
+        flights.run(("a.jpg", None), decode)
+        assert len(calls) == 3
+
+    def test_leader_error_propagates_to_joiners(self):
+        flights = DecodeSingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def decode(_flight):
+            started.set()
+            release.wait(2.0)
+            raise OSError("broken")
+
+        errors = []
+
+        def call():
+            try:
+                flights.run("k", decode)
+            except OSError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(2.0)
+        joiner = threading.Thread(target=call)
+        joiner.start()
+        assert _wait_until(lambda: flights.get_stats()["joined"] == 1)
+        release.set()
+        leader.join(2.0)
+        joiner.join(2.0)
+
+        assert len(errors) == 2
+        assert errors[0] is errors[1]
+        assert not flights.in_flight("k")
+
+    def test_next_join_raises_priority_but_keeps_slot_wait(self):
+        """非前台调用方加入只提升优先级数值，leader 仍排队等待槽位"""
+        flights = DecodeSingleFlight()
+        semaphore = threading.BoundedSemaphore(1)
+        semaphore.acquire()  # 槽位被其他解码占满
+        acquired = []
+        results = []
+
+        def decode(flight):
+            acquired.append(flight.acquire_slot(semaphore))
+            semaphore.release()
+            return flight.priority
+
+        leader = threading.Thread(target=lambda: results.append(flights.run("k", decode, PRIORITY_BACKGROUND)))
+        leader.start()
+        assert _wait_until(lambda: flights.in_flight("k"))
+        joiner = threading.Thread(target=lambda: results.append(flights.run("k", decode, PRIORITY_NEXT)))
+        joiner.start()
+        assert _wait_until(lambda: flights.get_stats()["joined"] == 1)
+        time.sleep(0.05)
+        assert acquired == []
+
+        semaphore.release()
+        leader.join(2.0)
+        joiner.join(2.0)
+        assert acquired == [True]
+        assert results == [PRIORITY_NEXT, PRIORITY_NEXT]
+        assert flights.get_stats()["promoted"] == 1
+
+    def test_promotion_updates_priority(self):
+        flights = DecodeSingleFlight()
+        semaphore = threading.BoundedSemaphore(1)
+        semaphore.acquire()
+        results = []
+
+        def decode(flight):
+            acquired = flight.acquire_slot(semaphore)
+            return acquired, flight.priority
+
+        leader = threading.Thread(target=lambda: results.append(flights.run("k", decode, PRIORITY_BACKGROUND)))
+        leader.start()
+        assert _wait_until(lambda: flights.in_flight("k"))
+        assert flights.run("k", decode, PRIORITY_FOREGROUND) == (False, PRIORITY_FOREGROUND)
+        leader.join(2.0)
+        assert results == [(False, PRIORITY_FOREGROUND)]
+        assert flights.get_stats()["promoted"] == 1
+        semaphore.release()
+
+    def test_foreground_leader_skips_slot_wait(self):
+        flights = DecodeSingleFlight()
+        semaphore = threading.BoundedSemaphore(1)
+        semaphore.acquire()
+        assert flights.run("k", lambda f: f.acquire_slot(semaphore), PRIORITY_FOREGROUND) is False
+        semaphore.release()
+        assert flights.run("k", lambda f: f.acquire_slot(semaphore), PRIORITY_BACKGROUND) is True
+
+    def test_try_run_does_not_join_in_flight_decode(self):
+        """try_run：无同键解码时执行；有则提升其优先级并立即返回，不等待"""
+        flights = DecodeSingleFlight()
+        semaphore = threading.BoundedSemaphore(1)
+        semaphore.acquire()
+        results = []
+
+        def decode(flight):
+            return flight.acquire_slot(semaphore), flight.priority
+
+        leader = threading.Thread(target=lambda: results.append(flights.run("k", decode, PRIORITY_BACKGROUND)))
+        leader.start()
+        assert _wait_until(lambda: flights.in_flight("k"))
+        assert flights.try_run("k", decode, PRIORITY_FOREGROUND) == (False, None)
+        leader.join(2.0)
+        assert results == [(False, PRIORITY_FOREGROUND)]
+        stats = flights.get_stats()
+        assert stats["promoted"] == 1
+        assert stats["joined"] == 0
+        semaphore.release()
+
+        assert flights.try_run("k", lambda f: "fresh", PRIORITY_FOREGROUND) == (True, "fresh")
+        assert not flights.in_flight("k")
+
+
+class TestSingleton:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        single_flight.reset_decode_flights()
+        yield
+        single_flight.reset_decode_flights()
+
+    def test_get_and_reset(self):
+        flights = get_decode_flights()
+        assert get_decode_flights() is flights
+        single_flight.reset_decode_flights()
+        assert get_decode_flights() is not flights
@@ -13,6 +13,7 @@ from plookingII.core.memory_watchdog import (
     LEVEL_NONE,
     LEVEL_PREVENTIVE,
     choose_cleanup_level,
+    get_level_threshold_mb,
     get_physical_memory_mb,
     get_process_rss_mb,
 )
@@ -150,3 +151,8 @@ class TestChooseCleanupLevel:
             assert choose_cleanup_level(5500.0, self.PHYS) == LEVEL_PREVENTIVE
             # ≥6000 直接命中 emergency
             assert choose_cleanup_level(6500.0, self.PHYS) == LEVEL_EMERGENCY
+
+    def test_level_threshold_mb(self):
+        """阈值查询与判定一致（供缓存调优计算余量）"""
+        assert get_level_threshold_mb(LEVEL_PREVENTIVE, self.PHYS) == self.PHYS * 0.30
+        assert get_level_threshold_mb(LEVEL_PREVENTIVE, 2048.0) == 1024.0
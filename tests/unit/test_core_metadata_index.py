@@ -0,0 +1,139 @@
+"""
+测试 core/metadata_index.py
+
+覆盖 SQLite 元数据索引：
+- 批量 upsert 与按目录读取往返一致
+- 逐文件增量刷新：仅改动的文件失效，删除的文件行被清理
+- upsert 覆盖旧行
+- 拍摄时间列往返与旧库自动补列
+- 打开失败时安全降级
+- 单例与重置
+"""
+
+import os
+
+from plookingII.core.metadata_index import FileMeta, MetadataIndex, get_metadata_index, reset_metadata_index
+
+
+def _make_files(tmp_path, *names):
+    photos = tmp_path / "photos"
+    photos.mkdir(exist_ok=True)
+    for name in names:
+        (photos / name).write_bytes(b"x" * 100)
+    return photos
+
+
+def _meta_for(path, **kwargs) -> FileMeta:
+    st = os.stat(path)
+    return FileMeta(os.path.basename(path), st.st_size, st.st_mtime_ns, **kwargs)
+
+
+class TestMetadataIndex:
+    def test_upsert_and_load_roundtrip(self, tmp_path):
+        """批量写入后按目录读取，可选字段保持 None/布尔语义"""
+        index = MetadataIndex(str(tmp_path / "meta.db"))
+        photos = _make_files(tmp_path, "a.jpg", "b.png")
+        rows = [
+            _meta_for(photos / "a.jpg", width=6000, height=4000, orientation=6, has_alpha=False, has_mpf=True),
+            _meta_for(photos / "b.png", width=800, height=600),
+        ]
+        assert index.upsert_many(str(photos), rows) == 2
+
+        loaded = index.load_dir(str(photos))
+        assert loaded["a.jpg"] == rows[0]
+        assert loaded["b.png"].has_alpha is None
+        assert loaded["b.png"].dimensions == (800, 600)
+        assert index.get_stats()["rows"] == 2
+        index.close()
+
+    def test_delta_refresh_invalidates_single_file(self, tmp_path):
+        """改动一张图只让该行失效，其余行仍有效"""
+        index = MetadataIndex(str(tmp_path / "meta.db"))
+        photos = _make_files(tmp_path, "a.jpg", "b.jpg", "c.jpg")
+        index.upsert_many(str(photos), [_meta_for(photos / n, width=10, height=10) for n in ("a.jpg", "b.jpg")])
+
+        (photos / "b.jpg").write_bytes(b"y" * 200)
+        fresh, stale = index.refresh_dir(str(photos))
+
+        assert set(fresh) == {"a.jpg"}
+        # b 已改动，c 尚未索引
+        assert set(stale) == {"b.jpg", "c.jpg"}
+        st = os.stat(photos / "b.jpg")
+        assert stale["b.jpg"] == (st.st_size, st.st_mtime_ns)
+        index.close()
+
+    def test_refresh_limited_to_names_and_drops_deleted(self, tmp_path):
+        """仅校验指定文件；已删除文件的行被清理"""
+        index = MetadataIndex(str(tmp_path / "meta.db"))
+        photos = _make_files(tmp_path, "a.jpg", "b.jpg", "gone.jpg")
+        index.upsert_many(str(photos), [_meta_for(photos / n) for n in ("a.jpg", "b.jpg", "gone.jpg")])
+        os.remove(photos / "gone.jpg")
+
+        fresh, stale = index.refresh_dir(str(photos), ["a.jpg", "gone.jpg"])
+        assert set(fresh) == {"a.jpg"}
+        assert stale == {}
+        assert set(index.load_dir(str(photos))) == {"a.jpg", "b.jpg"}
+
+    def test_upsert_overwrites_existing_row(self, tmp_path):
+        """同名文件再次写入覆盖旧行"""
+        index = MetadataIndex(":memory:")
+        index.upsert_many("/photos", [FileMeta("a.jpg", 1, 1, 10, 10)])
+        index.upsert_many("/photos/", [FileMeta("a.jpg", 2, 2, 20, 30, has_mpf=False)])
+        loaded = index.load_dir("/photos")
+        assert loaded == {"a.jpg": FileMeta("a.jpg", 2, 2, 20, 30, has_mpf=False)}
+
+    def test_capture_time_roundtrip_and_legacy_migration(self, tmp_path):
+        """拍摄时间列往返；缺少该列的旧库打开时自动补列且旧行保留"""
+        import sqlite3
+
+        db_path = str(tmp_path / "legacy.db")
+        photos = _make_files(tmp_path, "a.jpg", "b.jpg")
+        legacy = sqlite3.connect(db_path)
+        legacy.execute(
+            "CREATE TABLE file_meta (dir TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, width INTEGER, height INTEGER, orientation INTEGER, "
+            "has_alpha INTEGER, has_mpf INTEGER, PRIMARY KEY (dir, name)) WITHOUT ROWID"
+        )
+        st = os.stat(photos / "a.jpg")
+        legacy.execute(
+            "INSERT INTO file_meta (dir, name, size, mtime_ns, width, height) VALUES (?, ?, ?, ?, 10, 20)",
+            (os.path.normpath(str(photos)), "a.jpg", st.st_size, st.st_mtime_ns),
+        )
+        legacy.commit()
+        legacy.close()
+
+        index = MetadataIndex(db_path)
+        loaded = index.load_dir(str(photos))
+        assert loaded["a.jpg"].dimensions == (10, 20)
+        assert loaded["a.jpg"].capture_time is None
+
+        index.upsert_many(str(photos), [_meta_for(photos / "b.jpg", capture_time="2024:05:06 07:08:09")])
+        assert index.load_dir(str(photos))["b.jpg"].capture_time == "2024:05:06 07:08:09"
+        index.close()
+
+    def test_missing_dir_and_unopenable_db(self, tmp_path):
+        """目录不存在或数据库无法打开时返回空结果"""
+        index = MetadataIndex(":memory:")
+        assert index.refresh_dir(str(tmp_path / "missing")) == ({}, {})
+
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        broken = MetadataIndex(str(blocker / "sub" / "meta.db"))
+        assert broken.upsert_many("/photos", [FileMeta("a.jpg", 1, 1)]) == 0
+        assert broken.load_dir("/photos") == {}
+
+    def test_clear(self):
+        """清空全部行"""
+        index = MetadataIndex(":memory:")
+        index.upsert_many("/p", [FileMeta("a.jpg", 1, 1), FileMeta("b.jpg", 1, 1)])
+        index.clear()
+        assert index.get_stats()["rows"] == 0
+
+    def test_singleton_and_reset(self, tmp_path, monkeypatch):
+        """全局单例可复用，reset 后重建"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        reset_metadata_index()
+        try:
+            assert get_metadata_index() is get_metadata_index()
+        finally:
+            reset_metadata_index()
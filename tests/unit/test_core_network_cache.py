@@ -4,7 +4,9 @@
 覆盖：缓存命中/未命中、移除、过期清理、LRU 淘汰、元数据持久化、统计。
 """
 
+import hashlib
 import os
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
@@ -56,6 +58,69 @@ class TestNetworkCache:
         assert local2 == local
         assert cache.stats["cache_hits"] == 1
 
+    def test_cache_remote_file_streams_with_checksum_and_progress(self, tmp_path):
+        """流式填充：校验和与整文件 MD5 一致、上报进度、不残留临时文件"""
+        cache = make_cache(tmp_path / "nc")
+        cache.fill_chunk_bytes = 4096
+        data = os.urandom(10_000)
+        src = tmp_path / "big.jpg"
+        src.write_bytes(data)
+        cache.remote_detector.is_remote_path.return_value = True
+        progress = []
+
+        local = cache.cache_remote_file(str(src), progress_callback=lambda done, total: progress.append((done, total)))
+
+        entry = next(iter(cache.cache_index.values()))
+        assert entry.checksum == hashlib.md5(data, usedforsecurity=False).hexdigest()
+        assert entry.file_size == len(data)
+        assert progress == [(4096, 10_000), (8192, 10_000), (10_000, 10_000)]
+        assert not list((tmp_path / "nc").glob("*.part"))
+        assert cache.get_active_fill(str(src)) is None
+        with open(local, "rb") as f:
+            assert f.read() == data
+
+    def test_cache_remote_file_missing_source_returns_none(self, tmp_path):
+        """源文件不可读时返回 None 且不留下索引或临时文件"""
+        cache = make_cache(tmp_path / "nc")
+        cache.remote_detector.is_remote_path.return_value = True
+
+        assert cache.cache_remote_file(str(tmp_path / "missing.jpg")) is None
+        assert not cache.cache_index
+        assert not list((tmp_path / "nc").glob("*.part"))
+
+    def test_init_sweeps_stale_partial_files(self, tmp_path):
+        """初始化删除上次中断留下的 .part 临时文件，不动正式缓存文件"""
+        cache_dir = tmp_path / "nc"
+        cache_dir.mkdir()
+        (cache_dir / "abc.jpg.part").write_bytes(b"half")
+        (cache_dir / "def.jpg").write_bytes(b"whole")
+
+        make_cache(cache_dir)
+
+        assert not list(cache_dir.glob("*.part"))
+        assert (cache_dir / "def.jpg").exists()
+
+    def test_direct_load_joins_active_fill(self, tmp_path):
+        """直读时若文件正在填充，等待填充完成并读本地副本，不再读远程"""
+        from plookingII.core.cache_fill import CacheFill
+        from plookingII.core.remote_file_manager import RemoteFileManager
+
+        cache = make_cache(tmp_path / "nc")
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"filled data")
+        fill = CacheFill(str(src), str(tmp_path / "nc" / "local.jpg"))
+        cache._active_fills[cache._generate_cache_key(str(src))] = fill
+        manager = RemoteFileManager.__new__(RemoteFileManager)
+        manager.network_cache = cache
+
+        threading.Thread(target=fill.run).start()
+        with patch.object(RemoteFileManager, "_read_file", wraps=RemoteFileManager._read_file) as read_file:
+            result = manager._load_directly(str(src), MagicMock(), time.perf_counter())
+
+        assert result.success
+        assert result.data == b"filled data"
+        read_file.assert_called_once_with(fill.local_path)
+
     def test_get_cached_path_miss_increments_miss(self, tmp_path):
         """未缓存的远程路径产生一次 miss 统计"""
         cache = make_cache(tmp_path / "nc")
@@ -153,6 +218,39 @@ class TestNetworkCache:
         entry = next(iter(cache2.cache_index.values()))
         assert entry.remote_path == str(src)
 
+    def test_flush_metadata_persists_buffered_touches(self, tmp_path):
+        """不足一批的访问更新在 flush_metadata（退出路径）时写出"""
+        cache_dir = tmp_path / "nc"
+        cache = make_cache(cache_dir)
+        src = tmp_path / "src.jpg"
+        src.write_bytes(b"data")
+        cache.remote_detector.is_remote_path.return_value = True
+        cache.cache_remote_file(str(src))
+        key = next(iter(cache.cache_index))
+        filled_count = cache.cache_index[key].access_count
+        cache.cache_remote_file(str(src))
+        cache.cache_remote_file(str(src))
+        assert make_cache(cache_dir).cache_index[key].access_count == filled_count
+
+        cache.flush_metadata()
+        assert make_cache(cache_dir).cache_index[key].access_count == filled_count + 2
+
+    def test_save_metadata_writes_outside_cache_lock(self, tmp_path):
+        """日志写出与 fsync 期间其他线程可取得 cache_lock"""
+        cache = make_cache(tmp_path / "nc")
+        acquired = []
+
+        def commit(*_args, **_kwargs):
+            t = threading.Thread(target=lambda: acquired.append(cache.cache_lock.acquire(timeout=1)))
+            t.start()
+            t.join()
+            if acquired[-1]:
+                cache.cache_lock.release()
+
+        with patch.object(cache._journal, "commit", side_effect=commit):
+            cache._save_metadata(sync=True)
+        assert acquired == [True]
+
     def test_get_cache_stats(self, tmp_path):
         """统计信息包含命中率与使用量"""
         cache = make_cache(tmp_path / "nc")
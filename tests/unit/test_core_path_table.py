@@ -0,0 +1,76 @@
+"""
+测试 core/path_table.py
+
+覆盖紧凑路径表：
+- pack/unpack 往返（根目录、相对文件名、非 ASCII、混合目录）
+- 目录前缀驻留：同一目录只登记一次
+- reordered 共享文件名 blob，含未知路径时返回 None
+- DirectoryImageListCache 以 PackedPaths 存储后对外行为不变
+"""
+
+import os
+
+from plookingII.core.file_info_batch_loader import DirectoryImageListCache, FileInfo
+from plookingII.core.path_table import PathTable, get_path_table, reset_path_table
+
+
+class TestPathTable:
+    def test_pack_roundtrip(self):
+        table = PathTable()
+        paths = [
+            os.path.join("/photos", "2024", "IMG_0001.jpg"),
+            os.path.join("/photos", "2024", "照片 02.HEIC"),
+            os.path.join("/photos", "2025", "a.png"),
+            os.sep + "root.jpg",
+            "relative.jpg",
+        ]
+        packed = table.pack(paths)
+        assert len(packed) == 5
+        assert packed
+        assert packed.unpack() == paths
+        # 每次返回新列表
+        assert packed.unpack() is not packed.unpack()
+        assert not table.pack([])
+
+    def test_directory_prefix_interned_once(self):
+        table = PathTable()
+        table.pack([f"/photos/a/{i}.jpg" for i in range(50)])
+        table.pack([f"/photos/a/{i}.png" for i in range(50)] + ["/photos/b/x.jpg"])
+        assert table.get_stats()["dirs"] == 2
+        assert table.intern_dir("/photos/a") == table.intern_dir("/photos/a")
+
+    def test_reordered_shares_blob(self):
+        table = PathTable()
+        paths = [f"/photos/a/IMG_{i}.jpg" for i in range(10)]
+        packed = table.pack(paths)
+        reordered = packed.reordered(reversed(paths))
+        assert reordered.unpack() == paths[::-1]
+        assert reordered._blob is packed._blob
+        assert packed.reordered(["/photos/a/missing.jpg"]) is None
+
+    def test_singleton(self):
+        reset_path_table()
+        try:
+            table = get_path_table()
+            assert get_path_table() is table
+        finally:
+            reset_path_table()
+
+
+class TestPackedDirectoryCache:
+    def test_get_returns_fresh_lists(self, tmp_path):
+        images = [str(tmp_path / f"IMG_{i}.jpg") for i in (10, 2, 1)]
+        mtime = os.stat(tmp_path).st_mtime
+        cache = DirectoryImageListCache()
+        cache.put(str(tmp_path), mtime, sorted(images))
+        cache.put_ordered(str(tmp_path), mtime, "natural", images[::-1])
+
+        listed = cache.get(str(tmp_path))
+        assert listed == sorted(images)
+        listed.pop()
+        assert cache.get(str(tmp_path)) == sorted(images)
+        assert cache.get_ordered(str(tmp_path), "natural") == images[::-1]
+
+    def test_file_info_uses_slots(self):
+        info = FileInfo(path="/photos/a.jpg")
+        assert not hasattr(info, "__dict__")
@@ -0,0 +1,139 @@
+"""
+测试 core/prefetch_scheduler.py
+
+覆盖：优先级出队、(path, target_size) 去重、代次推进丢弃过期任务、
+代次内存预算、队列超限淘汰最低优先级、shutdown 清空排队。
+"""
+
+import threading
+import time
+
+from plookingII.core.prefetch_scheduler import PrefetchScheduler
+
+
+def _blocked_scheduler(**kwargs):
+    """单工作线程 + 阻塞任务占住线程，便于观察排队顺序"""
+    scheduler = PrefetchScheduler(max_workers=1, **kwargs)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocker(_path, _size, _gen, _prio):
+        started.set()
+        gate.wait(3)
+
+    scheduler.submit(blocker, "/blocker", None, 1, priority=0)
+    assert started.wait(3)
+    return scheduler, gate
+
+
+def _wait_idle(scheduler, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = scheduler.get_stats()
+        if stats["pending"] == 0 and stats["running"] == 0:
+            return
+        time.sleep(0.01)
+
+
+class TestPrefetchScheduler:
+    def test_runs_by_priority(self):
+        """排队任务按优先级（小者优先）执行，同级 FIFO"""
+        scheduler, gate = _blocked_scheduler()
+        order = []
+
+        def record(path, _size, _gen, _prio):
+            order.append(path)
+
+        try:
+            scheduler.submit(record, "/prev1", (800, 600), 1, priority=2)
+            scheduler.submit(record, "/next2", (800, 600), 1, priority=2)
+            scheduler.submit(record, "/next1", (800, 600), 1, priority=1)
+            gate.set()
+            _wait_idle(scheduler)
+            assert order == ["/next1", "/prev1", "/next2"]
+        finally:
+            scheduler.shutdown(wait=True)
+
+    def test_deduplicates_and_promotes(self):
+        """同键重复提交只执行一次，并取更高优先级"""
+        scheduler, gate = _blocked_scheduler()
+        order = []
+
+        def record(path, _size, _gen, prio):
+            order.append((path, prio))
+
+        try:
+            scheduler.submit(record, "/a", (800, 600), 1, priority=2)
+            scheduler.submit(record, "/b", (800, 600), 1, priority=1)
+            assert scheduler.submit(record, "/a", (800, 600), 1, priority=0) is True
+            # 目标尺寸不同视为不同任务
+            scheduler.submit(record, "/a", (400, 300), 1, priority=3)
+            assert scheduler.pending_count() == 3
+            gate.set()
+            _wait_idle(scheduler)
+            assert order == [("/a", 0), ("/b", 1), ("/a", 3)]
+            assert scheduler.get_stats()["deduplicated"] == 1
+        finally:
+            scheduler.shutdown(wait=True)
+
+    def test_advance_generation_drops_stale(self):
+        """代次推进时过期排队任务直接出队，过期提交被拒绝"""
+        scheduler, gate = _blocked_scheduler()
+        ran = []
+
+        def record(path, _size, _gen, _prio):
+            ran.append(path)
+
+        try:
+            scheduler.submit(record, "/old1", None, 1)
+            scheduler.submit(record, "/old2", None, 1)
+            assert scheduler.advance_generation(2) == 2
+            assert scheduler.submit(record, "/late", None, 1) is False
+            scheduler.submit(record, "/new", None, 2)
+            gate.set()
+            _wait_idle(scheduler)
+            assert ran == ["/new"]
+            assert scheduler.get_stats()["dropped_stale"] == 3
+        finally:
+            scheduler.shutdown(wait=True)
+
+    def test_generation_budget(self):
+        """单代预估内存超预算的提交被拒绝，新代次重置预算"""
+        scheduler, gate = _blocked_scheduler(generation_budget_mb=100)
+        try:
+            noop = lambda *_a: None  # noqa: E731
+            assert scheduler.submit(noop, "/a", None, 1, estimated_mb=60) is True
+            assert scheduler.submit(noop, "/b", None, 1, estimated_mb=60) is False
+            assert scheduler.get_stats()["rejected_budget"] == 1
+            assert scheduler.submit(noop, "/b", None, 2, estimated_mb=60) is True
+        finally:
+            gate.set()
+            scheduler.shutdown(wait=True)
+
+    def test_overflow_drops_lowest_priority(self):
+        """队列超限时丢弃优先级最低的排队任务"""
+        scheduler, gate = _blocked_scheduler(max_queued=2)
+        try:
+            noop = lambda *_a: None  # noqa: E731
+            scheduler.submit(noop, "/p1", None, 1, priority=1)
+            scheduler.submit(noop, "/p3", None, 1, priority=3)
+            scheduler.submit(noop, "/p2", None, 1, priority=2)
+            assert scheduler.pending_count() == 2
+            # 新任务本身最低优先级时被挤出
+            assert scheduler.submit(noop, "/p9", None, 1, priority=9) is False
+            assert scheduler.get_stats()["dropped_overflow"] == 2
+        finally:
+            gate.set()
+            scheduler.shutdown(wait=True)
+
+    def test_shutdown_clears_pending(self):
+        """shutdown 清空排队任务并拒绝新提交"""
+        scheduler, gate = _blocked_scheduler()
+        ran = []
+        scheduler.submit(lambda p, *_a: ran.append(p), "/x", None, 1)
+        scheduler.shutdown()
+        gate.set()
+        assert scheduler.pending_count() == 0
+        assert scheduler.submit(lambda *_a: None, "/y", None, 1) is False
+        time.sleep(0.05)
+        assert ran == []
@@ -0,0 +1,264 @@
+"""
+测试 core/range_cache.py
+
+覆盖：
+- RangeIndex 合并与缺失区间计算
+- 按块对齐补取、命中不再读远程、文件对象语义（seek/read/BufferedReader）
+- 远程文件变更 (mtime/size) 后区间作废；索引跨实例持久化
+- 字节预算淘汰（打开中的条目不淘汰）；并发读取同一区间只补取一次
+- extract_embedded_preview 对远程文件只读取头部与预览区间
+"""
+
+import io
+import os
+import struct
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from plookingII.core import range_cache, remote_fetch
+from plookingII.core.range_cache import RangeCache, RangeIndex
+
+
+@pytest.fixture(autouse=True)
+def fresh_coordinator():
+    remote_fetch.reset_fetch_coordinator()
+    yield
+    remote_fetch.reset_fetch_coordinator()
+
+
+@pytest.fixture
+def remote_file(tmp_path):
+    data = os.urandom(300_000)
+    path = tmp_path / "share" / "IMG_0001.JPG"
+    path.parent.mkdir()
+    path.write_bytes(data)
+    return str(path), data
+
+
+def make_cache(tmp_path, max_bytes=10 * 1024 * 1024, block_size=4096):
+    return RangeCache(str(tmp_path / "rc"), max_bytes, block_size)
+
+
+class TestRangeIndex:
+    def test_add_merges_overlapping_and_adjacent(self):
+        index = RangeIndex()
+        index.add(10, 20)
+        index.add(30, 40)
+        assert index.to_list() == [(10, 20), (30, 40)]
+        index.add(20, 25)
+        assert index.to_list() == [(10, 25), (30, 40)]
+        index.add(5, 35)
+        assert index.to_list() == [(5, 40)]
+        index.add(50, 50)
+        assert index.total == 35
+        assert len(index) == 1
+
+    def test_missing(self):
+        index = RangeIndex([(10, 20), (30, 40)])
+        assert index.missing(0, 50) == [(0, 10), (20, 30), (40, 50)]
+        assert index.missing(12, 18) == []
+        assert index.missing(15, 35) == [(20, 30)]
+        assert index.covers(30, 40)
+        assert not index.covers(30, 41)
+        assert RangeIndex().missing(3, 7) == [(3, 7)]
+
+
+class TestRangeCache:
+    def test_reads_fetch_aligned_blocks_then_hit(self, tmp_path, remote_file):
+        path, data = remote_file
+        cache = make_cache(tmp_path)
+
+        assert cache.read(path, 100, 50) == data[100:150]
+        assert cache.cached_ranges(path) == [(0, 4096)]
+        assert cache.read(path, 5000, 10_000) == data[5000:15_000]
+        assert cache.cached_ranges(path) == [(0, 16_384)]
+
+        fetched = cache.get_stats()["fetched_bytes"]
+        assert cache.read(path, 0, 16_384) == data[:16_384]
+        stats = cache.get_stats()
+        assert stats["fetched_bytes"] == fetched
+        assert stats["hits"] == 1
+        # 尾部不足一块时裁到文件末尾
+        assert cache.read(path, len(data) - 10, 100) == data[-10:]
+        assert cache.cached_ranges(path)[-1][1] == len(data)
+
+    def test_reader_is_file_like(self, tmp_path, remote_file):
+        path, data = remote_file
+        cache = make_cache(tmp_path)
+        with cache.open(path) as reader:
+            assert reader.size == len(data)
+            assert reader.seekable()
+            reader.seek(-100, io.SEEK_END)
+            assert reader.read() == data[-100:]
+            reader.seek(1000)
+            buffered = io.BufferedReader(reader, buffer_size=8192)
+            assert buffered.read(20_000) == data[1000:21_000]
+            assert reader.pread(0, 10) == data[:10]
+        with pytest.raises(ValueError, match="closed"):
+            reader.read(1)
+
+    def test_remote_change_invalidates_ranges(self, tmp_path, remote_file):
+        path, data = remote_file
+        cache = make_cache(tmp_path)
+        cache.read(path, 0, 100)
+
+        new_data = os.urandom(200_000)
+        with open(path, "wb") as f:
+            f.write(new_data)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        assert cache.read(path, 0, 100) == new_data[:100]
+        assert cache.get_stats()["invalidations"] == 1
+        assert cache.cached_ranges(path) == [(0, 4096)]
+
+    def test_stale_reader_does_not_touch_new_version(self, tmp_path, remote_file):
+        """远程变更后新旧条目各用各的稀疏文件；旧视图不再补取新版本的字节"""
+        path, data = remote_file
+        cache = make_cache(tmp_path)
+        old_reader = cache.open(path)
+        assert old_reader.pread(0, 100) == data[:100]
+
+        new_data = os.urandom(200_000)
+        with open(path, "wb") as f:
+            f.write(new_data)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        assert cache.read(path, 0, 100) == new_data[:100]
+        new_entry = cache._entries[path]
+        # 旧视图：已缓存区间照常读取，缺失区间因远程已变更而失败
+        assert old_reader.pread(0, 100) == data[:100]
+        with pytest.raises(OSError, match="changed"):
+            old_reader.pread(250_000, 100)
+        assert os.path.getsize(new_entry.data_path) == 200_000
+        assert cache.read(path, 150_000, 100) == new_data[150_000:150_100]
+
+        old_data_path = old_reader._entry.data_path
+        assert old_data_path != new_entry.data_path
+        assert os.path.exists(old_data_path)
+        old_reader.close()
+        assert not os.path.exists(old_data_path)
+
+    def test_clear_defers_open_readers(self, tmp_path, remote_file):
+        """清空时打开中的视图继续可读，关闭后删除其文件"""
+        path, data = remote_file
+        cache = make_cache(tmp_path)
+        with cache.open(path) as reader:
+            reader.pread(0, 100)
+            cache.clear()
+            assert cache.get_stats()["cached_bytes"] == 0
+            assert reader.pread(0, 5000) == data[:5000]
+            data_path = reader._entry.data_path
+            assert os.path.exists(data_path)
+        assert not os.path.exists(data_path)
+        assert cache.cached_ranges(path) == []
+
+    def test_index_persists_across_instances(self, tmp_path, remote_file):
+        path, data = remote_file
+        make_cache(tmp_path).read(path, 0, 10_000)
+
+        cache = make_cache(tmp_path)
+        assert cache.cached_ranges(path) == [(0, 12_288)]
+        assert cache.read(path, 0, 10_000) == data[:10_000]
+        assert cache.get_stats()["fetched_bytes"] == 0
+
+    def test_budget_evicts_least_recently_used(self, tmp_path):
+        paths = []
+        for name in ("a", "b", "c"):
+            p = tmp_path / f"{name}.jpg"
+            p.write_bytes(os.urandom(20_000))
+            paths.append(str(p))
+        cache = make_cache(tmp_path, max_bytes=40_000)
+
+        with cache.open(paths[0]) as pinned:
+            pinned.pread(0, 20_000)
+            cache.read(paths[1], 0, 20_000)
+            cache.read(paths[2], 0, 20_000)
+            # a 打开中不淘汰，淘汰 b
+            assert cache.cached_ranges(paths[0])
+            assert not cache.cached_ranges(paths[1])
+        assert cache.get_stats()["cached_bytes"] <= 40_000
+        st = os.stat(paths[1])
+        assert not os.path.exists(cache._file_stem(paths[1], st.st_mtime_ns, st.st_size) + ".ranges")
+
+    def test_concurrent_readers_fetch_once(self, tmp_path, remote_file):
+        path, data = remote_file
+        cache = make_cache(tmp_path, block_size=64 * 1024)
+        fills = []
+        real_fill = cache._fill
+
+        def slow_fill(entry, start, end):
+            fills.append((start, end))
+            time.sleep(0.05)
+            return real_fill(entry, start, end)
+
+        results = []
+        with patch.object(cache, "_fill", side_effect=slow_fill):
+            threads = [threading.Thread(target=lambda: results.append(cache.read(path, 0, 1000))) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+        assert results == [data[:1000]] * 5
+        assert fills == [(0, 65_536)]
+
+    def test_missing_remote_raises(self, tmp_path):
+        cache = make_cache(tmp_path)
+        with pytest.raises(FileNotFoundError, match=r"gone\.jpg"):
+            cache.read(str(tmp_path / "gone.jpg"), 0, 10)
+
+    def test_open_remote_reader_skips_local(self, tmp_path, remote_file):
+        path, _ = remote_file
+        cache = make_cache(tmp_path)
+        cache._remote_devices[os.stat(path).st_dev] = False
+        with patch.object(range_cache, "get_range_cache", return_value=cache):
+            assert range_cache.open_remote_reader(path) is None
+            assert range_cache.open_remote_reader(str(tmp_path / "missing.jpg")) is None
+
+
+def _segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _jpeg_with_preview(total_size: int, preview_at: int, preview: bytes) -> bytes:
+    """构造 MPF Index 1 指向 preview_at 处预览的 JPEG（其余以填充补足 total_size）"""
+
+    def build(rel_offset: int) -> bytes:
+        tiff = b"MM" + struct.pack(">HI", 42, 8) + struct.pack(">H", 2)
+        tiff += struct.pack(">HHII", 0xB001, 4, 1, 2)
+        tiff += struct.pack(">HHII", 0xB002, 7, 32, 8 + 2 + 2 * 12 + 4)
+        tiff += struct.pack(">I", 0)
+        tiff += struct.pack(">IIIHH", 0, total_size, 0, 0, 0)
+        tiff += struct.pack(">IIIHH", 0, len(preview), rel_offset, 0, 0)
+        sof = _segment(0xC0, struct.pack(">BHHB", 8, 4000, 6000, 3) + b"\x01\x11\x00" * 3)
+        return b"\xff\xd8" + _segment(0xE2, b"MPF\x00" + tiff) + sof + b"\xff\xda\x00\x02"
+
+    head = build(0)
+    mpf_tiff_start = head.index(b"MPF\x00") + 4
+    head = build(preview_at - mpf_tiff_start)
+    body = head + b"\x00" * (preview_at - len(head)) + preview
+    return body + b"\x00" * (total_size - len(body))
+
+
+class TestRemotePreviewExtraction:
+    def test_extract_embedded_preview_reads_only_needed_ranges(self, tmp_path):
+        from plookingII.core.loading import helpers
+
+        preview = os.urandom(300_000)
+        src = tmp_path / "DSC_0001.JPG"
+        src.write_bytes(_jpeg_with_preview(8 * 1024 * 1024, 5 * 1024 * 1024, preview))
+        cache = make_cache(tmp_path, block_size=64 * 1024)
+        cache._remote_devices[os.stat(src).st_dev] = True
+
+        with (
+            patch.object(range_cache, "get_range_cache", return_value=cache),
+            patch.object(helpers, "_decode_preview_data", side_effect=lambda data: data),
+        ):
+            assert helpers.extract_embedded_preview(str(src)) == preview
+            fetched = cache.get_stats()["fetched_bytes"]
+            assert fetched < 512 * 1024
+            # 再次提取完全命中本地稀疏文件
+            assert helpers.extract_embedded_preview(str(src)) == preview
+            assert cache.get_stats()["fetched_bytes"] == fetched
@@ -0,0 +1,104 @@
+"""
+测试 core/read_ahead_arena.py
+
+覆盖 ReadAheadArena：
+- put / load_file 读回一致，视图只读，文件对象读取
+- 按字节 LRU 淘汰，钉住的缓冲不淘汰，容量不足时拒绝
+- 替换 / 清空被钉住的缓冲延后到 release 释放 slab
+- 连续 slab 分配在碎片化后通过淘汰腾出空间
+"""
+
+import mmap
+import os
+
+import pytest
+
+from plookingII.core.read_ahead_arena import ReadAheadArena
+
+PAGE = mmap.PAGESIZE
+
+
+@pytest.fixture
+def arena():
+    return ReadAheadArena(4 * PAGE, slab_bytes=PAGE)
+
+
+class TestReadAheadArena:
+    def test_put_and_acquire_roundtrip(self, arena):
+        data = os.urandom(PAGE + 100)
+        assert arena.put("a", data)
+        assert "a" in arena
+        assert len(arena) == 1
+        with arena.acquire("a") as buf:
+            assert len(buf) == len(data)
+            assert buf.view.readonly
+            assert bytes(buf.view) == data
+            assert buf.open().read() == data
+            with pytest.raises(TypeError):
+                buf.view[0] = 0
+        assert arena.acquire("missing") is None
+        stats = arena.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["used_bytes"] == 2 * PAGE
+        assert stats["free_slabs"] == 2
+
+    def test_load_file_reads_directly_into_arena(self, arena, tmp_path):
+        data = os.urandom(2 * PAGE + 7)
+        src = tmp_path / "img.jpg"
+        src.write_bytes(data)
+        assert arena.load_file("full", str(src))
+        assert arena.load_file("prefix", str(src), size=10)
+        with arena.acquire("full") as full, arena.acquire("prefix") as prefix:
+            assert full.tobytes() == data
+            assert prefix.tobytes() == data[:10]
+
+    def test_lru_eviction_by_bytes(self, arena):
+        for key in ("a", "b", "c", "d"):
+            assert arena.put(key, b"x" * PAGE)
+        arena.acquire("a").release()  # a 变为最近使用
+        assert arena.put("e", b"y" * (2 * PAGE))
+        assert "a" in arena
+        assert "e" in arena
+        assert "b" not in arena
+        assert "c" not in arena
+        assert arena.get_stats()["evictions"] == 2
+
+    def test_pinned_buffers_are_not_evicted(self, arena):
+        arena.put("a", b"x" * (3 * PAGE))
+        buf = arena.acquire("a")
+        assert not arena.put("b", b"y" * (2 * PAGE))
+        assert arena.get_stats()["rejected"] == 1
+        assert bytes(buf.view[:1]) == b"x"
+        buf.release()
+        assert arena.put("b", b"y" * (2 * PAGE))
+        assert "a" not in arena
+
+    def test_oversized_rejected(self, arena):
+        assert not arena.put("big", b"z" * (4 * PAGE + 1))
+        assert len(arena) == 0
+
+    def test_replace_and_clear_defer_free_until_release(self, arena):
+        arena.put("a", b"old" * 10)
+        buf = arena.acquire("a")
+        arena.put("a", b"new" * 10)
+        arena.clear()
+        assert len(arena) == 0
+        # 旧缓冲仍被钉住：其 slab 未释放，内容不变
+        assert arena.get_stats()["free_slabs"] == 3
+        assert bytes(buf.view) == b"old" * 10
+        buf.release()
+        buf.release()  # 重复 release 无副作用
+        assert arena.get_stats()["free_slabs"] == 4
+
+    def test_fragmented_arena_evicts_for_contiguous_run(self, arena):
+        for key in ("a", "b", "c", "d"):
+            arena.put(key, b"x" * PAGE)
+        arena.discard("b")
+        arena.discard("d")
+        # 两个空闲 slab 不连续：淘汰最旧的 a 后 [0,1] 连续
+        assert arena.put("e", b"e" * (2 * PAGE))
+        assert "a" not in arena
+        assert "c" in arena
+        with arena.acquire("e") as buf:
+            assert buf.tobytes() == b"e" * (2 * PAGE)
@@ -0,0 +1,340 @@
+"""
+测试 core/remote_fetch.py
+
+覆盖 FetchCoordinator：
+- 同键并发读取只执行一次，异常传给所有调用方
+- 前台读取越过排队中的后台读取；前台加入时提升排队中的后台读取
+- 后台读取为前台保留线程
+- 工作线程内嵌套读取（新键或排队中的同键）内联执行
+- NetworkCache / SMBOptimizer 并发调用只读取一次远程文件；缓存填充、直读与预读
+  同一文件共用一次读取
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from plookingII.core import remote_fetch
+from plookingII.core.network_cache import NetworkCache
+from plookingII.core.remote_fetch import FETCH_BACKGROUND, FETCH_FOREGROUND, FetchCoordinator
+
+
+def make_cache(tmp_path):
+    """构造隔离到临时目录的 NetworkCache 实例"""
+    with (
+        patch("plookingII.core.network_cache.get_enhanced_logger", return_value=MagicMock()),
+        patch("plookingII.core.network_cache.get_remote_detector", return_value=MagicMock()),
+        patch("plookingII.core.network_cache.get_config", side_effect=lambda key, default=None: default),
+        patch.object(NetworkCache, "_get_cache_directory", lambda self: str(tmp_path)),
+    ):
+        return NetworkCache()
+
+
+@pytest.fixture
+def coordinator():
+    c = FetchCoordinator(max_workers=2)
+    yield c
+    c.shutdown(wait=True)
+
+
+@pytest.fixture
+def global_coordinator():
+    remote_fetch.reset_fetch_coordinator()
+    yield remote_fetch.get_fetch_coordinator()
+    remote_fetch.reset_fetch_coordinator()
+
+
+def _blocker():
+    """返回 (读取函数, 放行事件, 已开始事件)"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        return "blocked"
+
+    return fn, release, started
+
+
+class TestFetchCoordinator:
+    def test_concurrent_same_key_runs_once(self, coordinator):
+        calls = []
+        release = threading.Event()
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return b"data"
+
+        futures = [coordinator.submit("/smb/a.jpg", fn, FETCH_FOREGROUND) for _ in range(5)]
+        release.set()
+        assert [f.result(5) for f in futures] == [b"data"] * 5
+        assert len(calls) == 1
+        assert len({id(f) for f in futures}) == 1
+        stats = coordinator.get_stats()
+        assert stats["joined"] == 4
+        assert stats["inflight"] == 0
+
+        # 完成即出表：之后的读取重新执行
+        assert coordinator.fetch("/smb/a.jpg", fn) == b"data"
+        assert len(calls) == 2
+
+    def test_error_propagates_to_all_callers(self, coordinator):
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise OSError("share offline")
+
+        futures = [coordinator.submit("k", fn) for _ in range(3)]
+        release.set()
+        for f in futures:
+            with pytest.raises(OSError, match="share offline"):
+                f.result(5)
+        assert coordinator.get_stats()["failed"] == 1
+
+    def test_foreground_overtakes_queued_background(self):
+        c = FetchCoordinator(max_workers=1)
+        try:
+            block, release, started = _blocker()
+            c.submit("busy", block, FETCH_FOREGROUND)
+            assert started.wait(5)
+
+            order = []
+            c.submit("bg1", lambda: order.append("bg1"), FETCH_BACKGROUND)
+            c.submit("bg2", lambda: order.append("bg2"), FETCH_BACKGROUND)
+            fg = c.submit("fg", lambda: order.append("fg"), FETCH_FOREGROUND)
+            release.set()
+            fg.result(5)
+            c.fetch("bg2", lambda: None, FETCH_BACKGROUND, timeout=5)
+            deadline = time.monotonic() + 5
+            while len(order) < 3 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            assert order == ["fg", "bg1", "bg2"]
+        finally:
+            c.shutdown(wait=True)
+
+    def test_foreground_join_promotes_queued_background(self):
+        c = FetchCoordinator(max_workers=1)
+        try:
+            block, release, started = _blocker()
+            c.submit("busy", block, FETCH_FOREGROUND)
+            assert started.wait(5)
+
+            order = []
+            c.submit("bg1", lambda: order.append("bg1"), FETCH_BACKGROUND)
+            late = c.submit("bg2", lambda: order.append("bg2"), FETCH_BACKGROUND)
+            joined = c.submit("bg2", lambda: order.append("dup"), FETCH_FOREGROUND)
+            assert joined is late
+            release.set()
+            late.result(5)
+            deadline = time.monotonic() + 5
+            while len(order) < 2 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            assert order == ["bg2", "bg1"]
+            assert c.get_stats()["promoted"] == 1
+        finally:
+            c.shutdown(wait=True)
+
+    def test_background_leaves_a_worker_for_foreground(self, coordinator):
+        block, release, started = _blocker()
+        coordinator.submit("bg-busy", block, FETCH_BACKGROUND)
+        assert started.wait(5)
+        # 第二个后台读取排队，不占用保留线程
+        bg = coordinator.submit("bg-next", lambda: "bg", FETCH_BACKGROUND)
+        assert coordinator.fetch("fg", lambda: "fg", FETCH_FOREGROUND, timeout=5) == "fg"
+        assert not bg.done()
+        release.set()
+        assert bg.result(5) == "bg"
+
+    def test_nested_fetch_in_worker_runs_inline(self):
+        c = FetchCoordinator(max_workers=1)
+        try:
+            result = c.fetch("outer", lambda: c.fetch("inner", lambda: "inner-data"), timeout=5)
+            assert result == "inner-data"
+            assert c.get_stats()["inline"] == 1
+        finally:
+            c.shutdown(wait=True)
+
+    def test_nested_fetch_of_queued_key_runs_inline(self):
+        """工作线程加入仍在排队的同键读取：取出内联执行，不占住唯一线程等待"""
+        c = FetchCoordinator(max_workers=1)
+        try:
+            queued = threading.Event()
+
+            def outer():
+                queued.wait(5)
+                return c.fetch("shared", lambda: "never", timeout=5)
+
+            outer_future = c.submit("outer", outer, FETCH_FOREGROUND)
+            shared = c.submit("shared", lambda: "shared-data", FETCH_BACKGROUND)
+            queued.set()
+            assert outer_future.result(10) == "shared-data"
+            assert shared.result(5) == "shared-data"
+            stats = c.get_stats()
+            assert stats["inline"] == 1
+            assert stats["queued"] == 0
+        finally:
+            c.shutdown(wait=True)
+
+    def test_shutdown_cancels_queued(self):
+        c = FetchCoordinator(max_workers=1)
+        block, release, started = _blocker()
+        c.submit("busy", block, FETCH_FOREGROUND)
+        assert started.wait(5)
+        queued = c.submit("queued", lambda: "never", FETCH_BACKGROUND)
+        c.shutdown()
+        release.set()
+        assert queued.cancelled()
+        assert not c.is_inflight("queued")
+        with pytest.raises(RuntimeError):
+            c.fetch("after", lambda: None)
+
+
+class TestReadThroughCallers:
+    def test_network_cache_concurrent_callers_fill_once(self, tmp_path, global_coordinator):
+        cache = make_cache(tmp_path / "nc")
+        src = tmp_path / "remote.jpg"
+        src.write_bytes(b"x" * 50_000)
+        cache.remote_detector.is_remote_path.return_value = True
+
+        fills = []
+        real_fill = cache._fill_to_cache
+
+        def slow_fill(*args, **kwargs):
+            fills.append(1)
+            time.sleep(0.05)
+            return real_fill(*args, **kwargs)
+
+        results = []
+        with patch.object(cache, "_fill_to_cache", side_effect=slow_fill):
+            threads = [
+                threading.Thread(target=lambda: results.append(cache.cache_remote_file(str(src)))) for _ in range(6)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+
+        assert len(fills) == 1
+        assert len(results) == 6
+        assert len(set(results)) == 1
+        assert results[0]
+        assert cache.stats["total_cached_files"] == 1
+
+    def test_smb_preload_concurrent_callers_read_once(self, tmp_path, global_coordinator):
+        from plookingII.core.smb_optimizer import SMBOptimizer
+
+        with patch("plookingII.core.smb_optimizer.get_remote_detector"):
+            optimizer = SMBOptimizer()
+        src = tmp_path / "data.bin"
+        src.write_bytes(b"0123456789")
+        reads = []
+        real_open = open
+
+        def counting_open(path, *args, **kwargs):
+            if str(path) == str(src):
+                reads.append(1)
+                time.sleep(0.05)
+            return real_open(path, *args, **kwargs)
+
+        results = []
+        try:
+            with (
+                patch.object(optimizer, "_is_smb_path", return_value=True),
+                patch("builtins.open", side_effect=counting_open),
+            ):
+                threads = [
+                    threading.Thread(target=lambda: results.append(optimizer.preload_file_data(str(src))))
+                    for _ in range(4)
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join(5)
+        finally:
+            optimizer.shutdown()
+
+        assert results == [True] * 4
+        assert len(reads) == 1
+
+    def test_fill_direct_read_and_preload_share_one_remote_read(self, tmp_path, global_coordinator):
+        """缓存填充、直读与整文件预读同一文件：按远程路径去重，网络只读一遍"""
+        from plookingII.core.remote_file_manager import RemoteFileManager
+        from plookingII.core.smb_optimizer import SMBOptimizer
+
+        cache = make_cache(tmp_path / "nc")
+        cache.remote_detector.is_remote_path.return_value = True
+        manager = RemoteFileManager.__new__(RemoteFileManager)
+        manager.network_cache = cache
+        with patch("plookingII.core.smb_optimizer.get_remote_detector"):
+            optimizer = SMBOptimizer()
+        data = b"remote bytes" * 1000
+        src = tmp_path / "remote.jpg"
+        src.write_bytes(data)
+        reads = []
+        real_open = open
+
+        def counting_open(path, *args, **kwargs):
+            if str(path) == str(src):
+                reads.append(1)
+                time.sleep(0.2)
+            return real_open(path, *args, **kwargs)
+
+        results = {}
+        callers = {
+            "cache": lambda: cache.cache_remote_file(str(src)),
+            "direct": lambda: manager._load_directly(str(src), MagicMock(), time.perf_counter()),
+            "preload": lambda: optimizer.preload_file_data(str(src)),
+        }
+        try:
+            with (
+                patch.object(optimizer, "_is_smb_path", return_value=True),
+                patch("builtins.open", side_effect=counting_open),
+            ):
+                threads = [
+                    threading.Thread(target=lambda name=name, fn=fn: results.__setitem__(name, fn()))
+                    for name, fn in callers.items()
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join(10)
+            assert optimizer.get_cached_file_data(str(src)) == data
+        finally:
+            optimizer.shutdown()
+
+        assert len(reads) == 1
+        with open(results["cache"], "rb") as f:
+            assert f.read() == data
+        assert results["direct"].data == data
+        assert results["preload"] is True
+
+    def test_cache_fill_stores_bytes_from_joined_direct_read(self, tmp_path, global_coordinator):
+        """缓存填充加入进行中的直读：用其内容写入缓存，不再打开远程文件"""
+        cache = make_cache(tmp_path / "nc")
+        cache.remote_detector.is_remote_path.return_value = True
+        src = tmp_path / "remote.jpg"
+        src.write_bytes(b"stale on share")
+        release = threading.Event()
+
+        def direct_read():
+            release.wait(5)
+            return b"from direct read"
+
+        global_coordinator.submit(remote_fetch.remote_file_key(str(src)), direct_read, FETCH_FOREGROUND)
+        results = []
+        t = threading.Thread(target=lambda: results.append(cache.cache_remote_file(str(src))))
+        t.start()
+        deadline = time.monotonic() + 5
+        while global_coordinator.get_stats()["joined"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        release.set()
+        t.join(5)
+
+        with open(results[0], "rb") as f:
+            assert f.read() == b"from direct read"
+        assert cache.stats["total_cached_files"] == 1
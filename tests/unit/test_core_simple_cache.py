@@ -8,20 +8,83 @@
 - LRU淘汰策略
 - 内存管理
 - 线程安全
+- 分片锁、增量统计与 NSCache 后台对账
+- 多分辨率档位：最佳可用查找、独立淘汰、由大档位派生小渲染
+- 引用计数固定（pin）：计入预算、不被淘汰、按持有者优先级强制解除
 """
 
 import threading
 import time
 from unittest.mock import patch
 
+from plookingII.core import simple_cache
+from plookingII.core.cache_policy import POLICY_TINYLFU
 from plookingII.core.simple_cache import (
+    PIN_OWNER_CURRENT,
+    PIN_OWNER_NEIGHBOR,
+    PIN_OWNER_ZOOM,
+    PIN_PRIORITIES,
     CacheEntry,
     SimpleImageCache,
+    _ReconcileSweeper,
     get_global_cache,
+    quantize_target_size,
     reset_global_cache,
 )
 
 
+class _FakeNSCache:
+    """字典实现的 NSCache 替身：记录探测次数，可模拟系统自动驱逐"""
+
+    def __init__(self):
+        self.objects = {}
+        self.probes = 0
+
+    def init(self):
+        return self
+
+    def setCountLimit_(self, limit):
+        pass
+
+    def setTotalCostLimit_(self, limit):
+        pass
+
+    def objectForKey_(self, key):
+        self.probes += 1
+        return self.objects.get(key)
+
+    def setObject_forKey_cost_(self, value, key, cost):
+        self.objects[key] = value
+
+    def removeObjectForKey_(self, key):
+        self.objects.pop(key, None)
+
+    def removeAllObjects(self):
+        self.objects.clear()
+
+
+class _FakeImage:
+    """带像素尺寸的图像替身（PIL 风格 size 属性）"""
+
+    def __init__(self, width, height):
+        self.size = (width, height)
+
+    def resize(self, size, resample=None, reducing_gap=None):
+        return _FakeImage(*size)
+
+
+def _nscache_backed(**kwargs):
+    """构造使用 NSCache 替身的缓存（不启动后台对账线程）"""
+    fake = _FakeNSCache()
+    foundation = type("Foundation", (), {"NSCache": type("NSCache", (), {"alloc": staticmethod(lambda: fake)})})
+    with (
+        patch.object(simple_cache, "Foundation", foundation),
+        patch.object(simple_cache._reconcile_sweeper, "register"),
+    ):
+        cache = SimpleImageCache(use_nscache=True, **kwargs)
+    return cache, fake
+
+
 class TestCacheEntry:
     """测试CacheEntry数据类"""
 
@@ -336,6 +399,293 @@ class TestSimpleImageCacheEvictOldest:
         assert cache.get("key3") is None
 
 
+class TestShardedCache:
+    """测试分片缓存：跨分片精确 LRU、增量统计与 NSCache 对账"""
+
+    def test_lru_exact_across_shards(self):
+        """键分布在不同分片时仍按全局访问顺序淘汰"""
+        cache = SimpleImageCache(max_items=4, shards=8, use_nscache=False)
+        keys = [f"img{i}.jpg" for i in range(4)]
+        for k in keys:
+            cache.put(k, k)
+        cache.get(keys[0])
+        cache.get(keys[2])
+
+        cache.put("new1.jpg", "n")
+        cache.put("new2.jpg", "n")
+
+        assert keys[1] not in cache
+        assert keys[3] not in cache
+        assert all(k in cache for k in (keys[0], keys[2], "new1.jpg", "new2.jpg"))
+        assert cache.get_stats()["shards"] == 8
+
+    def test_concurrent_puts_keep_counters_consistent(self):
+        """多线程写入后条目数与内存记账与实际条目一致，不过度淘汰"""
+        cache = SimpleImageCache(max_items=50, max_memory_mb=10_000.0, use_nscache=False)
+
+        def writer(t):
+            for i in range(300):
+                cache.put(f"t{t}-{i}", i, size_mb=2.0)
+                cache.get(f"t{t}-{i // 2}")
+
+        threads = [threading.Thread(target=writer, args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = cache.get_stats()
+        assert stats["size"] == 50
+        assert stats["memory_mb"] == 100.0
+        assert stats["evictions"] == 8 * 300 - 50
+        assert stats["hits"] + stats["misses"] == 8 * 300
+
+    def test_stats_do_not_probe_nscache(self):
+        """get_stats/repr 不探测 NSCache；对账修正自动驱逐造成的漂移"""
+        cache, fake = _nscache_backed(max_items=10)
+        for k in ("a", "b", "c"):
+            cache.put(k, k, size_mb=4.0)
+        del fake.objects["b"]  # 模拟系统内存压力下的自动驱逐
+        fake.probes = 0
+
+        assert cache.get_stats()["size"] == 3
+        repr(cache)
+        assert fake.probes == 0
+
+        assert cache.reconcile() == 1
+        stats = cache.get_stats()
+        assert stats["size"] == 2
+        assert stats["memory_mb"] == 8.0
+        assert stats["evictions"] == 1
+
+    def test_nscache_miss_drops_stale_entry(self):
+        """NSCache 已驱逐的键在 get 未命中时顺带修正记账"""
+        cache, fake = _nscache_backed()
+        cache.put("a", "va", size_mb=3.0)
+        fake.objects.clear()
+
+        assert cache.get("a") is None
+        assert "a" not in cache
+        assert cache.get_current_memory_mb() == 0.0
+
+    def test_background_sweeper_reconciles(self):
+        """后台扫描线程定期对账已注册的缓存"""
+        cache, fake = _nscache_backed()
+        cache.put("a", "va")
+        cache.put("b", "vb")
+        del fake.objects["a"]
+
+        sweeper = _ReconcileSweeper(interval_s=0.01)
+        sweeper.register(cache)
+        deadline = time.time() + 2.0
+        while len(cache) != 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(cache) == 1
+        assert "b" in cache
+
+
+class TestResolutionTiers:
+    """测试多分辨率档位：最佳可用查找、近似档位去重与独立淘汰"""
+
+    def test_best_available_lookup(self):
+        """返回不小于请求尺寸的最小档位；都不够大时返回最大较小档位作为占位"""
+        cache = SimpleImageCache(max_items=10, use_nscache=False)
+        small, mid, full = _FakeImage(400, 300), _FakeImage(1600, 1200), _FakeImage(6000, 4000)
+        for img in (small, mid, full):
+            cache.put("a.jpg", img)
+
+        hit = cache.get_best("a.jpg", (1200, 800))
+        assert hit.value is mid
+        assert hit.tier == 1600
+        assert hit.satisfied
+        assert cache.get_best("a.jpg", (5000, 5000)).value is full
+        assert cache.get_best("a.jpg").value is full
+        assert cache.get("a.jpg", target_size=(300, 300)) is small
+
+        cache.remove("a.jpg")
+        cache.put("a.jpg", small)
+        hit = cache.get_best("a.jpg", (1600, 1200))
+        assert hit.value is small
+        assert not hit.satisfied
+        assert not cache.contains_tier("a.jpg", (1600, 1200))
+        assert cache.contains_tier("a.jpg", (400, 400))
+
+    def test_tiers_stored_independently(self):
+        """不同档位互不覆盖；近似档位被替换；remove 移除全部档位"""
+        cache = SimpleImageCache(max_items=10, use_nscache=False)
+        cache.put("a.jpg", _FakeImage(800, 600), size_mb=1.0)
+        cache.put("a.jpg", _FakeImage(3000, 2000), size_mb=8.0)
+        replacement = _FakeImage(3100, 2000)
+        cache.put("a.jpg", replacement, size_mb=8.5)
+        cache.put("b.jpg", "not an image")
+
+        stats = cache.get_stats()
+        assert stats["size"] == 3
+        assert stats["paths"] == 2
+        assert stats["memory_mb"] == 10.5
+        assert cache.get_best("a.jpg").value is replacement
+        assert cache.get_best("b.jpg").tier == 0
+
+        assert cache.remove("a.jpg") is True
+        assert "a.jpg" not in cache
+        assert len(cache) == 1
+
+    def test_reduced_tiers_outlive_full_resolution(self):
+        """淘汰时降采样档位享有宽限：先释放更旧或同龄的全分辨率档位"""
+        cache = SimpleImageCache(max_items=3, use_nscache=False)
+        cache.put("a.jpg", _FakeImage(800, 600), full_resolution=False)
+        cache.put("a.jpg", _FakeImage(6000, 4000), full_resolution=True)
+        cache.put("b.jpg", _FakeImage(6000, 4000), full_resolution=True)
+        cache.put("c.jpg", _FakeImage(6000, 4000), full_resolution=True)
+
+        assert cache.get_best("a.jpg").tier == 800
+        assert cache.get_stats()["reduced_tiers"] == 1
+        assert "b.jpg" in cache
+        assert "c.jpg" in cache
+
+    def test_quantize_target_size(self):
+        """长边向上取档位并保持宽高比；超出最大档位原样返回"""
+        assert quantize_target_size((1500, 900)) == (1536, 922)
+        assert quantize_target_size((1520, 1000)) == quantize_target_size((1500, 987))
+        assert quantize_target_size((9000, 6000)) == (9000, 6000)
+        assert quantize_target_size(None) is None
+
+    def test_derive_smaller_rendition_from_larger_tier(self):
+        """已缓存大档位时派生较小渲染（作为降采样档位写入），差距不大时不派生"""
+        cache = SimpleImageCache(max_items=10, use_nscache=False)
+        cache.put("a.jpg", _FakeImage(6000, 4000), size_mb=90.0)
+
+        target = quantize_target_size((1900, 1200))
+        hit = cache.get_best("a.jpg", target)
+        assert cache.can_derive(hit, target)
+        derived = cache.derive("a.jpg", target)
+        assert derived.tier == 2048
+        assert derived.value.size == (2048, 1365)
+
+        assert cache.get_best("a.jpg", target).value is derived.value
+        stats = cache.get_stats()
+        assert stats["derived"] == 1
+        assert stats["reduced_tiers"] == 1
+
+        assert not cache.can_derive(cache.get_best("a.jpg", (5000, 5000)), (5000, 5000))
+        assert cache.derive("a.jpg", (5000, 5000)) is None
+
+    def test_nscache_tier_fallback(self):
+        """NSCache 驱逐了大档位时回落到较小档位并修正记账"""
+        cache, fake = _nscache_backed(max_items=10)
+        small, full = _FakeImage(400, 300), _FakeImage(4000, 3000)
+        cache.put("a.jpg", small)
+        cache.put("a.jpg", full)
+        fake.objects.pop("a.jpg\x004000")
+
+        hit = cache.get_best("a.jpg", (2000, 2000))
+        assert hit.value is small
+        assert not hit.satisfied
+        assert len(cache) == 1
+
+
+class TestPinning:
+    """测试引用计数固定：计入预算、跳过淘汰、按持有者优先级强制解除"""
+
+    def test_pinned_entries_survive_eviction_and_count_in_budget(self):
+        cache = SimpleImageCache(max_items=3, max_memory_mb=1000.0, use_nscache=False)
+        for key in ("a", "b", "c"):
+            cache.put(key, key, size_mb=5.0)
+        assert cache.pin("a", PIN_OWNER_CURRENT)
+        assert not cache.pin("missing")
+
+        for key in ("d", "e", "f"):
+            cache.put(key, key, size_mb=5.0)
+        assert "a" in cache
+        assert len(cache) == 3
+        assert cache.evict_oldest(10) == 2
+        stats = cache.get_stats()
+        assert stats["pinned"] == 1
+        assert stats["pinned_mb"] == 5.0
+        assert stats["size"] == 1
+
+    def test_reference_counts(self):
+        """同一持有者固定两次需释放两次；最后一次释放后恢复可淘汰"""
+        cache = SimpleImageCache(max_items=2, use_nscache=False)
+        cache.put("a", "a")
+        cache.pin("a")
+        cache.pin("a")
+        assert cache.unpin("a")
+        assert cache.is_pinned("a")
+        assert cache.unpin("a")
+        assert not cache.is_pinned("a")
+        assert not cache.unpin("a")
+
+        cache.put("b", "b")
+        cache.put("c", "c")
+        assert "a" not in cache
+
+    def test_force_unpin_by_owner_priority(self):
+        cache = SimpleImageCache(max_items=10, use_nscache=False)
+        owners = {"a": PIN_OWNER_CURRENT, "b": PIN_OWNER_ZOOM, "c": PIN_OWNER_NEIGHBOR, "d": "tile"}
+        for key, owner in owners.items():
+            cache.put(key, key)
+            cache.pin(key, owner)
+
+        assert cache.force_unpin(PIN_PRIORITIES[PIN_OWNER_ZOOM]) == 2
+        assert sorted(cache.pinned_paths()) == ["a", "b"]
+        assert cache.force_unpin(PIN_PRIORITIES[PIN_OWNER_CURRENT]) == 1
+        assert cache.pinned_paths() == ["a"]
+
+        cache.put("c", "c")
+        cache.pin("c")
+        assert cache.unpin_owner(PIN_OWNER_NEIGHBOR, keep=("x",)) == 1
+        assert cache.unpin_all() == 1
+        assert cache.pinned_paths() == []
+
+    def test_pins_bypass_admission_policy(self):
+        """准入策略模式：固定条目不被策略淘汰，总量超限时淘汰其余条目"""
+        cache = SimpleImageCache(max_items=3, use_nscache=False, policy=POLICY_TINYLFU)
+        cache.put("a", "a")
+        cache.pin("a", PIN_OWNER_CURRENT)
+        for i in range(20):
+            cache.put(f"k{i}", i)
+        assert "a" in cache
+        assert len(cache) <= 3
+
+        cache.unpin("a", PIN_OWNER_CURRENT)
+        assert len(cache._policy) == len(cache)
+
+    def test_put_with_pin_owner_pins_atomically(self):
+        """写入时固定：新条目从不进入可淘汰状态，即使超出条目上限"""
+        cache = SimpleImageCache(max_items=1, use_nscache=False)
+        cache.put("a", "a")
+        cache.put("b", "b", pin_owner=PIN_OWNER_CURRENT)
+        assert "b" in cache
+        assert "a" not in cache
+        assert cache.is_pinned("b", PIN_OWNER_CURRENT)
+
+        cache.put("c", "c")
+        assert "b" in cache
+        assert cache.unpin("b", PIN_OWNER_CURRENT)
+
+    def test_nscache_pin_skips_evicted_objects(self):
+        """NSCache 已驱逐全部档位对象时 pin 视为未命中，不留下空固定"""
+        cache, fake = _nscache_backed()
+        cache.put("a", "va")
+        fake.objects.clear()
+
+        assert not cache.pin("a")
+        assert not cache.is_pinned("a")
+
+    def test_nscache_pin_holds_strong_reference(self):
+        """NSCache 自动驱逐固定条目后仍可命中，对账不剔除"""
+        cache, fake = _nscache_backed()
+        cache.put("a", "va")
+        cache.pin("a")
+        fake.objects.clear()
+
+        assert cache.reconcile() == 0
+        assert cache.get("a") == "va"
+        cache.unpin("a")
+        assert cache.reconcile() == 1
+
+
 class TestSimpleImageCacheRemove:
     """测试缓存移除"""
 
@@ -600,13 +950,12 @@ class TestEdgeCases:
 
     def test_very_large_item(self):
         """测试非常大的项"""
-        cache = SimpleImageCache(max_memory_mb=100.0)
+        cache = SimpleImageCache(max_memory_mb=100.0, use_nscache=False)
         cache.put("large", "data", size_mb=200.0)
 
-        # 应该淘汰所有现有项，但无法容纳新项
-        # 实现会尝试清空然后添加
+        # LRU 分支：超出总预算的单项写入后即被淘汰，内存记账不超过上限
         stats = cache.get_stats()
-        # 行为取决于实现细节
+        assert stats["memory_mb"] <= 100.0
 
     def test_put_with_same_key_different_size(self):
         """测试相同键不同大小"""
@@ -4,10 +4,12 @@
 覆盖：读取策略选择、批量读取、目录列表缓存、预读缓冲与淘汰、统计。
 """
 
+import mmap
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from plookingII.core.read_ahead_arena import ReadAheadArena
 from plookingII.core.remote_file_detector import MountType
 from plookingII.core.smb_optimizer import ReadResult, ReadStrategy, SMBOptimizer
 
@@ -114,8 +116,8 @@ class TestSMBOptimizer:
             assert optimizer.preload_file_data(str(src)) is False
 
     def test_read_ahead_eviction(self, optimizer, tmp_path):
-        """预读缓冲超限时按最旧淘汰"""
-        optimizer._MAX_READ_AHEAD_ENTRIES = 2
+        """预读内存池超出字节预算时按最近最少使用淘汰"""
+        optimizer.read_ahead_arena = ReadAheadArena(2 * mmap.PAGESIZE, slab_bytes=mmap.PAGESIZE)
         paths = []
         for name in ("a", "b", "c"):
             p = tmp_path / name
@@ -132,9 +134,9 @@ class TestSMBOptimizer:
     def test_clear_cache_and_stats(self, optimizer):
         """清空缓存与统计接口"""
         optimizer.directory_cache["/smb/x"] = (["a"], 0.0)
-        optimizer.read_ahead_cache["/smb/y"] = b"data"
+        optimizer.read_ahead_arena.put("/smb/y", b"data")
 
         optimizer.clear_cache()
         assert not optimizer.directory_cache
-        assert not optimizer.read_ahead_cache
+        assert len(optimizer.read_ahead_arena) == 0
         assert "total_reads" in optimizer.get_performance_stats()
@@ -0,0 +1,150 @@
+"""
+测试 core/sort_order.py
+
+覆盖可插拔排序：
+- 自然排序键（数字按数值、不区分大小写、前导零）
+- 各排序方式（name/natural/mtime/size/exif）与自定义注册
+- 拍摄时间持久化到元数据索引并复用；无 EXIF 时回退 mtime
+- FileInfoBatchLoader 按 (目录, 排序方式) 缓存排序结果
+"""
+
+import os
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from plookingII.core import sort_order
+from plookingII.core.file_info_batch_loader import FileInfoBatchLoader
+from plookingII.core.metadata_index import MetadataIndex
+from plookingII.core.sort_order import (
+    SORT_EXIF,
+    SORT_MTIME,
+    SORT_NAME,
+    SORT_NATURAL,
+    SORT_SIZE,
+    folder_sort_key,
+    load_capture_times,
+    natural_key,
+    register_sort_order,
+    sort_paths,
+)
+
+
+def _jpeg_with_capture(capture: bytes) -> bytes:
+    """最小 JPEG：APP1 EXIF（IFD0 DateTime）+ SOF0"""
+    tiff = b"MM" + struct.pack(">HI", 42, 8)
+    tiff += struct.pack(">H", 1) + struct.pack(">HHII", 0x0132, 2, 20, 26) + struct.pack(">I", 0)
+    tiff += capture + b"\x00"
+    app1 = b"Exif\x00\x00" + tiff
+    sof = struct.pack(">BHHB", 8, 8, 8, 3) + b"\x01\x11\x00" * 3
+    return (
+        b"\xff\xd8\xff\xe1"
+        + struct.pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xc0"
+        + struct.pack(">H", len(sof) + 2)
+        + sof
+        + b"\xff\xd9"
+    )
+
+
+def _write(path, data=b"x", mtime=None):
+    path.write_bytes(data)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def metadata_index(tmp_path):
+    index = MetadataIndex(str(tmp_path / "meta.db"))
+    with patch("plookingII.core.metadata_index.get_metadata_index", return_value=index):
+        yield index
+    index.close()
+
+
+class TestNaturalKey:
+    def test_numbers_compare_by_value(self):
+        names = ["IMG_10.jpg", "img_2.jpg", "IMG_1.jpg", "IMG_002.jpg", "a.jpg"]
+        assert sorted(names, key=natural_key) == ["a.jpg", "IMG_1.jpg", "img_2.jpg", "IMG_002.jpg", "IMG_10.jpg"]
+
+    def test_digit_and_text_segments_never_cross_compare(self):
+        """数字开头与文本开头的名称可直接比较，不抛 TypeError"""
+        assert sorted(["b1", "10", "a", "2"], key=natural_key) == ["2", "10", "a", "b1"]
+
+    def test_folder_sort_key_uses_basename(self):
+        paths = ["/r/z/Day 10", "/r/Day 9", "/r/a/day 1"]
+        assert sorted(paths, key=folder_sort_key) == ["/r/a/day 1", "/r/Day 9", "/r/z/Day 10"]
+
+
+class TestSortPaths:
+    def test_builtin_orders(self, tmp_path):
+        a = _write(tmp_path / "IMG_10.jpg", b"x" * 30, mtime=1_000)
+        b = _write(tmp_path / "IMG_2.jpg", b"x" * 10, mtime=3_000)
+        c = _write(tmp_path / "IMG_1.jpg", b"x" * 20, mtime=2_000)
+        paths = sorted([a, b, c])
+        d = str(tmp_path)
+
+        assert sort_paths(d, paths, SORT_NAME) == [c, a, b]
+        assert sort_paths(d, paths, SORT_NATURAL) == [c, b, a]
+        assert sort_paths(d, paths, SORT_MTIME) == [a, c, b]
+        assert sort_paths(d, paths, SORT_SIZE) == [b, c, a]
+        # 未注册的排序方式按自然排序
+        assert sort_paths(d, paths, "unknown") == [c, b, a]
+
+    def test_register_custom_order(self, tmp_path):
+        paths = [str(tmp_path / n) for n in ("a.jpg", "bb.jpg", "c.jpg")]
+        register_sort_order("name_length_desc", lambda d, ps, infos: [-len(os.path.basename(p)) for p in ps])
+        try:
+            assert sort_paths(str(tmp_path), paths, "name_length_desc")[0].endswith("bb.jpg")
+        finally:
+            sort_order._registry.pop("name_length_desc", None)
+
+    def test_exif_order_persists_capture_times(self, tmp_path, metadata_index):
+        """按拍摄时间排序：结果写回索引，再次排序不重复探测；无 EXIF 回退 mtime"""
+        early = _write(tmp_path / "b.jpg", _jpeg_with_capture(b"2020:01:01 00:00:00"))
+        late = _write(tmp_path / "a.jpg", _jpeg_with_capture(b"2024:01:01 00:00:00"))
+        plain = _write(tmp_path / "c.png", b"not an image", mtime=0)
+        paths = [late, early, plain]
+
+        assert sort_paths(str(tmp_path), paths, SORT_EXIF) == [plain, early, late]
+        rows = metadata_index.load_dir(str(tmp_path))
+        assert rows["b.jpg"].capture_time == "2020:01:01 00:00:00"
+        assert rows["c.png"].capture_time == ""
+
+        with patch("plookingII.core.image_header.read_image_headers") as probe:
+            times = load_capture_times(str(tmp_path), ["a.jpg", "b.jpg", "c.png"])
+        probe.assert_not_called()
+        assert times["a.jpg"] == "2024:01:01 00:00:00"
+
+
+class TestLoaderOrderedCache:
+    def test_orders_cached_per_directory(self, tmp_path):
+        """切换排序方式后再切回直接命中缓存；目录变化后重新排序"""
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        for name in ("IMG_10.jpg", "IMG_2.jpg"):
+            (photos / name).write_bytes(b"x")
+        loader = FileInfoBatchLoader()
+
+        natural = loader.get_directory_images(str(photos), filter_exts=(".jpg",))
+        assert [os.path.basename(p) for p in natural] == ["IMG_2.jpg", "IMG_10.jpg"]
+        by_name = loader.get_directory_images(str(photos), filter_exts=(".jpg",), order=SORT_NAME)
+        assert [os.path.basename(p) for p in by_name] == ["IMG_10.jpg", "IMG_2.jpg"]
+
+        with patch("plookingII.core.file_info_batch_loader.sort_paths") as resort:
+            assert loader.get_directory_images(str(photos), filter_exts=(".jpg",)) == natural
+        resort.assert_not_called()
+
+        (photos / "IMG_1.jpg").write_bytes(b"x")
+        future = os.stat(photos).st_mtime + 100
+        os.utime(photos, (future, future))
+        assert os.path.basename(loader.get_directory_images(str(photos), filter_exts=(".jpg",))[0]) == "IMG_1.jpg"
+
+    def test_set_sort_order_validates(self):
+        loader = FileInfoBatchLoader()
+        assert loader.set_sort_order(SORT_MTIME) is True
+        assert loader.get_sort_order() == SORT_MTIME
+        assert loader.set_sort_order("bogus") is False
+        assert loader.get_sort_order() == SORT_MTIME
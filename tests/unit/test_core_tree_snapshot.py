@@ -0,0 +1,194 @@
+"""
+测试 core/tree_snapshot.py
+
+覆盖目录树增量快照：
+- 首次全量遍历（先序、图片计数、子目录过滤）与流式遍历
+- mtime 未变的目录复用快照，变化/新增目录重新枚举
+- mtime 粒度保护窗口内的目录不信任快照
+- 快照持久化往返、损坏快照忽略
+- 单例与重置
+"""
+
+import os
+import time
+
+from plookingII.core.tree_snapshot import (
+    TreeScanResult,
+    TreeSnapshotStore,
+    get_tree_snapshot_store,
+    incremental_walk,
+    iter_walk,
+    reset_tree_snapshot_store,
+)
+
+EXTS = (".jpg", ".png")
+
+
+def _make_tree(tmp_path):
+    """root/{a.jpg}, root/x/{1.jpg,2.png}, root/x/deep/{}, root/y/{note.txt}"""
+    root = tmp_path / "root"
+    (root / "x" / "deep").mkdir(parents=True)
+    (root / "y").mkdir()
+    (root / "a.jpg").write_bytes(b"1")
+    (root / "x" / "1.jpg").write_bytes(b"1")
+    (root / "x" / "2.png").write_bytes(b"1")
+    (root / "y" / "note.txt").write_bytes(b"1")
+    return str(root)
+
+
+def _age_tree(root, seconds=60):
+    """把树内所有目录 mtime 调到过去，使其落在粒度保护窗口之外"""
+    past = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+class TestIncrementalWalk:
+    def test_full_walk_preorder_and_counts(self, tmp_path):
+        """无快照时全量遍历，先序输出并统计图片数"""
+        root = _make_tree(tmp_path)
+        result = incremental_walk(root, EXTS)
+
+        x = os.path.join(root, "x")
+        assert result.directories == [root, x, os.path.join(x, "deep"), os.path.join(root, "y")]
+        assert result.nodes[root].image_count == 1
+        assert result.nodes[x].image_count == 2
+        assert sorted(result.image_directories) == sorted([root, x])
+        assert result.rescanned == 4
+        assert result.reused == 0
+
+    def test_hidden_entries_skipped(self, tmp_path):
+        """AppleDouble "._*.jpg" 不计为图片，隐藏目录不遍历"""
+        root = _make_tree(tmp_path)
+        y = os.path.join(root, "y")
+        (tmp_path / "root" / "y" / "._IMG_0001.jpg").write_bytes(b"\x00\x05\x16\x07")
+        (tmp_path / "root" / ".hidden").mkdir()
+        (tmp_path / "root" / ".hidden" / "1.jpg").write_bytes(b"1")
+        result = incremental_walk(root, EXTS)
+        assert result.nodes[y].image_count == 0
+        assert os.path.join(root, ".hidden") not in result.nodes
+
+    def test_dir_filter_skips_subtree(self, tmp_path):
+        """dir_filter 返回 False 的子目录及其子树不遍历"""
+        root = _make_tree(tmp_path)
+        result = incremental_walk(root, EXTS, dir_filter=lambda parent, name: name != "x")
+        assert result.directories == [root, os.path.join(root, "y")]
+
+    def test_unchanged_dirs_reused_changed_rescanned(self, tmp_path):
+        """mtime 未变的目录复用快照，新增文件的目录重新枚举"""
+        root = _make_tree(tmp_path)
+        _age_tree(root)
+        first = incremental_walk(root, EXTS)
+
+        x = os.path.join(root, "x")
+        (tmp_path / "root" / "x" / "3.jpg").write_bytes(b"1")
+        second = incremental_walk(root, EXTS, first.nodes, time.time_ns())
+
+        assert second.rescanned == 1
+        assert second.reused == 3
+        assert second.nodes[x].image_count == 3
+        assert second.directories == first.directories
+
+    def test_new_subdirectory_discovered(self, tmp_path):
+        """新建子目录使父目录 mtime 变化，新目录被发现"""
+        root = _make_tree(tmp_path)
+        _age_tree(root)
+        first = incremental_walk(root, EXTS)
+
+        new_dir = tmp_path / "root" / "y" / "z"
+        new_dir.mkdir()
+        (new_dir / "p.jpg").write_bytes(b"1")
+        second = incremental_walk(root, EXTS, first.nodes, time.time_ns())
+
+        assert str(new_dir) in second.nodes
+        assert second.nodes[str(new_dir)].image_count == 1
+
+    def test_iter_walk_streams_and_accumulates(self, tmp_path):
+        """流式遍历逐个产出节点，并同步累积到结果对象"""
+        root = _make_tree(tmp_path)
+        result = TreeScanResult(root=root)
+        stream = iter_walk(root, EXTS, result=result)
+        first_path, first_node = next(stream)
+        assert first_path == root
+        assert first_node.image_count == 1
+        assert list(result.nodes) == [root]
+
+        rest = [p for p, _ in stream]
+        assert [root, *rest] == incremental_walk(root, EXTS).directories
+        assert result.rescanned == 4
+
+    def test_recent_mtime_not_trusted(self, tmp_path):
+        """快照时刻附近修改过的目录即使 mtime 相同也重新枚举"""
+        root = _make_tree(tmp_path)
+        first = incremental_walk(root, EXTS)
+        # 快照时间与目录 mtime 几乎相同：全部落在保护窗口内
+        second = incremental_walk(root, EXTS, first.nodes, time.time_ns())
+        assert second.reused == 0
+        assert second.rescanned == len(first.nodes)
+
+
+class TestTreeSnapshotStore:
+    def test_scan_persists_and_reuses(self, tmp_path):
+        """scan 写回快照，新实例读取后复用未变目录"""
+        root = _make_tree(tmp_path)
+        _age_tree(root)
+        cache_dir = str(tmp_path / "snap")
+        first = TreeSnapshotStore(cache_dir=cache_dir).scan(root, EXTS)
+        assert first.rescanned == 4
+
+        nodes, scanned_at = TreeSnapshotStore(cache_dir=cache_dir).load(root)
+        assert nodes == first.nodes
+        assert scanned_at > 0
+
+        second = TreeSnapshotStore(cache_dir=cache_dir).scan(root, EXTS)
+        assert second.reused == 4
+        assert second.rescanned == 0
+
+    def test_iter_scan_closed_early_does_not_save(self, tmp_path):
+        """流式扫描中途关闭不写入半棵树的快照"""
+        root = _make_tree(tmp_path)
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"))
+        stream = store.iter_scan(root, EXTS)
+        next(stream)
+        stream.close()
+        assert store.load(root) == ({}, 0)
+
+        list(store.iter_scan(root, EXTS))
+        assert len(store.load(root)[0]) == 4
+
+    def test_corrupt_snapshot_ignored(self, tmp_path):
+        """损坏的快照文件被忽略并回退全量遍历"""
+        root = _make_tree(tmp_path)
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"))
+        store.scan(root, EXTS)
+        for f in (tmp_path / "snap").glob("*.json"):
+            f.write_text("{not json", encoding="utf-8")
+
+        assert store.load(root) == ({}, 0)
+        assert store.scan(root, EXTS).rescanned == 4
+
+    def test_lru_prune_and_clear(self, tmp_path):
+        """超过根目录上限时清理最旧快照；clear 删除全部"""
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"), max_roots=2)
+        roots = []
+        for i in range(3):
+            d = tmp_path / f"r{i}"
+            d.mkdir()
+            roots.append(str(d))
+            store.save(str(d), incremental_walk(str(d), EXTS).nodes)
+            snap = store._snapshot_file(str(d))
+            past = time.time() - 100 + i
+            os.utime(snap, (past, past))
+
+        assert len(list((tmp_path / "snap").glob("*.json"))) == 2
+        assert store.load(roots[0]) == ({}, 0)
+        store.clear()
+        assert store.load(roots[2]) == ({}, 0)
+
+    def test_singleton_and_reset(self):
+        """全局单例可复用，reset 后重建"""
+        reset_tree_snapshot_store()
+        try:
+            assert get_tree_snapshot_store() is get_tree_snapshot_store()
+        finally:
+            reset_tree_snapshot_store()
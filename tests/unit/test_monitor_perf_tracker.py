@@ -7,6 +7,7 @@
 - 采样、慢事件捕获
 - 上下文管理器 / 装饰器
 - 会话报告落盘（JSON + Markdown）与轮转
+- 报告附加节
 """
 
 import json
@@ -85,6 +86,34 @@ class TestPerfTrackerBasic:
         tracker.record("nav", -5.0)
         assert tracker.get_summary()["operations"]["nav"]["min_ms"] == 0.0
 
+    def test_counters(self):
+        """计数器不受采样率影响，并出现在摘要与 Markdown 报告中"""
+        tracker = PerfTracker(enabled=True, sample_rate=5, auto_flush_seconds=0)
+        tracker.count("render_cache.hit")
+        tracker.count("render_cache.hit")
+        tracker.count("render_cache.derive", 3)
+        counters = tracker.get_summary()["counters"]
+        assert counters == {"render_cache.derive": 3, "render_cache.hit": 2}
+        assert "| render_cache.hit | 2 |" in PerfTracker._render_markdown(tracker.get_summary())
+
+        disabled = PerfTracker(enabled=False)
+        disabled.count("x")
+        assert disabled.get_summary()["counters"] == {}
+
+    def test_report_sections(self):
+        """注册的附加节在摘要中取值并渲染为 Markdown 表格；provider 异常时跳过"""
+        tracker = PerfTracker(enabled=True, auto_flush_seconds=0)
+        tracker.register_report_section("mrc", "缓存 MRC", lambda: [{"倍率": "1x", "命中率": "60.0%"}])
+        tracker.register_report_section("broken", "坏节", lambda: 1 / 0)
+        summary = tracker.get_summary()
+        assert summary["sections"] == {"mrc": {"title": "缓存 MRC", "rows": [{"倍率": "1x", "命中率": "60.0%"}]}}
+        markdown = PerfTracker._render_markdown(summary)
+        assert "## 缓存 MRC" in markdown
+        assert "| 1x | 60.0% |" in markdown
+
+        tracker.unregister_report_section("mrc")
+        assert tracker.get_summary()["sections"] == {}
+
     def test_sampling_rate(self):
         """采样率生效：每 N 次记录 1 次"""
         tracker = PerfTracker(enabled=True, sample_rate=10, auto_flush_seconds=0)
@@ -125,10 +125,22 @@ class TestFolderScanning:
         assert hasattr(folder_manager, "_dir_contains_images")
         assert callable(folder_manager._dir_contains_images)
 
-    def test_gather_directories_to_scan_method_exists(self, folder_manager):
-        """测试_gather_directories_to_scan方法存在"""
-        assert hasattr(folder_manager, "_gather_directories_to_scan")
-        assert callable(folder_manager._gather_directories_to_scan)
+    def test_scan_subfolders_sorted_with_walker_progress(self, folder_manager, tmp_path):
+        """完整扫描：并行遍历结果按文件夹名排序，并记录遍历进度"""
+        from plookingII.core.tree_snapshot import TreeSnapshotStore
+
+        root = tmp_path / "root"
+        for rel in ("z/B", "a", "m/c"):
+            (root / rel).mkdir(parents=True)
+            (root / rel / "x.jpg").touch()
+
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"))
+        with patch("plookingII.core.tree_snapshot.get_tree_snapshot_store", return_value=store):
+            found = folder_manager._scan_subfolders(str(root))
+
+        assert found == [str(root / "a"), str(root / "z/B"), str(root / "m/c")]
+        assert folder_manager._last_scanned_dir_count == 6
+        assert folder_manager._last_tree_walker.get_progress()["image_dirs"] == 3
 
     @patch("plookingII.ui.managers.folder_manager.SUPPORTED_IMAGE_EXTS", (".jpg", ".png"))
     @patch("plookingII.core.file_info_batch_loader.get_file_info_loader")
@@ -166,6 +178,135 @@ class TestFolderScanning:
 
         assert result is False
 
+    def test_iter_subfolders_streams_image_folders(self, folder_manager, tmp_path):
+        """流式发现：产出含图目录，跳过精选目录并记录目录总数"""
+        from plookingII.core.tree_snapshot import TreeSnapshotStore
+
+        root = tmp_path / "root"
+        (root / "b").mkdir(parents=True)
+        (root / "a" / "deep").mkdir(parents=True)
+        (root / "a 精选").mkdir()
+        (root / "b" / "1.jpg").touch()
+        (root / "a" / "deep" / "2.jpg").touch()
+        (root / "a 精选" / "3.jpg").touch()
+
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"))
+        with patch("plookingII.core.tree_snapshot.get_tree_snapshot_store", return_value=store):
+            found = list(folder_manager.iter_subfolders(str(root)))
+
+        assert sorted(found) == [str(root / "a" / "deep"), str(root / "b")]
+        assert folder_manager._last_scanned_dir_count == 4
+
+    def test_merge_discovered_subfolders_keeps_position(self, folder_manager, mock_window):
+        """按排序位置并入新发现的文件夹，当前浏览位置不变；过期代次丢弃"""
+        mock_window.subfolders = ["/r/b", "/r/d"]
+        mock_window.current_folder = "/r/d"
+        mock_window.current_subfolder_index = 1
+        gen = folder_manager._load_root_generation
+
+        folder_manager._merge_discovered_subfolders(gen, ["/r/x/a", "/r/c", "/r/b"])
+        assert mock_window.subfolders == ["/r/x/a", "/r/b", "/r/c", "/r/d"]
+        assert mock_window.current_subfolder_index == 3
+
+        folder_manager._merge_discovered_subfolders(gen - 1, ["/r/e"])
+        assert "/r/e" not in mock_window.subfolders
+
+    def test_merge_discovered_subfolders_reverse_order(self, folder_manager, mock_window):
+        """倒序浏览时按倒序位置插入，排序键缓存跨批次复用"""
+        folder_manager.reverse_folder_order = True
+        mock_window.subfolders = ["/r/d", "/r/b"]
+        mock_window.current_folder = "/r/b"
+        mock_window.current_subfolder_index = 1
+        gen = folder_manager._load_root_generation
+
+        folder_manager._merge_discovered_subfolders(gen, ["/r/a", "/r/c"])
+        folder_manager._merge_discovered_subfolders(gen, ["/r/e"])
+        assert mock_window.subfolders == ["/r/e", "/r/d", "/r/c", "/r/b", "/r/a"]
+        assert mock_window.current_subfolder_index == 3
+
+    def test_stream_subfolders_marks_first_batch_on_worker(self, folder_manager):
+        """首批标记在扫描线程确定，与主线程回调的执行时机无关"""
+        folder_manager._STREAM_MERGE_BATCH = 2
+        posted = []
+        with (
+            patch.object(folder_manager, "iter_subfolders", return_value=(p for p in ["/r/c", "/r/a", "/r/b"])),
+            patch.object(folder_manager, "_post_to_main", side_effect=posted.append),
+            patch.object(folder_manager, "_record_folder_scan"),
+        ):
+            result = folder_manager._stream_subfolders(
+                folder_manager._load_root_generation, "/r", lambda batch, first: (batch, first)
+            )
+        assert result == ["/r/a", "/r/b", "/r/c"]
+        assert [callback() for callback in posted] == [(["/r/c", "/r/a"], True), (["/r/b"], False)]
+
+    def test_set_image_sort_order_keeps_current_image(self, folder_manager, mock_window):
+        """切换图片排序方式后列表在后台重排，当前图片保持不变并同步缓存池；未知排序方式拒绝"""
+        import threading
+
+        from plookingII.core.file_info_batch_loader import get_file_info_loader, reset_file_info_loader
+        from plookingII.core.sort_order import sort_paths
+
+        paths = ["/p/IMG_1.jpg", "/p/IMG_10.jpg", "/p/IMG_2.jpg"]
+        mock_window.current_folder = "/p"
+        mock_window.images = sort_paths("/p", paths, "natural")
+        mock_window.current_index = 2
+        assert mock_window.images[2] == "/p/IMG_10.jpg"
+
+        applied = threading.Event()
+
+        def post_to_main(fn):
+            fn()
+            applied.set()
+
+        reset_file_info_loader()
+        try:
+            with (
+                patch.object(
+                    folder_manager,
+                    "_load_folder_images",
+                    side_effect=lambda folder: sort_paths(folder, paths, get_file_info_loader().get_sort_order()),
+                ),
+                patch.object(folder_manager, "_post_to_main", side_effect=post_to_main),
+            ):
+                assert folder_manager.set_image_sort_order("name") is True
+                assert applied.wait(5)
+                assert mock_window.images == paths
+                assert mock_window.current_index == 1
+                mock_window.image_manager.sync_bidi_sequence.assert_called_once_with(paths)
+                assert folder_manager.set_image_sort_order("bogus") is False
+        finally:
+            reset_file_info_loader()
+
+    def test_apply_image_order_discards_superseded_results(self, folder_manager, mock_window):
+        """排序完成前切换了文件夹或再次切换排序方式：丢弃结果"""
+        mock_window.current_folder = "/p"
+        mock_window.images = ["/p/a.jpg", "/p/b.jpg"]
+        folder_manager._sort_generation = 2
+        folder_manager._apply_image_order(1, "/p", ["/p/b.jpg", "/p/a.jpg"])
+        folder_manager._apply_image_order(2, "/q", ["/p/b.jpg", "/p/a.jpg"])
+        assert mock_window.images == ["/p/a.jpg", "/p/b.jpg"]
+
+    def test_history_restore_by_image_path(self, folder_manager, mock_window):
+        """恢复历史按图片路径定位；旧记录（无路径）按旧的文件名排序换算"""
+        history = {
+            "subfolders": ["/p"],
+            "current_subfolder_index": 0,
+            "current_index": 1,
+            "current_folder": "/p",
+            "current_image": "/p/IMG_10.jpg",
+        }
+        with patch.object(folder_manager, "load_current_subfolder") as load:
+            folder_manager._handle_task_history_dialog_result(1000, history)
+            assert load.call_args.kwargs["restore_path"] == "/p/IMG_10.jpg"
+
+            history["current_image"] = ""
+            loader = MagicMock()
+            loader.get_directory_images.return_value = ["/p/IMG_1.jpg", "/p/IMG_10.jpg", "/p/IMG_2.jpg"]
+            with patch("plookingII.core.file_info_batch_loader.get_file_info_loader", return_value=loader):
+                folder_manager._handle_task_history_dialog_result(1000, history)
+            assert load.call_args.kwargs["restore_path"] == "/p/IMG_10.jpg"
+            assert loader.get_directory_images.call_args.kwargs["order"] == "name"
+
 
 # ==================== 导航功能测试 ====================
 
@@ -648,6 +789,37 @@ class TestHistoryRestoreFastPath:
         mock_thm.save_task_progress.assert_called()
         assert folder_manager.main_window.current_subfolder_index == 0
 
+    @patch("plookingII.ui.managers.folder_manager.TaskHistoryManager")
+    def test_load_root_async_deep_tree_streams(self, mock_thm_class, folder_manager, tmp_path):
+        """直系无图片的深层目录树：流式发现首批即开始浏览，结束后列表完整"""
+        import time
+
+        from plookingII.core.tree_snapshot import TreeSnapshotStore
+
+        root = tmp_path / "root"
+        for rel in ("p/q/b", "p/q/a"):
+            (root / rel).mkdir(parents=True)
+            (root / rel / "x.jpg").touch()
+        mock_thm_class.return_value.load_task_progress.return_value = None
+
+        folder_manager._post_to_main = staticmethod(lambda f: f())
+        store = TreeSnapshotStore(cache_dir=str(tmp_path / "snap"))
+        with (
+            patch("plookingII.core.tree_snapshot.get_tree_snapshot_store", return_value=store),
+            patch.object(folder_manager, "load_current_subfolder") as load_current,
+            patch.object(folder_manager, "_STREAM_MERGE_BATCH", 1),
+        ):
+            folder_manager.load_images_from_root(str(root))
+            expected = [str(root / "p/q/a"), str(root / "p/q/b")]
+            deadline = time.time() + 5
+            saved = mock_thm_class.return_value.save_task_progress
+            while time.time() < deadline and not saved.called:
+                time.sleep(0.02)
+
+        assert folder_manager.main_window.subfolders == expected
+        load_current.assert_called_once()
+        mock_thm_class.return_value.save_task_progress.assert_called()
+
 
 class TestHistoryRestoreDialog:
     """回归测试：历史恢复确认弹窗的展示方式
@@ -9,11 +9,13 @@
 - 预加载和预取
 """
 
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from plookingII.core.simple_cache import PIN_OWNER_CURRENT, PIN_OWNER_NEIGHBOR
 from plookingII.ui.managers.image_manager import ImageManager
 
 # ==================== 夹具（Fixtures） ====================
@@ -146,6 +148,66 @@ class TestCacheManagement:
         assert hasattr(image_manager, "_record_cache_hit")
         assert callable(image_manager._record_cache_hit)
 
+    def test_memory_miss_probes_display_tier_off_main_thread(self, image_manager):
+        """内存未命中：后台查显示级磁盘缓存，命中后在主线程显示并回填内存缓存"""
+        posted = []
+        with (
+            patch.object(image_manager, "_load_from_display_tier", return_value="disk_img") as load,
+            patch.object(image_manager._executor, "submit", side_effect=lambda fn: fn()),
+            patch.object(image_manager, "_post_to_main", side_effect=posted.append),
+            patch.object(image_manager.image_cache, "put") as put,
+            patch.object(image_manager, "_display_image_immediate") as display,
+            patch.object(image_manager, "_schedule_background_tasks"),
+            patch.object(image_manager, "_load_uncached") as load_uncached,
+        ):
+            assert image_manager._schedule_display_tier_load("/a.jpg", (1600, 1200)) is True
+            load.assert_called_once_with("/a.jpg", (1600, 1200))
+            display.assert_not_called()
+            posted.pop()()
+            display.assert_called_once_with("disk_img")
+            assert put.call_args.args[:2] == ("/a.jpg", "disk_img")
+            load_uncached.assert_not_called()
+
+            # 未命中：回到主线程执行常规加载策略
+            load.return_value = None
+            image_manager._schedule_display_tier_load("/b.jpg", (1600, 1200), True)
+            posted.pop()()
+            load_uncached.assert_called_once_with("/b.jpg", (1600, 1200), True)
+
+            # 全分辨率浏览不查磁盘缓存
+            assert image_manager._schedule_display_tier_load("/c.jpg", None) is False
+
+    def test_display_tier_fill_skips_small_or_full_res(self, image_manager):
+        """小文件（工作线程中判断）与全分辨率浏览不回填磁盘缓存"""
+        futures = []
+        submit = image_manager._prefetch_executor.submit
+        with (
+            patch.object(image_manager, "_get_file_size_safely", return_value=0.5),
+            patch("plookingII.ui.managers.image_manager.get_decode_pool") as get_pool,
+            patch.object(
+                image_manager._prefetch_executor,
+                "submit",
+                side_effect=lambda fn: futures.append(submit(fn)) or futures[-1],
+            ),
+        ):
+            image_manager._schedule_display_tier_fill("/big.jpg", None)
+            assert not futures
+            image_manager._schedule_display_tier_fill("/small.jpg", (1600, 1200))
+            futures[0].result(5)
+            get_pool.assert_not_called()
+        assert not image_manager._display_tier_pending
+
+    def test_display_tier_fill_cancelled_clears_pending(self, image_manager):
+        """排队中被有界执行器淘汰的回填任务同样清除 pending 标记"""
+        from concurrent.futures import Future
+
+        future = Future()
+        with patch.object(image_manager._prefetch_executor, "submit", return_value=future):
+            image_manager._schedule_display_tier_fill("/big.jpg", (1600, 1200))
+        assert "/big.jpg" in image_manager._display_tier_pending
+        future.cancel()
+        assert "/big.jpg" not in image_manager._display_tier_pending
+
 
 # ==================== 目标尺寸计算测试 ====================
 
@@ -232,6 +294,93 @@ class TestPrefetch:
         """测试预取代数已初始化"""
         assert hasattr(image_manager, "_load_generation")
 
+    def test_adaptive_prefetch_uses_priority_scheduler(self, image_manager):
+        """自适应预取提交到优先级调度器（带代次与优先级）"""
+        image_manager._nav_history = []
+        with (
+            patch.object(image_manager, "_get_path_by_offset", side_effect=lambda _p, off: f"/img{off}.jpg"),
+            patch.object(image_manager.image_cache, "contains_tier", return_value=False),
+            patch.object(image_manager._prefetch_scheduler, "submit") as submit,
+            patch("plookingII.core.decode_pool.read_image_header") as read_header,
+        ):
+            image_manager._schedule_adaptive_prefetch("/img0.jpg", (800, 600))
+        calls = [(c.args[1], c.kwargs["priority"]) for c in submit.call_args_list]
+        assert calls == [("/img1.jpg", 1), ("/img-1.jpg", 2)]
+        assert all(c.args[3] == image_manager._load_generation for c in submit.call_args_list)
+        # 预算按档位估算：主线程不读邻居文件头
+        read_header.assert_not_called()
+        assert all(c.kwargs["estimated_mb"] == 800 * 4 * 800 / (1024 * 1024) for c in submit.call_args_list)
+
+    def test_prefetch_decodes_in_pool_with_fallback(self, image_manager):
+        """邻居预取经子进程共享内存帧解码；帧不可用时回退主进程解码"""
+        pool = MagicMock(uses_subprocess=True)
+        frame = pool.decode_frame.return_value
+        frame.__enter__.return_value = frame
+        with (
+            patch("plookingII.ui.managers.image_manager.get_decode_pool", return_value=pool),
+            patch("plookingII.core.loading.helpers.cgimage_from_frame", return_value="cg") as to_cg,
+            patch.object(image_manager, "_load_image_optimized", return_value="local") as local,
+        ):
+            assert image_manager._decode_in_pool("/a.jpg", (800, 600)) == "cg"
+            pool.decode_frame.assert_called_once_with("/a.jpg", (800, 600), fallback_to_file=False)
+            to_cg.assert_called_once_with(frame)
+            frame.__exit__.assert_called_once()
+            local.assert_not_called()
+
+            pool.decode_frame.return_value = None
+            assert image_manager._decode_in_pool("/b.jpg", (800, 600)) == "local"
+            pool.uses_subprocess = False
+            pool.decode_frame.reset_mock()
+            assert image_manager._decode_in_pool("/c.jpg", (800, 600)) == "local"
+            pool.decode_frame.assert_not_called()
+
+    def test_encoded_prefetch_window_follows_direction(self, image_manager):
+        """编码字节预读按距离由近到远，导航方向占多数"""
+        image_manager._encoded_cache = MagicMock(window=8)
+        with patch.object(image_manager, "_get_path_by_offset", side_effect=lambda _p, off: f"/img{off}.jpg"):
+            image_manager._schedule_encoded_prefetch("/img0.jpg", -1)
+        paths = image_manager._encoded_cache.prefetch.call_args.args[0]
+        assert paths[:4] == ["/img-1.jpg", "/img1.jpg", "/img-2.jpg", "/img2.jpg"]
+        assert len(paths) == 10
+
+    def test_cancel_stale_prefetches_advances_scheduler(self, image_manager):
+        """代次提升后过期排队预取被调度器丢弃"""
+        with patch.object(image_manager._prefetch_scheduler, "advance_generation") as advance:
+            image_manager._load_generation = 7
+            image_manager._cancel_stale_prefetches()
+            advance.assert_called_once_with(7)
+
+    def test_cancel_stale_prefetches_cancels_queued_tier_fill(self, image_manager):
+        """导航离开后仍在解码池排队的显示级回填被取消，不写入磁盘缓存"""
+        from concurrent.futures import Future
+
+        decode = Future()
+        pool = MagicMock()
+        pool.decode_async.return_value = decode
+        futures = []
+        submit = image_manager._prefetch_executor.submit
+        with (
+            patch.object(image_manager, "_get_file_size_safely", return_value=50.0),
+            patch.object(image_manager._display_tier, "contains", return_value=False),
+            patch.object(image_manager._display_tier, "store_file") as store,
+            patch("plookingII.ui.managers.image_manager.get_decode_pool", return_value=pool),
+            patch.object(
+                image_manager._prefetch_executor,
+                "submit",
+                side_effect=lambda fn: futures.append(submit(fn)) or futures[-1],
+            ),
+        ):
+            image_manager._schedule_display_tier_fill("/big.jpg", (1600, 1200))
+            deadline = time.time() + 5
+            while "/big.jpg" not in image_manager._display_tier_decodes and time.time() < deadline:
+                time.sleep(0.01)
+            image_manager._cancel_stale_prefetches()
+            futures[0].result(5)
+        assert decode.cancelled()
+        store.assert_not_called()
+        assert not image_manager._display_tier_decodes
+        assert "/big.jpg" not in image_manager._display_tier_pending
+
 
 # ==================== 导航统计测试 ====================
 
@@ -296,6 +445,37 @@ class TestBackgroundLoading:
         assert hasattr(image_manager, "_load_image_with_concurrency")
         assert callable(image_manager._load_image_with_concurrency)
 
+    def test_fast_loading_defers_to_background_when_decode_in_flight(self, image_manager):
+        """主线程快速路径不加入进行中的同键解码（如 HOT3 全分辨率），改由后台加入"""
+        from plookingII.core.loading.single_flight import DecodeSingleFlight
+
+        image_manager._decode_flights = DecodeSingleFlight()
+        release = threading.Event()
+        started = threading.Event()
+
+        def background_decode(_flight):
+            started.set()
+            release.wait(5)
+            return "img"
+
+        bg = threading.Thread(target=lambda: image_manager._decode_flights.run(("/a.jpg", None), background_decode))
+        bg.start()
+        try:
+            assert started.wait(5)
+            with (
+                patch.object(image_manager, "_load_image_optimized") as decode,
+                patch.object(image_manager, "_start_background_load") as background_load,
+                patch.object(image_manager, "_display_image_immediate") as display,
+                patch.object(image_manager, "_schedule_background_tasks"),
+            ):
+                image_manager._execute_fast_loading("/a.jpg")
+                background_load.assert_called_once_with("/a.jpg", None)
+                decode.assert_not_called()
+                display.assert_not_called()
+        finally:
+            release.set()
+            bg.join(5)
+
     def test_try_display_next_ready_method_exists(self, image_manager):
         """测试_try_display_next_ready方法存在"""
         assert hasattr(image_manager, "_try_display_next_ready")
@@ -496,6 +676,32 @@ class TestPrewarmDimensions:
             time.sleep(0.05)
         assert image_manager._get_cached_dimensions_only(str(png)) is not None
 
+    def test_prewarm_uses_metadata_index_rows(self, image_manager, tmp_path):
+        """索引行仍有效时直接回填，不再探测文件头；新文件探测后写回索引"""
+        import os
+
+        from plookingII.core.metadata_index import FileMeta, MetadataIndex
+
+        image_manager.main_window._shutting_down = False
+        indexed = tmp_path / "a.jpg"
+        indexed.write_bytes(b"x" * 10)
+        fresh_file = tmp_path / "b.jpg"
+        fresh_file.write_bytes(b"y" * 10)
+        st = os.stat(indexed)
+        index = MetadataIndex(":memory:")
+        index.upsert_many(str(tmp_path), [FileMeta("a.jpg", st.st_size, st.st_mtime_ns, 300, 200, has_mpf=False)])
+
+        with (
+            patch("plookingII.ui.managers.image_manager.read_image_headers", return_value={}) as probe,
+            patch.object(image_manager, "_get_cached_dimensions", return_value=(40, 30)),
+        ):
+            image_manager._prewarm_dir_dimensions(index, str(tmp_path), [str(indexed), str(fresh_file)])
+
+        probe.assert_called_once_with([str(fresh_file)])
+        assert image_manager._get_cached_dimensions_only(str(indexed)) == (300, 200)
+        assert str(indexed) in image_manager._no_mpf_cache
+        assert index.load_dir(str(tmp_path))["b.jpg"].dimensions == (40, 30)
+
 
 # ==================== 异步内嵌预览测试（P1-2） ====================
 
@@ -688,7 +894,12 @@ class TestRssMemoryWatchdog:
     def test_emergency_level_full_cleanup(self, image_manager):
         """紧急级：缓存保留1项 + HOT3 仅保留当前 + 双缓冲释放 + 小缓存清空"""
         image_manager._next_ready_image = "img"
-        image_manager._hot3_lock = {"/test/img1.jpg": "a", "/test/img2.jpg": "b", "/test/img3.jpg": "c"}
+        cache = image_manager.image_cache
+        for path in ("/test/img1.jpg", "/test/img2.jpg", "/test/img3.jpg"):
+            cache.put(path, path)
+        cache.pin("/test/img1.jpg", PIN_OWNER_CURRENT)
+        cache.pin("/test/img2.jpg", PIN_OWNER_NEIGHBOR)
+        cache.pin("/test/img3.jpg", PIN_OWNER_NEIGHBOR)
         image_manager._no_mpf_cache = {"/x.jpg": True}
         with (
             patch("plookingII.ui.managers.image_manager.get_process_rss_mb", return_value=12000.0),
@@ -698,10 +909,26 @@ class TestRssMemoryWatchdog:
             image_manager._run_rss_memory_check()
             cleanup.assert_called_once()
             assert image_manager._next_ready_image is None
-            # 仅保留当前路径（current_index=0 → /test/img1.jpg）
-            assert image_manager._hot3_lock == {"/test/img1.jpg": "a"}
+            # 仅保留当前图片的固定
+            assert cache.pinned_paths() == ["/test/img1.jpg"]
             assert image_manager._no_mpf_cache == {}
 
+    def test_hot3_residency_pins_cached_and_loaded_paths(self, image_manager):
+        """HOT3：已缓存的路径直接固定，未缓存的路径加载后写入即固定"""
+        cache = image_manager.image_cache
+        cache.put("/test/cur.jpg", "cur")
+        with (
+            patch.object(
+                image_manager, "_get_adjacent_path", side_effect=lambda p, d: "/test/next.jpg" if d > 0 else None
+            ),
+            patch.object(image_manager, "_load_image_with_concurrency", return_value="next") as load,
+            patch.object(image_manager._prefetch_executor, "submit", side_effect=lambda fn, *args: fn(*args)),
+        ):
+            image_manager._ensure_hot3_residency("/test/cur.jpg", (800, 600))
+        load.assert_called_once_with("/test/next.jpg", None)
+        assert cache.is_pinned("/test/cur.jpg", PIN_OWNER_CURRENT)
+        assert cache.is_pinned("/test/next.jpg", PIN_OWNER_NEIGHBOR)
+
     def test_shutting_down_skips(self, image_manager):
         """关闭中跳过看门狗"""
         image_manager.main_window._shutting_down = True